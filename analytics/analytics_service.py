@@ -8,7 +8,9 @@ from collections import defaultdict, Counter
 import re
 
 from .models import Commit, RepositoryStats, Release
+from .commit_frame import CommitFrame
 from .developer_grouping_service import DeveloperGroupingService
+from .developer_profile_service import DeveloperProfileService
 
 from .models import PullRequest
 
@@ -27,6 +29,47 @@ class AnalyticsService:
         self.application_id = application_id
         self.commits = Commit.objects.filter(application_id=application_id)
         self.grouping_service = DeveloperGroupingService(application_id)
+        self._commit_frame = None
+    
+    @property
+    def commit_frame(self) -> CommitFrame:
+        """Columnar view of the application commits, loaded once per service"""
+        if self._commit_frame is None:
+            self._commit_frame = CommitFrame.from_queryset(self.commits)
+        return self._commit_frame
+    
+    @staticmethod
+    def _format_frequency(frame: CommitFrame) -> Dict:
+        """Commit frequency report (application/developer flavour, with gap stats)"""
+        if not len(frame):
+            return {
+                'avg_commits_per_day': 0,
+                'recent_activity_score': 0,
+                'consistency_score': 0,
+                'overall_frequency_score': 0,
+                'commits_last_30_days': 0,
+                'commits_last_90_days': 0,
+                'days_since_last_commit': None,
+                'active_days': 0,
+                'total_days': 0
+            }
+        
+        terms = frame.frequency_terms()
+        avg_gap, gap_std = frame.gap_statistics()
+        
+        return {
+            'avg_commits_per_day': round(terms['avg_commits_per_day'], 2),
+            'recent_activity_score': round(terms['recent_activity_score'], 1),
+            'consistency_score': round(terms['consistency_score'], 1),
+            'overall_frequency_score': round(terms['overall_frequency_score'], 1),
+            'commits_last_30_days': terms['commits_last_30_days'],
+            'commits_last_90_days': terms['commits_last_90_days'],
+            'days_since_last_commit': terms['days_since_last_commit'],
+            'active_days': terms['active_days'],
+            'total_days': terms['total_days'],
+            'avg_gap_between_commits': round(avg_gap, 1),
+            'gap_consistency': round(gap_std, 1)
+        }
     
     def get_developer_activity(self, days: int = 30) -> Dict:
         """
@@ -121,18 +164,14 @@ class AnalyticsService:
         """
         from django.utils import timezone
         cutoff_date = timezone.now() - timedelta(days=days)
-        recent_commits = self.commits.filter(authored_date__gte=cutoff_date)
-        
-        # Group commits by date
-        daily_activity = defaultdict(int)
-        hourly_activity = defaultdict(int)
+        recent_commits = self.commit_frame.since(cutoff_date)
         
-        for commit in recent_commits:
-            date_key = commit.authored_date.strftime('%Y-%m-%d')
-            hour_key = commit.authored_date.strftime('%H')
-            
-            daily_activity[date_key] += 1
-            hourly_activity[hour_key] += 1
+        # Group commits by date and by hour (UTC)
+        daily_activity = recent_commits.daily_counts()
+        hourly_counts = recent_commits.hourly_counts()
+        hourly_activity = {
+            f"{hour:02d}": int(count) for hour, count in enumerate(hourly_counts) if count
+        }
         
         # Convert to lists for frontend
         heatmap_data = []
@@ -161,21 +200,12 @@ class AnalyticsService:
         """
         from django.utils import timezone
         cutoff_date = timezone.now() - timedelta(days=days)
-        recent_commits = self.commits.filter(authored_date__gte=cutoff_date)
+        recent_commits = self.commit_frame.since(cutoff_date)
         
-        # Group commits by repository, date, and hour
-        repo_bubble_data = defaultdict(lambda: defaultdict(lambda: {'commits': 0}))
-        
-        for commit in recent_commits:
-            # Use the new timezone-aware method from the model
-            local_date = commit.get_authored_date_in_timezone()
-            
-            date = local_date.date()
-            hour = local_date.hour
-            repo = commit.repository_full_name
-            
-            key = (date, hour)
-            repo_bubble_data[repo][key]['commits'] += 1
+        # Group commits by repository, local date, and local hour
+        repo_bubble_data = defaultdict(dict)
+        for (repo, date, hour), commits in recent_commits.local_hour_buckets(by_repository=True).items():
+            repo_bubble_data[repo][(date, hour)] = commits
         
         # Convert to Chart.js format with separate datasets per repository
         datasets = []
@@ -201,16 +231,16 @@ class AnalyticsService:
                 'hoverBorderColor': color['border']
             }
             
-            for (date, hour), data in bubbles.items():
+            for (date, hour), commits in bubbles.items():
                 days_ago = (timezone.now().date() - date).days
                 dataset['data'].append({
                     'x': days_ago,
                     'y': hour,
-                    'r': min(data['commits'] * 3, 20),
-                    'commits': data['commits'],
+                    'r': min(commits * 3, 20),
+                    'commits': commits,
                     'repository': repo
                 })
-                max_commits = max(max_commits, data['commits'])
+                max_commits = max(max_commits, commits)
             
             datasets.append(dataset)
         
@@ -380,9 +410,8 @@ class AnalyticsService:
         last_commit = self.commits.order_by('-authored_date').first()
         
         # Calculate total additions/deletions
-        commits = self.commits.all()
-        total_additions = sum(commit.additions for commit in commits)
-        total_deletions = sum(commit.deletions for commit in commits)
+        total_additions = self.commit_frame.total_additions()
+        total_deletions = self.commit_frame.total_deletions()
         
         # Count unique authors using all developers (grouped + ungrouped) for this specific application
         all_developers = self.grouping_service.get_all_developers_for_application(self.application_id)
@@ -412,122 +441,7 @@ class AnalyticsService:
         Returns:
             Dictionary with application commit frequency metrics
         """
-        from datetime import datetime, timedelta
-        import statistics
-        
-        commits = self.commits.all()
-        
-        if not commits:
-            return {
-                'avg_commits_per_day': 0,
-                'recent_activity_score': 0,
-                'consistency_score': 0,
-                'overall_frequency_score': 0,
-                'commits_last_30_days': 0,
-                'commits_last_90_days': 0,
-                'days_since_last_commit': None,
-                'active_days': 0,
-                'total_days': 0
-            }
-        
-        # Convert to list for processing
-        commits_list = list(commits.order_by('authored_date'))
-        
-        if not commits_list:
-            return {
-                'avg_commits_per_day': 0,
-                'recent_activity_score': 0,
-                'consistency_score': 0,
-                'overall_frequency_score': 0,
-                'commits_last_30_days': 0,
-                'commits_last_90_days': 0,
-                'days_since_last_commit': None,
-                'active_days': 0,
-                'total_days': 0
-            }
-        
-        now = datetime.now(dt_timezone.utc)
-        first_commit = commits_list[0]
-        last_commit = commits_list[-1]
-        
-        # Calculate total time span
-        total_days = (last_commit.authored_date - first_commit.authored_date).days + 1
-        
-        # Calculate average commits per day
-        avg_commits_per_day = len(commits_list) / total_days if total_days > 0 else 0
-        
-        # Calculate recent activity (last 30 and 90 days)
-        cutoff_30 = now - timedelta(days=30)
-        cutoff_90 = now - timedelta(days=90)
-        
-        commits_last_30_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_30)
-        commits_last_90_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_90)
-        
-        # Calculate days since last commit
-        days_since_last_commit = (now - self._ensure_timezone_aware(last_commit.authored_date)).days
-        
-        # Calculate activity consistency
-        # Group commits by day to find active days
-        active_days = set()
-        for commit in commits_list:
-            active_days.add(commit.authored_date.date())
-        
-        active_days_count = len(active_days)
-        consistency_ratio = active_days_count / total_days if total_days > 0 else 0
-        
-        # Calculate gaps between commits (for consistency)
-        gaps = []
-        for i in range(1, len(commits_list)):
-            gap = (commits_list[i].authored_date - commits_list[i-1].authored_date).days
-            gaps.append(gap)
-        
-        avg_gap = statistics.mean(gaps) if gaps else 0
-        gap_std = statistics.stdev(gaps) if len(gaps) > 1 else 0
-        
-        # Calculate scores (0-100 scale)
-        
-        # Recent activity score (0-100)
-        # Based on commits in last 30 days vs 90 days
-        if commits_last_90_days > 0:
-            recent_activity_ratio = commits_last_30_days / commits_last_90_days
-            recent_activity_score = min(recent_activity_ratio * 100, 100)
-        else:
-            recent_activity_score = 0
-        
-        # Consistency score (0-100)
-        # Based on consistency ratio and gap standard deviation
-        consistency_score = min(consistency_ratio * 100, 100)
-        
-        # Overall frequency score (0-100)
-        # Weighted combination of different factors
-        weights = {
-            'avg_commits_per_day': 0.3,
-            'recent_activity': 0.4,
-            'consistency': 0.3
-        }
-        
-        # Normalize avg_commits_per_day (0-5 commits/day = 0-100 score)
-        normalized_avg = min(avg_commits_per_day * 20, 100)
-        
-        overall_frequency_score = (
-            normalized_avg * weights['avg_commits_per_day'] +
-            recent_activity_score * weights['recent_activity'] +
-            consistency_score * weights['consistency']
-        )
-        
-        return {
-            'avg_commits_per_day': round(avg_commits_per_day, 2),
-            'recent_activity_score': round(recent_activity_score, 1),
-            'consistency_score': round(consistency_score, 1),
-            'overall_frequency_score': round(overall_frequency_score, 1),
-            'commits_last_30_days': commits_last_30_days,
-            'commits_last_90_days': commits_last_90_days,
-            'days_since_last_commit': days_since_last_commit,
-            'active_days': active_days_count,
-            'total_days': total_days,
-            'avg_gap_between_commits': round(avg_gap, 1),
-            'gap_consistency': round(gap_std, 1)
-        }
+        return self._format_frequency(self.commit_frame)
     
     def get_grouped_developers(self) -> List[Dict]:
         """
@@ -617,74 +531,10 @@ class AnalyticsService:
                 'success': False
             }
         
-        # Get all aliases for this developer
         aliases = DeveloperAlias.objects.filter(developer=developer)
         
-        # Get all commits for this developer (global, from all applications)
-        alias_emails = [alias.email for alias in aliases]
-        from .models import Commit
-        developer_commits = Commit.objects.filter(author_email__in=alias_emails)
-        
-        # Calculate basic stats
-        total_commits = developer_commits.count()
-        total_additions = sum(commit.additions for commit in developer_commits)
-        total_deletions = sum(commit.deletions for commit in developer_commits)
-        
-        # Get date range
-        first_commit = developer_commits.order_by('authored_date').first()
-        last_commit = developer_commits.order_by('-authored_date').first()
-        
-        # Calculate activity over time (last 12 months)
-        from datetime import datetime, timedelta
-        now = datetime.now(dt_timezone.utc)
-        months_data = []
-        
-        for i in range(12):
-            month_start = now - timedelta(days=30 * (i + 1))
-            month_end = now - timedelta(days=30 * i)
-            
-            month_commits = developer_commits.filter(
-                authored_date__gte=month_start,
-                authored_date__lt=month_end
-            )
-            
-            month_additions = sum(commit.additions for commit in month_commits)
-            month_deletions = sum(commit.deletions for commit in month_commits)
-            
-            months_data.append({
-                'month': month_start.strftime('%Y-%m'),
-                'commits': month_commits.count(),
-                'additions': month_additions,
-                'deletions': month_deletions,
-                'net_lines': month_additions - month_deletions
-            })
-        
-        # Keep newest first (no reverse needed since we build from newest to oldest)
-        
-        # Get most active repositories
-        repo_stats = {}
-        for commit in developer_commits:
-            repo_name = commit.repository_full_name
-            if repo_name not in repo_stats:
-                repo_stats[repo_name] = {
-                    'commits': 0,
-                    'additions': 0,
-                    'deletions': 0
-                }
-            
-            repo_stats[repo_name]['commits'] += 1
-            repo_stats[repo_name]['additions'] += commit.additions
-            repo_stats[repo_name]['deletions'] += commit.deletions
-        
-        # Sort repositories by commit count
-        sorted_repos = sorted(
-            [{'name': repo, **stats} for repo, stats in repo_stats.items()],
-            key=lambda x: x['commits'],
-            reverse=True
-        )
-        
-        # Get commit quality metrics for this developer
-        quality_metrics = self._get_developer_commit_quality(developer_commits)
+        # Materialized aggregates of the developer's commits (global, from all applications)
+        profile = DeveloperProfileService.get_profile(str(developer.id))
         
         return {
             'success': True,
@@ -703,71 +553,17 @@ class AnalyticsService:
                 }
                 for alias in aliases
             ],
-            'total_commits': total_commits,
-            'total_additions': total_additions,
-            'total_deletions': total_deletions,
-            'net_lines': total_additions - total_deletions,
-            'first_commit_date': first_commit.authored_date if first_commit else None,
-            'last_commit_date': last_commit.authored_date if last_commit else None,
-            'activity_over_time': months_data,
-            'top_repositories': sorted_repos[:10],  # Top 10 repositories
-            'commit_quality': quality_metrics
+            'total_commits': profile.total_commits,
+            'total_additions': profile.total_additions,
+            'total_deletions': profile.total_deletions,
+            'net_lines': profile.total_additions - profile.total_deletions,
+            'first_commit_date': profile.first_commit_date(),
+            'last_commit_date': profile.last_commit_date(),
+            'activity_over_time': profile.activity_over_time(),  # Newest first
+            'top_repositories': profile.top_repositories(10),
+            'commit_quality': profile.commit_quality()
         }
     
-    def _get_developer_commit_quality(self, commits) -> Dict:
-        """
-        Analyze commit message quality for a specific developer
-        
-        Args:
-            commits: QuerySet of commits for the developer
-            
-        Returns:
-            Dictionary with commit quality metrics
-        """
-        # Define patterns for generic vs explicit messages
-        generic_patterns = [
-            r'^wip$', r'^fix$', r'^update$', r'^cleanup$', r'^refactor$',
-            r'^typo$', r'^style$', r'^format$', r'^test$', r'^docs$',
-            r'^chore:', r'^feat:', r'^fix:', r'^docs:', r'^style:',
-            r'^refactor:', r'^test:', r'^chore\(', r'^feat\(', r'^fix\(',
-            r'^update\s+\w+$', r'^fix\s+\w+$', r'^add\s+\w+$'
-        ]
-        
-        explicit_count = 0
-        generic_count = 0
-        total_commits = 0
-        
-        for commit in commits:
-            total_commits += 1
-            message = commit.message.lower().strip()
-            
-            # Check if message matches generic patterns
-            is_generic = False
-            for pattern in generic_patterns:
-                if re.match(pattern, message):
-                    is_generic = True
-                    break
-            
-            if is_generic:
-                generic_count += 1
-            else:
-                explicit_count += 1
-        
-        if total_commits > 0:
-            explicit_ratio = (explicit_count / total_commits) * 100
-            generic_ratio = (generic_count / total_commits) * 100
-        else:
-            explicit_ratio = 0
-            generic_ratio = 0
-        
-        return {
-            'total_commits': total_commits,
-            'explicit_commits': explicit_count,
-            'generic_commits': generic_count,
-            'explicit_ratio': round(explicit_ratio, 1),
-            'generic_ratio': round(generic_ratio, 1)
-        }
-
     def get_developer_commit_frequency(self, commits) -> Dict:
         """
         Calculate commit frequency metrics for a developer
@@ -778,120 +574,7 @@ class AnalyticsService:
         Returns:
             Dictionary with commit frequency metrics
         """
-        from datetime import datetime, timedelta
-        import statistics
-        
-        if not commits:
-            return {
-                'avg_commits_per_day': 0,
-                'recent_activity_score': 0,
-                'consistency_score': 0,
-                'overall_frequency_score': 0,
-                'commits_last_30_days': 0,
-                'commits_last_90_days': 0,
-                'days_since_last_commit': None,
-                'active_days': 0,
-                'total_days': 0
-            }
-        
-        # Convert to list for processing
-        commits_list = list(commits.order_by('authored_date'))
-        
-        if not commits_list:
-            return {
-                'avg_commits_per_day': 0,
-                'recent_activity_score': 0,
-                'consistency_score': 0,
-                'overall_frequency_score': 0,
-                'commits_last_30_days': 0,
-                'commits_last_90_days': 0,
-                'days_since_last_commit': None,
-                'active_days': 0,
-                'total_days': 0
-            }
-        
-        now = datetime.now(dt_timezone.utc)
-        first_commit = commits_list[0]
-        last_commit = commits_list[-1]
-        
-        # Calculate total time span
-        total_days = (last_commit.authored_date - first_commit.authored_date).days + 1
-        
-        # Calculate average commits per day
-        avg_commits_per_day = len(commits_list) / total_days if total_days > 0 else 0
-        
-        # Calculate recent activity (last 30 and 90 days)
-        cutoff_30 = now - timedelta(days=30)
-        cutoff_90 = now - timedelta(days=90)
-        
-        commits_last_30_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_30)
-        commits_last_90_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_90)
-        
-        # Calculate days since last commit
-        days_since_last_commit = (now - self._ensure_timezone_aware(last_commit.authored_date)).days
-        
-        # Calculate activity consistency
-        # Group commits by day to find active days
-        active_days = set()
-        for commit in commits_list:
-            active_days.add(commit.authored_date.date())
-        
-        active_days_count = len(active_days)
-        consistency_ratio = active_days_count / total_days if total_days > 0 else 0
-        
-        # Calculate gaps between commits (for consistency)
-        gaps = []
-        for i in range(1, len(commits_list)):
-            gap = (commits_list[i].authored_date - commits_list[i-1].authored_date).days
-            gaps.append(gap)
-        
-        avg_gap = statistics.mean(gaps) if gaps else 0
-        gap_std = statistics.stdev(gaps) if len(gaps) > 1 else 0
-        
-        # Calculate scores (0-100 scale)
-        
-        # Recent activity score (0-100)
-        # Based on commits in last 30 days vs 90 days
-        if commits_last_90_days > 0:
-            recent_activity_ratio = commits_last_30_days / commits_last_90_days
-            recent_activity_score = min(recent_activity_ratio * 100, 100)
-        else:
-            recent_activity_score = 0
-        
-        # Consistency score (0-100)
-        # Based on consistency ratio and gap standard deviation
-        consistency_score = min(consistency_ratio * 100, 100)
-        
-        # Overall frequency score (0-100)
-        # Weighted combination of different factors
-        weights = {
-            'avg_commits_per_day': 0.3,
-            'recent_activity': 0.4,
-            'consistency': 0.3
-        }
-        
-        # Normalize avg_commits_per_day (0-5 commits/day = 0-100 score)
-        normalized_avg = min(avg_commits_per_day * 20, 100)
-        
-        overall_frequency_score = (
-            normalized_avg * weights['avg_commits_per_day'] +
-            recent_activity_score * weights['recent_activity'] +
-            consistency_score * weights['consistency']
-        )
-        
-        return {
-            'avg_commits_per_day': round(avg_commits_per_day, 2),
-            'recent_activity_score': round(recent_activity_score, 1),
-            'consistency_score': round(consistency_score, 1),
-            'overall_frequency_score': round(overall_frequency_score, 1),
-            'commits_last_30_days': commits_last_30_days,
-            'commits_last_90_days': commits_last_90_days,
-            'days_since_last_commit': days_since_last_commit,
-            'active_days': active_days_count,
-            'total_days': total_days,
-            'avg_gap_between_commits': round(avg_gap, 1),
-            'gap_consistency': round(gap_std, 1)
-        } 
+        return self._format_frequency(CommitFrame.from_queryset(commits))
 
     def get_pr_cycle_times(self) -> list:
         """
@@ -0,0 +1,165 @@
+"""
+Cache warming after indexing
+
+When indexing finishes for a repository, warm_after_indexing() requests a
+warm of the repository and of every project containing it. The repository
+warm then requests one for its top developers. Repository and project warms
+recompute the page snapshots of the default date ranges (the landing range
+and the 30d, 90d and All Time quick selects), repository warms also the
+all-time metrics, and developer warms rebuild stale developer profiles, so
+the first visitor after an indexing run does not pay for the computation.
+
+Warms are deduplicated per entity: a pending marker is added to the metrics
+cache store, and the warm is scheduled CACHE_WARMING_DELAY seconds later.
+Indexing completions until it starts (commits, then pull requests, then
+releases of the same sync) find the marker and add nothing.
+"""
+import logging
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics_cache import get_store
+from .page_snapshots import REFRESH_LOCK_TIMEOUT, compute_snapshot
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ('repository', 'project', 'developer')
+
+# Start of the All Time quick select of the detail pages
+ALL_TIME_START = '1970-01-01'
+
+
+def _warming_key(entity_type: str, entity_id) -> str:
+    return f"warm:{entity_type}:{entity_id}"
+
+
+def default_date_ranges() -> List[tuple]:
+    """(start, end) parameters of the detail pages warmed for an entity"""
+    today = timezone.now().date()
+    end = today.isoformat()
+    return [
+        (None, None),
+        ((today - timedelta(days=29)).isoformat(), end),
+        ((today - timedelta(days=89)).isoformat(), end),
+        (ALL_TIME_START, end),
+    ]
+
+
+def request_warming(entity_type: str, entity_id, delay: int = None) -> bool:
+    """
+    Schedule a warm of an entity unless one is already pending
+
+    Returns:
+        True if a warm was scheduled
+    """
+    if entity_type not in ENTITY_TYPES:
+        raise ValueError(f"Invalid entity_type: {entity_type}")
+    store = get_store()
+    if store is None:
+        return False
+    if delay is None:
+        delay = settings.CACHE_WARMING_DELAY
+
+    key = _warming_key(entity_type, entity_id)
+    try:
+        if not store.add(key, True, delay + REFRESH_LOCK_TIMEOUT):
+            return False
+        try:
+            from django_q.tasks import schedule
+            schedule(
+                'analytics.cache_warming.warm_entity_task', entity_type, entity_id,
+                next_run=timezone.now() + timedelta(seconds=delay)
+            )
+        except Exception:
+            store.delete(key)
+            raise
+    except Exception as e:
+        logger.warning(f"Could not schedule cache warming of {entity_type} {entity_id}: {e}")
+        return False
+    return True
+
+
+def warm_after_indexing(repository) -> None:
+    """Request warms of a repository and of the projects containing it"""
+    if get_store() is None:
+        return
+    try:
+        request_warming('repository', repository.id)
+        for project_id in repository.projects.values_list('id', flat=True):
+            request_warming('project', project_id)
+    except Exception as e:
+        logger.warning(f"Could not request cache warming for {repository.full_name}: {e}")
+
+
+def top_developer_ids(repository_full_name: str, limit: int) -> List[str]:
+    """IDs of the developers with the most commits in a repository"""
+    from .models import Commit
+
+    pipeline = [
+        {'$match': {'repository_full_name': repository_full_name, 'developer_id': {'$ne': None}}},
+        {'$group': {'_id': '$developer_id', 'commits': {'$sum': 1}}},
+        {'$sort': {'commits': -1}},
+        {'$limit': limit},
+    ]
+    return [doc['_id'] for doc in Commit._get_collection().aggregate(pipeline)]
+
+
+def _warm_repository(repository_id) -> None:
+    from repositories.models import Repository
+    from .unified_metrics_service import UnifiedMetricsService
+
+    repository = Repository.objects.get(id=repository_id)
+    for start_str, end_str in default_date_ranges():
+        compute_snapshot(
+            'repository_detail', repository.id, (start_str, end_str), [repository.full_name],
+            'repositories.views.compute_repository_detail_context',
+            (repository.id, start_str, end_str)
+        )
+    UnifiedMetricsService('repository', repository.id).get_all_metrics()
+
+    if settings.CACHE_WARMING_TOP_DEVELOPERS > 0:
+        for developer_id in top_developer_ids(repository.full_name, settings.CACHE_WARMING_TOP_DEVELOPERS):
+            request_warming('developer', developer_id, delay=0)
+
+
+def _warm_project(project_id) -> None:
+    from projects.models import Project
+
+    project = Project.objects.get(id=project_id)
+    repository_full_names = [repo.full_name for repo in project.repositories.all()]
+    for start_str, end_str in default_date_ranges():
+        compute_snapshot(
+            'project_detail', project.id, (start_str, end_str), repository_full_names,
+            'projects.views.compute_project_detail_context', (project.id, start_str, end_str)
+        )
+
+
+def _warm_developer(developer_id) -> None:
+    from .developer_profile_service import DeveloperProfileService
+
+    # Rebuilds the profile the developer pages read, if indexing marked it stale
+    DeveloperProfileService.get_profile(str(developer_id))
+
+
+def warm_entity_task(entity_type: str, entity_id) -> dict:
+    """Django-Q task warming the cached metrics of an entity"""
+    store = get_store()
+    if store is None:
+        return {'status': 'skipped', 'reason': 'metrics cache disabled'}
+    # Data indexed from now on needs another warm
+    store.delete(_warming_key(entity_type, entity_id))
+
+    warmers = {'repository': _warm_repository, 'project': _warm_project, 'developer': _warm_developer}
+    started = timezone.now()
+    try:
+        warmers[entity_type](entity_id)
+    except Exception as e:
+        logger.warning(f"Cache warming of {entity_type} {entity_id} failed: {e}")
+        return {'status': 'error', 'entity_type': entity_type, 'entity_id': entity_id, 'error': str(e)}
+
+    duration = (timezone.now() - started).total_seconds()
+    logger.info(f"Warmed cached metrics of {entity_type} {entity_id} in {duration:.1f}s")
+    return {'status': 'success', 'entity_type': entity_type, 'entity_id': entity_id, 'duration': duration}
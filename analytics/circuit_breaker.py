@@ -0,0 +1,95 @@
+"""
+Circuit breaker for slow or failing backends
+
+closed -> open: after `failure_threshold` consecutive failures, or a call
+slower than `latency_budget` seconds (failed or not).
+open -> half-open: after `retry_after` seconds, one probe call is allowed.
+half-open -> closed when the probe succeeds within the budget, back to open
+otherwise.
+
+While open, allow_request() returns False immediately and callers use their
+fallback. One breaker is shared by all the threads of a process.
+"""
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker with a latency budget"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, latency_budget: float = 30.0,
+                 retry_after: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.latency_budget = latency_budget
+        self.retry_after = retry_after
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit and forget failures"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.retry_after:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may be sent (only one probe at a time when half-open)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._probing or self._clock() - self._opened_at < self.retry_after:
+                return False
+            self._state = HALF_OPEN
+            self._probing = True
+            return True
+
+    def record_success(self, elapsed: float) -> None:
+        """Record a call answered in `elapsed` seconds"""
+        if elapsed > self.latency_budget:
+            self._trip(f"call took {elapsed:.1f}s, over the {self.latency_budget:.1f}s budget")
+            return
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self, elapsed: float = 0.0) -> None:
+        """Record a call that failed after `elapsed` seconds"""
+        with self._lock:
+            self._failures += 1
+            failures = self._failures
+            probing = self._state == HALF_OPEN
+        if probing:
+            self._trip("probe call failed")
+        elif elapsed > self.latency_budget:
+            self._trip(f"call failed after {elapsed:.1f}s, over the {self.latency_budget:.1f}s budget")
+        elif failures >= self.failure_threshold:
+            self._trip(f"{failures} consecutive failures")
+
+    def _trip(self, reason: str) -> None:
+        with self._lock:
+            if self._state != OPEN:
+                logger.warning(f"Circuit {self.name} opened for {self.retry_after:.0f}s: {reason}")
+            self._state = OPEN
+            self._opened_at = self._clock()
+            self._probing = False
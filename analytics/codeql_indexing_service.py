@@ -6,7 +6,7 @@ import re
 from datetime import datetime, timezone as dt_timezone, timedelta
 from typing import Dict, List, Optional
 
-from .codeql_service import get_codeql_service_for_user
+from .codeql_service import get_codeql_service_for_user, rebuild_open_vulnerability_snapshots
 from .sanitization import assert_safe_repository_full_name
 from .models import CodeQLVulnerability, IndexingState, SecurityHealthHistory
 from .security_health_score_service import SecurityHealthScoreService
@@ -69,6 +69,8 @@ class CodeQLIndexingService:
             self._cleanup_obsolete_vulnerabilities(repository_full_name, results, current_alert_ids)
             
             self._complete_indexing(state, results, repository_full_name)
+
+            self._refresh_timeline_snapshots(repository_full_name)
             
         except Exception as e:
             self._handle_indexing_error(e, results, state, repository_full_name)
@@ -227,6 +229,14 @@ class CodeQLIndexingService:
             results['vulnerabilities_removed'],
         )
 
+    def _refresh_timeline_snapshots(self, repository_full_name: str):
+        """Rewrite the daily open vulnerability snapshots used by the trend chart"""
+        try:
+            written = rebuild_open_vulnerability_snapshots(repository_full_name)
+            logger.info("Wrote %d CodeQL daily snapshots for %s", written, repository_full_name)
+        except Exception as e:
+            logger.warning("Could not refresh CodeQL snapshots for %s: %s", repository_full_name, e)
+
     def _handle_indexing_error(self, e: Exception, results: Dict, state: IndexingState, repository_full_name: str):
         """Handle indexing error"""
         error_msg = f"CodeQL indexing failed for {repository_full_name}: {e}"
@@ -2,8 +2,9 @@
 CodeQL Security Analysis Service for GitHub repositories
 """
 import logging
+import numpy as np
 import requests
-from datetime import datetime, timezone as dt_timezone, timedelta
+from datetime import date, datetime, timezone as dt_timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 from django.conf import settings
 
@@ -12,6 +13,11 @@ from .models import CodeQLVulnerability
 
 logger = logging.getLogger(__name__)
 
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+SEVERITY_INDEX = {severity: i for i, severity in enumerate(SEVERITIES)}
+# History kept in the daily open vulnerability snapshots
+SNAPSHOT_HISTORY_DAYS = 730
+
 
 class CodeQLService:
     """Service for fetching and processing CodeQL security analysis data from GitHub"""
@@ -511,6 +517,9 @@ class CodeQLService:
         A vulnerability is considered open on a day D if:
           created_at <= end_of(D) and not fixed/dismissed before end_of(D).
 
+        Days covered by the snapshots written after CodeQL indexing are read
+        from CodeQLDailySnapshot; otherwise counts are computed on the fly.
+
         Args:
             repo_full_name: repository identifier
             start_date: inclusive start (date or datetime); defaults to 30 days ago (UTC) at 00:00
@@ -532,77 +541,157 @@ class CodeQLService:
             start_date = end_date - timedelta(days=30)
 
         # Convert to date objects
-        if isinstance(start_date, datetime):
-            start_day = start_date.date()
-        else:
-            start_day = start_date
-        if isinstance(end_date, datetime):
-            end_day = end_date.date()
-        else:
-            end_day = end_date
+        start_day = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_day = end_date.date() if isinstance(end_date, datetime) else end_date
 
-        # Pre-build labels
         num_days = (end_day - start_day).days + 1
-        labels = [(start_day + timedelta(days=i)) for i in range(max(num_days, 0))]
-
-        # Initialize counters
-        series = {
-            'critical': [0] * len(labels),
-            'high': [0] * len(labels),
-            'medium': [0] * len(labels),
-            'low': [0] * len(labels),
-        }
+        if num_days <= 0:
+            return {'labels': [], 'series': {severity: [] for severity in SEVERITIES}}
 
-        if not labels:
-            return {'labels': [], 'series': series}
+        labels = [(start_day + timedelta(days=i)).isoformat() for i in range(num_days)]
 
-        # Fetch all vulnerabilities that could overlap the window
-        # Include ones created before end_day and not closed before start_day
-        window_start_dt = datetime.combine(start_day, datetime.min.time(), tzinfo=dt_timezone.utc)
-        window_end_dt = datetime.combine(end_day, datetime.max.time(), tzinfo=dt_timezone.utc)
+        series = _read_open_vulnerability_snapshots(repo_full_name, start_day, end_day)
+        if series is None:
+            window_end_dt = datetime.combine(end_day, datetime.max.time(), tzinfo=dt_timezone.utc)
+            vulns = CodeQLVulnerability.objects(
+                repository_full_name=repo_full_name,
+                created_at__lte=window_end_dt
+            ).only('severity', 'created_at', 'fixed_at', 'dismissed_at')
+            counts = open_vulnerability_counts(vulns, start_day, end_day)
+            series = {severity: counts[i].tolist() for i, severity in enumerate(SEVERITIES)}
 
-        vulns = CodeQLVulnerability.objects(
-            repository_full_name=repo_full_name,
-            created_at__lte=window_end_dt
-        )
+        return {'labels': labels, 'series': series}
 
-        # Accumulate active intervals per vuln
-        for v in vulns:
-            sev = (v.severity or 'low').lower()
-            if sev not in series:
-                continue
-
-            # Active from max(created_at.date, start_day)
-            v_created_day = (v.created_at.astimezone(dt_timezone.utc).date()
-                             if v.created_at else start_day)
-            active_start = max(v_created_day, start_day)
-
-            # Closed at min(fixed_at, dismissed_at) if present; treat closure on that day as no longer open
-            closed_dt = None
-            if v.fixed_at:
-                closed_dt = v.fixed_at
-            if v.dismissed_at and (closed_dt is None or v.dismissed_at < closed_dt):
-                closed_dt = v.dismissed_at
-
-            if closed_dt is not None:
-                closed_day = closed_dt.astimezone(dt_timezone.utc).date()
-                # Active through the day before closed_day
-                active_end = min(end_day, closed_day - timedelta(days=1))
-            else:
-                active_end = end_day
 
-            if active_end < active_start:
-                continue
+def _utc_date(value: datetime) -> date:
+    """Return the UTC calendar day of a datetime (naive values are UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc)
+    return value.date()
+
+
+def open_vulnerability_counts(vulnerabilities, start_day: date, end_day: date) -> np.ndarray:
+    """
+    Count open vulnerabilities per severity and day with a difference array.
+
+    Each vulnerability adds +1 on its first open day and -1 the day after its
+    last open day; a prefix sum then yields the daily open counts, so the cost
+    is O(vulnerabilities + days) instead of O(vulnerabilities x days).
+
+    Args:
+        vulnerabilities: Iterable of CodeQLVulnerability (severity, created_at,
+            fixed_at, dismissed_at are used)
+        start_day: First day of the range (inclusive)
+        end_day: Last day of the range (inclusive)
+
+    Returns:
+        Array of shape (len(SEVERITIES), days) with the open counts
+    """
+    num_days = (end_day - start_day).days + 1
+    if num_days <= 0:
+        return np.zeros((len(SEVERITIES), 0), dtype=np.int64)
+
+    rows, starts, ends = [], [], []
+    for v in vulnerabilities:
+        row = SEVERITY_INDEX.get((v.severity or 'low').lower())
+        if row is None:
+            continue
+
+        # Active from max(created_at.date, start_day)
+        created_day = _utc_date(v.created_at) if v.created_at else start_day
+        active_start = max(created_day, start_day)
+
+        # Closed at min(fixed_at, dismissed_at); not open anymore on the closing day
+        closed_dt = v.fixed_at
+        if v.dismissed_at and (closed_dt is None or v.dismissed_at < closed_dt):
+            closed_dt = v.dismissed_at
+        if closed_dt is not None:
+            active_end = min(end_day, _utc_date(closed_dt) - timedelta(days=1))
+        else:
+            active_end = end_day
+
+        if active_end < active_start:
+            continue
+        rows.append(row)
+        starts.append((active_start - start_day).days)
+        ends.append((active_end - start_day).days + 1)
+
+    diff = np.zeros((len(SEVERITIES), num_days + 1), dtype=np.int64)
+    if rows:
+        np.add.at(diff, (rows, starts), 1)
+        np.add.at(diff, (rows, ends), -1)
+    return np.cumsum(diff[:, :num_days], axis=1)
+
+
+def _read_open_vulnerability_snapshots(repo_full_name: str, start_day: date,
+                                       end_day: date) -> Optional[Dict[str, List[int]]]:
+    """
+    Return snapshot series for the range, or None if snapshots do not cover it
+
+    Snapshots end on the last CodeQL indexing day, and open counts only change
+    when indexing runs, so days after the latest snapshot repeat its counts.
+    """
+    from .models import CodeQLDailySnapshot
+
+    num_days = (end_day - start_day).days + 1
+    start_dt = datetime.combine(start_day, datetime.min.time())
+    end_dt = datetime.combine(end_day, datetime.min.time())
+    snapshots = list(CodeQLDailySnapshot.objects(
+        repository_full_name=repo_full_name,
+        day__gte=start_dt,
+        day__lte=end_dt
+    ).order_by('day'))
+
+    trailing_days = 0
+    if len(snapshots) != num_days:
+        latest = CodeQLDailySnapshot.objects(repository_full_name=repo_full_name).order_by('-day').first()
+        if latest is None or latest.day.date() >= end_day:
+            return None
+        covered_days = max(0, (latest.day.date() - start_day).days + 1)
+        if len(snapshots) != covered_days:
+            return None
+        trailing_days = num_days - covered_days
+        snapshots.extend([latest] * trailing_days)
+    return {severity: [getattr(snapshot, severity) for snapshot in snapshots] for severity in SEVERITIES}
+
+
+def rebuild_open_vulnerability_snapshots(repo_full_name: str, days: int = SNAPSHOT_HISTORY_DAYS) -> int:
+    """
+    Recompute and persist the daily open counts of a repository.
+
+    Fixed and dismissed dates can change retroactively, so the whole history
+    window is rewritten after every CodeQL indexing run.
 
-            # Add +1 for each day in [active_start, active_end]
-            start_idx = (active_start - start_day).days
-            end_idx = (active_end - start_day).days
-            for idx in range(start_idx, end_idx + 1):
-                series[sev][idx] += 1
+    Returns:
+        Number of daily snapshots written
+    """
+    from .models import CodeQLDailySnapshot
+
+    end_day = datetime.now(dt_timezone.utc).date()
+    start_day = end_day - timedelta(days=days - 1)
+    window_end_dt = datetime.combine(end_day, datetime.max.time(), tzinfo=dt_timezone.utc)
+
+    vulns = CodeQLVulnerability.objects(
+        repository_full_name=repo_full_name,
+        created_at__lte=window_end_dt
+    ).only('severity', 'created_at', 'fixed_at', 'dismissed_at')
+    counts = open_vulnerability_counts(vulns, start_day, end_day)
+
+    computed_at = datetime.now(dt_timezone.utc)
+    snapshots = [
+        CodeQLDailySnapshot(
+            repository_full_name=repo_full_name,
+            day=datetime.combine(start_day + timedelta(days=i), datetime.min.time()),
+            computed_at=computed_at,
+            **{severity: int(counts[row, i]) for row, severity in enumerate(SEVERITIES)}
+        )
+        for i in range(counts.shape[1])
+    ]
 
-        # Format labels as ISO dates
-        label_strs = [d.isoformat() for d in labels]
-        return {'labels': label_strs, 'series': series}
+    CodeQLDailySnapshot.objects(repository_full_name=repo_full_name).delete()
+    if snapshots:
+        CodeQLDailySnapshot.objects.insert(snapshots, load_bulk=False)
+    return len(snapshots)
 
 
 def get_codeql_service_for_user(user_id: int, repository_full_name: Optional[str] = None) -> Optional[CodeQLService]:
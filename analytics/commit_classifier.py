@@ -4,13 +4,19 @@ Commit classification service
 import re
 import requests
 from typing import Tuple, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .commit_flags import files_only_type
+from .commit_rules import classify_message
+from .ollama_classifier import classify_messages as classify_messages_ollama
 
 
 def classify_commit(message: str) -> str:
     """
     Classify a commit message into categories
     
+    Reference implementation of the rules, see commit_rules.classify_message
+    for the compiled version used by the classification paths.
+    
     Args:
         message: Commit message to classify
         
@@ -78,7 +84,7 @@ def classify_commit_with_ollama_fallback(message: str) -> str:
         Category: 'fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other'
     """
     # First try the simple classifier
-    simple_result = classify_commit(message)
+    simple_result = classify_message(message)
     
     # If simple classifier returns 'other', try Ollama
     if simple_result == 'other':
@@ -91,52 +97,17 @@ def classify_commits_ollama_parallel(messages: List[str], max_workers: int = 3)
     """
     Classify multiple commit messages in parallel using Ollama
     
+    Cached labels are reused, the other messages are sent in batched prompts
+    (see analytics.ollama_classifier).
+    
     Args:
         messages: List of commit messages to classify
-        max_workers: Number of parallel threads (default: 3)
+        max_workers: Number of prompts sent in parallel (default: 3)
         
     Returns:
         List of categories in the same order as input messages
     """
-    if not messages:
-        return []
-    
-    # If only one message, use single classification
-    if len(messages) == 1:
-        return [classify_commit_ollama(messages[0])]
-    
-    def classify_with_index(indexed_message):
-        """Helper function to classify with index to preserve order"""
-        index, message = indexed_message
-        try:
-            return index, classify_commit_ollama(message)
-        except Exception as e:
-            # Fallback to simple classifier on error
-            return index, classify_commit(message)
-    
-    # Create indexed messages to preserve order
-    indexed_messages = list(enumerate(messages))
-    results = [None] * len(messages)
-    
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_index = {
-            executor.submit(classify_with_index, indexed_msg): indexed_msg[0] 
-            for indexed_msg in indexed_messages
-        }
-        
-        # Collect results in original order
-        for future in as_completed(future_to_index):
-            try:
-                index, category = future.result()
-                results[index] = category
-            except Exception as e:
-                # Fallback for any remaining errors
-                index = future_to_index[future]
-                results[index] = classify_commit(messages[index])
-    
-    return results
+    return classify_messages_ollama(messages, max_workers=max_workers)
 
 
 def classify_commits_with_ollama_fallback_batch(messages: List[str]) -> List[str]:
@@ -153,7 +124,7 @@ def classify_commits_with_ollama_fallback_batch(messages: List[str]) -> List[str
         return []
     
     # First pass: use simple classifier for all messages
-    simple_results = [classify_commit(message) for message in messages]
+    simple_results = [classify_message(message) for message in messages]
     
     # Find messages that need Ollama (simple classifier returned 'other')
     ollama_needed_indices = []
@@ -189,155 +160,7 @@ def classify_commit_ollama(message: str) -> str:
     Returns:
         Category: 'fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other'
     """
-    from django.conf import settings
-    import ollama
-    
-    # Configure Ollama client properly
-    def normalize_host(host: str) -> str:
-        """Normalize the host URL for Ollama"""
-        if host.startswith('http://'):
-            return host
-        elif host.startswith('https://'):
-            return host.replace('https://', 'http://')
-        else:
-            return f"http://{host}"
-    
-    # Create Ollama client with proper host configuration
-    host = normalize_host(settings.OLLAMA_HOST)
-    client = ollama.Client(host=host)
-    MODEL_NAME = settings.OLLAMA_MODEL
-    
-    prompt = f"""Classify this git commit message:
-
-"{message}"
-
-Categories: test, fix, feature, docs, refactor, style, perf, ci, chore, other
-
-Answer with only one word:"""
-
-    try:
-        # Use the client instance to call generate
-        response = client.generate(
-            model=MODEL_NAME,
-            prompt=prompt,
-            options={
-                'temperature': 0.3,
-                'num_predict': 10
-            }
-        )
-        
-        llm_response = response['response'].strip().lower()  # Normalize to lowercase
-        
-        # Extract the category from response - only use valid MongoDB choices
-        valid_categories = ['fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other']
-        for category in valid_categories:
-            if category in llm_response:
-                return category
-        
-        # Handle common variations that the LLM might use
-        variations = {
-            'update': 'chore',
-            'change': 'refactor',
-            'modify': 'refactor',
-            'improve': 'feature',
-            'enhance': 'feature',
-            'add': 'feature',
-            'remove': 'refactor',
-            'delete': 'refactor',
-            'clean': 'refactor',
-            'cleanup': 'refactor',
-            'optimize': 'refactor',  # Changed from 'perf' to 'refactor'
-            'speed': 'refactor',     # Changed from 'perf' to 'refactor'
-            'fast': 'refactor',      # Changed from 'perf' to 'refactor'
-            'slow': 'refactor',      # Changed from 'perf' to 'refactor'
-            'perf': 'refactor',      # Map 'perf' to 'refactor'
-            'ci': 'chore',           # Map 'ci' to 'chore'
-            'build': 'chore',
-            'deploy': 'chore',
-            'maintenance': 'chore',
-            'wip': 'chore',          # Work in progress
-            'tmp': 'chore',          # Temporary
-            'temp': 'chore',         # Temporary
-            'bump': 'chore',         # Version bump
-            'upgrade': 'chore',      # Dependency upgrade
-            'downgrade': 'chore',    # Dependency downgrade
-            'pin': 'chore',          # Pin dependency
-            'unpin': 'chore',        # Unpin dependency
-            'sync': 'chore',         # Sync
-            'merge': 'chore',        # Merge
-            'revert': 'fix',         # Revert
-            'rollback': 'fix',       # Rollback
-            'undo': 'fix',           # Undo
-            'restore': 'fix',        # Restore
-            'repair': 'fix',         # Repair
-            'resolve': 'fix',        # Resolve
-            'correct': 'fix',        # Correct
-            'patch': 'fix',          # Patch
-            'hotfix': 'fix',         # Hotfix
-            'bugfix': 'fix',         # Bugfix
-            'implement': 'feature',  # Implement
-            'create': 'feature',     # Create
-            'new': 'feature',        # New
-            'introduce': 'feature',  # Introduce
-            'enable': 'feature',     # Enable
-            'disable': 'fix',        # Disable
-            'configure': 'chore',    # Configure
-            'setup': 'chore',        # Setup
-            'install': 'chore',      # Install
-            'uninstall': 'chore',    # Uninstall
-            'migrate': 'refactor',   # Migrate
-            'port': 'refactor',      # Port
-            'rewrite': 'refactor',   # Rewrite
-            'restructure': 'refactor', # Restructure
-            'reorganize': 'refactor', # Reorganize
-            'simplify': 'refactor',  # Simplify
-            'clarify': 'docs',       # Clarify
-            'document': 'docs',      # Document
-            'comment': 'docs',       # Comment
-            'format': 'style',       # Format
-            'lint': 'style',         # Lint
-            'prettier': 'style',     # Prettier
-            'indent': 'style',       # Indent
-            'whitespace': 'style',   # Whitespace
-            'test': 'test',          # Test
-            'testing': 'test',       # Testing
-            'spec': 'test',          # Spec
-            'specs': 'test',         # Specs
-            'coverage': 'test',      # Coverage
-            'unit': 'test',          # Unit
-            'integration': 'test',   # Integration
-            'e2e': 'test',           # End-to-end
-            'performance': 'refactor', # Performance
-            'optimization': 'refactor', # Optimization
-        }
-        
-        # Check variations in both LLM response and original message
-        message_lower = message.lower()
-        
-        # First check LLM response for variations
-        for variation, category in variations.items():
-            if variation in llm_response:
-                return category
-        
-        # Then check original message for variations (fallback)
-        for variation, category in variations.items():
-            if variation in message_lower:
-                return category
-        
-        # If LLM said "other" but we found variations in the message, use the variation
-        # This is a fallback for when LLM fails to recognize obvious patterns
-        if 'other' in llm_response:
-            # Check if message contains obvious patterns that LLM missed
-            if any(word in message_lower for word in ['update', 'change', 'modify', 'improve', 'add', 'remove', 'delete', 'fix', 'bug', 'feature', 'new', 'test', 'doc', 'format', 'style']):
-                # Use simple classifier as final fallback
-                return classify_commit(message)
-        
-        # If no category found in LLM response, return 'other'
-        return 'other'
-        
-    except Exception as e:
-        # If Ollama fails, use simple classifier as fallback
-        return classify_commit(message)
+    return classify_messages_ollama([message])[0]
 
 
 def classify_commit_with_confidence(message: str) -> Tuple[str, float]:
@@ -387,7 +210,7 @@ def classify_commit_with_confidence(message: str) -> Tuple[str, float]:
     
     # If no keywords found, use pattern matching
     if total_score == 0:
-        category = classify_commit(message)
+        category = classify_message(message)
         confidence = 0.5 if category != 'other' else 0.0
         return category, confidence
     
@@ -414,6 +237,21 @@ def get_commit_type_stats(commits) -> dict:
         if commit_type in stats:
             stats[commit_type] += 1
     
+    return build_commit_type_stats(stats)
+
+
+def build_commit_type_stats(stats: dict) -> dict:
+    """
+    Build commit type statistics (percentages, ratios, status) from raw counts
+    
+    Args:
+        stats: Dictionary mapping every commit type to its commit count
+        
+    Returns:
+        Dictionary with commit type statistics
+    """
+    stats = dict(stats)
+    
     # Calculate percentages
     total = sum(stats.values())
     if total > 0:
@@ -492,22 +330,10 @@ def classify_commit_with_files(message: str, files: list) -> str:
     if not files or not isinstance(files, list):
         return classify_commit_with_ollama_fallback(message)
 
-    doc_exts = {'.md', '.rst', '.adoc', '.markdown', '.txt'}
-    chore_exts = {'.tf', '.tfvars', '.yml', '.yaml', '.json', '.env', '.ini', '.cfg', '.lock', '.dockerfile', '.gitignore', '.gitattributes', '.sh', '.bat', '.ps1'}
-    
-    def get_ext(f):
-        f = f.lower()
-        if f.startswith('dockerfile'):
-            return '.dockerfile'
-        return '.' + f.split('.')[-1] if '.' in f else ''
-
-    exts = set(get_ext(f) for f in files)
-    # Si tous les fichiers sont de la doc
-    if exts and all(e in doc_exts for e in exts):
-        return 'docs'
-    # Si tous les fichiers sont infra/config
-    if exts and all(e in chore_exts for e in exts):
-        return 'chore'
+    # Si tous les fichiers sont de la doc ou de l'infra/config
+    files_type = files_only_type(files)
+    if files_type:
+        return files_type
     # Sinon, logique standard
     return classify_commit_with_ollama_fallback(message)
 
@@ -536,7 +362,7 @@ def classify_commits_with_files_batch(commit_data_list: List[dict]) -> List[str]
         
         if not files or not isinstance(files, list):
             # No files info, will need message classification
-            simple_result = classify_commit(message)
+            simple_result = classify_message(message)
             if simple_result == 'other':
                 messages_for_ollama.append(message)
                 ollama_indices.append(i)
@@ -545,27 +371,13 @@ def classify_commits_with_files_batch(commit_data_list: List[dict]) -> List[str]
                 results.append(simple_result)
             continue
         
-        # File-based classification
-        doc_exts = {'.md', '.rst', '.adoc', '.markdown', '.txt'}
-        chore_exts = {'.tf', '.tfvars', '.yml', '.yaml', '.json', '.env', '.ini', '.cfg', '.lock', '.dockerfile', '.gitignore', '.gitattributes', '.sh', '.bat', '.ps1'}
-        
-        def get_ext(f):
-            f = f.lower()
-            if f.startswith('dockerfile'):
-                return '.dockerfile'
-            return '.' + f.split('.')[-1] if '.' in f else ''
-
-        exts = set(get_ext(f) for f in files)
-        
-        # Si tous les fichiers sont de la doc
-        if exts and all(e in doc_exts for e in exts):
-            results.append('docs')
-        # Si tous les fichiers sont infra/config
-        elif exts and all(e in chore_exts for e in exts):
-            results.append('chore')
+        # File-based classification: all documentation, or all infra/config
+        files_type = files_only_type(files)
+        if files_type:
+            results.append(files_type)
         else:
             # Need message classification
-            simple_result = classify_commit(message)
+            simple_result = classify_message(message)
             if simple_result == 'other':
                 messages_for_ollama.append(message)
                 ollama_indices.append(i)
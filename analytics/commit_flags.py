@@ -0,0 +1,168 @@
+"""
+Per-commit derived flags
+
+Commit.flags is a bitfield computed once when a commit is saved (see
+Commit.save) from its filenames, size and message, and Commit.languages the
+set of programming languages it touches. Quality metrics then count flags
+instead of scanning filenames on every request. Existing commits are filled
+in by the backfill_commit_flags command.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FLAG_HAS_CODE = 1 << 0
+FLAG_HAS_TESTS = 1 << 1
+FLAG_DOC_ONLY = 1 << 2
+FLAG_CONFIG_ONLY = 1 << 3
+FLAG_MICRO = 1 << 4
+FLAG_HAS_TICKET_REF = 1 << 5
+FLAG_SUSPICIOUS = 1 << 6
+FLAG_GENERIC_MESSAGE = 1 << 7
+
+FLAG_NAMES = {
+    'has_code': FLAG_HAS_CODE,
+    'has_tests': FLAG_HAS_TESTS,
+    'doc_only': FLAG_DOC_ONLY,
+    'config_only': FLAG_CONFIG_ONLY,
+    'micro': FLAG_MICRO,
+    'has_ticket_ref': FLAG_HAS_TICKET_REF,
+    'suspicious': FLAG_SUSPICIOUS,
+    'generic_message': FLAG_GENERIC_MESSAGE,
+}
+
+# Substring rules of the developer quality metrics
+CODE_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.php', '.rb')
+TEST_PATTERNS = ('test', 'spec', 'specs', '_test.', '.test.')
+DOC_PATTERNS = ('.md', '.txt', '.rst', '.adoc', 'readme', 'docs/', 'documentation/')
+CONFIG_PATTERNS = ('.json', '.yaml', '.yml', '.toml', '.ini', '.conf', '.config', 'package.json',
+                   'requirements.txt', 'pom.xml', 'build.gradle')
+
+# Extension rules of the file-based commit classification
+DOC_EXTENSIONS = frozenset({'.md', '.rst', '.adoc', '.markdown', '.txt'})
+CHORE_EXTENSIONS = frozenset({'.tf', '.tfvars', '.yml', '.yaml', '.json', '.env', '.ini', '.cfg', '.lock',
+                              '.dockerfile', '.gitignore', '.gitattributes', '.sh', '.bat', '.ps1'})
+
+LANGUAGES_BY_EXTENSION = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript', '.java': 'java', '.kt': 'kotlin', '.kts': 'kotlin',
+    '.scala': 'scala', '.go': 'go', '.rs': 'rust', '.rb': 'ruby', '.php': 'php',
+    '.c': 'c', '.h': 'c', '.cpp': 'cpp', '.cc': 'cpp', '.cxx': 'cpp', '.hpp': 'cpp',
+    '.cs': 'csharp', '.swift': 'swift', '.m': 'objective-c', '.dart': 'dart',
+    '.html': 'html', '.htm': 'html', '.css': 'css', '.scss': 'css', '.less': 'css',
+    '.vue': 'vue', '.svelte': 'svelte', '.sql': 'sql', '.sh': 'shell', '.bash': 'shell',
+    '.ps1': 'powershell', '.tf': 'terraform', '.r': 'r', '.lua': 'lua', '.pl': 'perl',
+    '.ex': 'elixir', '.exs': 'elixir', '.erl': 'erlang', '.hs': 'haskell', '.clj': 'clojure',
+}
+
+GENERIC_MESSAGE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'^wip$', r'^fix$', r'^update$', r'^cleanup$', r'^refactor$',
+    r'^typo$', r'^style$', r'^format$', r'^test$', r'^docs$',
+    r'^chore:', r'^feat:', r'^fix:', r'^docs:', r'^style:',
+    r'^refactor:', r'^test:', r'^chore\(', r'^feat\(', r'^fix\(',
+    r'^update\s+\w+$', r'^fix\s+\w+$', r'^add\s+\w+$'
+)]
+TICKET_REF_PATTERN = re.compile(r'#[0-9]+')
+FORMATTING_PATTERN = re.compile(r'format|style|indent|whitespace')
+
+
+def file_extension(filename: str) -> str:
+    """Lowercase extension of a filename ('.dockerfile' for Dockerfiles, '' if none)"""
+    filename = (filename or '').lower()
+    if filename.startswith('dockerfile'):
+        return '.dockerfile'
+    return '.' + filename.split('.')[-1] if '.' in filename else ''
+
+
+def files_only_type(filenames: Iterable[str]) -> Optional[str]:
+    """'docs' or 'chore' when every file is documentation (resp. infra/config), else None"""
+    extensions = {file_extension(filename) for filename in filenames}
+    if extensions and extensions <= DOC_EXTENSIONS:
+        return 'docs'
+    if extensions and extensions <= CHORE_EXTENSIONS:
+        return 'chore'
+    return None
+
+
+def is_generic_message(message: Optional[str]) -> bool:
+    """True for generic commit messages ('wip', 'fix: ...', 'update foo')"""
+    message = (message or '').lower().strip()
+    return any(pattern.match(message) for pattern in GENERIC_MESSAGE_PATTERNS)
+
+
+def compute_commit_flags(filenames: Iterable[str], total_changes: int, message: str) -> Tuple[int, List[str]]:
+    """
+    Return the flags bitfield and the sorted languages of a commit.
+
+    Code/test files make a code commit, documentation or configuration only
+    commits are flagged, and suspicious commits are micro commits, doc/config
+    only commits with real changes, or small formatting-only commits.
+    """
+    total_changes = total_changes or 0
+    message = message or ''
+    has_code = False
+    has_tests = False
+    doc_only = True
+    config_only = True
+    languages = set()
+
+    for filename in filenames:
+        filename = (filename or '').lower()
+        language = LANGUAGES_BY_EXTENSION.get(file_extension(filename))
+        if language:
+            languages.add(language)
+        if any(pattern in filename for pattern in TEST_PATTERNS):
+            has_tests = True
+
+        if any(ext in filename for ext in CODE_EXTENSIONS) or any(pattern in filename for pattern in TEST_PATTERNS):
+            has_code = True
+            doc_only = False
+            config_only = False
+        elif any(ext in filename for ext in DOC_PATTERNS):
+            doc_only = doc_only and not has_code
+        elif any(ext in filename for ext in CONFIG_PATTERNS):
+            config_only = config_only and not has_code
+
+    suspicious = (
+        0 < total_changes <= 1
+        or (doc_only and total_changes > 5)
+        or (config_only and total_changes > 5)
+        or (FORMATTING_PATTERN.search(message.lower()) is not None and total_changes <= 5)
+    )
+
+    flags = 0
+    for value, flag in (
+        (has_code, FLAG_HAS_CODE),
+        (has_tests, FLAG_HAS_TESTS),
+        (doc_only, FLAG_DOC_ONLY),
+        (config_only, FLAG_CONFIG_ONLY),
+        (total_changes <= 2, FLAG_MICRO),
+        (TICKET_REF_PATTERN.search(message) is not None, FLAG_HAS_TICKET_REF),
+        (suspicious, FLAG_SUSPICIOUS),
+        (is_generic_message(message), FLAG_GENERIC_MESSAGE),
+    ):
+        if value:
+            flags |= flag
+    return flags, sorted(languages)
+
+
+def decode_flags(flags: int) -> Dict[str, bool]:
+    """Return the named booleans of a flags bitfield"""
+    return {name: bool(flags & flag) for name, flag in FLAG_NAMES.items()}
+
+
+def flag_count_pipeline(match: Dict) -> List[Dict]:
+    """
+    Aggregation pipeline counting commits per flag for a $match query.
+
+    Uses bit arithmetic (floor(flags / 2^k) mod 2) so it runs on MongoDB
+    versions without $bitAnd; with an index on the matched fields + flags
+    the scan is covered.
+    """
+    group = {'_id': None, 'total_commits': {'$sum': 1}}
+    for name, flag in FLAG_NAMES.items():
+        group[name] = {'$sum': {'$mod': [{'$floor': {'$divide': [{'$ifNull': ['$flags', 0]}, flag]}}, 2]}}
+    return [
+        {'$match': match},
+        {'$project': {'_id': 0, 'flags': 1}},
+        {'$group': group},
+    ]
@@ -0,0 +1,364 @@
+"""
+Columnar commit frame for vectorized analytics
+
+Loads a projected commit set straight from MongoDB (``as_pymongo``) into NumPy
+arrays so that metric routines run as array operations instead of iterating
+MongoEngine documents one by one.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.utils import timezone as django_timezone
+
+# Order matters: the index of a type in this tuple is its type code
+COMMIT_TYPES = ('fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other')
+COMMIT_TYPE_CODES = {commit_type: code for code, commit_type in enumerate(COMMIT_TYPES)}
+OTHER_TYPE_CODE = COMMIT_TYPE_CODES['other']
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+
+def _to_epoch_seconds(value) -> int:
+    """Convert a BSON datetime (naive UTC or aware) to epoch seconds"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return int(value.timestamp())
+
+
+def _to_utc_datetime(epoch_seconds) -> datetime:
+    """Convert epoch seconds back to an aware UTC datetime"""
+    return datetime.fromtimestamp(int(epoch_seconds), tz=dt_timezone.utc)
+
+
+class CommitFrame:
+    """
+    Column-oriented view over a set of commits.
+
+    Columns (all NumPy arrays of the same length):
+        authored_ts: authored date as epoch seconds (UTC)
+        additions / deletions: line statistics
+        type_codes: index into ``COMMIT_TYPES``
+        author_ids: interned (author_email, author_name) pair
+        repo_ids: interned repository_full_name
+
+    The interned values are exposed through ``authors`` (list of
+    ``(email, name)`` tuples) and ``repositories`` (list of names).
+    """
+
+    PROJECTION = (
+        'authored_date', 'additions', 'deletions', 'commit_type',
+        'author_email', 'author_name', 'repository_full_name',
+    )
+
+    def __init__(self, authored_ts, additions, deletions, type_codes, author_ids, repo_ids,
+                 authors: Sequence[Tuple[str, str]], repositories: Sequence[str]):
+        self.authored_ts = authored_ts
+        self.additions = additions
+        self.deletions = deletions
+        self.type_codes = type_codes
+        self.author_ids = author_ids
+        self.repo_ids = repo_ids
+        self.authors = list(authors)
+        self.repositories = list(repositories)
+
+    # Construction
+    @classmethod
+    def empty(cls) -> 'CommitFrame':
+        """Build a frame without any commit"""
+        return cls.from_documents([])
+
+    @classmethod
+    def from_queryset(cls, queryset) -> 'CommitFrame':
+        """
+        Load a frame from a Commit queryset using a projected raw cursor
+
+        Args:
+            queryset: MongoEngine Commit queryset (already filtered)
+
+        Returns:
+            CommitFrame with one row per commit
+        """
+        return cls.from_documents(queryset.only(*cls.PROJECTION).as_pymongo())
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict]) -> 'CommitFrame':
+        """
+        Build a frame from raw commit dictionaries (as returned by ``as_pymongo``)
+
+        Documents without an authored date are skipped.
+        """
+        authored_ts = []
+        additions = []
+        deletions = []
+        type_codes = []
+        author_ids = []
+        repo_ids = []
+
+        author_index: Dict[Tuple[str, str], int] = {}
+        repo_index: Dict[str, int] = {}
+
+        for doc in documents:
+            authored_date = doc.get('authored_date')
+            if authored_date is None:
+                continue
+
+            author_key = (doc.get('author_email') or '', doc.get('author_name') or '')
+            author_id = author_index.get(author_key)
+            if author_id is None:
+                author_id = author_index[author_key] = len(author_index)
+
+            repo_name = doc.get('repository_full_name') or ''
+            repo_id = repo_index.get(repo_name)
+            if repo_id is None:
+                repo_id = repo_index[repo_name] = len(repo_index)
+
+            authored_ts.append(_to_epoch_seconds(authored_date))
+            additions.append(doc.get('additions') or 0)
+            deletions.append(doc.get('deletions') or 0)
+            type_codes.append(COMMIT_TYPE_CODES.get(doc.get('commit_type') or 'other', OTHER_TYPE_CODE))
+            author_ids.append(author_id)
+            repo_ids.append(repo_id)
+
+        return cls(
+            authored_ts=np.asarray(authored_ts, dtype=np.int64),
+            additions=np.asarray(additions, dtype=np.int64),
+            deletions=np.asarray(deletions, dtype=np.int64),
+            type_codes=np.asarray(type_codes, dtype=np.int8),
+            author_ids=np.asarray(author_ids, dtype=np.int32),
+            repo_ids=np.asarray(repo_ids, dtype=np.int32),
+            authors=list(author_index.keys()),
+            repositories=list(repo_index.keys()),
+        )
+
+    def __len__(self) -> int:
+        return int(self.authored_ts.shape[0])
+
+    # Slicing
+    def select(self, mask) -> 'CommitFrame':
+        """Return a new frame restricted to the rows where ``mask`` is true"""
+        return CommitFrame(
+            authored_ts=self.authored_ts[mask],
+            additions=self.additions[mask],
+            deletions=self.deletions[mask],
+            type_codes=self.type_codes[mask],
+            author_ids=self.author_ids[mask],
+            repo_ids=self.repo_ids[mask],
+            authors=self.authors,
+            repositories=self.repositories,
+        )
+
+    def since(self, cutoff: datetime) -> 'CommitFrame':
+        """Return commits authored at or after ``cutoff``"""
+        return self.select(self.authored_ts >= _to_epoch_seconds(cutoff))
+
+    # Totals
+    def total_additions(self) -> int:
+        return int(self.additions.sum())
+
+    def total_deletions(self) -> int:
+        return int(self.deletions.sum())
+
+    def first_authored_date(self) -> Optional[datetime]:
+        return _to_utc_datetime(self.authored_ts.min()) if len(self) else None
+
+    def last_authored_date(self) -> Optional[datetime]:
+        return _to_utc_datetime(self.authored_ts.max()) if len(self) else None
+
+    # Distributions
+    def type_counts(self) -> Dict[str, int]:
+        """Number of commits per commit type (all types present, zero-filled)"""
+        counts = np.bincount(self.type_codes, minlength=len(COMMIT_TYPES))
+        return {commit_type: int(counts[code]) for code, commit_type in enumerate(COMMIT_TYPES)}
+
+    def _group_totals(self, group_ids, size: int):
+        """Commit count, additions and deletions per group id"""
+        commits = np.bincount(group_ids, minlength=size)
+        additions = np.bincount(group_ids, weights=self.additions, minlength=size)
+        deletions = np.bincount(group_ids, weights=self.deletions, minlength=size)
+        return commits, additions, deletions
+
+    def per_author_totals(self) -> List[Dict]:
+        """
+        Commits, additions and deletions per interned author
+
+        Returns:
+            List of dicts with email, name, commits, additions, deletions
+            (only authors that have at least one commit in the frame)
+        """
+        if not len(self):
+            return []
+        commits, additions, deletions = self._group_totals(self.author_ids, len(self.authors))
+        totals = []
+        for author_id in np.flatnonzero(commits):
+            email, name = self.authors[author_id]
+            totals.append({
+                'email': email,
+                'name': name,
+                'commits': int(commits[author_id]),
+                'additions': int(additions[author_id]),
+                'deletions': int(deletions[author_id]),
+            })
+        return totals
+
+    def per_repository_totals(self) -> List[Dict]:
+        """Commits, additions and deletions per repository present in the frame"""
+        if not len(self):
+            return []
+        commits, additions, deletions = self._group_totals(self.repo_ids, len(self.repositories))
+        return [
+            {
+                'name': self.repositories[repo_id],
+                'commits': int(commits[repo_id]),
+                'additions': int(additions[repo_id]),
+                'deletions': int(deletions[repo_id]),
+            }
+            for repo_id in np.flatnonzero(commits)
+        ]
+
+    def hourly_counts(self) -> np.ndarray:
+        """Commit count per UTC hour of day (array of 24 ints)"""
+        hours = (self.authored_ts // SECONDS_PER_HOUR) % 24
+        return np.bincount(hours, minlength=24)
+
+    def daily_counts(self) -> Dict[str, int]:
+        """Commit count per UTC calendar day, keyed by ``YYYY-MM-DD``"""
+        if not len(self):
+            return {}
+        days, counts = np.unique(self.authored_ts // SECONDS_PER_DAY, return_counts=True)
+        epoch = datetime(1970, 1, 1)
+        return {
+            (epoch + timedelta(days=int(day))).strftime('%Y-%m-%d'): int(count)
+            for day, count in zip(days, counts)
+        }
+
+    def local_hour_buckets(self, by_repository: bool = False) -> Dict[tuple, int]:
+        """
+        Commit count per (local date, local hour) in the configured timezone
+
+        Commits are first grouped by UTC hour bucket with NumPy, so the
+        timezone conversion only runs once per distinct hour rather than once
+        per commit (DST transitions are still honoured).
+
+        Args:
+            by_repository: prefix keys with the repository name
+
+        Returns:
+            Dict mapping (date, hour) or (repository, date, hour) to counts
+        """
+        if not len(self):
+            return {}
+        hour_buckets = self.authored_ts // SECONDS_PER_HOUR
+        if by_repository:
+            keys = np.stack([self.repo_ids.astype(np.int64), hour_buckets], axis=1)
+            unique_keys, counts = np.unique(keys, axis=0, return_counts=True)
+        else:
+            unique_keys, counts = np.unique(hour_buckets, return_counts=True)
+
+        buckets = {}
+        for key, count in zip(unique_keys, counts):
+            if by_repository:
+                repo_id, hour_bucket = int(key[0]), int(key[1])
+            else:
+                repo_id, hour_bucket = None, int(key)
+            local_dt = django_timezone.localtime(_to_utc_datetime(hour_bucket * SECONDS_PER_HOUR))
+            bucket_key = (local_dt.date(), local_dt.hour)
+            if by_repository:
+                bucket_key = (self.repositories[repo_id],) + bucket_key
+            buckets[bucket_key] = buckets.get(bucket_key, 0) + int(count)
+        return buckets
+
+    def change_size_percentiles(self, percentiles: Sequence[float] = (50, 75, 90, 95)) -> Dict[str, float]:
+        """Percentiles of lines changed (additions + deletions) per commit"""
+        if not len(self):
+            return {f"p{int(p)}": 0 for p in percentiles}
+        sizes = self.additions + self.deletions
+        values = np.percentile(sizes, percentiles)
+        return {f"p{int(p)}": round(float(v), 1) for p, v in zip(percentiles, values)}
+
+    # Frequency
+    def frequency_terms(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Raw (unrounded) terms of the commit frequency score
+
+        Follows the conventions of the original per-document implementations:
+        day spans use ``timedelta.days`` semantics and active days are UTC
+        calendar days.
+        """
+        now = now or datetime.now(dt_timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=dt_timezone.utc)
+        now_ts = now.timestamp()
+        first_ts = int(self.authored_ts.min())
+        last_ts = int(self.authored_ts.max())
+
+        total_days = (last_ts - first_ts) // SECONDS_PER_DAY + 1
+        avg_commits_per_day = len(self) / total_days if total_days > 0 else 0
+
+        commits_last_30_days = int(np.count_nonzero(self.authored_ts >= now_ts - 30 * SECONDS_PER_DAY))
+        commits_last_90_days = int(np.count_nonzero(self.authored_ts >= now_ts - 90 * SECONDS_PER_DAY))
+        days_since_last_commit = int((now_ts - last_ts) // SECONDS_PER_DAY)
+
+        active_days_count = int(np.unique(self.authored_ts // SECONDS_PER_DAY).shape[0])
+        consistency_ratio = active_days_count / total_days if total_days > 0 else 0
+
+        recent_activity_score = min((commits_last_30_days / commits_last_90_days * 100) if commits_last_90_days > 0 else 0, 100)
+        consistency_score = min(consistency_ratio * 100, 100)
+        normalized_avg = min(avg_commits_per_day * 20, 100)
+        overall_frequency_score = (normalized_avg * 0.3 + recent_activity_score * 0.4 + consistency_score * 0.3)
+
+        return {
+            'avg_commits_per_day': avg_commits_per_day,
+            'recent_activity_score': recent_activity_score,
+            'consistency_score': consistency_score,
+            'overall_frequency_score': overall_frequency_score,
+            'commits_last_30_days': commits_last_30_days,
+            'commits_last_90_days': commits_last_90_days,
+            'days_since_last_commit': days_since_last_commit,
+            'active_days': active_days_count,
+            'total_days': int(total_days)
+        }
+
+    def commit_frequency(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Commit frequency, recent activity and consistency scores
+
+        Same keys and rounding as ``UnifiedMetricsService.get_commit_frequency``.
+        """
+        if not len(self):
+            return {
+                'avg_commits_per_day': 0,
+                'recent_activity_score': 0,
+                'consistency_score': 0,
+                'overall_frequency_score': 0,
+                'commits_last_30_days': 0,
+                'commits_last_90_days': 0,
+                'days_since_last_commit': None,
+                'active_days': 0,
+                'total_days': 0
+            }
+
+        terms = self.frequency_terms(now)
+        return {
+            **terms,
+            'avg_commits_per_day': round(terms['avg_commits_per_day'], 2),
+            'recent_activity_score': int(round(terms['recent_activity_score'])),
+            'consistency_score': int(round(terms['consistency_score'])),
+            'overall_frequency_score': int(round(terms['overall_frequency_score'])),
+        }
+
+    def gap_statistics(self) -> Tuple[float, float]:
+        """
+        Mean and sample standard deviation of day gaps between consecutive commits
+
+        Matches the ``(later - earlier).days`` convention used by the
+        application/developer frequency reports.
+        """
+        if len(self) < 2:
+            return 0.0, 0.0
+        ordered = np.sort(self.authored_ts)
+        gaps = np.diff(ordered) // SECONDS_PER_DAY
+        mean = float(gaps.mean())
+        std = float(gaps.std(ddof=1)) if gaps.shape[0] > 1 else 0.0
+        return mean, std
@@ -12,6 +12,7 @@ from django.utils import timezone
 from .models import Commit, FileChange
 from .intelligent_indexing_service import IntelligentIndexingService
 from .commit_classifier import classify_commit_with_files, classify_commits_with_files_batch
+from .developer_profile_service import DeveloperProfileService, changed_developer_ids, profile_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -201,6 +202,8 @@ class CommitIndexingService:
             Number of commits processed
         """
         processed = 0
+        created_commits = []
+        stale_developer_ids = set()
 
         # First pass: prepare batch classification inputs (message + filenames)
         classification_inputs: List[Dict] = []
@@ -346,6 +349,7 @@ class CommitIndexingService:
                         created = True
                     else:
                         created = False
+                        before = profile_fingerprint(commit)
                         commit.repository_full_name = repository_full_name
                         commit.message = commit_info.get('message', '')
                         commit.author_name = author_info.get('name', '')
@@ -369,8 +373,10 @@ class CommitIndexingService:
                     
                     if created:
                         processed += 1
+                        created_commits.append(commit)
                         logger.debug(f"Created new commit {sha}")
                     else:
+                        stale_developer_ids.update(changed_developer_ids(before, commit))
                         logger.debug(f"Updated existing commit {sha}")
                         
                 except NotUniqueError:
@@ -381,6 +387,7 @@ class CommitIndexingService:
                 logger.warning(f"Error processing commit {commit_data.get('sha', 'unknown')}: {e}")
                 continue
         
+        DeveloperProfileService.record_ingested(created_commits, stale_developer_ids)
         logger.info(f"Processed {processed} new commits")
         return processed
     
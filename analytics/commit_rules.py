@@ -0,0 +1,121 @@
+"""
+Compiled rule-based commit classifier
+
+Same rules and outputs as commit_classifier.classify_commit (the reference
+implementation, checked by a golden test), with the tables built once:
+
+1. one anchored regex with a named group per category, in priority order,
+   for the message prefix;
+2. a frozen word -> category table for the first known word of the message;
+3. short messages (< 15 characters) are chores, everything else is 'other'.
+
+The conventional-commit prefix checks of classify_commit ('feat:',
+'fix(scope):') are not repeated: every such prefix already starts with one of
+the step 1 keywords.
+
+classify_many() classifies large batches, optionally across a process pool.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import Iterable, List, Optional
+
+# Message prefixes per category, in priority order
+PREFIX_KEYWORDS = (
+    ('fix', ('fix', 'bug', 'hotfix', 'patch', 'resolve', 'correct', 'repair', 'revert', 'rollback', 'undo',
+             'restore')),
+    ('feature', ('feat', 'add', 'implement', 'new', 'enhance', 'improve', 'create', 'introduce', 'enable')),
+    ('docs', ('docs', 'readme', 'documentation', 'comment', 'doc', 'clarify', 'document')),
+    ('refactor', ('refactor', 'cleanup', 'restructure', 'optimize', 'reorganize', 'simplify', 'migrate', 'port',
+                  'rewrite')),
+    ('test', ('test', 'spec', 'specs', 'testing', 'coverage', 'unit', 'integration', 'e2e')),
+    ('style', ('style', 'format', 'lint', 'prettier', 'indent', 'whitespace')),
+    ('chore', ('chore', 'ci', 'build', 'deploy', 'maintenance', 'deps', 'update', 'change', 'modify', 'configure',
+               'setup', 'install', 'uninstall', 'bump', 'upgrade', 'downgrade', 'pin', 'unpin', 'sync', 'merge',
+               'wip', 'tmp', 'temp')),
+)
+
+PREFIX_PATTERN = re.compile('|'.join(
+    f"(?P<{category}>{'|'.join(map(re.escape, keywords))})" for category, keywords in PREFIX_KEYWORDS
+))
+
+# Category of known words anywhere in the message (first match wins)
+WORD_TYPES = MappingProxyType({
+    'update': 'chore', 'change': 'refactor', 'modify': 'refactor', 'improve': 'feature', 'add': 'feature',
+    'remove': 'refactor', 'delete': 'refactor', 'fix': 'fix', 'bug': 'fix', 'feature': 'feature', 'new': 'feature',
+    'test': 'test', 'doc': 'docs', 'format': 'style', 'style': 'style', 'chore': 'chore', 'ci': 'chore',
+    'build': 'chore', 'deploy': 'chore', 'maintenance': 'chore', 'deps': 'chore', 'configure': 'chore',
+    'setup': 'chore', 'install': 'chore', 'uninstall': 'chore', 'bump': 'chore', 'upgrade': 'chore',
+    'downgrade': 'chore', 'pin': 'chore', 'unpin': 'chore', 'sync': 'chore', 'merge': 'chore', 'wip': 'chore',
+    'tmp': 'chore', 'temp': 'chore', 'revert': 'fix', 'rollback': 'fix', 'undo': 'fix', 'restore': 'fix',
+    'repair': 'fix', 'resolve': 'fix', 'correct': 'fix', 'patch': 'fix', 'hotfix': 'fix', 'bugfix': 'fix',
+    'implement': 'feature', 'create': 'feature', 'introduce': 'feature', 'enable': 'feature', 'disable': 'fix',
+    'migrate': 'refactor', 'port': 'refactor', 'rewrite': 'refactor', 'restructure': 'refactor',
+    'reorganize': 'refactor', 'simplify': 'refactor', 'clarify': 'docs', 'document': 'docs', 'comment': 'docs',
+    'lint': 'style', 'prettier': 'style', 'indent': 'style', 'whitespace': 'style', 'testing': 'test',
+    'coverage': 'test', 'unit': 'test', 'integration': 'test', 'e2e': 'test', 'performance': 'refactor',
+    'optimization': 'refactor',
+})
+
+SHORT_MESSAGE_LENGTH = 15
+# Below this many messages a process pool costs more than it saves
+PARALLEL_THRESHOLD = 20000
+PARALLEL_CHUNK_SIZE = 10000
+
+
+def classify_message(message: Optional[str]) -> str:
+    """
+    Classify a commit message into categories
+
+    Returns:
+        Category: 'fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other'
+    """
+    if not message:
+        return 'other'
+
+    message = message.lower().strip()
+
+    match = PREFIX_PATTERN.match(message)
+    if match:
+        return match.lastgroup
+
+    word_types = WORD_TYPES
+    for word in message.split():
+        category = word_types.get(word)
+        if category is not None:
+            return category
+
+    if len(message) < SHORT_MESSAGE_LENGTH:
+        return 'chore'
+    return 'other'
+
+
+def _classify_chunk(messages: List[Optional[str]]) -> List[str]:
+    return [classify_message(message) for message in messages]
+
+
+def classify_many(messages: Iterable[Optional[str]], workers: int = 1,
+                  parallel_threshold: int = PARALLEL_THRESHOLD,
+                  chunk_size: int = PARALLEL_CHUNK_SIZE) -> List[str]:
+    """
+    Classify many commit messages, in input order.
+
+    Args:
+        messages: Commit messages
+        workers: Worker processes (1 classifies in this process)
+        parallel_threshold: Minimum number of messages to use the process pool
+        chunk_size: Messages sent to a worker at once
+
+    Returns:
+        Categories in the same order as the messages
+    """
+    messages = list(messages)
+    if workers <= 1 or len(messages) < parallel_threshold:
+        return _classify_chunk(messages)
+
+    chunks = [messages[start:start + chunk_size] for start in range(0, len(messages), chunk_size)]
+    results: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_result in executor.map(_classify_chunk, chunks):
+            results.extend(chunk_result)
+    return results
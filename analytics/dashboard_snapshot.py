@@ -0,0 +1,125 @@
+"""
+Global dashboard snapshot
+
+The dashboard shows the same figures to every user: collection totals and the
+top developers and repositories of the last 30 days. refresh_dashboard_snapshot,
+a django-q task scheduled every DASHBOARD_SNAPSHOT_INTERVAL minutes, computes
+them with aggregation pipelines and estimated counts and keeps them as a
+page snapshot with a fixed key, so a dashboard render reads one entry.
+
+Renders only compute the dashboard themselves when there is no snapshot yet
+(or no store), and enqueue a refresh when the schedule fell behind or the
+global data version was bumped.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+
+from .page_snapshots import refresh_snapshot, serve_snapshot
+
+DASHBOARD_SNAPSHOT_KEY = 'snapshot:dashboard'
+PERIOD_DAYS = 30
+TOP_LIMIT = 5
+
+
+def _estimated_count(document) -> int:
+    """Number of documents of a collection, from its metadata"""
+    return document._get_collection().estimated_document_count()
+
+
+def top_repositories(document, date_field: str, since: datetime, limit: int = TOP_LIMIT) -> List[Tuple[str, int]]:
+    """(repository, count) of the repositories with the most documents since a date"""
+    pipeline = [
+        {'$match': {date_field: {'$gte': since}}},
+        {'$group': {'_id': '$repository_full_name', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+        {'$limit': limit},
+    ]
+    return [((doc['_id'] or '').strip(), doc['count']) for doc in document._get_collection().aggregate(pipeline)]
+
+
+def top_developers(since: datetime, limit: int = TOP_LIMIT) -> List[Tuple[str, int]]:
+    """
+    (name, commits) of the developers with the most commits since a date
+
+    Commits are grouped by their resolved developer, by author name when ungrouped.
+    Developers are shown by primary name, so people sharing a name count together.
+    """
+    from .models import Commit, Developer
+
+    pipeline = [
+        {'$match': {'authored_date': {'$gte': since}}},
+        {'$group': {
+            '_id': {
+                'developer_id': '$developer_id',
+                # Only ungrouped commits are told apart by their author name
+                'author_name': {'$cond': [{'$ifNull': ['$developer_id', False]}, None, '$author_name']},
+            },
+            'commits': {'$sum': 1},
+            'author_name': {'$first': '$author_name'},
+        }},
+    ]
+    groups = list(Commit._get_collection().aggregate(pipeline))
+
+    developer_ids = {group['_id'].get('developer_id') for group in groups} - {None}
+    names = {}
+    if developer_ids:
+        names = {
+            str(doc['_id']): doc.get('primary_name') or ''
+            for doc in Developer.objects(id__in=list(developer_ids)).only('primary_name').as_pymongo()
+        }
+
+    commits_by_name = defaultdict(int)
+    for group in groups:
+        name = names.get(group['_id'].get('developer_id'))
+        if name is None:
+            name = group.get('author_name') or ''
+        commits_by_name[name.strip()] += group['commits']
+    return sorted(commits_by_name.items(), key=lambda item: -item[1])[:limit]
+
+
+def compute_dashboard_context() -> Dict[str, Any]:
+    """Figures of the dashboard"""
+    from repositories.models import Repository
+    from .models import Commit, Deployment, PullRequest, Release
+
+    since = datetime.now(timezone.utc) - timedelta(days=PERIOD_DAYS)
+    return {
+        'total_repositories': Repository.objects.count(),
+        'total_commits': _estimated_count(Commit),
+        'total_pull_requests': _estimated_count(PullRequest),
+        'total_releases': _estimated_count(Release),
+        'total_deployments': _estimated_count(Deployment),
+        'top_developers': [{'name': name, 'commits': count} for name, count in top_developers(since)],
+        'top_repositories': [
+            {'repo': repo, 'commits': count} for repo, count in top_repositories(Commit, 'authored_date', since)
+        ],
+        'top_deployment_repositories': [
+            {'repo': repo, 'deployments': count} for repo, count in top_repositories(Deployment, 'created_at', since)
+        ],
+    }
+
+
+def _snapshot_args() -> Tuple:
+    """serve_snapshot() arguments of the dashboard: no repositories, only the global data version"""
+    return 'dashboard', 'global', (f'{PERIOD_DAYS}d',), (), 'analytics.dashboard_snapshot.compute_dashboard_context'
+
+
+def refresh_dashboard_snapshot() -> None:
+    """Django-Q task recomputing the dashboard snapshot"""
+    refresh_snapshot(*_snapshot_args(), key=DASHBOARD_SNAPSHOT_KEY)
+
+
+def serve_dashboard() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Context of the dashboard, from its snapshot when there is one
+
+    Returns:
+        (context, snapshot) as in page_snapshots.serve_snapshot
+    """
+    # The schedule refreshes it every interval, two missed runs mean it is not running
+    return serve_snapshot(
+        *_snapshot_args(), key=DASHBOARD_SNAPSHOT_KEY, max_age=2 * settings.DASHBOARD_SNAPSHOT_INTERVAL * 60
+    )
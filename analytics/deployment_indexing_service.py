@@ -166,6 +166,8 @@ class DeploymentIndexingService:
             Number of deployments processed
         """
         processed = 0
+        # (repository, environment) -> earliest created_at of new/refreshed deployments
+        stats_changes = {}
         
         for deployment_data in deployments:
             try:
@@ -289,6 +291,11 @@ class DeploymentIndexingService:
                         deployment.statuses = []
                 
                 deployment.save()
+
+                if refresh_needed:
+                    key = (deployment.repository_full_name, deployment.environment)
+                    earliest = stats_changes.get(key, created_at)
+                    stats_changes[key] = min(earliest, created_at) if earliest and created_at else None
                 
                 if created:
                     processed += 1
@@ -300,6 +307,10 @@ class DeploymentIndexingService:
                 logger.warning(f"Error processing deployment {deployment_data.get('id', 'unknown')}: {e}")
                 continue
         
+        if stats_changes:
+            from .deployment_stats_service import DeploymentStatsService
+            DeploymentStatsService.update_for_changes(stats_changes)
+
         logger.info(f"Processed {processed} new deployments")
         return processed
     
@@ -387,6 +398,12 @@ class DeploymentIndexingService:
             state.status = 'completed'
             state.save()
 
+            try:
+                from .dora_service import DoraMetricsService
+                DoraMetricsService.refresh_snapshot(repository.full_name, repository_id=repository_id)
+            except Exception as e:
+                logger.warning(f"Could not refresh DORA snapshot for {repository.full_name}: {e}")
+
             logger.info(f"Indexed {processed} deployments for {repository.full_name} from {since} to {until}")
             return {
                 'status': 'success',
@@ -0,0 +1,246 @@
+"""
+Weekly deployment outcome aggregates (change failure rate and time to restore)
+
+Deployment statuses are turned into per-repository, per-environment, per-week
+rows (DeploymentWeeklyStats). A deployment counts as failed when its latest
+final status is 'failure' or 'error'. An incident opens at the first failure of
+an environment and is restored by the next success in the same environment.
+
+Aggregates are maintained incrementally: when deployments are indexed, only the
+weeks since the last healthy deployment preceding the changes are rebuilt.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .dora_service import is_production_environment, parse_status_time
+
+logger = logging.getLogger(__name__)
+
+SUCCESS_STATES = {'success'}
+FAILURE_STATES = {'failure', 'error'}
+FINAL_STATES = SUCCESS_STATES | FAILURE_STATES
+
+
+def week_start(value: datetime) -> datetime:
+    """Return the Monday 00:00 UTC (naive, as stored in Mongo) of a datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    day = value - timedelta(days=value.weekday())
+    return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def final_status_events(deployment) -> List[Tuple[datetime, str]]:
+    """Return the (time, state) of the final statuses of a deployment, oldest first"""
+    events = []
+    for status in deployment.statuses or []:
+        state = str(status.get('state', '')).lower()
+        if state not in FINAL_STATES:
+            continue
+        status_time = parse_status_time(status)
+        if status_time:
+            events.append((status_time, state))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def deployment_outcome(deployment) -> Optional[str]:
+    """Return 'success' or 'failure' for a deployment, None while it is not finished"""
+    events = final_status_events(deployment)
+    if not events:
+        return None
+    return 'failure' if events[-1][1] in FAILURE_STATES else 'success'
+
+
+def build_weekly_stats(deployments: Iterable) -> Dict[datetime, Dict]:
+    """
+    Aggregate the deployments of one environment by week.
+
+    Args:
+        deployments: Deployments of a single repository environment
+
+    Returns:
+        Mapping of week start to counters (deployments, failed_deployments,
+        incidents, restored_incidents, restore_seconds_total)
+    """
+    weeks = defaultdict(lambda: {
+        'deployments': 0,
+        'failed_deployments': 0,
+        'incidents': 0,
+        'restored_incidents': 0,
+        'restore_seconds_total': 0.0,
+    })
+
+    timeline = []
+    for deployment in deployments:
+        events = final_status_events(deployment)
+        if not events or not deployment.created_at:
+            continue
+        week = weeks[week_start(deployment.created_at)]
+        week['deployments'] += 1
+        if events[-1][1] in FAILURE_STATES:
+            week['failed_deployments'] += 1
+        timeline.extend(events)
+
+    # Walk all final statuses of the environment in time order
+    timeline.sort(key=lambda event: event[0])
+    incident_start = None
+    for event_time, state in timeline:
+        if state in FAILURE_STATES and incident_start is None:
+            incident_start = event_time
+            weeks[week_start(event_time)]['incidents'] += 1
+        elif state in SUCCESS_STATES and incident_start is not None:
+            week = weeks[week_start(incident_start)]
+            week['restored_incidents'] += 1
+            week['restore_seconds_total'] += (event_time - incident_start).total_seconds()
+            incident_start = None
+
+    return dict(weeks)
+
+
+class DeploymentStatsService:
+    """Maintain and query weekly deployment outcome aggregates"""
+
+    @staticmethod
+    def _find_rebuild_start(repository_full_name: str, environment: str,
+                            changed_since: Optional[datetime]) -> Optional[datetime]:
+        """
+        Return the week from which aggregates must be rebuilt.
+
+        Weeks before the last successful deployment preceding the change cannot
+        be affected: any incident open before it was already restored by it.
+        """
+        from analytics.models import Deployment
+
+        if changed_since is None:
+            return None
+
+        previous = Deployment.objects.filter(
+            repository_full_name=repository_full_name,
+            environment=environment,
+            created_at__lt=week_start(changed_since)
+        ).order_by('-created_at')
+        for deployment in previous:
+            if deployment_outcome(deployment) == 'success':
+                return week_start(deployment.created_at)
+        return None
+
+    @staticmethod
+    def rebuild(repository_full_name: str, environment: str,
+                changed_since: Optional[datetime] = None) -> int:
+        """
+        Rebuild the weekly aggregates of a repository environment.
+
+        Args:
+            repository_full_name: Repository full name (owner/repo)
+            environment: Deployment environment
+            changed_since: Earliest created_at of the changed deployments,
+                None to rebuild the whole history
+
+        Returns:
+            Number of weekly rows written
+        """
+        from analytics.models import Deployment, DeploymentWeeklyStats
+
+        start = DeploymentStatsService._find_rebuild_start(
+            repository_full_name, environment, changed_since
+        )
+
+        deployments = Deployment.objects.filter(
+            repository_full_name=repository_full_name,
+            environment=environment
+        )
+        existing = DeploymentWeeklyStats.objects.filter(
+            repository_full_name=repository_full_name,
+            environment=environment
+        )
+        if start is not None:
+            deployments = deployments.filter(created_at__gte=start)
+            existing = existing.filter(week_start__gte=start)
+
+        weeks = build_weekly_stats(deployments)
+
+        now = datetime.now(dt_timezone.utc)
+        rows = [
+            DeploymentWeeklyStats(
+                repository_full_name=repository_full_name,
+                environment=environment,
+                week_start=week,
+                updated_at=now,
+                **counters
+            )
+            for week, counters in sorted(weeks.items())
+        ]
+        existing.delete()
+        if rows:
+            DeploymentWeeklyStats.objects.insert(rows, load_bulk=False)
+        return len(rows)
+
+    @staticmethod
+    def update_for_changes(changes: Dict[Tuple[str, str], Optional[datetime]]) -> int:
+        """
+        Incrementally update aggregates after deployments were indexed.
+
+        Args:
+            changes: Mapping of (repository_full_name, environment) to the
+                earliest created_at among the new or refreshed deployments
+
+        Returns:
+            Number of weekly rows written
+        """
+        written = 0
+        for (repository_full_name, environment), changed_since in changes.items():
+            if not repository_full_name or not environment:
+                continue
+            try:
+                written += DeploymentStatsService.rebuild(repository_full_name, environment, changed_since)
+            except Exception as e:
+                logger.warning(f"Could not update deployment stats for {repository_full_name} ({environment}): {e}")
+        return written
+
+    @staticmethod
+    def summarize(repository_full_names: List[str], since: Optional[datetime] = None,
+                  production_only: bool = True) -> Dict:
+        """
+        Sum weekly aggregates over repositories (a repository or a project).
+
+        Args:
+            repository_full_names: Repositories to include
+            since: Only include weeks starting on or after the week of this date
+            production_only: Restrict to production-like environments
+
+        Returns:
+            Dictionary with deployments, failed_deployments, change_failure_rate
+            (percentage or None), incidents, restored_incidents and
+            mean_time_to_restore_hours (or None)
+        """
+        from analytics.models import DeploymentWeeklyStats
+
+        query = DeploymentWeeklyStats.objects.filter(repository_full_name__in=list(repository_full_names))
+        if since is not None:
+            query = query.filter(week_start__gte=week_start(since))
+
+        totals = {
+            'deployments': 0,
+            'failed_deployments': 0,
+            'incidents': 0,
+            'restored_incidents': 0,
+            'restore_seconds_total': 0.0,
+        }
+        for row in query:
+            if production_only and not is_production_environment(row.environment):
+                continue
+            for key in totals:
+                totals[key] += getattr(row, key) or 0
+
+        restore_seconds_total = totals.pop('restore_seconds_total')
+        totals['change_failure_rate'] = (
+            round(totals['failed_deployments'] / totals['deployments'] * 100, 1)
+            if totals['deployments'] else None
+        )
+        totals['mean_time_to_restore_hours'] = (
+            restore_seconds_total / totals['restored_incidents'] / 3600
+            if totals['restored_incidents'] else None
+        )
+        return totals
@@ -7,7 +7,130 @@ from datetime import datetime
 from difflib import SequenceMatcher
 from collections import defaultdict
 
+from bson import ObjectId
+from pymongo import InsertOne, UpdateMany
+
 from .models import Developer, DeveloperAlias, Commit
+from .identity_index import get_identity_index, invalidate_identity_index, refresh_developer_stamps
+
+
+BULK_WRITE_CHUNK_SIZE = 1000
+
+
+def _bulk_write(collection, operations: List) -> Tuple[int, int]:
+    """Run operations in unordered bulk_write chunks, return (inserted, modified)"""
+    inserted = modified = 0
+    for start in range(0, len(operations), BULK_WRITE_CHUNK_SIZE):
+        result = collection.bulk_write(operations[start:start + BULK_WRITE_CHUNK_SIZE], ordered=False)
+        inserted += result.inserted_count
+        modified += result.modified_count
+    return inserted, modified
+
+
+class GroupingPlan:
+    """
+    In-memory plan of an auto grouping run: new developers and alias assignments.
+    
+    Planning tracks which developer every alias belongs to so later groups see
+    the assignments of earlier ones, exactly as if each step had been saved.
+    apply() then writes everything with a few bulk_write calls.
+    """
+    
+    def __init__(self, aliases: List[Dict], developer_names: Dict[str, Tuple[str, str]]):
+        # Developer (existing or planned) of every alias, by alias id
+        self.alias_developer = {}
+        # First alias holding each email, as DeveloperAlias.objects.filter(email=...).first()
+        self.first_alias_by_email = {}
+        for alias in aliases:
+            self.alias_developer[alias['alias_id']] = alias.get('developer_id')
+            self.first_alias_by_email.setdefault(alias['email'], alias['alias_id'])
+        # (primary_name, primary_email) of existing and planned developers
+        self.developer_names = dict(developer_names)
+        self.new_developers: List[Developer] = []
+        self.assignments: List[Dict] = []
+    
+    def developer_of(self, dev: Dict) -> Optional[str]:
+        """Return the developer an alias is (planned to be) linked to"""
+        return self.alias_developer.get(dev['alias_id'])
+    
+    def existing_developer_for(self, developers: List[Dict]) -> Optional[str]:
+        """Return the developer already holding the email of a group member, if any"""
+        for dev in developers:
+            alias_id = self.first_alias_by_email.get(dev['email'])
+            if alias_id is not None:
+                return self.alias_developer.get(alias_id)
+        return None
+    
+    def create_developer(self, primary_name: str, primary_email: str, confidence_score: int) -> str:
+        """Plan a new developer, return its (pre-allocated) id"""
+        developer = Developer(
+            id=ObjectId(),
+            primary_name=primary_name,
+            primary_email=primary_email,
+            is_auto_grouped=True,
+            confidence_score=confidence_score
+        )
+        developer.validate()
+        self.new_developers.append(developer)
+        developer_id = str(developer.id)
+        self.developer_names[developer_id] = (primary_name, primary_email)
+        return developer_id
+    
+    def assign(self, developer_id: str, developers: List[Dict], developer_type: str, key: str,
+               action: str) -> int:
+        """Link the still ungrouped aliases of a group to a developer, return how many"""
+        linked = [dev for dev in developers if not self.alias_developer.get(dev['alias_id'])]
+        for dev in linked:
+            self.alias_developer[dev['alias_id']] = developer_id
+        primary_name, primary_email = self.developer_names.get(developer_id, ('', ''))
+        self.assignments.append({
+            'developer_id': developer_id,
+            'primary_name': primary_name,
+            'primary_email': primary_email,
+            'type': developer_type,
+            'key': key,
+            'added_count': len(linked),
+            'action': action,
+            'alias_ids': [dev['alias_id'] for dev in linked],
+            'emails': [dev['email'] for dev in linked],
+        })
+        return len(linked)
+    
+    def describe(self) -> List[str]:
+        """Return one human readable line per planned assignment"""
+        lines = []
+        for assignment in self.assignments:
+            verb = 'create' if assignment['action'] == 'created_new' else 'add to'
+            lines.append(
+                f"{verb} {assignment['primary_name']} <{assignment['primary_email']}> "
+                f"[{assignment['type']}: {assignment['key']}]: {', '.join(assignment['emails']) or '-'}"
+            )
+        return lines
+    
+    def apply(self) -> Dict[str, int]:
+        """Insert the planned developers and re-point aliases with bulk writes"""
+        developer_ops = [InsertOne(developer.to_mongo()) for developer in self.new_developers]
+        # developer: None guards against aliases grouped since planning
+        alias_ops = [
+            UpdateMany(
+                {'_id': {'$in': [ObjectId(alias_id) for alias_id in assignment['alias_ids']]}, 'developer': None},
+                {'$set': {'developer': ObjectId(assignment['developer_id'])}}
+            )
+            for assignment in self.assignments if assignment['alias_ids']
+        ]
+        
+        developers_inserted, _ = _bulk_write(Developer._get_collection(), developer_ops)
+        _, aliases_updated = _bulk_write(DeveloperAlias._get_collection(), alias_ops)
+        if developer_ops or alias_ops:
+            # Bulk writes bypass Developer.save / DeveloperAlias.save
+            invalidate_identity_index()
+            refresh_developer_stamps(
+                email for assignment in self.assignments for email in assignment['emails']
+            )
+        return {
+            'developers_inserted': developers_inserted,
+            'aliases_updated': aliases_updated,
+        }
 
 
 class DeveloperGroupingService:
@@ -17,38 +140,58 @@ class DeveloperGroupingService:
         # application_id is kept for backward compatibility but not used for grouping
         self.application_id = application_id
     
-    def auto_group_developers(self) -> Dict:
+    def auto_group_developers(self, dry_run: bool = False) -> Dict:
         """
         Automatically group developers based on:
         1. Same email address
         2. Same developer name (case-insensitive)
         3. Same GitHub ID
         
+        Every assignment is planned in memory first (see GroupingPlan), then
+        written with a few bulk_write calls.
+        
+        Args:
+            dry_run: Only compute the plan, write nothing
+        
         Returns:
-            Dictionary with grouping results
+            Dictionary with grouping results (and the plan lines on dry run)
         """
         try:
             # Get all existing aliases (not commits)
-            all_aliases = DeveloperAlias.objects.all()
+            alias_docs = list(DeveloperAlias.objects.only(
+                'name', 'email', 'first_seen', 'last_seen', 'commit_count', 'developer'
+            ).as_pymongo())
             
-            if not all_aliases:
+            if not alias_docs:
                 return {
                     'success': False,
                     'error': 'No aliases found to group'
                 }
             
+            developer_ids = {doc['developer'] for doc in alias_docs if doc.get('developer')}
+            developer_names = {}
+            if developer_ids:
+                for doc in Developer.objects(id__in=list(developer_ids)).only(
+                    'primary_name', 'primary_email'
+                ).as_pymongo():
+                    developer_names[str(doc['_id'])] = (doc.get('primary_name'), doc.get('primary_email'))
+            
             # Convert aliases to developer data format
-            all_developers = []
-            for alias in all_aliases:
-                if not alias.developer:  # Only process ungrouped aliases
-                    all_developers.append({
-                        'name': alias.name,
-                        'email': alias.email,
-                        'first_seen': alias.first_seen,
-                        'last_seen': alias.last_seen,
-                        'commit_count': alias.commit_count,
-                        'alias_id': str(alias.id)
-                    })
+            aliases = []
+            for doc in alias_docs:
+                developer_id = str(doc['developer']) if doc.get('developer') else None
+                aliases.append({
+                    'name': doc.get('name') or '',
+                    'email': doc.get('email') or '',
+                    'first_seen': doc.get('first_seen'),
+                    'last_seen': doc.get('last_seen'),
+                    'commit_count': doc.get('commit_count', 0),
+                    'alias_id': str(doc['_id']),
+                    # References to deleted developers count as ungrouped
+                    'developer_id': developer_id if developer_id in developer_names else None
+                })
+            # Only process ungrouped aliases
+            all_developers = [alias for alias in aliases if not alias['developer_id']]
             
             if not all_developers:
                 return {
@@ -58,10 +201,11 @@ class DeveloperGroupingService:
                     'message': 'All aliases are already grouped'
                 }
             
+            plan = GroupingPlan(aliases, developer_names)
+            
             # Track which developers have been processed
             processed_developers = set()
             developers_to_create = []
-            created_developers = []
             
             # Step 1: Group by GitHub ID (highest priority - unique identifier)
             github_groups = defaultdict(list)
@@ -73,20 +217,11 @@ class DeveloperGroupingService:
             for github_id, developers in github_groups.items():
                 if len(developers) > 1:
                     # Check if any of these developers are already in existing developers
-                    existing_developer = self._find_existing_developer_for_developers(developers)
+                    existing_developer_id = plan.existing_developer_for(developers)
                     
-                    if existing_developer:
+                    if existing_developer_id:
                         # Add to existing developer
-                        added_count = self._add_developers_to_developer(existing_developer, developers)
-                        created_developers.append({
-                            'developer_id': str(existing_developer.pk),
-                            'primary_name': existing_developer.primary_name,
-                            'primary_email': existing_developer.primary_email,
-                            'type': 'github_id',
-                            'key': github_id,
-                            'added_count': added_count,
-                            'action': 'added_to_existing'
-                        })
+                        plan.assign(existing_developer_id, developers, 'github_id', github_id, 'added_to_existing')
                     else:
                         # Create new developer
                         developers_to_create.append({
@@ -110,20 +245,11 @@ class DeveloperGroupingService:
             for email, developers in email_groups.items():
                 if len(developers) > 1:
                     # Check if any of these developers are already in existing developers
-                    existing_developer = self._find_existing_developer_for_developers(developers)
+                    existing_developer_id = plan.existing_developer_for(developers)
                     
-                    if existing_developer:
+                    if existing_developer_id:
                         # Add to existing developer
-                        added_count = self._add_developers_to_developer(existing_developer, developers)
-                        created_developers.append({
-                            'developer_id': str(existing_developer.pk),
-                            'primary_name': existing_developer.primary_name,
-                            'primary_email': existing_developer.primary_email,
-                            'type': 'email',
-                            'key': email,
-                            'added_count': added_count,
-                            'action': 'added_to_existing'
-                        })
+                        plan.assign(existing_developer_id, developers, 'email', email, 'added_to_existing')
                     else:
                         # Create new developer
                         developers_to_create.append({
@@ -146,37 +272,17 @@ class DeveloperGroupingService:
                     if username:
                         approximate_email_groups[username].append(dev)
             
-            # Step 3.5: Group GitHub ID with regular emails (same username)
-            github_regular_groups = defaultdict(list)
-            for dev in all_developers:
-                dev_key = dev['name'] + '|' + dev['email']
-                if dev_key not in processed_developers:
-                    github_id = self._extract_github_id(dev['email'])
-                    if github_id:
-                        # Find regular emails with same username
-                        username = self._extract_username_from_email(dev['email'])
-                        if username:
-                            github_regular_groups[username].append(dev)
-            
             for username, developers in approximate_email_groups.items():
                 if len(developers) > 1:
                     # Additional validation for approximate email grouping
                     if self._validate_approximate_email_grouping(developers):
                         # Check if any of these developers are already in existing developers
-                        existing_developer = self._find_existing_developer_for_developers(developers)
+                        existing_developer_id = plan.existing_developer_for(developers)
                         
-                        if existing_developer:
+                        if existing_developer_id:
                             # Add to existing developer
-                            added_count = self._add_developers_to_developer(existing_developer, developers)
-                            created_developers.append({
-                                'developer_id': str(existing_developer.pk),
-                                'primary_name': existing_developer.primary_name,
-                                'primary_email': existing_developer.primary_email,
-                                'type': 'approximate_email',
-                                'key': username,
-                                'added_count': added_count,
-                                'action': 'added_to_existing'
-                            })
+                            plan.assign(existing_developer_id, developers, 'approximate_email', username,
+                                        'added_to_existing')
                         else:
                             # Create new developer
                             developers_to_create.append({
@@ -223,76 +329,51 @@ class DeveloperGroupingService:
             # Create the developers
             for developer_data in developers_to_create:
                 # Check if any of these developers are already in existing developers
-                existing_developer = self._find_existing_developer_for_developers(developer_data['developers'])
+                existing_developer_id = plan.existing_developer_for(developer_data['developers'])
                 
-                if existing_developer:
+                if existing_developer_id:
                     # Add to existing developer
-                    added_count = self._add_developers_to_developer(existing_developer, developer_data['developers'])
-                    created_developers.append({
-                        'developer_id': str(existing_developer.pk),
-                        'primary_name': existing_developer.primary_name,
-                        'primary_email': existing_developer.primary_email,
-                        'type': developer_data['type'],
-                        'key': developer_data['key'],
-                        'added_count': added_count,
-                        'action': 'added_to_existing'
-                    })
+                    plan.assign(existing_developer_id, developer_data['developers'],
+                                developer_data['type'], developer_data['key'], 'added_to_existing')
                 else:
                     # Create new developer
-                    developer = Developer(
-                        primary_name=developer_data['primary_name'],
-                        primary_email=developer_data['primary_email'],
-                        is_auto_grouped=True,
-                        confidence_score=self._calculate_confidence_score(developer_data['type'])
+                    developer_id = plan.create_developer(
+                        developer_data['primary_name'],
+                        developer_data['primary_email'],
+                        self._calculate_confidence_score(developer_data['type'])
                     )
-                    developer.save()
-                    
-                    # Link existing aliases to this developer
-                    for dev in developer_data['developers']:
-                        alias = DeveloperAlias.objects(id=dev['alias_id']).first()
-                        if alias and not alias.developer:
-                            alias.developer = developer
-                            alias.save()
-                    
-                    created_developers.append({
-                        'developer_id': str(developer.pk),
-                        'primary_name': developer.primary_name,
-                        'primary_email': developer.primary_email,
-                        'type': developer_data['type'],
-                        'key': developer_data['key'],
-                        'added_count': len(developer_data['developers']),
-                        'action': 'created_new'
-                    })
+                    plan.assign(developer_id, developer_data['developers'],
+                                developer_data['type'], developer_data['key'], 'created_new')
             
             # Create individual developers for ungrouped aliases
-            ungrouped_count = 0
             for dev in all_developers:
                 dev_key = dev['name'] + '|' + dev['email']
-                if dev_key not in processed_developers:
-                    # Create individual developer for this alias
-                    developer = Developer(
-                        application_id=None,
-                        primary_name=dev['name'],
-                        primary_email=dev['email'],
-                        is_auto_grouped=True,
-                        confidence_score=100
-                    )
-                    developer.save()
-                    
-                    # Link the alias to this developer
-                    alias = DeveloperAlias.objects(id=dev['alias_id']).first()
-                    if alias and not alias.developer:
-                        alias.developer = developer
-                        alias.save()
-                        ungrouped_count += 1
+                if dev_key not in processed_developers and not plan.developer_of(dev):
+                    developer_id = plan.create_developer(dev['name'], dev['email'], 100)
+                    plan.assign(developer_id, [dev], 'individual', dev['email'], 'created_new')
             
-            return {
+            created_developers = [
+                {key: value for key, value in assignment.items() if key not in ('alias_ids', 'emails')}
+                for assignment in plan.assignments if assignment['type'] != 'individual'
+            ]
+            ungrouped_count = sum(
+                assignment['added_count'] for assignment in plan.assignments if assignment['type'] == 'individual'
+            )
+            results = {
                 'success': True,
                 'developers_created': len(created_developers) + ungrouped_count,
                 'developers': created_developers,
                 'ungrouped_individuals': ungrouped_count
             }
             
+            if dry_run:
+                results['dry_run'] = True
+                results['plan'] = plan.describe()
+                return results
+            
+            results['written'] = plan.apply()
+            return results
+            
         except Exception as e:
             return {
                 'success': False,
@@ -390,78 +471,6 @@ class DeveloperGroupingService:
         else:
             return 50
     
-    def _find_existing_developer_for_developers(self, developers: List[Dict]) -> Optional[Developer]:
-        """Find if any of these developers are already in an existing developer"""
-        # Check if any developer email is already in any existing developer
-        for dev in developers:
-            # Chercher dans TOUS les developers existants par email
-            existing_alias = DeveloperAlias.objects.filter(
-                email=dev['email']  # Chercher par email seulement
-            ).first()
-            
-            if existing_alias:
-                return existing_alias.developer
-        
-        # Si aucun developer trouvé par email, chercher par similarité de noms
-        if developers:
-            # Use the first developer's name as reference
-            primary_name = developers[0]['name']
-            
-            # Get all existing developers
-            existing_developers = Developer.objects.all()
-            
-            # Check for name similarity with existing developers
-            for existing_dev in existing_developers:
-                if self._names_are_similar(primary_name, existing_dev.primary_name):
-                    return existing_dev
-            
-            # If no similarity found, check if any of the developer emails match existing developer emails
-            for dev in developers:
-                for existing_dev in existing_developers:
-                    if dev['email'].lower() == existing_dev.primary_email.lower():
-                        return existing_dev
-        
-        return None
-    
-    def _add_developers_to_developer(self, developer: Developer, developers: List[Dict]) -> int:
-        """Add developers to an existing developer, return number of new aliases added"""
-        added_count = 0
-        
-        for dev in developers:
-            # Check if this alias already exists in the developer (by email AND name)
-            existing_alias = DeveloperAlias.objects.filter(
-                developer=developer,
-                email=dev['email'],
-                name=dev['name']
-            ).first()
-            
-            # Also check if an alias with the same email exists (regardless of name)
-            existing_email_alias = DeveloperAlias.objects.filter(
-                developer=developer,
-                email=dev['email']
-            ).first()
-            
-            if not existing_alias and not existing_email_alias:
-                # Create new alias only if it doesn't exist
-                alias = DeveloperAlias(
-                    developer=developer,
-                    name=dev['name'],
-                    email=dev['email'],
-                    first_seen=dev['first_seen'],
-                    last_seen=dev['last_seen'],
-                    commit_count=dev['commit_count']
-                )
-                alias.save()
-                added_count += 1
-            elif existing_email_alias and not existing_alias:
-                # Update existing alias with new name if it's different
-                if existing_email_alias.name != dev['name']:
-                    existing_email_alias.name = dev['name']
-                    existing_email_alias.save()
-                    added_count += 1
-        
-        return added_count
-
     def get_grouped_developers(self) -> List[Dict]:
         """Get all grouped developers (both auto and manual)"""
         developers = Developer.objects.all()  # Get all developers, not filtered by application
@@ -675,80 +684,19 @@ class DeveloperGroupingService:
         
         return all_developers
     
-    def get_all_developers_for_commits(self, commits) -> List[Dict]:
+    def get_all_developers_for_commits(self, commits) -> int:
         """
         Get all developers (both grouped and ungrouped) for a given set of commits
         
         Args:
-            commits: QuerySet or list of commits to analyze
+            commits: QuerySet of commits to analyze
             
         Returns:
-            List of all developers with their activity in these commits
+            Number of distinct developers (grouped developers count once,
+            ungrouped emails count as one developer each)
         """
-        # Get unique emails from commits
-        commit_emails = set()
-        for commit in commits:
-            if commit.author_email:
-                commit_emails.add(commit.author_email.lower())
-        
-        # Get all developers and filter by emails that appear in these commits
-        developers = Developer.objects.all()
-        grouped_developers = []
-        grouped_emails = set()  # Track emails that are in developers
-        
-        for developer in developers:
-            aliases = DeveloperAlias.objects.filter(developer=developer)
-            
-            # Filter aliases to only include those that have commits in the given set
-            relevant_aliases = []
-            
-            for alias in aliases:
-                if alias.email.lower() in commit_emails:
-                    relevant_aliases.append(alias)
-                    grouped_emails.add(alias.email.lower())  # Track this email as grouped
-            
-            # Only include developers that have relevant aliases
-            if relevant_aliases:
-                grouped_developers.append({
-                    'developer_id': str(developer.id),
-                    'primary_name': developer.primary_name,
-                    'primary_email': developer.primary_email,
-                    'github_id': developer.github_id,
-                    'confidence_score': developer.confidence_score,
-                    'is_auto_grouped': developer.is_auto_grouped,
-                    'aliases': relevant_aliases
-                })
-        
-        # Find ungrouped developers (emails that are not in any developer)
-        ungrouped_emails = commit_emails - grouped_emails
-        
-        # Create individual developer entries for ungrouped developers
-        ungrouped_developers = []
-        for email in ungrouped_emails:
-            # Get commits for this email in the given set
-            email_commits = commits.filter(author_email=email)
-            if email_commits.count() > 0:
-                # Get the most common name for this email
-                name_counts = {}
-                for commit in email_commits:
-                    name = commit.author_name
-                    name_counts[name] = name_counts.get(name, 0) + 1
-                
-                # Use the most common name
-                most_common_name = max(name_counts.items(), key=lambda x: x[1])[0]
-                
-                ungrouped_developers.append({
-                    'developer_id': None,  # No developer
-                    'primary_name': most_common_name,
-                    'primary_email': email,
-                    'github_id': None,
-                    'confidence_score': 100,  # Individual developer
-                    'is_auto_grouped': False,
-                    'aliases': []
-                })
-        
-        # Return total count of grouped + ungrouped developers
-        return len(grouped_developers) + len(ungrouped_developers)
+        commit_emails = {email.lower() for email in commits.distinct('author_email') if email}
+        return get_identity_index().count_developers(commit_emails)
     
     def manually_group_developers(self, developer_data: Dict) -> Dict:
         """
@@ -868,6 +816,7 @@ class DeveloperGroupingService:
                             )
                             alias.save()
                             added_count += 1
+                    refresh_developer_stamps(dev['email'] for dev in developers_to_group)
                     
                     return {
                         'success': True,
@@ -906,6 +855,7 @@ class DeveloperGroupingService:
                         commit_count=dev['commit_count']
                     )
                     alias.save()
+                refresh_developer_stamps(dev['email'] for dev in developers_to_group)
                 
                 return {
                     'success': True,
@@ -980,6 +930,7 @@ class DeveloperGroupingService:
             
             # Merge the developers
             merged_count = 0
+            merged_emails = []
             for merge_data in developers_to_merge:
                 developer1 = merge_data['developer1']
                 developer2 = merge_data['developer2']
@@ -989,6 +940,7 @@ class DeveloperGroupingService:
                 moved_count = 0
                 
                 for alias in aliases_to_move:
+                    merged_emails.append(alias.email)
                     # Check if this alias already exists in developer1 (by email only)
                     existing_alias = DeveloperAlias.objects.filter(
                         developer=developer1,
@@ -1016,6 +968,8 @@ class DeveloperGroupingService:
                 # Delete developer2
                 developer2.delete()
                 merged_count += 1
+            if merged_emails:
+                refresh_developer_stamps(merged_emails)
             
             return {
                 'success': True,
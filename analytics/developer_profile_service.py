@@ -0,0 +1,639 @@
+"""
+Materialized developer profiles
+
+A DeveloperProfile document holds the aggregates shown on the developer pages
+(totals, commit types, quality counters, message quality, repositories, daily
+activity and hourly buckets for the last year), so the pages read one
+document instead of iterating every commit of the developer several times.
+
+All aggregates are sums, so new commits are added incrementally at ingest
+(record_ingested). Profiles are marked stale when an update changes an
+aggregated field of a commit (see profile_fingerprint) or re-assigns it to
+another developer (merges, splits), and rebuilt from the commits on next
+read. A rebuild counts the commits synced before it started (built_at),
+record_ingested adds the ones synced since, and every write increments the
+profile version and is conditional on it, so a rebuild racing with ingestion
+neither misses nor double-counts a commit. Updates that leave the aggregated
+fields unchanged keep the commit's synced_at for the same reason.
+Quality counters come from the commit flags (see analytics.commit_flags),
+so rebuilds do not load messages or file lists.
+
+Time windows (last 30/90 days, 30-day months, 365-day bubble chart) are
+computed from UTC hour buckets, and gaps between commits from UTC day
+buckets, so they are exact to the hour (resp. the day).
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from django.utils import timezone as django_timezone
+
+from .commit_classifier import build_commit_type_stats
+from .commit_flags import (
+    FLAG_CONFIG_ONLY,
+    FLAG_DOC_ONLY,
+    FLAG_GENERIC_MESSAGE,
+    FLAG_HAS_CODE,
+    FLAG_HAS_TICKET_REF,
+    FLAG_MICRO,
+    FLAG_SUSPICIOUS,
+    compute_commit_flags,
+)
+from .commit_frame import COMMIT_TYPES
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# Hour buckets older than this are dropped (bubble chart: 365 days, months: 360 days)
+HOURLY_RETENTION_DAYS = 400
+MAX_UPDATE_RETRIES = 3
+
+QUALITY_COUNTERS = (
+    'real_code_commits', 'suspicious_commits', 'doc_only_commits', 'config_only_commits',
+    'micro_commits', 'no_ticket_commits', 'code_quality_sum', 'impact_sum', 'complexity_sum',
+)
+
+PROFILE_PROJECTION = (
+    'authored_date', 'repository_full_name', 'additions', 'deletions', 'total_changes',
+    'commit_type', 'flags', 'developer_id', 'synced_at',
+)
+
+
+def scores_from_flags(flags: int, total_changes: int, commit_type: str) -> Dict[str, int]:
+    """
+    Quality counters contributed by one commit (see QUALITY_COUNTERS).
+
+    Rules of the developer detail page: code quality, impact and complexity
+    are scored from the commit flags, size and type.
+    """
+    total_changes = total_changes or 0
+
+    code_quality = 50
+    if flags & FLAG_HAS_CODE:
+        code_quality += 40
+    if total_changes > 10:
+        code_quality += 15
+
+    impact = 50
+    if total_changes > 20:
+        impact += 40
+    elif total_changes > 10:
+        impact += 30
+    elif total_changes > 5:
+        impact += 20
+
+    complexity = 30
+    if commit_type == 'feature':
+        complexity += 40
+    elif commit_type == 'fix':
+        complexity += 35
+    elif commit_type == 'refactor':
+        complexity += 30
+
+    return {
+        'real_code_commits': int(bool(flags & FLAG_HAS_CODE)),
+        'suspicious_commits': int(bool(flags & FLAG_SUSPICIOUS)),
+        'doc_only_commits': int(bool(flags & FLAG_DOC_ONLY)),
+        'config_only_commits': int(bool(flags & FLAG_CONFIG_ONLY)),
+        'micro_commits': int(bool(flags & FLAG_MICRO)),
+        'no_ticket_commits': int(not flags & FLAG_HAS_TICKET_REF),
+        'code_quality_sum': min(100, code_quality),
+        'impact_sum': min(100, impact),
+        'complexity_sum': min(100, complexity),
+    }
+
+
+def score_commit(filenames: Iterable[str], total_changes: int, message: str, commit_type: str) -> Dict[str, int]:
+    """Quality counters of a commit whose flags were not computed yet"""
+    flags, _ = compute_commit_flags(filenames, total_changes, message)
+    return scores_from_flags(flags, total_changes, commit_type)
+
+
+def quality_metrics_from_counters(total_commits: int, counters: Dict[str, int]) -> Dict:
+    """Build the detailed quality metrics (counts, ratios, averages) from summed counters"""
+    def ratio(key):
+        return round(counters.get(key, 0) / total_commits * 100, 1) if total_commits else 0
+
+    def average(key):
+        return round(counters.get(key, 0) / total_commits, 1) if total_commits else 0
+
+    return {
+        'total_commits': total_commits,
+        'real_code_commits': counters.get('real_code_commits', 0),
+        'real_code_ratio': ratio('real_code_commits'),
+        'suspicious_commits': counters.get('suspicious_commits', 0),
+        'suspicious_ratio': ratio('suspicious_commits'),
+        'doc_only_commits': counters.get('doc_only_commits', 0),
+        'doc_only_ratio': ratio('doc_only_commits'),
+        'config_only_commits': counters.get('config_only_commits', 0),
+        'config_only_ratio': ratio('config_only_commits'),
+        'micro_commits': counters.get('micro_commits', 0),
+        'micro_commits_ratio': ratio('micro_commits'),
+        'no_ticket_commits': counters.get('no_ticket_commits', 0),
+        'no_ticket_ratio': ratio('no_ticket_commits'),
+        'avg_code_quality': average('code_quality_sum'),
+        'avg_impact': average('impact_sum'),
+        'avg_complexity': average('complexity_sum'),
+    }
+
+
+def monthly_scores(total_changes: int, commit_type: str) -> Tuple[int, int, int]:
+    """(quality, impact, complexity) of a commit in the monthly quality chart"""
+    total_changes = total_changes or 0
+    quality = 50 + (20 if total_changes > 10 else 0)
+    impact = 40
+    if total_changes > 20:
+        impact += 30
+    elif total_changes > 10:
+        impact += 20
+    complexity = 30
+    if commit_type == 'feature':
+        complexity += 30
+    elif commit_type == 'fix':
+        complexity += 25
+    return min(100, quality), min(100, impact), min(100, complexity)
+
+
+def _field(commit, name, default=None):
+    """Read a field from a Commit document or a raw (as_pymongo) dict"""
+    if isinstance(commit, dict):
+        return commit.get(name, default)
+    return getattr(commit, name, default)
+
+
+def _filenames(commit) -> List[str]:
+    files = _field(commit, 'files_changed') or []
+    return [f.get('filename', '') if isinstance(f, dict) else getattr(f, 'filename', '') for f in files]
+
+
+def profile_fingerprint(commit) -> Tuple:
+    """Values of the commit fields the profile aggregates are computed from"""
+    authored_date = _field(commit, 'authored_date')
+    return (
+        _epoch_seconds(authored_date) if authored_date else None,
+        _field(commit, 'repository_full_name'),
+        _field(commit, 'additions') or 0,
+        _field(commit, 'deletions') or 0,
+        _field(commit, 'total_changes') or 0,
+        _field(commit, 'commit_type') or 'other',
+        _field(commit, 'message') or '',
+        tuple(_filenames(commit)),
+        _field(commit, 'developer_id'),
+    )
+
+
+def changed_developer_ids(before: Tuple, commit) -> Set[str]:
+    """
+    Developers whose profile an update of a commit invalidates
+
+    Args:
+        before: profile_fingerprint() of the commit before the update
+        commit: The updated commit
+
+    Returns:
+        The previous and current developer of the commit, empty when no
+        aggregated field changed
+    """
+    if profile_fingerprint(commit) == before:
+        return set()
+    return {before[-1], _field(commit, 'developer_id')} - {None}
+
+
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return int(value.timestamp())
+
+
+def _utc(epoch_seconds: int) -> datetime:
+    return datetime.fromtimestamp(int(epoch_seconds), tz=dt_timezone.utc)
+
+
+class ProfileState:
+    """Summable aggregates of a developer's commits, as stored in DeveloperProfile"""
+
+    def __init__(self):
+        self.total_commits = 0
+        self.total_additions = 0
+        self.total_deletions = 0
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.type_counts = {commit_type: 0 for commit_type in COMMIT_TYPES}
+        self.quality = {key: 0 for key in QUALITY_COUNTERS}
+        self.message_quality = {'explicit_commits': 0, 'generic_commits': 0}
+        # repository -> [commits, additions, deletions]
+        self.repositories: Dict[str, List[int]] = {}
+        # UTC day number -> commits
+        self.daily: Dict[int, int] = defaultdict(int)
+        # (UTC hour number, repository) -> [commits, additions, deletions, quality, impact, complexity]
+        self.hourly: Dict[Tuple[int, str], List[int]] = {}
+
+    # Persistence
+    @classmethod
+    def from_document(cls, doc: Dict) -> 'ProfileState':
+        """Load a state from a raw developer_profiles document"""
+        state = cls()
+        state.total_commits = doc.get('total_commits', 0)
+        state.total_additions = doc.get('total_additions', 0)
+        state.total_deletions = doc.get('total_deletions', 0)
+        if doc.get('first_commit_at'):
+            state.first_ts = _epoch_seconds(doc['first_commit_at'])
+        if doc.get('last_commit_at'):
+            state.last_ts = _epoch_seconds(doc['last_commit_at'])
+        state.type_counts.update(doc.get('type_counts') or {})
+        state.quality.update(doc.get('quality') or {})
+        state.message_quality.update(doc.get('message_quality') or {})
+        for repo in doc.get('repositories') or []:
+            state.repositories[repo['name']] = [repo['commits'], repo['additions'], repo['deletions']]
+        for day, commits in doc.get('daily_commits') or []:
+            state.daily[day] = commits
+        for hour, repo, *values in doc.get('hourly') or []:
+            state.hourly[(hour, repo)] = list(values)
+        return state
+
+    def to_fields(self) -> Dict:
+        """Return the document fields of this state"""
+        return {
+            'total_commits': self.total_commits,
+            'total_additions': self.total_additions,
+            'total_deletions': self.total_deletions,
+            'first_commit_at': _utc(self.first_ts) if self.first_ts is not None else None,
+            'last_commit_at': _utc(self.last_ts) if self.last_ts is not None else None,
+            'type_counts': dict(self.type_counts),
+            'quality': dict(self.quality),
+            'message_quality': dict(self.message_quality),
+            'repositories': [
+                {'name': name, 'commits': values[0], 'additions': values[1], 'deletions': values[2]}
+                for name, values in self.repositories.items()
+            ],
+            'daily_commits': [[day, commits] for day, commits in sorted(self.daily.items())],
+            'hourly': [[hour, repo] + values for (hour, repo), values in sorted(self.hourly.items())],
+        }
+
+    # Updates
+    def add(self, commit) -> None:
+        """Add one commit (Commit document or raw dict)"""
+        authored_date = _field(commit, 'authored_date')
+        if authored_date is None:
+            return
+        ts = _epoch_seconds(authored_date)
+        repo = _field(commit, 'repository_full_name') or 'unknown'
+        additions = _field(commit, 'additions') or 0
+        deletions = _field(commit, 'deletions') or 0
+        total_changes = _field(commit, 'total_changes') or 0
+        commit_type = _field(commit, 'commit_type') or 'other'
+        message = _field(commit, 'message') or ''
+
+        self.total_commits += 1
+        self.total_additions += additions
+        self.total_deletions += deletions
+        self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        if commit_type in self.type_counts:
+            self.type_counts[commit_type] += 1
+
+        flags = _field(commit, 'flags')
+        if flags is None:
+            flags, _ = compute_commit_flags(_filenames(commit), total_changes, message)
+        for key, value in scores_from_flags(flags, total_changes, commit_type).items():
+            self.quality[key] += value
+        if flags & FLAG_GENERIC_MESSAGE:
+            self.message_quality['generic_commits'] += 1
+        else:
+            self.message_quality['explicit_commits'] += 1
+
+        totals = self.repositories.setdefault(repo, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += additions
+        totals[2] += deletions
+
+        self.daily[ts // SECONDS_PER_DAY] += 1
+
+        quality, impact, complexity = monthly_scores(total_changes, commit_type)
+        bucket = self.hourly.setdefault((ts // SECONDS_PER_HOUR, repo), [0, 0, 0, 0, 0, 0])
+        for index, value in enumerate((1, additions, deletions, quality, impact, complexity)):
+            bucket[index] += value
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """Drop hour buckets older than the retention window"""
+        now = now or datetime.now(dt_timezone.utc)
+        oldest_hour = (_epoch_seconds(now) - HOURLY_RETENTION_DAYS * SECONDS_PER_DAY) // SECONDS_PER_HOUR
+        self.hourly = {key: values for key, values in self.hourly.items() if key[0] >= oldest_hour}
+
+    # Reads
+    def _hour_totals(self, start: datetime, end: datetime) -> List[int]:
+        """Summed hour bucket values for buckets starting in [start, end)"""
+        start_hour = _epoch_seconds(start) / SECONDS_PER_HOUR
+        end_hour = _epoch_seconds(end) / SECONDS_PER_HOUR
+        totals = [0, 0, 0, 0, 0, 0]
+        for (hour, _), values in self.hourly.items():
+            if start_hour <= hour < end_hour:
+                for index, value in enumerate(values):
+                    totals[index] += value
+        return totals
+
+    def first_commit_date(self) -> Optional[datetime]:
+        return _utc(self.first_ts) if self.first_ts is not None else None
+
+    def last_commit_date(self) -> Optional[datetime]:
+        return _utc(self.last_ts) if self.last_ts is not None else None
+
+    def detailed_quality_metrics(self) -> Dict:
+        return quality_metrics_from_counters(self.total_commits, self.quality)
+
+    def commit_type_distribution(self) -> Dict:
+        return build_commit_type_stats(self.type_counts)
+
+    def commit_quality(self) -> Dict:
+        """Explicit vs generic commit message counts and ratios"""
+        explicit = self.message_quality['explicit_commits']
+        generic = self.message_quality['generic_commits']
+        total = explicit + generic
+        return {
+            'total_commits': total,
+            'explicit_commits': explicit,
+            'generic_commits': generic,
+            'explicit_ratio': round(explicit / total * 100, 1) if total else 0,
+            'generic_ratio': round(generic / total * 100, 1) if total else 0,
+        }
+
+    def top_repositories(self, limit: int = 10) -> List[Dict]:
+        repositories = [
+            {'name': name, 'commits': values[0], 'additions': values[1], 'deletions': values[2]}
+            for name, values in self.repositories.items()
+        ]
+        repositories.sort(key=lambda repo: repo['commits'], reverse=True)
+        return repositories[:limit]
+
+    def activity_over_time(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Commits and line changes per 30-day window over the last 12 windows, newest first"""
+        now = now or datetime.now(dt_timezone.utc)
+        months = []
+        for i in range(12):
+            month_start = now - timedelta(days=30 * (i + 1))
+            commits, additions, deletions, *_ = self._hour_totals(month_start, now - timedelta(days=30 * i))
+            months.append({
+                'month': month_start.strftime('%Y-%m'),
+                'commits': commits,
+                'additions': additions,
+                'deletions': deletions,
+                'net_lines': additions - deletions
+            })
+        return months
+
+    def quality_metrics_by_month(self, now: Optional[datetime] = None) -> Dict:
+        """Average quality, impact and complexity per 30-day window (chart datasets)"""
+        now = now or datetime.now(dt_timezone.utc)
+        months_data = {}
+        for i in range(12):
+            month_start = now - timedelta(days=30 * (i + 1))
+            commits, _, _, quality, impact, complexity = self._hour_totals(
+                month_start, now - timedelta(days=30 * i)
+            )
+            if commits:
+                months_data[month_start.strftime('%Y-%m')] = {
+                    'quality': quality / commits,
+                    'impact': impact / commits,
+                    'complexity': complexity / commits,
+                }
+
+        sorted_months = sorted(months_data.keys())
+        return {
+            'labels': sorted_months,
+            'datasets': [
+                {
+                    'label': 'Code Quality',
+                    'data': [months_data[month]['quality'] for month in sorted_months],
+                    'borderColor': '#10B981',
+                    'backgroundColor': 'rgba(16, 185, 129, 0.1)',
+                    'tension': 0.4
+                },
+                {
+                    'label': 'Impact Score',
+                    'data': [months_data[month]['impact'] for month in sorted_months],
+                    'borderColor': '#3B82F6',
+                    'backgroundColor': 'rgba(59, 130, 246, 0.1)',
+                    'tension': 0.4
+                },
+                {
+                    'label': 'Complexity Score',
+                    'data': [months_data[month]['complexity'] for month in sorted_months],
+                    'borderColor': '#F59E0B',
+                    'backgroundColor': 'rgba(245, 158, 11, 0.1)',
+                    'tension': 0.4
+                }
+            ]
+        }
+
+    def activity_bubbles(self, now: Optional[datetime] = None) -> Dict[str, Dict[Tuple[int, int], Dict]]:
+        """
+        Commits and changes per repository and (days ago, local hour) over the last 365 days
+
+        Repositories are ordered by commit count so chart colors stay stable.
+        """
+        now = now or datetime.now(dt_timezone.utc)
+        cutoff_hour = (_epoch_seconds(now) - 365 * SECONDS_PER_DAY) // SECONDS_PER_HOUR
+        today = now.astimezone(dt_timezone.utc).date()
+        bubbles = defaultdict(dict)
+        for (hour, repo), values in sorted(self.hourly.items()):
+            if hour < cutoff_hour:
+                continue
+            local_dt = django_timezone.localtime(_utc(hour * SECONDS_PER_HOUR))
+            key = ((today - local_dt.date()).days, local_dt.hour)
+            bubble = bubbles[repo].setdefault(key, {'commits': 0, 'changes': 0})
+            bubble['commits'] += values[0]
+            bubble['changes'] += values[1] + values[2]
+        ordered = sorted(bubbles, key=lambda repo: -sum(b['commits'] for b in bubbles[repo].values()))
+        return {repo: bubbles[repo] for repo in ordered}
+
+    def commit_frequency(self, now: Optional[datetime] = None) -> Dict:
+        """Commit frequency report with gap statistics (see AnalyticsService._format_frequency)"""
+        if not self.total_commits or self.first_ts is None:
+            return {
+                'avg_commits_per_day': 0,
+                'recent_activity_score': 0,
+                'consistency_score': 0,
+                'overall_frequency_score': 0,
+                'commits_last_30_days': 0,
+                'commits_last_90_days': 0,
+                'days_since_last_commit': None,
+                'active_days': 0,
+                'total_days': 0
+            }
+
+        now = now or datetime.now(dt_timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=dt_timezone.utc)
+        far_future = now + timedelta(days=36500)
+        commits_last_30_days = self._hour_totals(now - timedelta(days=30), far_future)[0]
+        commits_last_90_days = self._hour_totals(now - timedelta(days=90), far_future)[0]
+
+        total_days = (self.last_ts - self.first_ts) // SECONDS_PER_DAY + 1
+        avg_commits_per_day = self.total_commits / total_days
+        active_days = len([day for day, commits in self.daily.items() if commits])
+        consistency_ratio = active_days / total_days
+
+        recent_activity_score = min((commits_last_30_days / commits_last_90_days * 100) if commits_last_90_days > 0 else 0, 100)
+        consistency_score = min(consistency_ratio * 100, 100)
+        normalized_avg = min(avg_commits_per_day * 20, 100)
+        overall_frequency_score = (normalized_avg * 0.3 + recent_activity_score * 0.4 + consistency_score * 0.3)
+
+        # Gaps between consecutive commits, at day granularity
+        days = np.array(sorted(self.daily), dtype=np.int64)
+        counts = np.array([self.daily[day] for day in days], dtype=np.int64)
+        gaps = np.concatenate([np.zeros(int((counts - 1).clip(min=0).sum()), dtype=np.int64), np.diff(days)])
+        avg_gap = float(gaps.mean()) if gaps.shape[0] else 0.0
+        gap_std = float(gaps.std(ddof=1)) if gaps.shape[0] > 1 else 0.0
+
+        return {
+            'avg_commits_per_day': round(avg_commits_per_day, 2),
+            'recent_activity_score': round(recent_activity_score, 1),
+            'consistency_score': round(consistency_score, 1),
+            'overall_frequency_score': round(overall_frequency_score, 1),
+            'commits_last_30_days': commits_last_30_days,
+            'commits_last_90_days': commits_last_90_days,
+            'days_since_last_commit': int((now.timestamp() - self.last_ts) // SECONDS_PER_DAY),
+            'active_days': active_days,
+            'total_days': int(total_days),
+            'avg_gap_between_commits': round(avg_gap, 1),
+            'gap_consistency': round(gap_std, 1)
+        }
+
+
+class DeveloperProfileService:
+    """Build, update and read materialized developer profiles"""
+
+    @staticmethod
+    def _collection():
+        from .models import DeveloperProfile
+        return DeveloperProfile._get_collection()
+
+    @staticmethod
+    def rebuild(developer_id: str, doc: Optional[Dict] = None) -> ProfileState:
+        """
+        Recompute a profile from all the developer's commits and store it
+
+        Args:
+            developer_id: Developer of the profile
+            doc: The stored profile document, read here when not given
+
+        The store is conditional on the version of the profile read before
+        the commits: when it changed meanwhile (commits ingested, profile
+        marked stale), the profile stays stale and is rebuilt on next read.
+        """
+        from .models import Commit
+
+        collection = DeveloperProfileService._collection()
+        if doc is None:
+            doc = collection.find_one({'developer_id': developer_id})
+        started_at = datetime.now(dt_timezone.utc)
+        started_ts = _epoch_seconds(started_at)
+        state = ProfileState()
+
+        def add(commit):
+            # Commits synced from now on are added by _add_commits (synced_at >= built_at)
+            synced_at = _field(commit, 'synced_at')
+            if synced_at is None or _epoch_seconds(synced_at) < started_ts:
+                state.add(commit)
+
+        for commit in Commit.objects(developer_id=developer_id, flags__ne=None).only(*PROFILE_PROJECTION).as_pymongo():
+            add(commit)
+        # Commits stored before flags existed (until backfill_commit_flags has run)
+        for commit in Commit.objects(developer_id=developer_id, flags=None).only(
+            *PROFILE_PROJECTION, 'message', 'files_changed.filename'
+        ).as_pymongo():
+            add(commit)
+        state.prune(started_at)
+
+        fields = state.to_fields()
+        fields.update(stale=False, built_at=started_at, updated_at=datetime.now(dt_timezone.utc))
+        update = {'$set': fields, '$inc': {'version': 1}}
+        if doc is None:
+            collection.update_one({'developer_id': developer_id}, update, upsert=True)
+        else:
+            result = collection.update_one({'_id': doc['_id'], 'version': doc.get('version', 0)}, update)
+            if not result.modified_count:
+                logger.debug(f"Profile of {developer_id} changed during its rebuild, left stale")
+        return state
+
+    @staticmethod
+    def get_profile(developer_id: str) -> ProfileState:
+        """Return a developer's profile, rebuilding it if missing or stale"""
+        doc = DeveloperProfileService._collection().find_one({'developer_id': developer_id})
+        if doc is None or doc.get('stale'):
+            return DeveloperProfileService.rebuild(developer_id, doc)
+        return ProfileState.from_document(doc)
+
+    @staticmethod
+    def mark_stale(developer_ids: Optional[Iterable[str]] = None) -> None:
+        """Force a rebuild of some (or all) profiles on next read"""
+        query = {}
+        if developer_ids is not None:
+            developer_ids = [developer_id for developer_id in set(developer_ids) if developer_id]
+            if not developer_ids:
+                return
+            query = {'developer_id': {'$in': developer_ids}}
+        # The version change also discards rebuilds in progress
+        DeveloperProfileService._collection().update_many(query, {'$set': {'stale': True}, '$inc': {'version': 1}})
+
+    @staticmethod
+    def _add_commits(developer_id: str, commits: List) -> bool:
+        """Add new commits to an existing profile (optimistic update), False if it must be rebuilt"""
+        collection = DeveloperProfileService._collection()
+        for _ in range(MAX_UPDATE_RETRIES):
+            doc = collection.find_one({'developer_id': developer_id})
+            if doc is None:
+                # Built from the commits (these included) on next read
+                return True
+            if doc.get('stale'):
+                # A rebuild in progress may have read the commits before these were stored
+                return False
+
+            built_at = doc.get('built_at')
+            state = ProfileState.from_document(doc)
+            for commit in commits:
+                synced_at = _field(commit, 'synced_at')
+                # Commits stored before the last rebuild are already counted
+                if built_at and synced_at and _epoch_seconds(synced_at) < _epoch_seconds(built_at):
+                    continue
+                state.add(commit)
+            state.prune()
+
+            fields = state.to_fields()
+            fields['updated_at'] = datetime.now(dt_timezone.utc)
+            result = collection.update_one(
+                {'_id': doc['_id'], 'version': doc.get('version', 0)},
+                {'$set': fields, '$inc': {'version': 1}}
+            )
+            if result.modified_count:
+                return True
+        return False
+
+    @staticmethod
+    def record_ingested(created: Iterable = (), stale_developer_ids: Iterable[Optional[str]] = ()) -> None:
+        """
+        Keep profiles in sync after commits were indexed.
+
+        Args:
+            created: New commits (documents or raw dicts, with developer_id)
+            stale_developer_ids: Developers whose existing commits were modified
+                (before and after the update), rebuilt on next read
+        """
+        try:
+            stale = set(stale_developer_ids) - {None}
+            new_by_developer = defaultdict(list)
+            for commit in created:
+                developer_id = _field(commit, 'developer_id')
+                if developer_id and developer_id not in stale:
+                    new_by_developer[developer_id].append(commit)
+
+            for developer_id, commits in new_by_developer.items():
+                if not DeveloperProfileService._add_commits(developer_id, commits):
+                    stale.add(developer_id)
+            if stale:
+                DeveloperProfileService.mark_stale(stale)
+        except Exception as e:
+            logger.warning(f"Could not update developer profiles: {e}")
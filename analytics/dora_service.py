@@ -0,0 +1,381 @@
+"""
+DORA metrics engine
+
+Computes deployment frequency and lead time for a repository in a single pass:
+production deployments are parsed and sorted once, merged PRs are assigned to
+their deployment window by binary search and the first commit of every PR is
+resolved through one bulk commit lookup. Change failure rate and time to restore
+are read from the weekly deployment aggregates (see deployment_stats_service).
+Results are persisted per repository
+as a DoraMetricsSnapshot so the repository detail page does not recompute them
+on every request.
+"""
+import bisect
+import logging
+import statistics
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = 180
+PRODUCTION_ENVIRONMENTS = ('production', 'prod', 'live', 'main', 'master', 'github-pages')
+# PRs merged before this date are never attributed to the first deployment
+FIRST_WINDOW_START = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+# Snapshots older than this are recomputed on read (the 180-day window slides)
+SNAPSHOT_MAX_AGE = timedelta(hours=24)
+
+NOT_AVAILABLE = {'grade': 'N/A', 'color': 'text-gray-500'}
+
+
+def classify_dora_performance(metric_type, value):
+    """
+    Classify DORA metric performance based on Google's State of DevOps Report benchmarks.
+
+    Args:
+        metric_type (str): 'deployment_frequency', 'lt1', 'lt2',
+            'change_failure_rate' (percentage) or 'mttr' (hours)
+        value (float): The metric value
+
+    Returns:
+        dict: {'grade': 'Elite|High|Medium|Low', 'color': 'text-green-600|text-blue-600|text-yellow-600|text-red-600'}
+    """
+    if metric_type == 'change_failure_rate' and value is not None:
+        # Percentage of failed production deployments (0% is a valid, elite value)
+        if value <= 15:
+            return {'grade': 'Elite', 'color': 'text-green-600'}
+        elif value <= 30:
+            return {'grade': 'High', 'color': 'text-blue-600'}
+        elif value <= 45:
+            return {'grade': 'Medium', 'color': 'text-yellow-600'}
+        else:
+            return {'grade': 'Low', 'color': 'text-red-600'}
+
+    if value is None or value <= 0:
+        return dict(NOT_AVAILABLE)
+
+    if metric_type == 'deployment_frequency':
+        # Deployments per day
+        if value >= 1.0:  # Several times per day
+            return {'grade': 'Elite', 'color': 'text-green-600'}
+        elif value >= 0.14:  # Once per day to once per week (1/7)
+            return {'grade': 'High', 'color': 'text-blue-600'}
+        elif value >= 0.03:  # Once per week to once per month (1/30)
+            return {'grade': 'Medium', 'color': 'text-yellow-600'}
+        else:  # Less than once per month
+            return {'grade': 'Low', 'color': 'text-red-600'}
+
+    elif metric_type == 'lt1':
+        # Lead Time LT1 in days (first commit to production)
+        if value < 0.042:  # Less than 1 hour (1/24)
+            return {'grade': 'Elite', 'color': 'text-green-600'}
+        elif value < 1.0:  # Less than 1 day
+            return {'grade': 'High', 'color': 'text-blue-600'}
+        elif value <= 7.0:  # 1 day to 1 week
+            return {'grade': 'Medium', 'color': 'text-yellow-600'}
+        else:  # More than 1 week
+            return {'grade': 'Low', 'color': 'text-red-600'}
+
+    elif metric_type == 'lt2':
+        # Lead Time LT2 in days (merge to production)
+        if value < 0.042:  # Less than 1 hour (1/24)
+            return {'grade': 'Elite', 'color': 'text-green-600'}
+        elif value < 0.5:  # Less than 12 hours (1/2 day)
+            return {'grade': 'High', 'color': 'text-blue-600'}
+        elif value <= 2.0:  # 12 hours to 2 days
+            return {'grade': 'Medium', 'color': 'text-yellow-600'}
+        else:  # More than 2 days
+            return {'grade': 'Low', 'color': 'text-red-600'}
+
+    elif metric_type == 'mttr':
+        # Mean time to restore in hours (failure to next success)
+        if value < 1:  # Less than 1 hour
+            return {'grade': 'Elite', 'color': 'text-green-600'}
+        elif value < 24:  # Less than 1 day
+            return {'grade': 'High', 'color': 'text-blue-600'}
+        elif value <= 168:  # 1 day to 1 week
+            return {'grade': 'Medium', 'color': 'text-yellow-600'}
+        else:  # More than 1 week
+            return {'grade': 'Low', 'color': 'text-red-600'}
+
+    return dict(NOT_AVAILABLE)
+
+
+def empty_dora_metrics(period_days: int = PERIOD_DAYS) -> Dict:
+    """Return the DORA metrics structure with no data"""
+    return {
+        'deployment_frequency': {
+            'total_deployments': 0,
+            'period_days': period_days,
+            'deployments_per_day': 0,
+            'performance': dict(NOT_AVAILABLE)
+        },
+        'lead_time': {
+            'lt1_median_hours': None,
+            'lt1_mean_hours': None,
+            'lt1_median_days': None,
+            'lt1_mean_days': None,
+            'lt1_performance': dict(NOT_AVAILABLE),
+            'lt2_median_hours': None,
+            'lt2_mean_hours': None,
+            'lt2_median_days': None,
+            'lt2_mean_days': None,
+            'lt2_performance': dict(NOT_AVAILABLE),
+            'total_prs_analyzed': 0
+        },
+        'change_failure_rate': {
+            'total_deployments': 0,
+            'failed_deployments': 0,
+            'rate': None,
+            'performance': dict(NOT_AVAILABLE)
+        },
+        'time_to_restore': {
+            'incidents': 0,
+            'restored_incidents': 0,
+            'mean_hours': None,
+            'performance': dict(NOT_AVAILABLE)
+        }
+    }
+
+
+def stability_metrics(summary: Dict) -> Dict:
+    """Build the change failure rate and time to restore sections from summed aggregates"""
+    rate = summary.get('change_failure_rate')
+    mean_hours = summary.get('mean_time_to_restore_hours')
+    return {
+        'change_failure_rate': {
+            'total_deployments': summary.get('deployments', 0),
+            'failed_deployments': summary.get('failed_deployments', 0),
+            'rate': rate,
+            'performance': classify_dora_performance('change_failure_rate', rate)
+        },
+        'time_to_restore': {
+            'incidents': summary.get('incidents', 0),
+            'restored_incidents': summary.get('restored_incidents', 0),
+            'mean_hours': mean_hours,
+            'performance': classify_dora_performance('mttr', mean_hours)
+        }
+    }
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normalize a datetime to aware UTC (stored naive dates are UTC)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_timezone.utc)
+    return value.astimezone(dt_timezone.utc)
+
+
+def is_production_environment(environment: Optional[str]) -> bool:
+    """Return True if the environment name looks like a production target"""
+    if not environment:
+        return False
+    env_lower = environment.lower()
+    return any(prod_env in env_lower for prod_env in PRODUCTION_ENVIRONMENTS)
+
+
+def parse_status_time(status: Dict) -> Optional[datetime]:
+    """Parse the timestamp of a deployment status, as aware UTC"""
+    timestamp_str = status.get('created_at') or status.get('updated_at')
+    if not timestamp_str:
+        return None
+    if isinstance(timestamp_str, datetime):
+        return _as_utc(timestamp_str)
+    try:
+        return _as_utc(datetime.fromisoformat(str(timestamp_str).replace('Z', '+00:00')))
+    except (ValueError, TypeError):
+        return None
+
+
+def deployment_success_time(deployment) -> Optional[datetime]:
+    """Return the time of the first successful status of a deployment"""
+    for status in deployment.statuses or []:
+        if str(status.get('state', '')).lower() == 'success':
+            success_time = parse_status_time(status)
+            if success_time:
+                return success_time
+    return None
+
+
+def _summarize(values: List[float]) -> Tuple[float, float]:
+    return statistics.median(values), statistics.mean(values)
+
+
+class DoraMetricsService:
+    """Compute and persist DORA metrics for repositories"""
+
+    @staticmethod
+    def compute(repository_full_name: str, now: Optional[datetime] = None,
+                period_days: int = PERIOD_DAYS) -> Dict:
+        """
+        Compute DORA metrics for a repository over the last `period_days`.
+
+        Args:
+            repository_full_name: Repository full name (owner/repo)
+            now: End of the analysis period (defaults to the current time)
+            period_days: Length of the analysis period
+
+        Returns:
+            Dictionary with 'deployment_frequency', 'lead_time',
+            'change_failure_rate' and 'time_to_restore' sections
+        """
+        from analytics.models import Deployment, PullRequest, Commit
+        from .deployment_stats_service import DeploymentStatsService
+
+        end_date = now or datetime.now()
+        start_date = end_date - timedelta(days=period_days)
+
+        deployments = Deployment.objects.filter(
+            repository_full_name=repository_full_name
+        ).filter(created_at__gte=start_date).filter(created_at__lte=end_date)
+
+        # Parse every status once and keep production successes sorted by time
+        deploy_times = []
+        for deployment in deployments:
+            if not is_production_environment(deployment.environment):
+                continue
+            success_time = deployment_success_time(deployment)
+            if success_time:
+                deploy_times.append(success_time)
+        deploy_times.sort()
+
+        result = empty_dora_metrics(period_days)
+        deployments_per_day = len(deploy_times) / period_days if deploy_times else 0
+        result['deployment_frequency'].update({
+            'total_deployments': len(deploy_times),
+            'deployments_per_day': deployments_per_day,
+            'performance': classify_dora_performance('deployment_frequency', deployments_per_day)
+        })
+        result.update(stability_metrics(
+            DeploymentStatsService.summarize([repository_full_name], since=start_date)
+        ))
+
+        if len(deploy_times) < 2:
+            return result
+
+        prs = PullRequest.objects.filter(
+            repository_full_name=repository_full_name,
+            state='closed'
+        ).filter(merged_at__gte=start_date).filter(merged_at__lte=end_date)
+
+        # Assign each merged PR to the first deployment at or after its merge:
+        # the window of deployment i is (deploy_times[i-1], deploy_times[i]]
+        assigned = []
+        for pr in prs:
+            if pr.merged_at is None:
+                continue
+            merged_at = _as_utc(pr.merged_at)
+            index = bisect.bisect_left(deploy_times, merged_at)
+            if index >= len(deploy_times):
+                continue  # Not deployed yet
+            if index == 0 and merged_at <= FIRST_WINDOW_START:
+                continue
+            assigned.append((pr, merged_at, deploy_times[index]))
+
+        first_commit_times = DoraMetricsService._first_commit_times(
+            Commit, repository_full_name, [pr for pr, _, _ in assigned]
+        )
+
+        lead_times_lt1 = []  # first_commit -> deployment
+        lead_times_lt2 = []  # merged_at -> deployment
+        for pr, merged_at, deploy_time in assigned:
+            first_commit_time = first_commit_times.get(id(pr))
+            if first_commit_time is not None:
+                lead_times_lt1.append((deploy_time - first_commit_time).total_seconds() / 3600)
+            lead_times_lt2.append((deploy_time - merged_at).total_seconds() / 3600)
+
+        lead_time = result['lead_time']
+        if lead_times_lt1:
+            median_hours, mean_hours = _summarize(lead_times_lt1)
+            lead_time.update({
+                'lt1_median_hours': median_hours,
+                'lt1_mean_hours': mean_hours,
+                'lt1_median_days': median_hours / 24,
+                'lt1_mean_days': mean_hours / 24,
+                'lt1_performance': classify_dora_performance('lt1', median_hours / 24)
+            })
+        if lead_times_lt2:
+            median_hours, mean_hours = _summarize(lead_times_lt2)
+            lead_time.update({
+                'lt2_median_hours': median_hours,
+                'lt2_mean_hours': mean_hours,
+                'lt2_median_days': median_hours / 24,
+                'lt2_mean_days': mean_hours / 24,
+                'lt2_performance': classify_dora_performance('lt2', median_hours / 24),
+                'total_prs_analyzed': len(lead_times_lt2)
+            })
+
+        return result
+
+    @staticmethod
+    def _first_commit_times(commit_model, repository_full_name: str, prs: List) -> Dict[int, datetime]:
+        """
+        Resolve the earliest authored date of each PR with one bulk commit query.
+
+        Returns:
+            Mapping of id(pr) to the authored date of its first known commit
+        """
+        all_shas = {sha for pr in prs for sha in (pr.commit_shas or [])}
+        if not all_shas:
+            return {}
+
+        authored_by_sha = {}
+        commits = commit_model.objects.filter(
+            repository_full_name=repository_full_name,
+            sha__in=list(all_shas)
+        )
+        for commit in commits:
+            if commit.authored_date is not None:
+                authored_by_sha[commit.sha] = _as_utc(commit.authored_date)
+
+        first_times = {}
+        for pr in prs:
+            dates = [authored_by_sha[sha] for sha in (pr.commit_shas or []) if sha in authored_by_sha]
+            if dates:
+                first_times[id(pr)] = min(dates)
+        return first_times
+
+    @staticmethod
+    def save_snapshot(repository_full_name: str, metrics: Dict,
+                      repository_id: Optional[int] = None) -> None:
+        """Persist computed DORA metrics as the repository snapshot"""
+        from analytics.models import DoraMetricsSnapshot
+
+        DoraMetricsSnapshot.objects(repository_full_name=repository_full_name).update_one(
+            upsert=True,
+            set__repository_id=repository_id,
+            set__computed_at=datetime.now(dt_timezone.utc),
+            set__period_days=PERIOD_DAYS,
+            set__metrics=metrics
+        )
+
+    @staticmethod
+    def refresh_snapshot(repository_full_name: str, repository_id: Optional[int] = None) -> Dict:
+        """Recompute DORA metrics for a repository and persist the snapshot"""
+        metrics = DoraMetricsService.compute(repository_full_name)
+        DoraMetricsService.save_snapshot(repository_full_name, metrics, repository_id)
+        return metrics
+
+    @staticmethod
+    def get_metrics(repository_full_name: str, repository_id: Optional[int] = None) -> Dict:
+        """
+        Return DORA metrics for a repository from its snapshot.
+
+        The snapshot is recomputed (and persisted) when missing or older than
+        SNAPSHOT_MAX_AGE.
+        """
+        from analytics.models import DoraMetricsSnapshot
+
+        snapshot = DoraMetricsSnapshot.objects.filter(repository_full_name=repository_full_name).first()
+        # Snapshots written before a metric section existed are recomputed too
+        if snapshot and snapshot.metrics and snapshot.computed_at \
+                and set(empty_dora_metrics()).issubset(snapshot.metrics):
+            if datetime.now(dt_timezone.utc) - _as_utc(snapshot.computed_at) < SNAPSHOT_MAX_AGE:
+                return snapshot.metrics
+
+        metrics = DoraMetricsService.compute(repository_full_name)
+        try:
+            DoraMetricsService.save_snapshot(repository_full_name, metrics, repository_id)
+        except Exception as e:
+            # Serving the fresh metrics matters more than caching them
+            logger.warning(f"Could not persist DORA snapshot for {repository_full_name}: {e}")
+        return metrics
@@ -15,6 +15,7 @@ from .git_service import GitService, GitServiceError
 from .sanitization import assert_safe_repository_full_name
 
 from .commit_classifier import classify_commit_with_files
+from .developer_profile_service import DeveloperProfileService, changed_developer_ids, profile_fingerprint
 from analytics.models import DeveloperAlias
 
 logger = logging.getLogger(__name__)
@@ -277,6 +278,9 @@ class GitSyncService:
             'commits_skipped': 0
         }
         
+        created_commits = []
+        stale_developer_ids = set()
+        
         logger.info(f"Processing {len(commits_data)} commits for {repo_full_name}")
         
         for commit_data in commits_data:
@@ -329,10 +333,16 @@ class GitSyncService:
                 if existing_commit:
                     # Update existing commit
                     logger.debug(f"Updating existing commit {sha[:8]}")
+                    before, synced_at = profile_fingerprint(existing_commit), existing_commit.synced_at
                     for field, value in parsed_data.items():
                         if field != 'sha':  # Don't update SHA
                             setattr(existing_commit, field, value)
+                    if not changed_developer_ids(before, existing_commit):
+                        # Unchanged for the profiles: still counted by their last rebuild
+                        existing_commit.synced_at = synced_at
                     existing_commit.save()
+                    # After save(), which re-stamps developer_id (a re-stamp marks both profiles stale)
+                    stale_developer_ids.update(changed_developer_ids(before, existing_commit))
                     results['commits_updated'] += 1
                 else:
                     # Create new commit
@@ -340,6 +350,7 @@ class GitSyncService:
                         logger.debug(f"Creating new commit {sha[:8]} by {parsed_data.get('author_name', 'unknown')}")
                         commit = Commit(**parsed_data)
                         commit.save()
+                        created_commits.append(commit)
                         results['commits_new'] += 1
                         logger.info(f"Successfully created commit {sha[:8]} by {parsed_data.get('author_name', 'unknown')}")
                     except NotUniqueError:
@@ -354,6 +365,7 @@ class GitSyncService:
                 results['commits_skipped'] += 1
                 continue
         
+        DeveloperProfileService.record_ingested(created_commits, stale_developer_ids)
         logger.info(f"Processed {results['commits_processed']} commits for {repo_full_name}: {results['commits_new']} new, {results['commits_updated']} updated, {results['commits_skipped']} skipped")
         return results
     
@@ -0,0 +1,201 @@
+"""
+Developer identity grouping engine
+
+Aliases are grouped with the email rules of the developer identity grouping
+task (exact email, same local part, reversed first.last, initial + last name).
+Instead of comparing every pair of aliases, candidates are first blocked by
+keys that two matching aliases necessarily share, only candidates inside a
+block are compared, and matches are merged with a union-find so grouping is
+transitive.
+
+Blocks:
+    - lowercase email (exact_email_match)
+    - email local part (email_local_match)
+    - sorted dotted parts of a two-part local part (name_reversal_pattern)
+    - dotless local parts, looked up among the substrings of every longer
+      local part (initial_pattern; this also catches GitHub noreply
+      addresses such as 12345+login@users.noreply.github.com)
+"""
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Shortest local part the pattern rules apply to (the rules require len > 3)
+MIN_PATTERN_LENGTH = 4
+
+
+def extract_email_local(email: Optional[str]) -> str:
+    """Extract the lowercase local part of an email (before @)"""
+    if not email or '@' not in email:
+        return ""
+    return email.split('@')[0].lower()
+
+
+def should_group_identities(identity1: Dict, identity2: Dict) -> Tuple[bool, Optional[str]]:
+    """
+    Decide whether two identities belong to the same developer (strict rules).
+
+    Returns:
+        Tuple (should_group, reason)
+    """
+    email1_normalized = identity1['email'].lower()
+    email2_normalized = identity2['email'].lower()
+    email1_local = extract_email_local(email1_normalized)
+    email2_local = extract_email_local(email2_normalized)
+
+    # 1. Same email
+    if email1_normalized == email2_normalized:
+        return True, "exact_email_match"
+
+    # 2. Same local part
+    if email1_local and email2_local and email1_local == email2_local:
+        return True, "email_local_match"
+
+    # 3. Initials patterns
+    # Ex: nohemie.lehuby@toto.com <-> lehuby.nohemie@kisio.com
+    # Ex: nlehuby@hove.com <-> n.lehuby@hove.com
+    if email1_local and email2_local and len(email1_local) > 3 and len(email2_local) > 3:
+        # first.last <-> last.first
+        if '.' in email1_local and '.' in email2_local:
+            parts1 = email1_local.split('.')
+            parts2 = email2_local.split('.')
+            if len(parts1) == 2 and len(parts2) == 2:
+                if (parts1[0] == parts2[1] and parts1[1] == parts2[0]) or \
+                   (parts1[0] == parts2[0] and parts1[1] == parts2[1]):
+                    return True, "name_reversal_pattern"
+
+        # initial + last name: nlehuby <-> n.lehuby
+        if len(email1_local) > len(email2_local):
+            long_email, short_email = email1_local, email2_local
+        else:
+            long_email, short_email = email2_local, email1_local
+
+        if len(short_email) >= 3 and len(long_email) >= len(short_email) + 1:
+            if short_email in long_email.replace('.', ''):
+                return True, "initial_pattern"
+
+    return False, None
+
+
+class UnionFind:
+    """Disjoint sets over 0..size-1 with path halving and union by size"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of a and b, return False if they were already merged"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """Return the sets as sorted index lists, ordered by their first index"""
+        members = defaultdict(list)
+        for item in range(len(self.parent)):
+            members[self.find(item)].append(item)
+        return sorted(members.values(), key=lambda group: group[0])
+
+
+class GroupingResult(NamedTuple):
+    """Groups of identity indexes and the matches that merged them"""
+    groups: List[List[int]]
+    matches: List[Tuple[int, int, str]]
+    comparisons: int
+
+
+def _candidate_pairs(identities: Sequence[Dict]):
+    """Yield (i, j) pairs sharing at least one block, i < j"""
+    emails = [(identity.get('email') or '').lower() for identity in identities]
+    locals_ = [extract_email_local(email) for email in emails]
+
+    blocks = defaultdict(list)
+    for index, (email, local) in enumerate(zip(emails, locals_)):
+        blocks[('email', email)].append(index)
+        if local:
+            blocks[('local', local)].append(index)
+            parts = local.split('.')
+            if len(parts) == 2 and len(local) >= MIN_PATTERN_LENGTH:
+                blocks[('reversal', tuple(sorted(parts)))].append(index)
+
+    # Every member of these blocks matches the first one
+    for members in blocks.values():
+        for other in members[1:]:
+            yield members[0], other
+
+    # initial_pattern: a dotless local part contained in a longer local part
+    short_locals = defaultdict(list)
+    for index, local in enumerate(locals_):
+        if len(local) >= MIN_PATTERN_LENGTH and '.' not in local:
+            short_locals[local].append(index)
+    if not short_locals:
+        return
+    shortest = min(len(local) for local in short_locals)
+    longest = max(len(local) for local in short_locals)
+
+    for index, local in enumerate(locals_):
+        if len(local) <= shortest:
+            continue
+        stripped = local.replace('.', '')
+        seen = set()
+        for length in range(shortest, min(longest, len(local) - 1) + 1):
+            for start in range(len(stripped) - length + 1):
+                candidate = stripped[start:start + length]
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                for other in short_locals.get(candidate, ()):
+                    yield (other, index) if other < index else (index, other)
+
+
+def group_identities(identities: Sequence[Dict]) -> GroupingResult:
+    """
+    Group identities ({'name', 'email'} dicts) that belong to the same developer.
+
+    Only candidates sharing a block are compared with should_group_identities.
+
+    Returns:
+        GroupingResult with the index groups, the (i, j, reason) matches that
+        merged two groups, and the number of rule evaluations
+    """
+    union_find = UnionFind(len(identities))
+    matches = []
+    comparisons = 0
+    for i, j in _candidate_pairs(identities):
+        if union_find.find(i) == union_find.find(j):
+            continue
+        comparisons += 1
+        should_group, reason = should_group_identities(identities[i], identities[j])
+        if should_group:
+            union_find.union(i, j)
+            matches.append((i, j, reason))
+    return GroupingResult(union_find.groups(), matches, comparisons)
+
+
+def group_identities_pairwise(identities: Sequence[Dict]) -> GroupingResult:
+    """Reference implementation comparing every pair (quadratic, for tests and benchmarks)"""
+    union_find = UnionFind(len(identities))
+    matches = []
+    comparisons = 0
+    for i in range(len(identities)):
+        for j in range(i + 1, len(identities)):
+            if union_find.find(i) == union_find.find(j):
+                continue
+            comparisons += 1
+            should_group, reason = should_group_identities(identities[i], identities[j])
+            if should_group:
+                union_find.union(i, j)
+                matches.append((i, j, reason))
+    return GroupingResult(union_find.groups(), matches, comparisons)
@@ -0,0 +1,221 @@
+"""
+In-memory identity index: alias email -> grouped developer
+
+The index is built with two projected queries (aliases and developers) and kept
+per process. A version counter stored in MongoDB (a RepositoryDataVersion
+entry, shared by web and worker processes) is bumped whenever aliases or
+developers change (see DeveloperAlias.save / Developer.save), which makes
+every process rebuild its copy on next use, before stamping another commit.
+A maximum age bounds staleness if a bump could not be written.
+
+The resolved developer id is also denormalized on commits and pull requests
+(developer_id): stamped when they are saved, and re-stamped in bulk with
+restamp_developer_ids() after aliases are merged or split, which also marks
+the developer profiles of the moved commits stale.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# RepositoryDataVersion entry of the index (repository names always contain a '/')
+VERSION_ID = 'identity_index'
+MAX_AGE_SECONDS = 300
+RESTAMP_CHUNK_SIZE = 1000
+
+
+class DeveloperIdentity(NamedTuple):
+    """Grouped developer an alias email resolves to"""
+    developer_id: str
+    primary_name: str
+
+
+class IdentityIndex:
+    """Immutable snapshot of the alias email -> developer mapping"""
+
+    def __init__(self, email_to_developer: Dict[str, DeveloperIdentity], version: Optional[int] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self._email_to_developer = email_to_developer
+        self._developer_emails: Dict[str, Set[str]] = {}
+        for email, identity in email_to_developer.items():
+            self._developer_emails.setdefault(identity.developer_id, set()).add(email)
+
+    @classmethod
+    def build(cls, version: Optional[int] = None) -> 'IdentityIndex':
+        """Load every grouped alias and its developer's primary name"""
+        from .models import Developer, DeveloperAlias
+
+        names = {
+            str(doc['_id']): doc.get('primary_name') or ''
+            for doc in Developer.objects.only('primary_name').as_pymongo()
+        }
+        email_to_developer = {}
+        for doc in DeveloperAlias.objects(developer__ne=None).only('email', 'developer').as_pymongo():
+            email = (doc.get('email') or '').lower()
+            developer_id = doc.get('developer')
+            if not email or developer_id is None:
+                continue
+            developer_id = str(developer_id)
+            if developer_id in names:
+                email_to_developer[email] = DeveloperIdentity(developer_id, names[developer_id])
+        return cls(email_to_developer, version)
+
+    def __len__(self) -> int:
+        return len(self._email_to_developer)
+
+    def resolve(self, email: Optional[str]) -> Optional[DeveloperIdentity]:
+        """Return the developer an email belongs to, None if ungrouped"""
+        if not email:
+            return None
+        return self._email_to_developer.get(email.lower())
+
+    def emails_for(self, developer_id: str) -> List[str]:
+        """Return the (lowercase) alias emails of a developer"""
+        return sorted(self._developer_emails.get(str(developer_id), ()))
+
+    def count_developers(self, emails: Iterable[str]) -> int:
+        """
+        Count distinct developers behind a set of author emails.
+
+        Grouped emails count once per developer, ungrouped emails count as one
+        developer each.
+        """
+        developers = set()
+        ungrouped = set()
+        for email in emails:
+            if not email:
+                continue
+            email = email.lower()
+            identity = self._email_to_developer.get(email)
+            if identity:
+                developers.add(identity.developer_id)
+            else:
+                ungrouped.add(email)
+        return len(developers) + len(ungrouped)
+
+
+_lock = threading.Lock()
+_index: Optional[IdentityIndex] = None
+
+
+def _version_collection():
+    from .models import RepositoryDataVersion
+    return RepositoryDataVersion._get_collection()
+
+
+def _current_version() -> int:
+    doc = _version_collection().find_one({'_id': VERSION_ID}, {'version': 1})
+    return doc.get('version', 0) if doc else 0
+
+
+def get_identity_index() -> IdentityIndex:
+    """Return the process-wide identity index, rebuilding it if it is stale"""
+    global _index
+    version = _current_version()
+    index = _index
+    if index is not None and index.version == version \
+            and time.monotonic() - index.built_at < MAX_AGE_SECONDS:
+        return index
+
+    with _lock:
+        index = _index
+        if index is None or index.version != version or time.monotonic() - index.built_at >= MAX_AGE_SECONDS:
+            index = IdentityIndex.build(version)
+            _index = index
+            logger.debug(f"Identity index rebuilt with {len(index)} aliases (version {version})")
+    return index
+
+
+def invalidate_identity_index() -> None:
+    """Mark every process's identity index as stale after alias or developer changes"""
+    global _index
+    try:
+        _version_collection().update_one(
+            {'_id': VERSION_ID},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now(timezone.utc)}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"Could not bump identity index version: {e}")
+    _index = None
+
+
+def stamp_developer_id(document, email: Optional[str]) -> None:
+    """Set document.developer_id to the developer an email resolves to"""
+    try:
+        identity = get_identity_index().resolve(email)
+    except Exception as e:
+        # Keep the previous stamp, restamp_developer_ids() will fix it
+        logger.warning(f"Could not resolve developer for {email}: {e}")
+        return
+    document.developer_id = identity.developer_id if identity else None
+
+
+def restamp_developer_ids(emails: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Re-stamp developer_id on commits and pull requests with bulk updates.
+
+    Args:
+        emails: Alias emails (or GitHub logins) whose grouping changed,
+            None to re-stamp everything (backfill)
+
+    Returns:
+        Number of modified commits and pull requests
+    """
+    from pymongo import UpdateMany
+    from .developer_profile_service import DeveloperProfileService
+    from .metrics_cache import bump_data_version
+    from .models import Commit, PullRequest
+
+    index = get_identity_index()
+    affected_profiles = set()
+    wanted = {email.lower() for email in emails if email} if emails is not None else None
+
+    modified = {}
+    for label, model, field in (('commits', Commit, 'author_email'), ('pull_requests', PullRequest, 'author')):
+        # Distinct raw values keep the original case of stored emails
+        values_by_developer = defaultdict(list)
+        for value in model.objects.distinct(field):
+            if not value or (wanted is not None and value.lower() not in wanted):
+                continue
+            identity = index.resolve(value)
+            values_by_developer[identity.developer_id if identity else None].append(value)
+
+        updates = []
+        for developer_id, values in values_by_developer.items():
+            for start in range(0, len(values), RESTAMP_CHUNK_SIZE):
+                query = {field: {'$in': values[start:start + RESTAMP_CHUNK_SIZE]}, 'developer_id': {'$ne': developer_id}}
+                updates.append((query, developer_id))
+
+        modified[label] = 0
+        collection = model._get_collection()
+        if model is Commit and wanted is not None:
+            # Profiles of the developers losing or gaining commits
+            for query, developer_id in updates:
+                affected_profiles.update(collection.distinct('developer_id', query))
+                affected_profiles.add(developer_id)
+        operations = [UpdateMany(query, {'$set': {'developer_id': developer_id}}) for query, developer_id in updates]
+        for start in range(0, len(operations), RESTAMP_CHUNK_SIZE):
+            result = collection.bulk_write(operations[start:start + RESTAMP_CHUNK_SIZE], ordered=False)
+            modified[label] += result.modified_count
+
+    if modified['commits']:
+        DeveloperProfileService.mark_stale(affected_profiles if wanted is not None else None)
+    if modified['commits'] or modified['pull_requests']:
+        # Developer metrics of every cached entity are keyed on the global data version
+        bump_data_version()
+    return modified
+
+
+def refresh_developer_stamps(emails: Optional[Iterable[str]] = None) -> Optional[Dict[str, int]]:
+    """Re-stamp after a merge or split, logging instead of failing the grouping change"""
+    try:
+        return restamp_developer_ids(emails)
+    except Exception as e:
+        logger.warning(f"Could not re-stamp developer ids: {e}")
+        return None
@@ -0,0 +1,297 @@
+"""
+Local commit type model, a fast alternative to Ollama
+
+Messages become sparse hashed n-gram features over the subject line (first
+line, lowercased, cut to MAX_SUBJECT_LENGTH characters):
+
+1. whitespace-separated words, with common punctuation split off
+   ('fix', '(', 'api', ')', ':', ...);
+2. bigrams of consecutive tokens;
+3. the first token again, as its own feature ('Fix ...' vs '... fix');
+4. the number of tokens, capped at MAX_LENGTH_BUCKET (short messages are
+   often chores);
+5. a bias feature present in every message.
+
+Subjects are joined and tokenized in one pass over a single string (str
+methods, no per-message regex). Token hashes are crc32 (stable across
+processes), memoized per token; bigram and first-token hashes are combined
+in NumPy. Features are kept as (row, feature) pairs, so scoring a batch is
+one gather and one bincount per category.
+
+Two algorithms, in plain NumPy:
+- 'nb': multinomial naive Bayes with Laplace smoothing (default)
+- 'lr': multinomial logistic regression trained by full-batch AdaGrad
+
+Models are trained on labelled commits (train_commit_model command) and saved
+as commit_model_v<N>.npz in COMMIT_MODEL_DIR; load() reads the latest version.
+"""
+import json
+import re
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+CATEGORIES = ('fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other')
+ALGORITHMS = ('nb', 'lr')
+FORMAT_VERSION = 1
+HASH_FEATURES = 2 ** 18
+MAX_SUBJECT_LENGTH = 200
+MAX_CACHED_TOKENS = 500000
+PREDICT_CHUNK_SIZE = 50000
+
+PUNCTUATION = ':()[]{}!?,.;#/\'"`*+=<>@'
+MESSAGE_SEPARATOR = '\x00'
+BIGRAM_MULTIPLIER = 1000003
+FIRST_TOKEN_MULTIPLIER = 2654435761
+LENGTH_MULTIPLIER = 3266489917
+MAX_LENGTH_BUCKET = 8
+MODEL_FILE_PATTERN = re.compile(r'^commit_model_v(\d+)\.npz$')
+
+
+class _TokenHashes(dict):
+    """crc32 of tokens, memoized (-1 for the message separator)"""
+
+    def __init__(self):
+        super().__init__({MESSAGE_SEPARATOR: -1})
+
+    def __missing__(self, token):
+        if len(self) >= MAX_CACHED_TOKENS:
+            self.clear()
+            self[MESSAGE_SEPARATOR] = -1
+        value = self[token] = zlib.crc32(token.encode('utf-8'))
+        return value
+
+
+_token_hashes = _TokenHashes()
+
+
+def _tokenize(messages: Sequence[Optional[str]]) -> str:
+    """Lowercased subject lines, one string, messages separated by a separator token"""
+    text = '\n'.join(
+        message.lstrip().partition('\n')[0][:MAX_SUBJECT_LENGTH] if message else '' for message in messages
+    ).lower()
+    text = text.replace(MESSAGE_SEPARATOR, ' ').replace('\n', f' {MESSAGE_SEPARATOR} ')
+    for character in PUNCTUATION:
+        if character in text:
+            text = text.replace(character, f' {character} ')
+    return text
+
+
+def featurize(messages: Sequence[Optional[str]],
+              n_features: int = HASH_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed n-gram features of commit messages
+
+    Returns:
+        (rows, features): message index and feature index of every feature
+        occurrence. Feature n_features is the bias.
+    """
+    count = len(messages)
+    tokens = _tokenize(messages).split()
+    codes = np.fromiter(map(_token_hashes.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+    separators = codes < 0
+    token_rows = np.cumsum(separators)[~separators]
+    codes = codes[~separators]
+    lengths = np.bincount(token_rows, minlength=count)
+    message_rows = np.arange(count, dtype=np.int64)
+
+    # Bigrams: consecutive tokens of the same message
+    same_message = token_rows[:-1] == token_rows[1:]
+    bigrams = (codes[:-1][same_message] * BIGRAM_MULTIPLIER + codes[1:][same_message]) % n_features
+
+    has_tokens = lengths > 0
+    starts = np.cumsum(lengths) - lengths
+    first_tokens = (codes[starts[has_tokens]] * FIRST_TOKEN_MULTIPLIER + 1) % n_features
+
+    length_buckets = (np.minimum(lengths, MAX_LENGTH_BUCKET) * LENGTH_MULTIPLIER + 3) % n_features
+
+    rows = np.concatenate([
+        token_rows, token_rows[:-1][same_message], message_rows[has_tokens], message_rows, message_rows
+    ])
+    features = np.concatenate([
+        codes % n_features, bigrams, first_tokens, length_buckets, np.full(count, n_features, dtype=np.int64)
+    ])
+    return rows, features
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+class LocalCommitModel:
+    """Hashed n-gram commit type classifier"""
+
+    def __init__(self, weights: np.ndarray, class_bias: np.ndarray, algorithm: str = 'nb',
+                 n_features: int = HASH_FEATURES, categories: Sequence[str] = CATEGORIES,
+                 metadata: Optional[Dict] = None):
+        self.weights = weights  # (categories, n_features + 1)
+        self.class_bias = class_bias
+        self.algorithm = algorithm
+        self.n_features = n_features
+        self.categories = tuple(categories)
+        self.metadata = metadata or {}
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.metadata.get('version')
+
+    @classmethod
+    def train(cls, messages: Sequence[Optional[str]], labels: Sequence[str], algorithm: str = 'nb',
+              n_features: int = HASH_FEATURES, alpha: float = 0.1, epochs: int = 60,
+              learning_rate: float = 0.5, l2: float = 1e-6) -> 'LocalCommitModel':
+        """
+        Train a model on labelled commit messages
+
+        Args:
+            messages: Commit messages
+            labels: Category of each message
+            algorithm: 'nb' (naive Bayes) or 'lr' (logistic regression)
+            n_features: Hash buckets
+            alpha: Naive Bayes smoothing
+            epochs: Logistic regression full-batch iterations
+            learning_rate: Logistic regression AdaGrad learning rate
+            l2: Logistic regression weight decay
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}")
+        category_index = {category: index for index, category in enumerate(CATEGORIES)}
+        y = np.array([category_index[label] for label in labels], dtype=np.int64)
+        if not len(y):
+            raise ValueError("No labelled commits to train on")
+
+        rows, features = featurize(messages, n_features)
+        width = n_features + 1
+        n_categories = len(CATEGORIES)
+
+        if algorithm == 'nb':
+            counts = np.bincount(y[rows] * width + features, minlength=n_categories * width)
+            counts = counts.reshape(n_categories, width).astype(np.float64) + alpha
+            weights = np.log(counts) - np.log(counts.sum(axis=1, keepdims=True))
+            class_counts = np.bincount(y, minlength=n_categories) + 1.0
+            class_bias = np.log(class_counts / class_counts.sum())
+        else:
+            weights = np.zeros((n_categories, width))
+            class_bias = np.zeros(n_categories)
+            squared_gradients = np.full((n_categories, width), 1e-8)
+            squared_bias_gradients = np.full(n_categories, 1e-8)
+            targets = np.zeros((len(y), n_categories))
+            targets[np.arange(len(y)), y] = 1.0
+            for _ in range(epochs):
+                errors = _softmax(_scores(weights, class_bias, rows, features, len(y))) - targets
+                errors /= len(y)
+                gradients = np.stack([
+                    np.bincount(features, weights=errors[rows, category], minlength=width)
+                    for category in range(n_categories)
+                ]) + l2 * weights
+                bias_gradients = errors.sum(axis=0)
+                squared_gradients += gradients ** 2
+                squared_bias_gradients += bias_gradients ** 2
+                weights -= learning_rate * gradients / np.sqrt(squared_gradients)
+                class_bias -= learning_rate * bias_gradients / np.sqrt(squared_bias_gradients)
+
+        return cls(
+            weights.astype(np.float32), class_bias.astype(np.float32), algorithm=algorithm, n_features=n_features,
+            metadata={'training_commits': int(len(y))}
+        )
+
+    def predict(self, messages: Iterable[Optional[str]]) -> List[str]:
+        """Categories of commit messages, in input order"""
+        messages = list(messages)
+        if not messages:
+            return []
+        # Histories repeat messages ('wip', merges, bumps): classify each once
+        distinct = list(dict.fromkeys(messages))
+        categories = self.categories
+        by_message = {}
+        for start in range(0, len(distinct), PREDICT_CHUNK_SIZE):
+            chunk = distinct[start:start + PREDICT_CHUNK_SIZE]
+            rows, features = featurize(chunk, self.n_features)
+            best = _scores(self.weights, self.class_bias, rows, features, len(chunk)).argmax(axis=1)
+            by_message.update(zip(chunk, (categories[index] for index in best.tolist())))
+        return [by_message[message] for message in messages]
+
+    def evaluate(self, messages: Sequence[Optional[str]], labels: Sequence[str]) -> Dict:
+        """Accuracy against labelled messages, overall and per category"""
+        predicted = self.predict(messages)
+        per_category = {}
+        for category in self.categories:
+            expected = [guess == label for guess, label in zip(predicted, labels) if label == category]
+            if expected:
+                per_category[category] = {'commits': len(expected), 'accuracy': sum(expected) / len(expected)}
+        correct = sum(guess == label for guess, label in zip(predicted, labels))
+        return {
+            'commits': len(labels),
+            'accuracy': correct / len(labels) if labels else 0.0,
+            'per_category': per_category,
+        }
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """Save as the next model version, returns the file path"""
+        directory = Path(directory or settings.COMMIT_MODEL_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        version = max(_model_versions(directory), default=0) + 1
+        self.metadata.update({
+            'version': version,
+            'format_version': FORMAT_VERSION,
+            'algorithm': self.algorithm,
+            'n_features': self.n_features,
+            'categories': list(self.categories),
+            'saved_at': datetime.now(timezone.utc).isoformat(),
+        })
+        path = directory / f'commit_model_v{version}.npz'
+        temporary = directory / f'.commit_model_v{version}.tmp.npz'
+        np.savez_compressed(
+            temporary, weights=self.weights, class_bias=self.class_bias, metadata=np.array(json.dumps(self.metadata))
+        )
+        temporary.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> 'LocalCommitModel':
+        """
+        Load a model file, by default the latest version in COMMIT_MODEL_DIR
+
+        Raises:
+            FileNotFoundError: No model was trained
+            ValueError: The file was written by an incompatible version
+        """
+        if path is None:
+            directory = Path(settings.COMMIT_MODEL_DIR)
+            versions = _model_versions(directory)
+            if not versions:
+                raise FileNotFoundError(f"No commit model in {directory}, run train_commit_model first")
+            path = directory / f'commit_model_v{max(versions)}.npz'
+
+        with np.load(path) as data:
+            metadata = json.loads(str(data['metadata']))
+            if metadata.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"{path} has model format {metadata.get('format_version')}, expected {FORMAT_VERSION}")
+            return cls(
+                data['weights'], data['class_bias'], algorithm=metadata['algorithm'],
+                n_features=metadata['n_features'], categories=metadata['categories'], metadata=metadata
+            )
+
+
+def _scores(weights: np.ndarray, class_bias: np.ndarray, rows: np.ndarray, features: np.ndarray,
+            count: int) -> np.ndarray:
+    scores = np.empty((count, len(weights)))
+    for category, category_weights in enumerate(weights):
+        scores[:, category] = np.bincount(rows, weights=category_weights[features], minlength=count)
+    return scores + class_bias
+
+
+def _model_versions(directory: Path) -> List[int]:
+    if not directory.is_dir():
+        return []
+    return [
+        int(match.group(1))
+        for match in (MODEL_FILE_PATTERN.match(path.name) for path in directory.iterdir())
+        if match
+    ]
@@ -0,0 +1,43 @@
+"""
+Management command to auto-group ungrouped developer aliases in bulk
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from analytics.developer_grouping_service import DeveloperGroupingService
+
+
+class Command(BaseCommand):
+    help = 'Group ungrouped developer aliases (plan in memory, then apply with bulk writes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print the grouping plan without writing it')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        start = time.perf_counter()
+        result = DeveloperGroupingService().auto_group_developers(dry_run=dry_run)
+        elapsed = time.perf_counter() - start
+
+        if not result.get('success'):
+            raise CommandError(result.get('error', 'Auto-grouping failed'))
+        if result.get('message'):
+            self.stdout.write(result['message'])
+            return
+
+        for line in result.get('plan', []):
+            self.stdout.write(f"  {line}")
+
+        summary = (
+            f"{len(result['developers'])} groups, "
+            f"{result['ungrouped_individuals']} individual developers"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run: {summary} planned in {elapsed:.2f}s, nothing written"))
+        else:
+            written = result['written']
+            self.stdout.write(self.style.SUCCESS(
+                f"{summary}: {written['developers_inserted']} developers inserted, "
+                f"{written['aliases_updated']} aliases linked in {elapsed:.2f}s"
+            ))
@@ -0,0 +1,79 @@
+"""
+Management command to backfill derived flags and languages on existing commits
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import UpdateOne
+
+from analytics.commit_flags import compute_commit_flags, flag_count_pipeline
+from analytics.developer_profile_service import DeveloperProfileService
+from analytics.models import Commit
+
+
+class Command(BaseCommand):
+    help = 'Compute the flags bitfield and language set of commits stored before they existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every commit (after a change of the flag rules), not only missing ones'
+        )
+        parser.add_argument(
+            '--repository',
+            help='Only backfill commits of this repository (owner/repo)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of updates per bulk write'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError('Chunk size must be positive')
+
+        query = {} if options['all'] else {'flags': None}
+        if options['repository']:
+            query['repository_full_name'] = options['repository']
+
+        collection = Commit._get_collection()
+        cursor = collection.find(
+            query,
+            {'files_changed.filename': 1, 'total_changes': 1, 'message': 1},
+            no_cursor_timeout=True
+        ).batch_size(chunk_size)
+
+        start = time.perf_counter()
+        operations = []
+        updated = 0
+        try:
+            for doc in cursor:
+                filenames = [file_change.get('filename', '') for file_change in doc.get('files_changed') or []]
+                flags, languages = compute_commit_flags(filenames, doc.get('total_changes'), doc.get('message'))
+                operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {'flags': flags, 'languages': languages}}))
+                if len(operations) >= chunk_size:
+                    updated += collection.bulk_write(operations, ordered=False).modified_count
+                    operations = []
+                    self.stdout.write(f"  {updated} commits updated...")
+            if operations:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - start
+
+        # Profiles computed missing flags with the same rules, but counted
+        # the old flags of recomputed commits
+        if options['all'] and updated:
+            DeveloperProfileService.mark_stale()
+
+        self.stdout.write(self.style.SUCCESS(f"Updated flags of {updated} commits in {elapsed:.2f}s"))
+
+        match = {'repository_full_name': options['repository']} if options['repository'] else {}
+        for counts in collection.aggregate(flag_count_pipeline(match)):
+            total = counts.pop('total_commits')
+            counts.pop('_id', None)
+            self.stdout.write(f"{total} commits: " + ", ".join(f"{name} {int(count)}" for name, count in counts.items()))
@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.commit_classifier import classify_commit
+from analytics.commit_rules import classify_many, classify_message
+import random
+import time
+
+PREFIXES = ['', '', '', 'feat: ', 'fix(api): ', 'chore(deps): ', 'docs: ', 'Refactor ', 'WIP ', 'Merge branch ',
+            'Revert "', 'test: ', 'style: ', 'ci: ', 'Bump ', '  ', 'Update ', 'Add ', 'perf: ', 'release: ']
+WORDS = ['login', 'page', 'the', 'api', 'endpoint', 'user', 'settings', 'fix', 'bug', 'update', 'readme',
+         'cache', 'export', 'from', 'to', 'version', 'lodash', 'main', 'into', 'develop', 'typo', 'coverage',
+         'unit', 'performance', 'handle', 'error', 'when', 'empty', 'list', 'rename', 'variable', 'Éléments',
+         'résolution', 'crash', 'build', 'improve', 'remove', 'dead', 'code', 'new', 'feature', 'flag', 'e2e',
+         'fix,', '#123', '(scope)', 'v1.2.3', 'disable', 'migration', 'optimization', 'lint', 'format']
+
+
+def synthetic_messages(count, seed=42):
+    """
+    Build `count` commit messages shaped like real histories.
+
+    Mixes conventional-commit prefixes, merge and bump messages, free text,
+    mixed case, accented words, multi-line bodies and empty messages.
+    """
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.02:
+            messages.append(rng.choice(['', ' ', None, '\n\n']))
+            continue
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 9))]
+        if rng.random() < 0.3:
+            words = [word.upper() if rng.random() < 0.5 else word.title() for word in words]
+        message = rng.choice(PREFIXES) + ' '.join(words)
+        if rng.random() < 0.15:
+            message += '\n\n' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 30)))
+        messages.append(message)
+    return messages
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the compiled commit classifier against the reference classify_commit'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=200000,
+            help='Number of synthetic commit messages'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            nargs='+',
+            default=[2, 4],
+            help='Process pool sizes to benchmark classify_many with'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the synthetic messages'
+        )
+
+    def handle(self, *args, **options):
+        if options['count'] <= 0:
+            raise CommandError('Count must be positive')
+
+        messages = synthetic_messages(options['count'], seed=options['seed'])
+
+        start = time.perf_counter()
+        reference = [classify_commit(message) for message in messages]
+        baseline = time.perf_counter() - start
+        self.stdout.write(f'classify_commit: {baseline:.3f}s ({len(messages) / baseline:,.0f} msgs/s)')
+
+        runs = [('classify_message', lambda: [classify_message(message) for message in messages])]
+        runs += [
+            (f'classify_many(workers={workers})', lambda workers=workers: classify_many(messages, workers=workers))
+            for workers in options['workers']
+        ]
+        for label, run in runs:
+            start = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - start
+            if result != reference:
+                raise CommandError(f'{label} differs from classify_commit')
+            self.stdout.write(
+                f'{label}: {elapsed:.3f}s ({len(messages) / elapsed:,.0f} msgs/s, x{baseline / elapsed:.1f})'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Commit classifier benchmark completed'))
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.identity_grouping import group_identities, group_identities_pairwise
+import random
+import string
+import time
+
+FIRST_NAMES = ['alice', 'bruno', 'chloe', 'david', 'emma', 'felix', 'gaelle', 'hugo', 'ines', 'jules',
+               'karim', 'lea', 'marc', 'nohemie', 'oscar', 'paula', 'quentin', 'rose', 'samir', 'theo']
+DOMAINS = ['example.com', 'corp.example.org', 'gmail.com', 'hove.com', 'kisio.com']
+
+
+def synthetic_identities(count, seed=42):
+    """
+    Build about `count` aliases of synthetic developers.
+
+    Each developer gets a random subset of the alias shapes seen in real
+    histories: first.last, last.first, initial + last name, a dotted initial,
+    a GitHub noreply address and a personal address.
+    """
+    rng = random.Random(seed)
+    identities = []
+    while len(identities) < count:
+        first = rng.choice(FIRST_NAMES)
+        last = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 9)))
+        login = f"{first[:3]}{last}{rng.randint(1, 99)}"
+        shapes = [
+            f"{first}.{last}@{rng.choice(DOMAINS)}",
+            f"{last}.{first}@{rng.choice(DOMAINS)}",
+            f"{first[0]}{last}@{rng.choice(DOMAINS)}",
+            f"{first[0]}.{last}@{rng.choice(DOMAINS)}",
+            f"{rng.randint(10000, 99999999)}+{login}@users.noreply.github.com",
+            f"{login}@gmail.com",
+        ]
+        name = f"{first.title()} {last.title()}"
+        for email in rng.sample(shapes, rng.randint(1, 4)):
+            identities.append({'name': name, 'email': email})
+    return identities[:count]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark developer identity grouping on synthetic alias sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 5000, 15000],
+            help='Number of synthetic aliases per run'
+        )
+        parser.add_argument(
+            '--pairwise-limit',
+            type=int,
+            default=3000,
+            help='Also run the pairwise reference (and check results match) up to this size'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the synthetic alias sets'
+        )
+
+    def handle(self, *args, **options):
+        if any(size <= 0 for size in options['sizes']):
+            raise CommandError('Sizes must be positive')
+
+        for size in options['sizes']:
+            identities = synthetic_identities(size, seed=options['seed'])
+
+            start = time.perf_counter()
+            result = group_identities(identities)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{size} aliases: {len(result.groups)} groups, {result.comparisons} comparisons, '
+                f'{elapsed:.3f}s (blocking + union-find)'
+            )
+
+            if size > options['pairwise_limit']:
+                continue
+            start = time.perf_counter()
+            reference = group_identities_pairwise(identities)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{size} aliases: {len(reference.groups)} groups, {reference.comparisons} comparisons, '
+                f'{elapsed:.3f}s (pairwise)'
+            )
+            if reference.groups != result.groups:
+                raise CommandError(f'Grouping differs from the pairwise reference for {size} aliases')
+
+        self.stdout.write(self.style.SUCCESS('Identity grouping benchmark completed'))
@@ -21,6 +21,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Force recalculation even if SHS already exists'
         )
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Compute all repositories with a few aggregate queries and one bulk insert'
+        )
 
     def handle(self, *args, **options):
         repository_id = options.get('repository_id')
@@ -42,8 +47,11 @@ class Command(BaseCommand):
             repositories = Repository.objects.filter(is_indexed=True)
             self.stdout.write(f'Calculating SHS for {repositories.count()} repositories...')
             
-            for repository in repositories:
-                self._calculate_shs_for_repository(repository, shs_service, force)
+            if options.get('batch'):
+                self._calculate_shs_batch(repositories, shs_service, force)
+            else:
+                for repository in repositories:
+                    self._calculate_shs_for_repository(repository, shs_service, force)
             
             self.stdout.write(
                 self.style.SUCCESS('SHS calculation completed for all repositories')
@@ -84,4 +92,27 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error calculating SHS for {repository.full_name}: {e}')
-            ) 
\ No newline at end of file
+            )
+
+    def _calculate_shs_batch(self, repositories, shs_service, force):
+        """Calculate SHS for all repositories in batch mode"""
+        try:
+            results = shs_service.calculate_shs_batch(repositories, force=force)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error calculating SHS in batch mode: {e}'))
+            return
+
+        for full_name, result in sorted(results.items()):
+            if result['shs_score'] is not None:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'{full_name}: SHS {result["shs_score"]:.1f}/100 '
+                        f'({result["total_vulnerabilities"]} vulnerabilities)'
+                    )
+                )
+            else:
+                self.stdout.write(f'{full_name}: {result["status"]} - {result["message"]}')
+
+        skipped = len(repositories) - len(results)
+        if skipped:
+            self.stdout.write(f'{skipped} repositories already have a SHS (use --force to recalculate)')
@@ -1,17 +1,36 @@
 """
 Management command to classify existing commits
+
+Commits classified as "other" are streamed in _id order with only their _id,
+message, file names and developer. Chunks are classified in a worker pool
+and changed commit types are written with one bulk update per chunk. The
+last written _id is checkpointed, so an interrupted run resumes where it
+stopped (--restart starts over).
 """
-from django.core.management.base import BaseCommand
-from analytics.models import Commit
-from analytics.commit_classifier import classify_commit_ollama
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from pymongo import UpdateOne
+
+from analytics.commit_flags import files_only_type
+from analytics.developer_profile_service import DeveloperProfileService
+from analytics.local_commit_model import LocalCommitModel
+from analytics.metrics_cache import bump_data_version
+from analytics.models import Commit, CommandCheckpoint
+from analytics.ollama_classifier import label_messages
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_PREFIX = 'classify_existing_commits'
+
 
 class Command(BaseCommand):
-    help = 'Classify existing commits marked as "other" using Ollama LLM'
-    
+    help = 'Classify existing commits marked as "other" using Ollama LLM or the local commit model'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--dry-run',
@@ -21,76 +40,233 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=100,
-            help='Number of commits to process in each batch',
+            default=500,
+            help='Number of commits classified and written at once',
         )
         parser.add_argument(
             '--limit',
             type=int,
             help='Limit the number of commits to process (for testing)',
         )
-    
+        parser.add_argument(
+            '--backend',
+            choices=['ollama', 'local'],
+            default='ollama',
+            help='Ollama LLM, or the local model trained with train_commit_model',
+        )
+        parser.add_argument(
+            '--model-file',
+            help='Local model file to use (default: latest version in settings.COMMIT_MODEL_DIR)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Number of batches classified in parallel',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the checkpoint of an interrupted run and start over',
+        )
+
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         batch_size = options['batch_size']
+        workers = options['workers']
         limit = options.get('limit')
-        
-        # Get all commits classified as "other"
-        commits = list(Commit.objects(commit_type='other'))
-        
+        if batch_size <= 0 or workers <= 0:
+            raise CommandError('Batch size and workers must be positive')
+
+        classify_messages = self._classifier(options)
+
+        checkpoints = CommandCheckpoint._get_collection()
+        checkpoint_name = f"{CHECKPOINT_PREFIX}:{options['backend']}"
+        if options['restart'] and not dry_run:
+            checkpoints.delete_one({'_id': checkpoint_name})
+        checkpoint = None if options['restart'] else checkpoints.find_one({'_id': checkpoint_name})
+
+        query = {'commit_type': 'other'}
+        processed = updated = 0
+        if checkpoint:
+            query['_id'] = {'$gt': checkpoint['last_id']}
+            processed, updated = checkpoint.get('processed', 0), checkpoint.get('updated', 0)
+            self.stdout.write(f"Resuming after {processed} commits ({updated} updated) of an interrupted run")
+
+        collection = Commit._get_collection()
+        total_commits = collection.count_documents(query)
         if limit:
-            commits = commits[:limit]
+            total_commits = min(total_commits, limit)
             self.stdout.write(f"Limited to {limit} commits for testing")
-        
-        total_commits = len(commits)
         self.stdout.write(f"Found {total_commits} commits classified as 'other' to reclassify")
-        
+
         if total_commits == 0:
+            if not dry_run:
+                checkpoints.delete_one({'_id': checkpoint_name})
             self.stdout.write(self.style.SUCCESS("No commits classified as 'other' found. Nothing to do."))
             return
-        
+
         if dry_run:
             self.stdout.write("DRY RUN - No changes will be made")
-        
-        # Process in batches
-        processed = 0
-        updated = 0
+
+        cursor = collection.find(
+            query,
+            {'message': 1, 'files_changed.filename': 1, 'developer_id': 1},
+            no_cursor_timeout=True
+        ).sort('_id', 1).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        run_processed = 0
+        reclassified_developers = set()
         stats = {
             'fix': 0, 'feature': 0, 'docs': 0, 'refactor': 0,
             'test': 0, 'style': 0, 'chore': 0, 'other': 0
         }
-        
-        for i in range(0, total_commits, batch_size):
-            batch = commits[i:i + batch_size]
-            
-            for commit in batch:
-                processed += 1
-                
-                # Classify the commit with Ollama
-                commit_type = classify_commit_ollama(commit.message)
-                stats[commit_type] += 1
-                
-                if not dry_run:
-                    commit.commit_type = commit_type
-                    commit.save()
-                    updated += 1
-                
-                # Progress update
-                if processed % 10 == 0:
-                    self.stdout.write(f"Processed {processed}/{total_commits} commits...")
-        
+        interrupted = False
+        start = time.perf_counter()
+
+        # Batches are classified in parallel and written in cursor order,
+        # so the checkpoint only ever moves past fully written commits
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batches = self._batches(cursor, batch_size)
+            pending = deque()
+            exhausted = False
+            try:
+                while True:
+                    # Keep every worker busy, with one batch queued behind them
+                    while not exhausted and len(pending) <= workers:
+                        batch = next(batches, None)
+                        if batch is None:
+                            exhausted = True
+                        else:
+                            pending.append((batch, executor.submit(self._classify_batch, classify_messages, batch)))
+                    if not pending:
+                        break
+
+                    batch, future = pending.popleft()
+                    commit_types = future.result()
+                    if None in commit_types:
+                        interrupted = True
+                        break
+                    updated += self._write_batch(collection, batch, commit_types, stats,
+                                                 reclassified_developers, dry_run)
+                    processed += len(batch)
+                    run_processed += len(batch)
+                    if not dry_run:
+                        self._save_checkpoint(checkpoints, checkpoint_name, batch[-1]['_id'], processed, updated)
+                    self._progress(run_processed, total_commits, updated, start)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                cursor.close()
+
+        # Commit type counts changed on these developers' profiles
+        reclassified_developers.discard(None)
+        if reclassified_developers:
+            DeveloperProfileService.mark_stale(reclassified_developers)
+        if updated:
+            # Commit type distributions of cached metrics changed
+            bump_data_version()
+
+        if interrupted:
+            self.stdout.write(self.style.WARNING(
+                f"\nOllama is unavailable, stopped after {processed} commits. "
+                "Run the command again to resume from the checkpoint."
+            ))
+        else:
+            if not dry_run:
+                checkpoints.delete_one({'_id': checkpoint_name})
+            self.stdout.write(self.style.SUCCESS(f"\nClassification complete!"))
+
         # Show results
-        self.stdout.write(self.style.SUCCESS(f"\nClassification complete!"))
         self.stdout.write(f"Total commits processed: {processed}")
-        
+
         if not dry_run:
             self.stdout.write(f"Commits updated: {updated}")
-        
-        self.stdout.write("\nClassification statistics:")
-        for commit_type, count in stats.items():
-            if count > 0:
-                percentage = (count / processed) * 100
-                self.stdout.write(f"  {commit_type}: {count} ({percentage:.1f}%)")
-        
+
+        if run_processed:
+            self.stdout.write("\nClassification statistics:")
+            for commit_type, count in stats.items():
+                if count > 0:
+                    percentage = (count / run_processed) * 100
+                    self.stdout.write(f"  {commit_type}: {count} ({percentage:.1f}%)")
+
         if dry_run:
-            self.stdout.write(self.style.WARNING("\nThis was a dry run. Run without --dry-run to apply changes.")) 
\ No newline at end of file
+            self.stdout.write(self.style.WARNING("\nThis was a dry run. Run without --dry-run to apply changes."))
+
+    def _classifier(self, options):
+        """Function classifying a list of messages, None for messages it could not classify"""
+        if options['backend'] == 'local':
+            try:
+                model = LocalCommitModel.load(options.get('model_file'))
+            except (FileNotFoundError, ValueError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"Using local commit model v{model.version} ({model.algorithm})")
+            return model.predict
+        # Cached labels, batched prompts; None while the Ollama circuit is open
+        return lambda messages: label_messages(messages, max_workers=1)
+
+    @staticmethod
+    def _batches(cursor, batch_size):
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _classify_batch(classify_messages, batch):
+        """Commit types of a batch: documentation or configuration only commits by their files, others by message"""
+        commit_types = [
+            files_only_type([file_change.get('filename', '') for file_change in doc.get('files_changed') or []])
+            for doc in batch
+        ]
+        to_classify = [index for index, commit_type in enumerate(commit_types) if commit_type is None]
+        if to_classify:
+            labels = classify_messages([batch[index].get('message') or '' for index in to_classify])
+            for index, label in zip(to_classify, labels):
+                commit_types[index] = label
+        return commit_types
+
+    @staticmethod
+    def _write_batch(collection, batch, commit_types, stats, reclassified_developers, dry_run):
+        """Count the new commit types and write the changed ones, returns the number of updated commits"""
+        operations = []
+        developer_ids = set()
+        for doc, commit_type in zip(batch, commit_types):
+            stats[commit_type] += 1
+            if commit_type != 'other':
+                operations.append(UpdateOne(
+                    {'_id': doc['_id'], 'commit_type': 'other'}, {'$set': {'commit_type': commit_type}}
+                ))
+                developer_ids.add(doc.get('developer_id'))
+        if dry_run or not operations:
+            return 0
+        modified = collection.bulk_write(operations, ordered=False).modified_count
+        # Only written commit types change the developers' profiles
+        reclassified_developers.update(developer_ids)
+        return modified
+
+    @staticmethod
+    def _save_checkpoint(checkpoints, name, last_id, processed, updated):
+        checkpoints.update_one(
+            {'_id': name},
+            {'$set': {
+                'last_id': last_id,
+                'processed': processed,
+                'updated': updated,
+                'updated_at': datetime.now(timezone.utc),
+            }},
+            upsert=True
+        )
+
+    def _progress(self, run_processed, total_commits, updated, start):
+        elapsed = time.perf_counter() - start
+        rate = run_processed / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Processed {run_processed}/{total_commits} commits, {updated} updated ({rate:,.0f} msgs/s)..."
+        )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from analytics.models import Deployment
+from analytics.deployment_stats_service import DeploymentStatsService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild weekly deployment aggregates (change failure rate, time to restore) from deployment statuses'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repo-id',
+            type=int,
+            help='Repository ID to rebuild aggregates for'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild aggregates for all repositories'
+        )
+
+    def handle(self, *args, **options):
+        if options['repo_id']:
+            from repositories.models import Repository
+            try:
+                repository = Repository.objects.get(id=options['repo_id'])
+            except Repository.DoesNotExist:
+                raise CommandError(f"Repository with ID {options['repo_id']} not found")
+            repository_names = [repository.full_name]
+        elif options['all']:
+            repository_names = [name for name in Deployment.objects.distinct('repository_full_name') if name]
+        else:
+            raise CommandError('Please specify either --repo-id or --all')
+
+        total_rows = 0
+        for repository_full_name in repository_names:
+            environments = Deployment.objects.filter(
+                repository_full_name=repository_full_name
+            ).distinct('environment')
+            # None as change date rebuilds the whole history of the environment
+            changes = {(repository_full_name, env): None for env in environments if env}
+            rows = DeploymentStatsService.update_for_changes(changes)
+            total_rows += rows
+            self.stdout.write(f'{repository_full_name}: {len(changes)} environments, {rows} weekly rows')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total_rows} weekly rows for {len(repository_names)} repositories'))
@@ -0,0 +1,46 @@
+"""
+Management command to rebuild materialized developer profiles
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from analytics.developer_profile_service import DeveloperProfileService
+from analytics.models import Developer, DeveloperProfile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild developer profiles (aggregates of the developer pages) from their commits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--developer',
+            action='append',
+            dest='developer_ids',
+            help='Only rebuild this developer id (repeatable)'
+        )
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only rebuild profiles marked stale'
+        )
+
+    def handle(self, *args, **options):
+        developer_ids = options['developer_ids']
+        if developer_ids is None:
+            if options['stale_only']:
+                developer_ids = DeveloperProfile._get_collection().distinct('developer_id', {'stale': True})
+            else:
+                developer_ids = [str(doc['_id']) for doc in Developer.objects.only('id').as_pymongo()]
+
+        start = time.perf_counter()
+        commits = 0
+        for developer_id in developer_ids:
+            try:
+                commits += DeveloperProfileService.rebuild(developer_id).total_commits
+            except Exception as e:
+                raise CommandError(f'Could not rebuild profile of {developer_id}: {e}')
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(developer_ids)} developer profiles ({commits} commits) in {elapsed:.2f}s"
+        ))
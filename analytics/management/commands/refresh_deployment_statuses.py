@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from analytics.models import Deployment
 from analytics.deployment_indexing_service import DeploymentIndexingService
+from analytics.deployment_stats_service import DeploymentStatsService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -86,6 +87,7 @@ class Command(BaseCommand):
         processed = 0
         updated = 0
         errors = 0
+        stats_changes = {}
 
         for deployment in deployments:
             try:
@@ -110,6 +112,10 @@ class Command(BaseCommand):
                     deployment.statuses = statuses
                     deployment.save()
                     updated += 1
+
+                    key = (deployment.repository_full_name, deployment.environment)
+                    earliest = stats_changes.get(key, deployment.created_at)
+                    stats_changes[key] = min(earliest, deployment.created_at) if earliest and deployment.created_at else None
                     
                     # Show status states
                     states = [s.get('state', 'unknown') for s in statuses]
@@ -121,6 +127,9 @@ class Command(BaseCommand):
                 errors += 1
                 self.stdout.write(self.style.ERROR(f'  Error processing deployment {deployment.deployment_id}: {e}'))
 
+        if stats_changes:
+            DeploymentStatsService.update_for_changes(stats_changes)
+
         self.stdout.write('')
         self.stdout.write(f'Repository {repository_full_name}:')
         self.stdout.write(f'  Processed: {processed}')
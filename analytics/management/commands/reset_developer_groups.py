@@ -3,6 +3,8 @@ Management command to reset all developer groups and start fresh
 """
 from django.core.management.base import BaseCommand
 from analytics.models import DeveloperGroup, DeveloperAlias
+from analytics.identity_index import invalidate_identity_index
+from analytics.metrics_cache import bump_data_version
 
 
 class Command(BaseCommand):
@@ -35,11 +37,15 @@ class Command(BaseCommand):
         # Delete all aliases first (due to foreign key constraint)
         deleted_aliases = DeveloperAlias.objects.count()
         DeveloperAlias.objects.all().delete()
+        invalidate_identity_index()
         
         # Delete all groups
         deleted_groups = DeveloperGroup.objects.count()
         DeveloperGroup.objects.all().delete()
         
+        # Cached developer metrics were built on the deleted groups
+        bump_data_version()
+        
         self.stdout.write(f"\n✅ Reset completed!")
         self.stdout.write(f"✓ Deleted {deleted_groups} developer groups")
         self.stdout.write(f"✓ Deleted {deleted_aliases} developer aliases")
@@ -0,0 +1,29 @@
+"""
+Management command to backfill developer_id on commits and pull requests
+"""
+from django.core.management.base import BaseCommand, CommandError
+from analytics.identity_index import invalidate_identity_index, restamp_developer_ids
+
+
+class Command(BaseCommand):
+    help = 'Stamp the grouped developer id on commits and pull requests (backfill or repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            action='append',
+            dest='emails',
+            help='Only re-stamp this author email or GitHub login (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        # Start from the current aliases, not a cached index
+        invalidate_identity_index()
+        try:
+            modified = restamp_developer_ids(options['emails'])
+        except Exception as e:
+            raise CommandError(f'Could not stamp developer ids: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stamped {modified['commits']} commits and {modified['pull_requests']} pull requests"
+        ))
@@ -0,0 +1,29 @@
+"""
+Management command to copy the latest KLOC history entry onto each repository
+"""
+from datetime import timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.models import RepositoryKLOCHistory
+from repositories.models import Repository
+
+
+class Command(BaseCommand):
+    help = 'Sync Repository.kloc and kloc_calculated_at with the KLOC history (backfill or repair)'
+
+    def handle(self, *args, **options):
+        try:
+            latest = RepositoryKLOCHistory.latest_by_repository()
+        except Exception as e:
+            raise CommandError(f'Could not read the KLOC history: {e}')
+
+        repositories = list(Repository.objects.filter(id__in=list(latest)))
+        for repository in repositories:
+            kloc, calculated_at = latest[repository.id]
+            if calculated_at is not None and calculated_at.tzinfo is None:
+                calculated_at = calculated_at.replace(tzinfo=dt_timezone.utc)
+            repository.kloc, repository.kloc_calculated_at = kloc, calculated_at
+        Repository.objects.bulk_update(repositories, ['kloc', 'kloc_calculated_at'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f'Synced KLOC of {len(repositories)} repositories'))
@@ -0,0 +1,103 @@
+"""
+Management command to train the local commit type model on classified commits
+"""
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.local_commit_model import ALGORITHMS, CATEGORIES, HASH_FEATURES, LocalCommitModel
+from analytics.models import Commit
+
+
+class Command(BaseCommand):
+    help = 'Train the local commit type model on commits already classified in the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--algorithm',
+            choices=ALGORITHMS,
+            default='nb',
+            help='nb (naive Bayes, fast to train) or lr (logistic regression, more accurate)'
+        )
+        parser.add_argument(
+            '--holdout',
+            type=float,
+            default=0.1,
+            help='Fraction of the commits kept out of training to measure accuracy'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Train on at most this many commits'
+        )
+        parser.add_argument(
+            '--features',
+            type=int,
+            default=HASH_FEATURES,
+            help='Number of hashed n-gram features'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed of the held-out slice'
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Directory of the model files (default: settings.COMMIT_MODEL_DIR)'
+        )
+
+    def handle(self, *args, **options):
+        holdout = options['holdout']
+        if not 0 <= holdout < 1:
+            raise CommandError('Holdout must be between 0 and 1')
+        if options['features'] <= 0:
+            raise CommandError('Number of features must be positive')
+
+        cursor = Commit._get_collection().find(
+            {'commit_type': {'$in': list(CATEGORIES)}}, {'_id': 0, 'message': 1, 'commit_type': 1}
+        )
+        if options['limit']:
+            cursor = cursor.limit(options['limit'])
+        messages = []
+        labels = []
+        for doc in cursor:
+            messages.append(doc.get('message') or '')
+            labels.append(doc['commit_type'])
+        if not messages:
+            raise CommandError('No classified commits to train on')
+
+        order = np.random.default_rng(options['seed']).permutation(len(messages))
+        held_out = order[:int(len(messages) * holdout)]
+        training = order[len(held_out):]
+        if not len(training):
+            raise CommandError('No commits left to train on, lower --holdout')
+
+        start = time.perf_counter()
+        model = LocalCommitModel.train(
+            [messages[index] for index in training],
+            [labels[index] for index in training],
+            algorithm=options['algorithm'],
+            n_features=options['features']
+        )
+        self.stdout.write(
+            f"Trained {options['algorithm']} model on {len(training)} commits in {time.perf_counter() - start:.2f}s"
+        )
+
+        if len(held_out):
+            held_out_messages = [messages[index] for index in held_out]
+            start = time.perf_counter()
+            report = model.evaluate(held_out_messages, [labels[index] for index in held_out])
+            elapsed = time.perf_counter() - start
+            model.metadata['holdout_commits'] = report['commits']
+            model.metadata['holdout_accuracy'] = report['accuracy']
+            self.stdout.write(
+                f"Held-out accuracy: {report['accuracy']:.1%} on {report['commits']} commits "
+                f"({len(held_out_messages) / elapsed:,.0f} msgs/s)"
+            )
+            for category, stats in report['per_category'].items():
+                self.stdout.write(f"  {category}: {stats['accuracy']:.1%} ({stats['commits']} commits)")
+
+        path = model.save(options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f"Saved commit model v{model.version} to {path}"))
@@ -0,0 +1,235 @@
+"""
+Shared cache of UnifiedMetricsService results
+
+Entries are keyed by (entity_type, entity_id, date range, metric) and live in
+a store shared by every gunicorn process and django-q worker:
+
+- 'mongo' (default): the metrics_cache collection, expired by a TTL index
+- 'file': Django's file-based cache in METRICS_CACHE_DIR (single host)
+- 'none': no caching
+
+Keys also carry the data versions of the repositories behind the entity.
+Indexers bump a repository's version when they ingest data
+(bump_data_version), which moves every entity built on it to new keys, so
+invalidation is exact and METRICS_CACHE_TIMEOUT can be long. Changes that
+are not tied to one repository (identity regrouping, commit reclassification)
+bump the global version GLOBAL_SCOPE, part of every key.
+
+Metrics computed relative to today (last 30 days, days since last commit)
+also carry the current date, so they are recomputed once a day.
+"""
+import functools
+import hashlib
+import logging
+import pickle
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable
+
+from bson import Binary
+from django.conf import settings
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .models import MetricsCacheEntry, RepositoryDataVersion
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = '*'
+BACKENDS = ('mongo', 'file', 'none')
+
+_MISSING = object()
+
+
+class MongoMetricsStore:
+    """Entries in the metrics_cache collection"""
+
+    def get(self, key: str) -> Any:
+        doc = MetricsCacheEntry._get_collection().find_one(
+            {'_id': key, 'expires_at': {'$gt': datetime.now(timezone.utc)}}, {'value': 1}
+        )
+        return pickle.loads(doc['value']) if doc else _MISSING
+
+    def set(self, key: str, value: Any, timeout: int, **labels) -> None:
+        now = datetime.now(timezone.utc)
+        MetricsCacheEntry._get_collection().update_one(
+            {'_id': key},
+            {'$set': {
+                **labels,
+                'value': Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=timeout),
+            }},
+            upsert=True
+        )
+
+    def add(self, key: str, value: Any, timeout: int, **labels) -> bool:
+        """Set a key unless it holds an unexpired value, returns whether it was set"""
+        now = datetime.now(timezone.utc)
+        try:
+            MetricsCacheEntry._get_collection().update_one(
+                {'_id': key, 'expires_at': {'$lte': now}},
+                {'$set': {
+                    **labels,
+                    'value': Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+                    'created_at': now,
+                    'expires_at': now + timedelta(seconds=timeout),
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def delete(self, key: str) -> None:
+        MetricsCacheEntry._get_collection().delete_one({'_id': key})
+
+
+class FileMetricsStore:
+    """Entries in a file-based Django cache"""
+
+    def __init__(self, directory):
+        from django.core.cache.backends.filebased import FileBasedCache
+        self.cache = FileBasedCache(str(directory), {})
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key, _MISSING)
+
+    def set(self, key: str, value: Any, timeout: int, **labels) -> None:
+        self.cache.set(key, value, timeout)
+
+    def add(self, key: str, value: Any, timeout: int, **labels) -> bool:
+        return self.cache.add(key, value, timeout)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+_stores = {}
+
+
+def get_store():
+    """Store of the configured METRICS_CACHE_BACKEND, None when caching is disabled"""
+    backend = getattr(settings, 'METRICS_CACHE_BACKEND', 'mongo')
+    if backend == 'none':
+        return None
+    if backend not in _stores:
+        if backend == 'mongo':
+            _stores[backend] = MongoMetricsStore()
+        elif backend == 'file':
+            _stores[backend] = FileMetricsStore(settings.METRICS_CACHE_DIR)
+        else:
+            raise ValueError(f"Unknown METRICS_CACHE_BACKEND {backend!r}, expected one of {', '.join(BACKENDS)}")
+    return _stores[backend]
+
+
+def bump_data_version(repository_full_name: str = GLOBAL_SCOPE) -> int:
+    """Record new data for a repository (or for all of them), returns its new version"""
+    doc = RepositoryDataVersion._get_collection().find_one_and_update(
+        {'_id': repository_full_name},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now(timezone.utc)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc['version']
+
+
+def get_data_versions(repository_full_names: Iterable[str]) -> Dict[str, int]:
+    """Data version of each repository and of GLOBAL_SCOPE (0 when never bumped)"""
+    names = sorted(set(repository_full_names) | {GLOBAL_SCOPE})
+    versions = dict.fromkeys(names, 0)
+    for doc in RepositoryDataVersion._get_collection().find({'_id': {'$in': names}}, {'version': 1}):
+        versions[doc['_id']] = doc.get('version', 0)
+    return versions
+
+
+def versions_digest(repository_full_names: Iterable[str]) -> str:
+    """Digest of the data versions of repositories, changes whenever one of them is bumped"""
+    versions = get_data_versions(repository_full_names)
+    return hashlib.sha1(repr(sorted(versions.items())).encode('utf-8')).hexdigest()
+
+
+def format_date_range(start_date=None, end_date=None) -> str:
+    """Cache key part of a date range, 'all' without one"""
+    if start_date and end_date:
+        return f"{start_date.isoformat()}..{end_date.isoformat()}"
+    return 'all'
+
+
+class EntityMetricsCache:
+    """Cached metrics of one entity over one date range"""
+
+    def __init__(self, entity_type: str, entity_id, date_range: str,
+                 repository_full_names: Iterable[str], store=None):
+        """
+        Args:
+            entity_type: 'repository', 'project' or 'developer'
+            entity_id: Entity ID
+            date_range: format_date_range() of the service's dates
+            repository_full_names: Repositories behind the entity, their
+                versions are read on the first lookup
+            store: Defaults to the configured backend
+        """
+        self.entity_type = entity_type
+        self.entity_id = str(entity_id)
+        self.date_range = date_range
+        self.store = store if store is not None else get_store()
+        self.repository_full_names = list(repository_full_names)
+        self._versions_digest = None
+        self.hits = 0
+        self.misses = 0
+
+    def _versions(self) -> str:
+        if self._versions_digest is None:
+            self._versions_digest = versions_digest(self.repository_full_names)
+        return self._versions_digest
+
+    def key(self, metric: str, relative: bool = False) -> str:
+        parts = [self.entity_type, self.entity_id, self.date_range, metric, self._versions()]
+        if relative:
+            parts.append(date.today().isoformat())
+        return 'metrics:' + hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, metric: str, compute: Callable[[], Any], relative: bool = False) -> Any:
+        """Cached value of a metric, computed and stored on a miss"""
+        if self.store is None:
+            return compute()
+        try:
+            key = self.key(metric, relative)
+            value = self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Metrics cache unavailable, computing {metric}: {e}")
+            return compute()
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        try:
+            self.store.set(
+                key, value, settings.METRICS_CACHE_TIMEOUT, entity_type=self.entity_type,
+                entity_id=self.entity_id, date_range=self.date_range, metric=metric
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache {metric} of {self.entity_type} {self.entity_id}: {e}")
+        return value
+
+
+def cached_metric(relative: bool = False):
+    """
+    Cache a UnifiedMetricsService method in the service's metrics cache
+
+    Args:
+        relative: The value depends on today's date (windows ending now)
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metric = method.__name__
+            if args or kwargs:
+                metric += repr(args) + repr(sorted(kwargs.items()))
+            return self.metrics_cache.get_or_compute(
+                metric, lambda: method(self, *args, **kwargs), relative=relative
+            )
+        return wrapper
+    return decorator
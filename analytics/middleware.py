@@ -0,0 +1,39 @@
+"""
+Middleware of the analytics app
+"""
+import logging
+
+from django.conf import settings
+
+from .query_memo import end_request_stats, start_request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Count the Mongo round trips made and saved by the metric services of a request
+
+    With DEBUG on, requests that used a metric service log the counts and
+    return them in the X-Mongo-Round-Trips and X-Mongo-Round-Trips-Saved headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = start_request_stats()
+        request.query_stats = stats
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request_stats()
+
+        if settings.DEBUG and (stats.round_trips or stats.saved):
+            logger.debug(
+                "%s: %d Mongo round trips, %d saved by query memoization",
+                request.path, stats.round_trips, stats.saved
+            )
+            response['X-Mongo-Round-Trips'] = str(stats.round_trips)
+            response['X-Mongo-Round-Trips-Saved'] = str(stats.saved)
+        return response
@@ -7,6 +7,9 @@ import mongoengine.fields as fields
 from mongoengine import Document, EmbeddedDocument
 from typing import List, Optional
 
+from .commit_flags import compute_commit_flags
+from .identity_index import invalidate_identity_index, stamp_developer_id
+
 
 class IndexingState(Document):
     """MongoDB document for tracking indexing state per repository and entity type"""
@@ -102,6 +105,18 @@ class Developer(Document):
     def __str__(self):
         return f"{self.primary_name} ({self.primary_email})"
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        invalidate_identity_index()
+        return result
+
+    def delete(self, *args, **kwargs):
+        developer_id = str(self.id)
+        result = super().delete(*args, **kwargs)
+        invalidate_identity_index()
+        DeveloperProfile._get_collection().delete_one({'developer_id': developer_id})
+        return result
+
 
 class DeveloperAlias(Document):
     """MongoDB document for storing developer aliases/identities"""
@@ -134,6 +149,16 @@ class DeveloperAlias(Document):
     def __str__(self):
         return f"{self.name} ({self.email})"
 
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        invalidate_identity_index()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_identity_index()
+        return result
+
 
 class Commit(Document):
     """MongoDB document for storing commit data"""
@@ -169,6 +194,13 @@ class Commit(Document):
     pull_request_url = fields.StringField(null=True)
     pull_request_merged_at = fields.DateTimeField(null=True)
     
+    # Grouped developer of the author (denormalized from DeveloperAlias)
+    developer_id = fields.StringField(null=True)
+    
+    # Derived at save (see analytics.commit_flags), None until backfilled
+    flags = fields.IntField(null=True)
+    languages = fields.ListField(fields.StringField())
+    
     # Metadata
     parent_shas = fields.ListField(fields.StringField(max_length=40))
     tree_sha = fields.StringField(max_length=40)
@@ -187,11 +219,25 @@ class Commit(Document):
             'authored_date',
             ('repository_full_name', 'authored_date'),
             ('application_id', 'authored_date'),
+            ('developer_id', 'authored_date'),
+            ('developer_id', 'flags'),
+            ('repository_full_name', 'flags'),
+            'languages',
+            ('commit_type', 'id'),  # Reclassification scans in _id order
             # Composite unique index: SHA + repository (unique constraint)
             ('sha', 'repository_full_name'),
         ]
     }
     
+    def save(self, *args, **kwargs):
+        stamp_developer_id(self, self.author_email)
+        self.flags, self.languages = compute_commit_flags(
+            [file_change.filename for file_change in self.files_changed or []],
+            self.total_changes,
+            self.message
+        )
+        return super().save(*args, **kwargs)
+    
     def get_authored_date_in_timezone(self):
         """Get authored_date converted to the configured timezone"""
         authored_date = getattr(self, 'authored_date', None)
@@ -225,6 +271,135 @@ class Commit(Document):
         return f"{repository_full_name}:{sha_short} - {message_short}"
 
 
+class DeveloperProfile(Document):
+    """MongoDB document for the materialized aggregates of a developer's commits"""
+    developer_id = fields.StringField(required=True)
+    version = fields.IntField(default=0)  # Incremented on every write (optimistic updates)
+    stale = fields.BooleanField(default=False)  # Rebuilt from the commits on next read
+
+    # Totals
+    total_commits = fields.IntField(default=0)
+    total_additions = fields.IntField(default=0)
+    total_deletions = fields.IntField(default=0)
+    first_commit_at = fields.DateTimeField(null=True)
+    last_commit_at = fields.DateTimeField(null=True)
+
+    # Summed counters (see analytics.developer_profile_service)
+    type_counts = fields.DictField()  # commit_type -> commits
+    quality = fields.DictField()  # quality counter -> sum
+    message_quality = fields.DictField()  # explicit_commits / generic_commits
+    repositories = fields.ListField(fields.DictField())  # {name, commits, additions, deletions}
+    daily_commits = fields.ListField(fields.ListField())  # [utc day number, commits]
+    hourly = fields.ListField(fields.ListField())  # [utc hour number, repository, commits, additions, deletions, quality, impact, complexity]
+
+    built_at = fields.DateTimeField(null=True)  # Start of the last full rebuild
+    updated_at = fields.DateTimeField(default=lambda: datetime.now(dt_timezone.utc))
+
+    # MongoDB settings
+    meta = {
+        'collection': 'developer_profiles',
+        'indexes': [
+            {'fields': ['developer_id'], 'unique': True},
+            'stale',
+        ]
+    }
+
+    def __str__(self):
+        return f"Profile of {self.developer_id} ({self.total_commits} commits)"
+
+
+class CommitLabel(Document):
+    """MongoDB document caching the LLM category of a commit message"""
+    message_hash = fields.StringField(required=True)  # sha1 of the model and stripped message
+    label = fields.StringField(required=True)
+    model = fields.StringField()
+    created_at = fields.DateTimeField(default=lambda: datetime.now(dt_timezone.utc))
+
+    # MongoDB settings
+    meta = {
+        'collection': 'commit_labels',
+        'indexes': [
+            {'fields': ['message_hash'], 'unique': True},
+        ]
+    }
+
+    def __str__(self):
+        return f"{self.message_hash[:12]} -> {self.label}"
+
+
+class ClassificationBacklog(Document):
+    """MongoDB document counting commits classified by rules while the LLM was unavailable"""
+    name = fields.StringField(primary_key=True)  # LLM backend, e.g. 'ollama'
+    deferred_commits = fields.IntField(default=0)
+    first_deferred_at = fields.DateTimeField(null=True)  # Deferred commits were synced after this
+    last_deferred_at = fields.DateTimeField(null=True)
+    last_reclassified_at = fields.DateTimeField(null=True)
+
+    # MongoDB settings
+    meta = {
+        'collection': 'classification_backlog',
+    }
+
+    def __str__(self):
+        return f"{self.name}: {self.deferred_commits} deferred commits"
+
+
+class CommandCheckpoint(Document):
+    """MongoDB document storing where a long-running management command stopped"""
+    name = fields.StringField(primary_key=True)  # Command and variant, e.g. 'classify_existing_commits:ollama'
+    last_id = fields.ObjectIdField()  # Last document fully processed, in _id order
+    processed = fields.IntField(default=0)
+    updated = fields.IntField(default=0)
+    updated_at = fields.DateTimeField(default=lambda: datetime.now(dt_timezone.utc))
+
+    # MongoDB settings
+    meta = {
+        'collection': 'command_checkpoints',
+    }
+
+    def __str__(self):
+        return f"{self.name}: {self.processed} processed, last {self.last_id}"
+
+
+class RepositoryDataVersion(Document):
+    """MongoDB document counting data ingests of a repository, part of the metrics cache keys"""
+    repository_full_name = fields.StringField(primary_key=True)  # '*' for changes across all repositories
+    version = fields.IntField(default=0)
+    updated_at = fields.DateTimeField(default=lambda: datetime.now(dt_timezone.utc))
+
+    # MongoDB settings
+    meta = {
+        'collection': 'repository_data_versions',
+    }
+
+    def __str__(self):
+        return f"{self.repository_full_name} v{self.version}"
+
+
+class MetricsCacheEntry(Document):
+    """MongoDB document caching one metric of an entity over a date range"""
+    key = fields.StringField(primary_key=True)  # Hash of the entity, range, metric and data versions
+    entity_type = fields.StringField(required=True)
+    entity_id = fields.StringField(required=True)
+    date_range = fields.StringField(required=True)
+    metric = fields.StringField(required=True)
+    value = fields.BinaryField()  # Pickled metric value
+    created_at = fields.DateTimeField(default=lambda: datetime.now(dt_timezone.utc))
+    expires_at = fields.DateTimeField(required=True)
+
+    # MongoDB settings
+    meta = {
+        'collection': 'metrics_cache',
+        'indexes': [
+            ('entity_type', 'entity_id'),
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0},
+        ]
+    }
+
+    def __str__(self):
+        return f"{self.entity_type} {self.entity_id} {self.metric} ({self.date_range})"
+
+
 class SyncLog(Document):
     """MongoDB document for tracking synchronization logs"""
     # Repository information
@@ -407,6 +582,37 @@ class Deployment(Document):
         return f"{self.repository_full_name} - {self.environment} - {self.deployment_id}" 
 
 
+class DeploymentWeeklyStats(Document):
+    """Weekly deployment outcome aggregates per repository and environment
+
+    Maintained incrementally from Deployment.statuses to compute change failure
+    rate and time to restore without rescanning the deployment history. Rows can
+    be summed across repositories for project level metrics.
+    """
+    repository_full_name = fields.StringField(required=True)
+    environment = fields.StringField(required=True)
+    week_start = fields.DateTimeField(required=True)  # Monday 00:00 UTC
+
+    deployments = fields.IntField(default=0)  # Deployments with a final outcome
+    failed_deployments = fields.IntField(default=0)  # Final outcome failure/error
+    incidents = fields.IntField(default=0)  # Failures opened this week
+    restored_incidents = fields.IntField(default=0)  # ... followed by a success
+    restore_seconds_total = fields.FloatField(default=0.0)
+
+    updated_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'deployment_weekly_stats',
+        'indexes': [
+            ('repository_full_name', 'environment', 'week_start'),
+            ('repository_full_name', 'week_start'),
+        ]
+    }
+
+    def __str__(self):
+        return f"{self.repository_full_name} - {self.environment} - {self.week_start:%Y-%m-%d}"
+
+
 class Release(Document):
     """MongoDB document for storing GitHub releases"""
     release_id = fields.StringField(required=True)  # Unique per repository, not globally
@@ -469,6 +675,9 @@ class PullRequest(Document):
     # Commit linkage cached on PR for performance (list of commit SHAs)
     commit_shas = fields.ListField(fields.StringField(max_length=40), default=list)
     
+    # Grouped developer of the author (denormalized from DeveloperAlias)
+    developer_id = fields.StringField(null=True)
+    
     payload = fields.DictField()  # Raw PR payload (optionnel)
 
     meta = {
@@ -487,9 +696,14 @@ class PullRequest(Document):
             ('repository_full_name', 'number'),
             # Index unique pour éviter les doublons
             ('application_id', 'repository_full_name', 'number'),
+            ('developer_id', 'created_at'),
         ]
     }
 
+    def save(self, *args, **kwargs):
+        stamp_developer_id(self, self.author)
+        return super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.repository_full_name}#{self.number} - {self.title}" 
 
@@ -776,6 +990,31 @@ class CodeQLVulnerability(Document):
         return (now - fixed_at).days <= days
 
 
+class CodeQLDailySnapshot(Document):
+    """Daily count of open CodeQL vulnerabilities per severity for a repository
+
+    Rebuilt after each CodeQL indexing run so the open vulnerabilities timeline
+    is a single indexed read.
+    """
+    repository_full_name = fields.StringField(required=True, max_length=255)
+    day = fields.DateTimeField(required=True)  # 00:00 UTC
+    critical = fields.IntField(default=0)
+    high = fields.IntField(default=0)
+    medium = fields.IntField(default=0)
+    low = fields.IntField(default=0)
+    computed_at = fields.DateTimeField()
+
+    meta = {
+        'collection': 'codeql_daily_snapshots',
+        'indexes': [
+            ('repository_full_name', 'day'),
+        ]
+    }
+
+    def __str__(self):
+        return f"CodeQL open {self.repository_full_name} {self.day:%Y-%m-%d}"
+
+
 class RepositoryKLOCHistory(Document):
     """MongoDB document for storing KLOC history per repository"""
     
@@ -815,6 +1054,29 @@ class RepositoryKLOCHistory(Document):
     
     def __str__(self):
         return f"KLOC History for {self.repository_full_name}: {self.kloc:.2f} KLOC at {self.calculated_at}"
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        # Repository.kloc mirrors the latest entry, so lists sort and paginate in SQL
+        from repositories.models import Repository
+        Repository.record_kloc(self.repository_id, self.kloc, self.calculated_at)
+        return result
+
+    @classmethod
+    def latest_by_repository(cls):
+        """{repository_id: (kloc, calculated_at)} of the latest entry of each repository, in one aggregation"""
+        pipeline = [
+            {'$sort': {'repository_id': 1, 'calculated_at': -1}},
+            {'$group': {
+                '_id': '$repository_id',
+                'kloc': {'$first': '$kloc'},
+                'calculated_at': {'$first': '$calculated_at'},
+            }},
+        ]
+        return {
+            doc['_id']: (doc['kloc'], doc['calculated_at'])
+            for doc in cls._get_collection().aggregate(pipeline, allowDiskUse=True)
+        }
     
     @property
     def kloc_formatted(self):
@@ -867,4 +1129,25 @@ class SecurityHealthHistory(Document):
     }
     
     def __str__(self):
-        return f"SHS {self.repository_full_name}: {self.shs_score:.1f}/100 ({self.calculated_at})"
\ No newline at end of file
+        return f"SHS {self.repository_full_name}: {self.shs_score:.1f}/100 ({self.calculated_at})"
+
+class DoraMetricsSnapshot(Document):
+    """Persisted DORA metrics for a repository, read by the detail page"""
+
+    repository_full_name = fields.StringField(required=True, unique=True)
+    repository_id = fields.IntField()
+    computed_at = fields.DateTimeField(required=True)
+    period_days = fields.IntField(default=180)
+    metrics = fields.DictField()  # Same structure as repositories.views._get_dora_metrics
+
+    meta = {
+        'collection': 'dora_metrics_snapshots',
+        'indexes': [
+            'repository_full_name',
+            'repository_id',
+            'computed_at'
+        ]
+    }
+
+    def __str__(self):
+        return f"DORA {self.repository_full_name} ({self.computed_at})"
@@ -0,0 +1,543 @@
+"""
+Ollama commit classification with a label cache and batched prompts
+
+Only messages the rule-based classifier leaves as 'other' are sent to the LLM.
+
+1. Labels are cached per model and message (sha1 of both, message stripped)
+   in an in-process LRU backed by the commit_labels collection, so "wip",
+   merge or release messages seen on every sync are only sent once.
+2. Uncached messages are sent OLLAMA_BATCH_SIZE at a time, numbered, in one
+   prompt whose answer is constrained to a JSON schema. Messages missing from
+   the answer are retried with the one-message prompt.
+3. Calls go through a circuit breaker shared by the process: it opens after
+   OLLAMA_FAILURE_THRESHOLD consecutive failures or a call slower than
+   OLLAMA_LATENCY_BUDGET, then lets a probe through every OLLAMA_RETRY_AFTER
+   seconds. While it is open no call is sent.
+4. Messages Ollama did not classify (open circuit or failure) fall back to
+   the rule-based classifier and are not cached. They are counted in the
+   classification backlog, and reclassify_deferred_commits() (run by a
+   scheduled task) sends them again once Ollama answers.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from pymongo import UpdateOne
+
+from .circuit_breaker import OPEN, CircuitBreaker
+from .commit_rules import classify_message
+from .metrics_cache import bump_data_version
+from .models import ClassificationBacklog, Commit, CommitLabel
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ('fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other')
+MAX_WORKERS = 3
+BACKLOG_NAME = 'ollama'
+RECLASSIFY_CHUNK_SIZE = 500
+# Longer messages are cut in batch prompts, the subject line is what matters
+MAX_BATCH_MESSAGE_LENGTH = 500
+
+# Words the LLM answers with instead of a category
+RESPONSE_VARIATIONS = {
+    'update': 'chore',
+    'change': 'refactor',
+    'modify': 'refactor',
+    'improve': 'feature',
+    'enhance': 'feature',
+    'add': 'feature',
+    'remove': 'refactor',
+    'delete': 'refactor',
+    'clean': 'refactor',
+    'cleanup': 'refactor',
+    'optimize': 'refactor',
+    'speed': 'refactor',
+    'fast': 'refactor',
+    'slow': 'refactor',
+    'perf': 'refactor',
+    'ci': 'chore',
+    'build': 'chore',
+    'deploy': 'chore',
+    'maintenance': 'chore',
+    'wip': 'chore',          # Work in progress
+    'tmp': 'chore',          # Temporary
+    'temp': 'chore',         # Temporary
+    'bump': 'chore',         # Version bump
+    'upgrade': 'chore',      # Dependency upgrade
+    'downgrade': 'chore',    # Dependency downgrade
+    'pin': 'chore',          # Pin dependency
+    'unpin': 'chore',        # Unpin dependency
+    'sync': 'chore',         # Sync
+    'merge': 'chore',        # Merge
+    'revert': 'fix',         # Revert
+    'rollback': 'fix',       # Rollback
+    'undo': 'fix',           # Undo
+    'restore': 'fix',        # Restore
+    'repair': 'fix',         # Repair
+    'resolve': 'fix',        # Resolve
+    'correct': 'fix',        # Correct
+    'patch': 'fix',          # Patch
+    'hotfix': 'fix',         # Hotfix
+    'bugfix': 'fix',         # Bugfix
+    'implement': 'feature',  # Implement
+    'create': 'feature',     # Create
+    'new': 'feature',        # New
+    'introduce': 'feature',  # Introduce
+    'enable': 'feature',     # Enable
+    'disable': 'fix',        # Disable
+    'configure': 'chore',    # Configure
+    'setup': 'chore',        # Setup
+    'install': 'chore',      # Install
+    'uninstall': 'chore',    # Uninstall
+    'migrate': 'refactor',   # Migrate
+    'port': 'refactor',      # Port
+    'rewrite': 'refactor',   # Rewrite
+    'restructure': 'refactor', # Restructure
+    'reorganize': 'refactor', # Reorganize
+    'simplify': 'refactor',  # Simplify
+    'clarify': 'docs',       # Clarify
+    'document': 'docs',      # Document
+    'comment': 'docs',       # Comment
+    'format': 'style',       # Format
+    'lint': 'style',         # Lint
+    'prettier': 'style',     # Prettier
+    'indent': 'style',       # Indent
+    'whitespace': 'style',   # Whitespace
+    'test': 'test',          # Test
+    'testing': 'test',       # Testing
+    'spec': 'test',          # Spec
+    'specs': 'test',         # Specs
+    'coverage': 'test',      # Coverage
+    'unit': 'test',          # Unit
+    'integration': 'test',   # Integration
+    'e2e': 'test',           # End-to-end
+    'performance': 'refactor', # Performance
+    'optimization': 'refactor', # Optimization
+}
+
+BATCH_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'labels': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'id': {'type': 'integer'},
+                    'category': {'type': 'string', 'enum': list(CATEGORIES)},
+                },
+                'required': ['id', 'category'],
+            },
+        },
+    },
+    'required': ['labels'],
+}
+
+
+def normalize_host(host: str) -> str:
+    """Normalize the host URL for Ollama"""
+    if host.startswith('http://'):
+        return host
+    elif host.startswith('https://'):
+        return host.replace('https://', 'http://')
+    else:
+        return f"http://{host}"
+
+
+def message_key(message: Optional[str], model: str) -> str:
+    """Cache key of a commit message classified by a model"""
+    return hashlib.sha1(f"{model}\n{(message or '').strip()}".encode('utf-8')).hexdigest()
+
+
+def interpret_response(llm_response: str, message: Optional[str]) -> str:
+    """
+    Map an LLM answer to a commit category
+
+    Args:
+        llm_response: Text answered by the LLM
+        message: Classified commit message, checked when the answer is unclear
+
+    Returns:
+        Category: 'fix', 'feature', 'docs', 'refactor', 'test', 'style', 'chore', 'other'
+    """
+    llm_response = llm_response.strip().lower()
+    for category in CATEGORIES:
+        if category in llm_response:
+            return category
+
+    # First check LLM response for variations
+    for variation, category in RESPONSE_VARIATIONS.items():
+        if variation in llm_response:
+            return category
+
+    # Then check original message for variations (fallback)
+    message_lower = (message or '').lower()
+    for variation, category in RESPONSE_VARIATIONS.items():
+        if variation in message_lower:
+            return category
+
+    return 'other'
+
+
+class LabelCache:
+    """Commit message labels, in an in-process LRU backed by MongoDB"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self._labels: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cached labels of these keys, from memory then MongoDB"""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                label = self._labels.get(key)
+                if label is None:
+                    missing.append(key)
+                else:
+                    self._labels.move_to_end(key)
+                    found[key] = label
+
+        if missing:
+            try:
+                stored = {
+                    doc['message_hash']: doc['label']
+                    for doc in CommitLabel._get_collection().find(
+                        {'message_hash': {'$in': missing}}, {'_id': 0, 'message_hash': 1, 'label': 1}
+                    )
+                }
+            except Exception as e:
+                logger.warning(f"Could not read cached commit labels: {e}")
+                stored = {}
+            self._remember(stored)
+            found.update(stored)
+        return found
+
+    def set_many(self, labels: Dict[str, str], model: str) -> None:
+        """Cache labels in memory and in MongoDB"""
+        if not labels:
+            return
+        self._remember(labels)
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {'message_hash': key},
+                {'$set': {'label': label, 'model': model}, '$setOnInsert': {'created_at': now}},
+                upsert=True
+            )
+            for key, label in labels.items()
+        ]
+        try:
+            CommitLabel._get_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Could not store {len(operations)} commit labels: {e}")
+
+    def clear(self) -> None:
+        """Forget the in-process labels (MongoDB is kept)"""
+        with self._lock:
+            self._labels.clear()
+
+    def _remember(self, labels: Dict[str, str]) -> None:
+        max_size = self.max_size or settings.OLLAMA_LABEL_CACHE_SIZE
+        with self._lock:
+            for key, label in labels.items():
+                self._labels[key] = label
+                self._labels.move_to_end(key)
+            while len(self._labels) > max_size:
+                self._labels.popitem(last=False)
+
+
+label_cache = LabelCache()
+
+breaker = CircuitBreaker(
+    'ollama',
+    failure_threshold=settings.OLLAMA_FAILURE_THRESHOLD,
+    latency_budget=settings.OLLAMA_LATENCY_BUDGET,
+    retry_after=settings.OLLAMA_RETRY_AFTER
+)
+
+
+def _client():
+    import ollama
+    # Never wait much longer than the budget, the breaker opens anyway
+    return ollama.Client(host=normalize_host(settings.OLLAMA_HOST), timeout=breaker.latency_budget)
+
+
+def _generate(client, **kwargs) -> Optional[str]:
+    """Text answered by Ollama, None when the circuit is open or the call fails"""
+    if not breaker.allow_request():
+        return None
+    start = time.monotonic()
+    try:
+        response = client.generate(**kwargs)
+    except Exception as e:
+        breaker.record_failure(time.monotonic() - start)
+        logger.warning(f"Ollama call failed: {e}")
+        return None
+    breaker.record_success(time.monotonic() - start)
+    return response['response']
+
+
+def _classify_single(client, model: str, message: str) -> Optional[str]:
+    """Category of one message, None when Ollama fails"""
+    prompt = f"""Classify this git commit message:
+
+"{message}"
+
+Categories: test, fix, feature, docs, refactor, style, perf, ci, chore, other
+
+Answer with only one word:"""
+
+    answer = _generate(
+        client,
+        model=model,
+        prompt=prompt,
+        options={
+            'temperature': 0.3,
+            'num_predict': 10
+        }
+    )
+    return None if answer is None else interpret_response(answer, message)
+
+
+def _classify_batch(client, model: str, messages: List[str]) -> Optional[Dict[int, str]]:
+    """
+    Categories of numbered messages classified in one prompt
+
+    Returns:
+        Category by message index (answers may miss some), None when the
+        circuit is open or the call fails
+    """
+    numbered = '\n'.join(
+        f"{number}. {json.dumps((message or '').strip()[:MAX_BATCH_MESSAGE_LENGTH], ensure_ascii=False)}"
+        for number, message in enumerate(messages, start=1)
+    )
+    prompt = f"""Classify each of these git commit messages:
+
+{numbered}
+
+Categories: test, fix, feature, docs, refactor, style, chore, other
+
+Answer in JSON with the category of every message id:"""
+
+    answer = _generate(
+        client,
+        model=model,
+        prompt=prompt,
+        format=BATCH_SCHEMA,
+        options={
+            'temperature': 0.3,
+            'num_predict': 20 * len(messages) + 20
+        }
+    )
+    if answer is None:
+        return None
+
+    categories = {}
+    try:
+        items = json.loads(answer).get('labels') or []
+    except (ValueError, AttributeError):
+        logger.warning(f"Invalid Ollama batch answer: {answer[:200]!r}")
+        return categories
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        number, category = item.get('id'), item.get('category')
+        if isinstance(number, int) and 1 <= number <= len(messages) and isinstance(category, str):
+            categories[number - 1] = interpret_response(category, messages[number - 1])
+    return categories
+
+
+def _classify_uncached(items: List[Tuple[str, str]], model: str, batch_size: int,
+                       max_workers: int) -> Dict[str, str]:
+    """Labels of (key, message) items the LLM could classify, by key"""
+    client = _client()
+
+    def classify_chunk(chunk):
+        if len(chunk) == 1:
+            key, message = chunk[0]
+            label = _classify_single(client, model, message)
+            return {key: label} if label else {}
+
+        answers = _classify_batch(client, model, [message for _, message in chunk])
+        if answers is None:
+            # Circuit open or Ollama failing, don't retry every message on its own
+            return {}
+        labels = {}
+        for index, (key, message) in enumerate(chunk):
+            label = answers.get(index) or _classify_single(client, model, message)
+            if label:
+                labels[key] = label
+        return labels
+
+    chunks = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+    if len(chunks) == 1:
+        return classify_chunk(chunks[0])
+
+    labels = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk_labels in executor.map(classify_chunk, chunks):
+            labels.update(chunk_labels)
+    return labels
+
+
+def label_messages(messages: Iterable[Optional[str]], batch_size: Optional[int] = None,
+                   max_workers: int = MAX_WORKERS) -> List[Optional[str]]:
+    """
+    Ollama categories of commit messages, through the label cache
+
+    Args:
+        messages: Commit messages
+        batch_size: Messages per prompt (default: settings.OLLAMA_BATCH_SIZE)
+        max_workers: Prompts sent in parallel
+
+    Returns:
+        Categories in the same order as the messages, None for messages
+        Ollama did not classify
+    """
+    messages = list(messages)
+    if not messages:
+        return []
+
+    model = settings.OLLAMA_MODEL
+    keys = [message_key(message, model) for message in messages]
+    labels = label_cache.get_many(set(keys))
+
+    # Each distinct uncached message is sent once
+    pending = {}
+    for key, message in zip(keys, messages):
+        if key not in labels and key not in pending:
+            pending[key] = message
+    if pending:
+        classified = _classify_uncached(
+            list(pending.items()), model, max(1, batch_size or settings.OLLAMA_BATCH_SIZE), max_workers
+        )
+        label_cache.set_many(classified, model)
+        labels.update(classified)
+
+    return [labels.get(key) for key in keys]
+
+
+def classify_messages(messages: Iterable[Optional[str]], batch_size: Optional[int] = None,
+                      max_workers: int = MAX_WORKERS) -> List[str]:
+    """
+    Classify commit messages with Ollama, falling back to the rules
+
+    Messages Ollama did not classify are counted in the classification backlog.
+
+    Args:
+        messages: Commit messages
+        batch_size: Messages per prompt (default: settings.OLLAMA_BATCH_SIZE)
+        max_workers: Prompts sent in parallel
+
+    Returns:
+        Categories in the same order as the messages
+    """
+    messages = list(messages)
+    labels = label_messages(messages, batch_size=batch_size, max_workers=max_workers)
+    deferred = sum(1 for label in labels if label is None)
+    if deferred:
+        record_deferred(deferred)
+    return [label or classify_message(message) for label, message in zip(labels, messages)]
+
+
+def record_deferred(count: int) -> None:
+    """Count commits classified by rules for a later reclassification with Ollama"""
+    now = datetime.now(timezone.utc)
+    try:
+        ClassificationBacklog._get_collection().update_one(
+            {'_id': BACKLOG_NAME},
+            {
+                '$inc': {'deferred_commits': count},
+                '$min': {'first_deferred_at': now},
+                '$set': {'last_deferred_at': now},
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"Could not record {count} deferred commit classifications: {e}")
+
+
+def reclassify_deferred_commits(chunk_size: int = RECLASSIFY_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Reclassify with Ollama the 'other' commits synced since classifications were deferred
+
+    The backlog is cleared once every such commit has an Ollama category. When
+    the circuit opens again, the run stops and the backlog is kept.
+
+    Returns:
+        Dictionary with the run status and the number of reclassified commits
+    """
+    from .developer_profile_service import DeveloperProfileService
+
+    backlog_collection = ClassificationBacklog._get_collection()
+    backlog = backlog_collection.find_one({'_id': BACKLOG_NAME})
+    if not backlog or not backlog.get('deferred_commits'):
+        return {'status': 'empty', 'reclassified': 0}
+    if breaker.state == OPEN:
+        return {'status': 'circuit_open', 'reclassified': 0, 'deferred': backlog['deferred_commits']}
+
+    query = {'commit_type': 'other'}
+    if backlog.get('first_deferred_at'):
+        query['synced_at'] = {'$gte': backlog['first_deferred_at']}
+
+    commit_collection = Commit._get_collection()
+    cursor = commit_collection.find(query, {'message': 1, 'developer_id': 1}).batch_size(chunk_size)
+    reclassified = 0
+    developer_ids = set()
+    complete = True
+
+    def flush(chunk) -> bool:
+        nonlocal reclassified
+        labels = label_messages([doc.get('message') for doc in chunk])
+        operations = []
+        for doc, label in zip(chunk, labels):
+            if label and label != 'other':
+                operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {'commit_type': label}}))
+                developer_ids.add(doc.get('developer_id'))
+        if operations:
+            reclassified += commit_collection.bulk_write(operations, ordered=False).modified_count
+        return None not in labels
+
+    try:
+        chunk = []
+        for doc in cursor:
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                complete = flush(chunk)
+                chunk = []
+                if not complete:
+                    break
+        if chunk and complete:
+            complete = flush(chunk)
+    finally:
+        cursor.close()
+
+    # Commit type counts changed on these developers' profiles and in cached metrics
+    developer_ids.discard(None)
+    if developer_ids:
+        DeveloperProfileService.mark_stale(developer_ids)
+    if reclassified:
+        bump_data_version()
+
+    if not complete:
+        return {'status': 'circuit_open', 'reclassified': reclassified, 'deferred': backlog['deferred_commits']}
+
+    # Deferrals recorded during the run keep the backlog for the next run
+    backlog_collection.update_one(
+        {'_id': BACKLOG_NAME, 'deferred_commits': backlog['deferred_commits']},
+        {
+            '$set': {'deferred_commits': 0, 'last_reclassified_at': datetime.now(timezone.utc)},
+            '$unset': {'first_deferred_at': ''},
+        }
+    )
+    return {'status': 'completed', 'reclassified': reclassified}
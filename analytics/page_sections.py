@@ -0,0 +1,85 @@
+"""
+Concurrent computation of the independent sections of a page
+
+A heavy page is split into named sections, each a callable returning its
+part of the template context. compute_sections() runs them on a bounded
+thread pool (they mostly wait on MongoDB), so the page takes as long as its
+slowest section rather than the sum of all of them, and records how long
+each section took.
+"""
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class Section(NamedTuple):
+    """
+    name: Shown in the timings
+    compute: Callable returning a dict of context entries
+    fallback: Entries used when compute fails, None to propagate the error
+    """
+    name: str
+    compute: Callable[[], Dict[str, Any]]
+    fallback: Optional[Dict[str, Any]] = None
+
+
+def _run_section(section: Section) -> Tuple[Optional[Dict[str, Any]], Optional[BaseException], float]:
+    started = time.perf_counter()
+    try:
+        return section.compute(), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+    finally:
+        # Pool threads would otherwise keep their own database connections open
+        connections.close_all()
+
+
+def compute_sections(sections: Sequence[Section], max_workers: int) -> Tuple[Dict[str, Dict[str, Any]], List[Dict]]:
+    """
+    Compute sections concurrently
+
+    Args:
+        sections: Sections of the page, with distinct names
+        max_workers: Size of the thread pool
+
+    Returns:
+        (results, timings): the entries of each section by name, and one
+        {'name', 'duration_ms', 'status'} per section in the given order
+
+    Raises:
+        The error of the first failed section without a fallback, once every
+        section has finished
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sections)))) as executor:
+        # Each section runs in a copy of the request context (query stats)
+        futures = [
+            executor.submit(contextvars.copy_context().run, _run_section, section)
+            for section in sections
+        ]
+        outcomes = [future.result() for future in futures]
+
+    results = {}
+    timings = []
+    error = None
+    for section, (result, exc, duration) in zip(sections, outcomes):
+        status = 'ok'
+        if exc is not None:
+            status = 'failed'
+            if section.fallback is None:
+                error = error or exc
+            else:
+                logger.warning(f"Section {section.name} failed, using its fallback: {exc}")
+                result = dict(section.fallback)
+        results[section.name] = result
+        timings.append({'name': section.name, 'duration_ms': round(duration * 1000, 1), 'status': status})
+        logger.debug(f"Section {section.name}: {status} in {duration * 1000:.1f} ms")
+
+    if error is not None:
+        raise error
+    return results, timings
@@ -0,0 +1,145 @@
+"""
+Stale-while-revalidate snapshots of heavy pages
+
+A snapshot is the template context a page computed for an entity and its
+request parameters, kept in the metrics cache store (see metrics_cache).
+serve_snapshot() returns the snapshot immediately when one exists, and
+enqueues a django-q refresh when it is older than PAGE_SNAPSHOT_SOFT_TTL or
+when the data version of one of its repositories was bumped since. Requests
+only wait for the computation when there is no snapshot at all.
+
+Refreshes are deduplicated with a lock entry, so a burst of requests on a
+stale page enqueues one task. The compute function is referenced by its
+dotted path so the worker can import it, and is part of the snapshot key
+with its arguments, so contexts computed from different inputs never share
+a snapshot. Views normalize request parameters (normalize_date_range)
+before passing them, so arbitrary query strings do not create snapshots.
+Snapshots shared by every entity (the dashboard) pass a fixed key and their
+own max age instead.
+"""
+import hashlib
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .metrics_cache import get_store, versions_digest
+
+logger = logging.getLogger(__name__)
+
+# A refresh not finished after this long (dead worker) can be enqueued again
+REFRESH_LOCK_TIMEOUT = 600
+
+
+def normalize_date_range(start_str: Optional[str], end_str: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(start, end) date parameters as YYYY-MM-DD, (None, None) unless both are valid days"""
+    try:
+        return date.fromisoformat(start_str).isoformat(), date.fromisoformat(end_str).isoformat()
+    except (TypeError, ValueError):
+        return None, None
+
+
+def snapshot_key(page: str, entity_id, params: Sequence, compute: str = '', args: Sequence = ()) -> str:
+    parts = [page, str(entity_id), repr(tuple(params)), compute, repr(tuple(args))]
+    return 'snapshot:' + hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+def compute_snapshot(page: str, entity_id, params: Sequence, repository_full_names: Iterable[str],
+                     compute: str, args: Sequence = (), key: Optional[str] = None) -> Dict[str, Any]:
+    """Compute a page context and store it as the entity's snapshot"""
+    repository_full_names = list(repository_full_names)
+    # Versions are read before computing: data indexed meanwhile triggers another refresh
+    versions = versions_digest(repository_full_names)
+    context = import_string(compute)(*args)
+    try:
+        get_store().set(
+            key or snapshot_key(page, entity_id, params, compute, args),
+            {'context': context, 'computed_at': datetime.now(timezone.utc), 'versions': versions},
+            settings.METRICS_CACHE_TIMEOUT, entity_type=page, entity_id=str(entity_id),
+            date_range=repr(tuple(params)), metric='snapshot'
+        )
+    except Exception as e:
+        logger.warning(f"Could not store {page} snapshot of {entity_id}: {e}")
+    return context
+
+
+def refresh_snapshot(page: str, entity_id, params: Sequence, repository_full_names: Iterable[str],
+                     compute: str, args: Sequence = (), key: Optional[str] = None) -> None:
+    """Django-Q task recomputing a stale snapshot"""
+    key = key or snapshot_key(page, entity_id, params, compute, args)
+    try:
+        compute_snapshot(page, entity_id, params, repository_full_names, compute, args, key)
+        logger.info(f"Refreshed {page} snapshot of {entity_id}")
+    except Exception as e:
+        logger.warning(f"Could not refresh {page} snapshot of {entity_id}: {e}")
+    finally:
+        get_store().delete(key + ':refresh')
+
+
+def serve_snapshot(page: str, entity_id, params: Sequence, repository_full_names: Iterable[str],
+                   compute: str, args: Sequence = (), key: Optional[str] = None,
+                   max_age: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Context of a page, from its snapshot when there is one
+
+    Args:
+        page: Page name, e.g. 'repository_detail'
+        entity_id: Repository or project ID
+        params: Request parameters the context depends on (date range)
+        repository_full_names: Repositories whose data the page shows
+        compute: Dotted path of the function computing the context
+        args: Arguments of the compute function
+        key: Fixed snapshot key, instead of one derived from the other arguments
+        max_age: Seconds after which the snapshot is stale (default: PAGE_SNAPSHOT_SOFT_TTL)
+
+    Returns:
+        (context, snapshot): snapshot has computed_at, age_seconds, stale and
+        refreshing (a refresh was enqueued by this or an earlier request)
+    """
+    repository_full_names = list(repository_full_names)
+    key = key or snapshot_key(page, entity_id, params, compute, args)
+    store = get_store()
+    snapshot = None
+    if store is not None:
+        try:
+            snapshot = store.get(key)
+            current_versions = versions_digest(repository_full_names)
+        except Exception as e:
+            logger.warning(f"Page snapshots unavailable, computing {page}: {e}")
+            store = None
+    if not isinstance(snapshot, dict):
+        if store is None:
+            context = import_string(compute)(*args)
+        else:
+            context = compute_snapshot(page, entity_id, params, repository_full_names, compute, args, key)
+        return context, {'computed_at': datetime.now(timezone.utc), 'age_seconds': 0, 'stale': False, 'refreshing': False}
+
+    age = (datetime.now(timezone.utc) - snapshot['computed_at']).total_seconds()
+    if max_age is None:
+        max_age = settings.PAGE_SNAPSHOT_SOFT_TTL
+    stale = age > max_age or snapshot.get('versions') != current_versions
+    refreshing = False
+    if stale:
+        lock_key = key + ':refresh'
+        try:
+            if store.add(lock_key, True, REFRESH_LOCK_TIMEOUT):
+                try:
+                    from django_q.tasks import async_task
+                    async_task(
+                        'analytics.page_snapshots.refresh_snapshot', page, entity_id, tuple(params),
+                        repository_full_names, compute, tuple(args), key
+                    )
+                except Exception:
+                    store.delete(lock_key)
+                    raise
+            refreshing = True
+        except Exception as e:
+            logger.warning(f"Could not enqueue {page} snapshot refresh of {entity_id}: {e}")
+    return snapshot['context'], {
+        'computed_at': snapshot['computed_at'],
+        'age_seconds': int(age),
+        'stale': stale,
+        'refreshing': refreshing,
+    }
@@ -0,0 +1,128 @@
+"""
+Memoization of MongoDB queries within a metrics computation
+
+UnifiedMetricsService methods read the same querysets over and over (the
+commits of the entity are counted, iterated for the frame, for the commit
+quality and for the change stats; pull requests are counted and filtered a
+dozen times). A QueryMemo materializes each distinct projected query once
+and serves the later reads from memory: counts and distinct values of a
+query are derived from its materialized documents when there are some.
+
+Round trips made and saved are added to the stats of the current request
+(RequestQueryStats, installed by QueryStatsMiddleware), logged and exposed
+as response headers when DEBUG is on.
+"""
+import contextvars
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+_request_stats = contextvars.ContextVar('query_memo_request_stats', default=None)
+
+
+class RequestQueryStats:
+    """Mongo round trips of one request, across all its metric services"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        self.saved = 0
+
+    def record(self, round_trips: int = 0, saved: int = 0) -> None:
+        # Sections of a page may be computed on a thread pool
+        with self._lock:
+            self.round_trips += round_trips
+            self.saved += saved
+
+
+def start_request_stats() -> RequestQueryStats:
+    """Start counting the round trips of the current request"""
+    stats = RequestQueryStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[RequestQueryStats]:
+    return _request_stats.get()
+
+
+def end_request_stats() -> None:
+    _request_stats.set(None)
+
+
+class QueryMemo:
+    """Results of the MongoEngine queries of one service, keyed by query, sort and projection"""
+
+    def __init__(self):
+        self._documents: Dict[tuple, Dict[tuple, List[dict]]] = {}
+        self._values: Dict[tuple, Any] = {}
+        self.round_trips = 0
+        self.saved = 0
+        self.request_stats = current_request_stats()
+
+    @staticmethod
+    def _query_key(queryset) -> tuple:
+        return (
+            queryset._document._get_collection_name(), repr(queryset._query),
+            repr(queryset._ordering), queryset._skip, queryset._limit,
+        )
+
+    def _record(self, round_trips: int = 0, saved: int = 0) -> None:
+        self.round_trips += round_trips
+        self.saved += saved
+        if self.request_stats is not None:
+            self.request_stats.record(round_trips, saved)
+
+    def _materialized(self, query_key: tuple, fields: Iterable[str]) -> Optional[List[dict]]:
+        """Documents of a query loaded with (at least) these fields"""
+        fields = set(fields)
+        for projection, documents in self._documents.get(query_key, {}).items():
+            if fields <= set(projection):
+                return documents
+        return None
+
+    def documents(self, queryset, fields: Sequence[str]) -> List[dict]:
+        """Raw documents of a queryset projected on fields (as_pymongo)"""
+        query_key = self._query_key(queryset)
+        documents = self._materialized(query_key, fields)
+        if documents is not None:
+            self._record(saved=1)
+            return documents
+        documents = list(queryset.only(*fields).as_pymongo())
+        self._documents.setdefault(query_key, {})[tuple(sorted(fields))] = documents
+        self._record(round_trips=1)
+        return documents
+
+    def count(self, queryset) -> int:
+        """Number of documents of a queryset"""
+        query_key = self._query_key(queryset)
+        if query_key in self._documents:
+            self._record(saved=1)
+            return len(next(iter(self._documents[query_key].values())))
+        return self._value(('count',) + query_key, queryset.count)
+
+    def distinct(self, queryset, field: str) -> List:
+        """Distinct values of a top-level field of a queryset"""
+        documents = self._materialized(self._query_key(queryset), [field])
+        if documents is not None:
+            self._record(saved=1)
+            values = []
+            seen = set()
+            for doc in documents:
+                value = doc.get(field)
+                if value is not None and value not in seen:
+                    seen.add(value)
+                    values.append(value)
+            return values
+        return self._value(('distinct', field) + self._query_key(queryset), lambda: queryset.distinct(field))
+
+    def first(self, queryset):
+        """First document of a queryset"""
+        return self._value(('first',) + self._query_key(queryset), queryset.first)
+
+    def _value(self, key: tuple, load) -> Any:
+        if key in self._values:
+            self._record(saved=1)
+            return self._values[key]
+        value = self._values[key] = load()
+        self._record(round_trips=1)
+        return value
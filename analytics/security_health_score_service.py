@@ -2,7 +2,7 @@ import math
 from collections import Counter
 from datetime import datetime
 from mongoengine import DoesNotExist
-from .models import SecurityHealthHistory, CodeQLVulnerability
+from .models import SecurityHealthHistory, CodeQLVulnerability, RepositoryKLOCHistory
 
 
 class SecurityHealthScoreService:
@@ -83,11 +83,7 @@ class SecurityHealthScoreService:
                     'delta_shs': 0.0
                 }
             
-            # Calculate surface score
-            score_surface = total_weight / kloc
-            
-            # Apply exponential decay function (higher vulnerabilities = lower score)
-            shs_score = 100 * math.exp(-self.alpha * score_surface)
+            shs_score = self._score_from_weight(total_weight, kloc)
             
             # Get delta from previous analysis
             delta_shs = self._calculate_delta_shs(repository_full_name, shs_score)
@@ -119,6 +115,159 @@ class SecurityHealthScoreService:
                 'delta_shs': 0.0
             }
     
+    def _score_from_weight(self, total_weight, kloc):
+        """Apply the SHS formula to a weighted vulnerability total"""
+        # Calculate surface score
+        score_surface = total_weight / kloc
+
+        # Apply exponential decay function (higher vulnerabilities = lower score)
+        return 100 * math.exp(-self.alpha * score_surface)
+
+    def calculate_shs_batch(self, repositories, force=True):
+        """
+        Calculate Security Health Score for many repositories at once
+
+        Severity counts come from one $group aggregation over all repositories,
+        the latest KLOC and previous scores from one aggregation each, and the
+        history rows are written with a single bulk insert.
+
+        Args:
+            repositories (iterable): Repository objects (full_name, id, kloc)
+            force (bool): Recalculate repositories that already have a score
+
+        Returns:
+            dict: repository full name -> SHS calculation results (same
+            structure as calculate_shs), skipped repositories are omitted
+        """
+        repositories = [repo for repo in repositories if repo.full_name]
+        names = [repo.full_name for repo in repositories]
+        if not names:
+            return {}
+
+        open_counts, analyzed = self._severity_counts_by_repository(names)
+        latest_kloc = self._latest_kloc_by_repository(names)
+        previous_scores = self._previous_scores_by_repository(names)
+
+        now = datetime.now()
+        month = now.strftime('%Y-%m')
+        results = {}
+        history_rows = []
+
+        for repo in repositories:
+            name = repo.full_name
+            if not force and name in previous_scores:
+                continue
+
+            kloc = latest_kloc.get(name) or repo.kloc or 0.0
+            severity_counts = open_counts.get(name, {})
+            total = sum(severity_counts.values())
+            full_counts = {sev: severity_counts.get(sev, 0) for sev in self.weights}
+
+            if total == 0:
+                if name in analyzed:
+                    results[name] = {
+                        'shs_score': 100.0,
+                        'status': 'perfect',
+                        'message': 'No vulnerabilities found',
+                        'total_vulnerabilities': 0,
+                        'severity_counts': full_counts,
+                        'kloc': kloc,
+                        'delta_shs': 0.0
+                    }
+                else:
+                    results[name] = {
+                        'shs_score': None,
+                        'status': 'not_available',
+                        'message': 'CodeQL analysis not available',
+                        'total_vulnerabilities': 0,
+                        'severity_counts': full_counts,
+                        'kloc': kloc,
+                        'delta_shs': 0.0
+                    }
+                continue
+
+            if kloc <= 0:
+                results[name] = {
+                    'shs_score': None,
+                    'status': 'not_available',
+                    'message': 'Repository size not available',
+                    'total_vulnerabilities': total,
+                    'severity_counts': dict(severity_counts),
+                    'kloc': kloc,
+                    'delta_shs': 0.0
+                }
+                continue
+
+            total_weight = sum(full_counts[sev] * weight for sev, weight in self.weights.items())
+            shs_score = self._score_from_weight(total_weight, kloc)
+            previous = previous_scores.get(name)
+            delta_shs = shs_score - previous if previous is not None else 0.0
+
+            history_rows.append(SecurityHealthHistory(
+                repository_full_name=name,
+                repository_id=repo.id,
+                shs_score=shs_score,
+                delta_shs=delta_shs,
+                calculated_at=now,
+                month=month,
+                total_vulnerabilities=total,
+                critical_count=full_counts['critical'],
+                high_count=full_counts['high'],
+                medium_count=full_counts['medium'],
+                low_count=full_counts['low'],
+                kloc=kloc
+            ))
+            results[name] = {
+                'shs_score': round(shs_score, 1),
+                'status': 'calculated',
+                'message': f'Score calculated from {total} vulnerabilities',
+                'total_vulnerabilities': total,
+                'severity_counts': dict(severity_counts),
+                'kloc': kloc,
+                'delta_shs': round(delta_shs, 1)
+            }
+
+        if history_rows:
+            SecurityHealthHistory.objects.insert(history_rows, load_bulk=False)
+
+        return results
+
+    def _severity_counts_by_repository(self, names):
+        """Return ({repo: {severity: open count}}, set of repos with CodeQL data) in one aggregation"""
+        pipeline = [
+            {'$match': {'repository_full_name': {'$in': names}}},
+            {'$group': {
+                '_id': {'repository': '$repository_full_name', 'severity': '$severity'},
+                'open': {'$sum': {'$cond': [{'$eq': ['$state', 'open']}, 1, 0]}},
+            }},
+        ]
+        open_counts = {}
+        analyzed = set()
+        for row in CodeQLVulnerability.objects.aggregate(pipeline):
+            name = row['_id']['repository']
+            analyzed.add(name)
+            if row['open']:
+                open_counts.setdefault(name, {})[row['_id']['severity']] = row['open']
+        return open_counts, analyzed
+
+    def _latest_kloc_by_repository(self, names):
+        """Return {repo: latest successful KLOC} in one aggregation"""
+        pipeline = [
+            {'$match': {'repository_full_name': {'$in': names}, 'calculation_success': {'$ne': False}}},
+            {'$sort': {'calculated_at': -1}},
+            {'$group': {'_id': '$repository_full_name', 'kloc': {'$first': '$kloc'}}},
+        ]
+        return {row['_id']: row['kloc'] for row in RepositoryKLOCHistory.objects.aggregate(pipeline)}
+
+    def _previous_scores_by_repository(self, names):
+        """Return {repo: most recent SHS} in one aggregation"""
+        pipeline = [
+            {'$match': {'repository_full_name': {'$in': names}}},
+            {'$sort': {'calculated_at': -1}},
+            {'$group': {'_id': '$repository_full_name', 'shs_score': {'$first': '$shs_score'}}},
+        ]
+        return {row['_id']: row['shs_score'] for row in SecurityHealthHistory.objects.aggregate(pipeline)}
+
     def _has_codeql_analysis(self, repository_full_name):
         """Check if CodeQL analysis is available for the repository"""
         try:
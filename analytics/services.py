@@ -605,6 +605,7 @@ def index_all_sonarcloud_metrics_task():
     
     try:
         from repositories.models import Repository
+        from .tasks import repository_data_changed
         from .sonarcloud_service import SonarCloudService
         
         results = []
@@ -630,6 +631,7 @@ def index_all_sonarcloud_metrics_task():
                 })
                 
                 if result.get('success'):
+                    repository_data_changed(repo)
                     logger.info(f"Successfully indexed SonarCloud metrics for repository {repo.full_name}")
                 else:
                     logger.warning(f"Failed to index SonarCloud metrics for repository {repo.full_name}: {result.get('error')}")
@@ -11,6 +11,7 @@ from mongoengine.errors import NotUniqueError
 
 from .models import Commit, SyncLog, RepositoryStats
 from .sanitization import assert_safe_repository_full_name
+from .developer_profile_service import DeveloperProfileService, changed_developer_ids, profile_fingerprint
 from .github_service import GitHubService, GitHubAPIError, GitHubRateLimitError
 # Note: Legacy 'Application' model has been removed.
 # Any application-centric sync paths have been adapted to use 'Project' if needed,
@@ -303,6 +304,8 @@ class SyncService:
             'commits_skipped': 0,
             'api_calls': 1  # Base API call for fetching commits list
         }
+        created_commits = []
+        stale_developer_ids = set()
         
         for commit_data in commits_data:
             try:
@@ -374,15 +377,22 @@ class SyncService:
                 
                 if existing_commit:
                     # Update existing commit
+                    before, synced_at = profile_fingerprint(existing_commit), existing_commit.synced_at
                     for field, value in parsed_data.items():
                         setattr(existing_commit, field, value)
+                    if not changed_developer_ids(before, existing_commit):
+                        # Unchanged for the profiles: still counted by their last rebuild
+                        existing_commit.synced_at = synced_at
                     existing_commit.save()
+                    # After save(), which re-stamps developer_id (a re-stamp marks both profiles stale)
+                    stale_developer_ids.update(changed_developer_ids(before, existing_commit))
                     results['commits_updated'] += 1
                 else:
                     # Create new commit
                     try:
                         commit = Commit(**parsed_data)
                         commit.save()
+                        created_commits.append(commit)
                         results['commits_new'] += 1
                     except NotUniqueError:
                         logger.warning(f"Commit {sha} déjà présent, ignoré.")
@@ -394,12 +404,14 @@ class SyncService:
             except GitHubRateLimitError as e:
                 # Re-raise rate limit errors to stop processing
                 logger.error(f"Rate limit exceeded processing commit {commit_data.get('sha', 'unknown')}: {e}")
+                DeveloperProfileService.record_ingested(created_commits, stale_developer_ids)
                 raise
             except Exception as e:
                 logger.error(f"Error processing commit {commit_data.get('sha', 'unknown')}: {e}")
                 results['commits_skipped'] += 1
                 continue
         
+        DeveloperProfileService.record_ingested(created_commits, stale_developer_ids)
         return results
     
     def _update_repository_stats(self, repo_stats: RepositoryStats, commits_data: List[Dict]):
@@ -227,11 +227,27 @@ def schedule_sync_tasks():
         else:
             logger.info("Retry failed syncs schedule already exists")
         
+        # Reclassify commits deferred while Ollama was unavailable, every hour
+        reclassify_schedule, created = Schedule.objects.get_or_create(
+            name='reclassify_deferred_commits',
+            defaults={
+                'func': 'analytics.tasks.reclassify_deferred_commits_task',
+                'schedule_type': Schedule.HOURLY,
+                'next_run': datetime.now(dt_timezone.utc) + timedelta(hours=1),
+                'repeats': -1  # Infinite repeats
+            }
+        )
+        if created:
+            logger.info("Created deferred commit reclassification schedule")
+        else:
+            logger.info("Deferred commit reclassification schedule already exists")
+        
         logger.info("Scheduled sync tasks setup completed")
         return {
             'daily_schedule_created': created if 'daily_schedule' in locals() else False,
             'weekly_schedule_created': created if 'weekly_schedule' in locals() else False,
             'retry_schedule_created': created if 'retry_schedule' in locals() else False,
+            'reclassify_schedule_created': created if 'reclassify_schedule' in locals() else False,
         }
         
     except Exception as e:
@@ -239,6 +255,21 @@ def schedule_sync_tasks():
         raise
 
 
+def reclassify_deferred_commits_task():
+    """
+    Django-Q task to reclassify with Ollama the commits classified by rules
+    while the Ollama circuit breaker was open
+    """
+    from .ollama_classifier import reclassify_deferred_commits
+    
+    result = reclassify_deferred_commits()
+    if result['status'] == 'circuit_open':
+        logger.warning(f"Ollama still unavailable, {result['deferred']} deferred commit classifications kept")
+    elif result['status'] == 'completed':
+        logger.info(f"Reclassified {result['reclassified']} deferred commits with Ollama")
+    return result
+
+
 # Removed manual_sync_application - it used the deprecated Application model
 
 
@@ -830,84 +861,12 @@ def group_developer_identities_task():
     Returns:
         dict: Résultats du regroupement
     """
-    import re
-    import unicodedata
-    from difflib import SequenceMatcher
+    from analytics.identity_grouping import group_identities
+    from analytics.identity_index import refresh_developer_stamps
     from analytics.models import Commit, Developer, DeveloperAlias, PullRequest, Release, Deployment
     
     logger.info("Starting simplified developer identity grouping task")
     
-    def normalize_name(name):
-        """Normalise un nom : minuscules, sans accents, sans espaces/tirets/underscores"""
-        if not name:
-            return ""
-        # Supprimer les accents
-        name = unicodedata.normalize('NFD', name).encode('ascii', 'ignore').decode('ascii')
-        # Minuscules et supprimer caractères spéciaux
-        name = re.sub(r'[^a-zA-Z0-9]', '', name.lower())
-        return name
-    
-    def extract_email_local(email):
-        """Extrait la partie locale d'un email (avant @)"""
-        if not email or '@' not in email:
-            return ""
-        return email.split('@')[0].lower()
-    
-    def extract_initials_from_name(name):
-        """Extrait les initiales d'un nom complet"""
-        if not name:
-            return ""
-        parts = re.split(r'[^a-zA-Z]+', name.lower())
-        return ''.join([part[0] for part in parts if part])
-    
-    def should_group_identities(identity1, identity2):
-        """Détermine si deux identités doivent être regroupées - règles strictes"""
-        # Normaliser les emails pour la comparaison
-        email1_normalized = identity1['email'].lower()
-        email2_normalized = identity2['email'].lower()
-        email1_local = extract_email_local(email1_normalized)
-        email2_local = extract_email_local(email2_normalized)
-        name1_norm = normalize_name(identity1['name'])
-        name2_norm = normalize_name(identity2['name'])
-        
-        # 1. Email identique = Même développeur (confiance 100%)
-        if email1_normalized == email2_normalized:
-            return True, "exact_email_match"
-        
-        # 2. Email local identique = Même développeur (confiance 100%)
-        if email1_local and email2_local and email1_local == email2_local:
-            return True, "email_local_match"
-        
-        # 3. Patterns d'initiales spécifiques (confiance 85%)
-        # Ex: nohemie.lehuby@toto.com ↔ lehuby.nohemie@kisio.com
-        # Ex: nlehuby@hove.com ↔ n.lehuby@hove.com
-        # Ex: nohemiel@canaltp.fr ↔ nohemie.l@canaltp.fr
-        
-        if email1_local and email2_local and len(email1_local) > 3 and len(email2_local) > 3:
-            # Règle 1: Initiales + nom de famille
-            # nohemie.lehuby ↔ lehuby.nohemie
-            if '.' in email1_local and '.' in email2_local:
-                parts1 = email1_local.split('.')
-                parts2 = email2_local.split('.')
-                if len(parts1) == 2 and len(parts2) == 2:
-                    if (parts1[0] == parts2[1] and parts1[1] == parts2[0]) or \
-                       (parts1[0] == parts2[0] and parts1[1] == parts2[1]):
-                        return True, "name_reversal_pattern"
-            
-            # Règle 2: Initiale + nom de famille
-            # nlehuby ↔ n.lehuby
-            if len(email1_local) > len(email2_local):
-                long_email, short_email = email1_local, email2_local
-            else:
-                long_email, short_email = email2_local, email1_local
-            
-            if len(short_email) >= 3 and len(long_email) >= len(short_email) + 1:
-                # Vérifier si short_email est contenu dans long_email avec un point
-                if short_email in long_email.replace('.', ''):
-                    return True, "initial_pattern"
-        
-        return False, None
-    
     try:
         # Extraire toutes les identités uniques de toutes les sources
         identities = {}  # key: email, value: {name, email, commit_count, first_seen, last_seen, sources}
@@ -1081,32 +1040,24 @@ def group_developer_identities_task():
         aliases_grouped = 0
         grouping_details = []
         
-        # Algorithme de regroupement optimisé
-        processed_aliases = set()
+        # Regroupement par blocs + union-find (seuls les candidats d'un même bloc sont comparés)
+        grouping = group_identities([
+            {'name': alias.name, 'email': alias.email} for alias in ungrouped_aliases
+        ])
+        for i, j, reason in grouping.matches:
+            alias1, alias2 = ungrouped_aliases[i], ungrouped_aliases[j]
+            grouping_details.append({
+                'alias1': f"{alias1.name} ({alias1.email})",
+                'alias2': f"{alias2.name} ({alias2.email})",
+                'reason': reason
+            })
+        logger.info(
+            f"Identity grouping: {len(grouping.groups)} groups, "
+            f"{grouping.comparisons} rule evaluations for {len(ungrouped_aliases)} aliases"
+        )
         
-        for i, alias1 in enumerate(ungrouped_aliases):
-            if alias1.id in processed_aliases:
-                continue
-            
-            # Créer un nouveau groupe avec cette alias
-            group = [alias1]
-            identity1 = {'name': alias1.name, 'email': alias1.email}
-            
-            # Chercher d'autres aliases qui correspondent
-            for j, alias2 in enumerate(ungrouped_aliases[i+1:], i+1):
-                if alias2.id in processed_aliases:
-                    continue
-                
-                identity2 = {'name': alias2.name, 'email': alias2.email}
-                should_group, reason = should_group_identities(identity1, identity2)
-                
-                if should_group:
-                    group.append(alias2)
-                    grouping_details.append({
-                        'alias1': f"{alias1.name} ({alias1.email})",
-                        'alias2': f"{alias2.name} ({alias2.email})",
-                        'reason': reason
-                    })
+        for group_indexes in grouping.groups:
+            group = [ungrouped_aliases[index] for index in group_indexes]
             
             # Créer un Developer pour ce groupe
             if len(group) > 0:
@@ -1125,7 +1076,6 @@ def group_developer_identities_task():
                         if not alias.developer:
                             alias.developer = existing_developer
                             alias.save()
-                            processed_aliases.add(alias.id)
                             aliases_grouped += 1
                 else:
                     # Créer un nouveau developer avec email normalisé
@@ -1143,7 +1093,6 @@ def group_developer_identities_task():
                         for alias in group:
                             alias.developer = developer
                             alias.save()
-                            processed_aliases.add(alias.id)
                             aliases_grouped += 1
                     except Exception as e:
                         logger.error(f"Failed to create developer for {normalized_email}: {e}")
@@ -1154,15 +1103,24 @@ def group_developer_identities_task():
                                 if not alias.developer:
                                     alias.developer = existing_developer
                                     alias.save()
-                                    processed_aliases.add(alias.id)
                                     aliases_grouped += 1
         
+        # Stamp developer_id on the commits and PRs of the newly grouped aliases
+        restamped = refresh_developer_stamps(
+            alias.email for alias in ungrouped_aliases if alias.developer
+        ) if aliases_grouped else None
+        if aliases_grouped:
+            # Developer totals of every cached entity may change
+            from .metrics_cache import bump_data_version
+            bump_data_version()
+        
         results = {
             'identities_found': len(identities),
             'aliases_created': aliases_created,
             'aliases_updated': aliases_updated,
             'developers_created': developers_created,
             'aliases_grouped': aliases_grouped,
+            'restamped': restamped,
             'grouping_details': grouping_details[:10],
             'total_grouping_details': len(grouping_details)
         }
@@ -1176,6 +1134,29 @@ def group_developer_identities_task():
 
 
 
+def refresh_dora_snapshot(repository):
+    """Recompute the persisted DORA metrics of a repository after new data was indexed"""
+    try:
+        from .dora_service import DoraMetricsService
+        DoraMetricsService.refresh_snapshot(repository.full_name, repository_id=repository.id)
+    except Exception as e:
+        logger.warning(f"Could not refresh DORA snapshot for {repository.full_name}: {e}")
+
+
+def repository_data_changed(repository):
+    """
+    Bump the data version of a repository after new data was indexed, invalidating its cached metrics,
+    and schedule the warming of the repository, its projects and top developers
+    """
+    try:
+        from .metrics_cache import bump_data_version
+        bump_data_version(repository.full_name)
+    except Exception as e:
+        logger.warning(f"Could not bump data version for {repository.full_name}: {e}")
+    from .cache_warming import warm_after_indexing
+    warm_after_indexing(repository)
+
+
 def index_deployments_intelligent_task(repository_id=None, args=None, **kwargs):
     """
     Indexe les déploiements GitHub pour un repository donné, en reprenant là où on s'est arrêté.
@@ -1310,6 +1291,9 @@ def index_deployments_intelligent_task(repository_id=None, args=None, **kwargs):
         state.status = 'completed'
         state.save()
 
+        repository_data_changed(repository)
+        refresh_dora_snapshot(repository)
+
         logger.info(f"Indexed {processed} deployments for {repository.full_name} from {since} to {until}")
         return {
             'status': 'success',
@@ -1559,6 +1543,8 @@ def index_commits_intelligent_task(repository_id):
         repository.save()
         logger.info(f"Repository {repository.full_name} marked as indexed")
         result['is_indexed_updated'] = True
+        if result.get('status') == 'success':
+            repository_data_changed(repository)
         
         logger.info(f"Commit indexing completed for repository {repository_id}: {result}")
         return result
@@ -1747,6 +1733,7 @@ def index_commits_git_local_task(repository_id):
         repository.save()
         logger.info(f"Repository {repository.full_name} marked as indexed")
         final_result['is_indexed_updated'] = True
+        repository_data_changed(repository)
         
         # Clean up the cloned repository after indexing is complete
         try:
@@ -1977,6 +1964,10 @@ def index_pullrequests_intelligent_task(repository_id=None, args=None, **kwargs)
                 )
                 logger.info(f"Created new pull request indexing schedule for repository {repository_id}")
         
+        if result.get('status') == 'success':
+            repository_data_changed(repository)
+            refresh_dora_snapshot(repository)
+
         logger.info(f"Pull request indexing completed for repository {repository_id}: {result}")
         return result
         
@@ -2188,6 +2179,9 @@ def index_releases_intelligent_task(repository_id=None, args=None, **kwargs):
                 )
                 logger.info(f"Created new release indexing schedule for repository {repository_id}")
         
+        if result.get('status') == 'success':
+            repository_data_changed(repository)
+
         logger.info(f"Release indexing completed for repository {repository_id}: {result}")
         return result
         
@@ -2500,6 +2494,9 @@ def index_codeql_intelligent_task(repository_id=None, args=None, **kwargs):
             repository_full_name=repository.full_name
         )
         
+        if result.get('status') == 'success':
+            repository_data_changed(repository)
+
         logger.info(f"CodeQL indexing completed for repository {repository_id}: {result}")
         return result
         
@@ -1,17 +1,25 @@
 """
 Unified metrics service for calculating analytics across repositories, projects, and developers
 """
-from datetime import datetime, timedelta, timezone as dt_timezone
+from datetime import timedelta, timezone as dt_timezone
 from typing import Dict, List, Optional, Union
 from collections import defaultdict, Counter
 from django.utils import timezone as django_timezone
 import re
 import statistics
 
-from .models import Commit, PullRequest, Release, Deployment, Developer, DeveloperAlias
+from .models import Commit, PullRequest, Release, Deployment, Developer
+from .identity_index import get_identity_index
 from .cache_service import AnalyticsCacheService
-from .commit_classifier import get_commit_type_stats
+from .commit_classifier import build_commit_type_stats
+from .commit_frame import CommitFrame
 from .developer_grouping_service import DeveloperGroupingService
+from .metrics_cache import EntityMetricsCache, cached_metric, format_date_range
+from .query_memo import QueryMemo
+
+# Commit fields of a full computation, loaded once and shared by the metric methods
+COMMIT_METRICS_PROJECTION = CommitFrame.PROJECTION + ('message', 'total_changes', 'files_changed.filename')
+PR_METRICS_PROJECTION = ('state', 'created_at', 'closed_at', 'merged_at', 'merged_by', 'author', 'comments_count')
 
 
 class UnifiedMetricsService:
@@ -20,6 +28,11 @@ class UnifiedMetricsService:
     - Repository (R): single repo metrics
     - Project (P): aggregated repos metrics  
     - Developer (D): single developer metrics
+    
+    Metric methods are cached in the shared metrics cache (see metrics_cache),
+    keyed by entity, date range and the data versions of its repositories.
+    On a miss they read MongoDB through the service's QueryMemo, so each
+    projected query runs once per service.
     """
     
     @staticmethod
@@ -41,15 +54,50 @@ class UnifiedMetricsService:
         self.entity_id = entity_id
         self.start_date = start_date
         self.end_date = end_date
+        self._commit_frame = None
+        self.query_memo = QueryMemo()
         
         # Initialize commits queryset based on entity type
         self._setup_entity_data()
+        self.metrics_cache = EntityMetricsCache(
+            self.entity_type, self.entity_id, format_date_range(start_date, end_date), self.repository_full_names
+        )
+    
+    @property
+    def commit_frame(self) -> CommitFrame:
+        """Columnar view of the (date-filtered) commits, loaded once per service"""
+        if self._commit_frame is None:
+            self._commit_frame = CommitFrame.from_documents(
+                self.query_memo.documents(self.commits, CommitFrame.PROJECTION)
+            )
+        return self._commit_frame
+    
+    def _recent_commit_frame(self, days: int) -> CommitFrame:
+        """Commit frame restricted to the date range, or to the last ``days`` days"""
+        if self.start_date and self.end_date:
+            return self.commit_frame
+        return self.commit_frame.since(django_timezone.now() - timedelta(days=days))
+    
+    def _totals_by_developer(self, frame: CommitFrame) -> Dict[str, Dict]:
+        """Aggregate per-author totals of a frame under grouped developer names"""
+        identity_index = get_identity_index()
+        developer_stats = {}
+        for author in frame.per_author_totals():
+            identity = identity_index.resolve(author['email'])
+            key = identity.primary_name if identity else author['name']
+            if key not in developer_stats:
+                developer_stats[key] = {'commits': 0, 'additions': 0, 'deletions': 0}
+            developer_stats[key]['commits'] += author['commits']
+            developer_stats[key]['additions'] += author['additions']
+            developer_stats[key]['deletions'] += author['deletions']
+        return developer_stats
     
     def _setup_entity_data(self):
         """Setup entity-specific data and querysets"""
         if self.entity_type == 'repository':
             from repositories.models import Repository
             self.repository = Repository.objects.get(id=self.entity_id)
+            self.repository_full_names = [self.repository.full_name]
             self.commits = Commit.objects.filter(repository_full_name=self.repository.full_name)
             self.prs = PullRequest.objects.filter(repository_full_name=self.repository.full_name)
             self.releases = Release.objects.filter(repository_full_name=self.repository.full_name)
@@ -60,6 +108,7 @@ class UnifiedMetricsService:
             self.project = Project.objects.get(id=self.entity_id)
             # Get all repository full names for this project
             project_repo_names = [repo.full_name for repo in self.project.repositories.all()]
+            self.repository_full_names = project_repo_names
             self.commits = Commit.objects.filter(repository_full_name__in=project_repo_names)
             self.prs = PullRequest.objects.filter(repository_full_name__in=project_repo_names)
             self.releases = Release.objects.filter(repository_full_name__in=project_repo_names)
@@ -67,16 +116,13 @@ class UnifiedMetricsService:
             
         elif self.entity_type == 'developer':
             self.developer = Developer.objects.get(id=self.entity_id)
-            # Get all aliases for this developer
-            aliases = DeveloperAlias.objects.filter(developer=self.developer)
-            alias_emails = [alias.email for alias in aliases]
-            self.commits = Commit.objects.filter(author_email__in=alias_emails)
-            # For developers, PRs and releases are filtered by their commits' repos
-            repo_names = set(commit.repository_full_name for commit in self.commits)
-            self.prs = PullRequest.objects.filter(
-                repository_full_name__in=repo_names,
-                author__in=[alias.email for alias in aliases]
-            )
+            # Commits and PRs carry the developer id stamped from the identity index
+            developer_id = str(self.developer.id)
+            self.commits = Commit.objects.filter(developer_id=developer_id)
+            # For developers, releases and deployments are filtered by their commits' repos
+            repo_names = self.query_memo.distinct(self.commits, 'repository_full_name')
+            self.repository_full_names = list(repo_names)
+            self.prs = PullRequest.objects.filter(developer_id=developer_id)
             self.releases = Release.objects.filter(repository_full_name__in=repo_names)
             self.deployments = Deployment.objects.filter(repository_full_name__in=repo_names)
         else:
@@ -103,7 +149,7 @@ class UnifiedMetricsService:
                     field = 'created_at'
             # Fallback: test le premier objet
             if not field and hasattr(qs, 'first'):
-                first = qs.first()
+                first = self.query_memo.first(qs)
                 if first:
                     if hasattr(first, 'authored_date'):
                         field = 'authored_date'
@@ -118,108 +164,65 @@ class UnifiedMetricsService:
         return qs
     
     # Basic Stats (DPR - Developers, Projects, Repositories)
+    @cached_metric()
     def get_total_commits(self) -> int:
         """Total Commits (DAR)"""
-        return self.commits.count()
+        return self.query_memo.count(self.commits)
     
+    @cached_metric()
     def get_total_releases(self) -> int:
         """Total Releases (AR)"""
         if self.entity_type == 'developer':
             return 0  # Developers don't own releases
-        return self.releases.count()
+        return len(self.query_memo.documents(self.releases, ('published_at',)))
     
+    @cached_metric()
     def get_total_developers(self) -> int:
         """Total Developers (AR)"""
         if self.entity_type == 'developer':
             return 1  # Single developer
         
-        # For both repositories and projects, use the commits we already have to count developers
-        from .developer_grouping_service import DeveloperGroupingService
-        grouping_service = DeveloperGroupingService()
-        return grouping_service.get_all_developers_for_commits(self.commits)
+        # For both repositories and projects, count the grouped identities of the commit emails
+        commit_emails = {email.lower() for email in self.query_memo.distinct(self.commits, 'author_email') if email}
+        return get_identity_index().count_developers(commit_emails)
     
+    @cached_metric()
     def get_lines_added(self) -> int:
         """Lines Added (DAR)"""
-        return sum(commit.additions for commit in self.commits)
+        return self.commit_frame.total_additions()
     
+    @cached_metric()
     def get_lines_deleted(self) -> int:
         """Lines Deleted (DAR)"""
-        return sum(commit.deletions for commit in self.commits)
+        return self.commit_frame.total_deletions()
     
     def get_net_lines(self) -> int:
         """Net Lines Added (DAR)"""
         return self.get_lines_added() - self.get_lines_deleted()
     
     # Frequency Metrics (DAR for commits, AR for releases)
+    @cached_metric(relative=True)
     def get_commit_frequency(self) -> Dict:
         """Commit Frequency (DAR)"""
         # Toujours utiliser self.commits filtré (déjà filtré sur la plage si fournie)
-        commits_list = list(self.commits.order_by('authored_date'))
-        
-        if not commits_list:
-            return {
-                'avg_commits_per_day': 0,
-                'recent_activity_score': 0,
-                'consistency_score': 0,
-                'overall_frequency_score': 0,
-                'commits_last_30_days': 0,
-                'commits_last_90_days': 0,
-                'days_since_last_commit': None,
-                'active_days': 0,
-                'total_days': 0
-            }
-        
-        now = datetime.now(dt_timezone.utc)
-        first_commit = commits_list[0]
-        last_commit = commits_list[-1]
-        
-        # Calculate total time span
-        total_days = (last_commit.authored_date - first_commit.authored_date).days + 1
-        avg_commits_per_day = len(commits_list) / total_days if total_days > 0 else 0
-        
-        # Calculate recent activity
-        cutoff_30 = now - timedelta(days=30)
-        cutoff_90 = now - timedelta(days=90)
-        commits_last_30_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_30)
-        commits_last_90_days = sum(1 for commit in commits_list if self._ensure_timezone_aware(commit.authored_date) >= cutoff_90)
-        days_since_last_commit = (now - self._ensure_timezone_aware(last_commit.authored_date)).days
-        
-        # Calculate activity consistency
-        active_days = set(commit.authored_date.date() for commit in commits_list)
-        active_days_count = len(active_days)
-        consistency_ratio = active_days_count / total_days if total_days > 0 else 0
-        
-        # Calculate scores
-        recent_activity_score = min((commits_last_30_days / commits_last_90_days * 100) if commits_last_90_days > 0 else 0, 100)
-        consistency_score = min(consistency_ratio * 100, 100)
-        normalized_avg = min(avg_commits_per_day * 20, 100)
-        overall_frequency_score = (normalized_avg * 0.3 + recent_activity_score * 0.4 + consistency_score * 0.3)
-        
-        return {
-            'avg_commits_per_day': round(avg_commits_per_day, 2),
-            'recent_activity_score': int(round(recent_activity_score)),
-            'consistency_score': int(round(consistency_score)),
-            'overall_frequency_score': int(round(overall_frequency_score)),
-            'commits_last_30_days': commits_last_30_days,
-            'commits_last_90_days': commits_last_90_days,
-            'days_since_last_commit': days_since_last_commit,
-            'active_days': active_days_count,
-            'total_days': total_days
-        }
+        return self.commit_frame.commit_frequency()
     
+    @cached_metric(relative=True)
     def get_release_frequency(self, period_days: int = 90) -> Dict:
         """Release Frequency (AR)"""
         if self.entity_type == 'developer':
             return {'releases_per_month': 0, 'releases_per_week': 0, 'total_releases': 0, 'period_days': period_days}
         # Si plage personnalisée, utiliser self.releases filtré, sinon period_days
+        releases = self.query_memo.documents(self.releases, ('published_at',))
         if self.start_date and self.end_date:
-            releases = self.releases
-            total_releases = releases.count()
+            total_releases = len(releases)
             days_span = (self.end_date - self.start_date).days + 1
         else:
             cutoff = django_timezone.now() - timedelta(days=period_days)
-            releases = self.releases.filter(published_at__gte=cutoff)
-            total_releases = releases.count()
+            total_releases = sum(
+                1 for release in releases
+                if release.get('published_at') and self._ensure_timezone_aware(release['published_at']) >= cutoff
+            )
             days_span = period_days
         if total_releases == 0:
             return {'releases_per_month': 0, 'releases_per_week': 0, 'total_releases': 0, 'period_days': days_span}
@@ -232,6 +235,7 @@ class UnifiedMetricsService:
             'period_days': days_span
         }
     
+    @cached_metric()
     def get_pr_metrics(self) -> Dict:
         """Unified PR metrics including cycle time and health metrics (AR)"""
         if self.entity_type == 'developer':
@@ -251,7 +255,8 @@ class UnifiedMetricsService:
                 'open_prs_percentage': 0, 'merged_prs_percentage': 0
             }
         
-        if self.prs.count() == 0:
+        prs = self.query_memo.documents(self.prs, PR_METRICS_PROJECTION)
+        if not prs:
             return {
                 # Cycle time metrics
                 'avg_cycle_time_hours': 0, 
@@ -269,40 +274,36 @@ class UnifiedMetricsService:
             }
         
         # Calculate cycle times (using closed_at for consistency)
-        prs_with_times = self.prs.filter(created_at__ne=None, closed_at__ne=None)
         cycle_times = []
-        
-        for pr in prs_with_times:
-            if pr.closed_at and pr.created_at:
-                cycle_time_hours = (pr.closed_at - pr.created_at).total_seconds() / 3600
+        for pr in prs:
+            if pr.get('closed_at') and pr.get('created_at'):
+                cycle_time_hours = (pr['closed_at'] - pr['created_at']).total_seconds() / 3600
                 cycle_times.append(cycle_time_hours)
         
         # Calculate health metrics
-        total_prs = self.prs.count()
-        open_prs = self.prs.filter(state='open').count()
-        merged_prs = self.prs.filter(merged_at__ne=None).count()
-        closed_prs = self.prs.filter(state='closed').count()
+        merged = [pr for pr in prs if pr.get('merged_at') is not None]
+        closed = [pr for pr in prs if pr.get('state') == 'closed']
+        total_prs = len(prs)
+        open_prs = sum(1 for pr in prs if pr.get('state') == 'open')
+        merged_prs = len(merged)
+        closed_prs = len(closed)
         
         # Calculate old open PRs (open for more than 7 days)
-        cutoff_date = datetime.now(dt_timezone.utc) - timedelta(days=7)
         old_open_prs = 0
-        for pr in self.prs.filter(state='closed'):
-            if pr.created_at and pr.closed_at:
-                days_open = (pr.closed_at - pr.created_at).days
+        for pr in closed:
+            if pr.get('created_at') and pr.get('closed_at'):
+                days_open = (pr['closed_at'] - pr['created_at']).days
                 if days_open > 7:
                     old_open_prs += 1
         
         # Calculate self-merged PRs
-        self_merged_prs = 0
-        for pr in self.prs.filter(merged_at__ne=None):
-            if pr.merged_by and pr.author and pr.merged_by == pr.author:
-                self_merged_prs += 1
+        def is_self_merged(pr):
+            return bool(pr.get('merged_by') and pr.get('author') and pr['merged_by'] == pr['author'])
+        
+        self_merged_prs = sum(1 for pr in merged if is_self_merged(pr))
         
         # Estimate PRs without review
-        prs_without_review = 0
-        for pr in self.prs.filter(merged_at__ne=None):
-            if (pr.merged_by and pr.author and pr.merged_by == pr.author) or pr.comments_count <= 1:
-                prs_without_review += 1
+        prs_without_review = sum(1 for pr in merged if is_self_merged(pr) or (pr.get('comments_count') or 0) <= 1)
         
         # Calculate percentages
         open_prs_percentage = round((open_prs / total_prs * 100) if total_prs > 0 else 0, 1)
@@ -340,49 +341,28 @@ class UnifiedMetricsService:
         }
     
     # Activity Metrics
+    @cached_metric(relative=True)
     def get_developer_activity(self, days: int = 30) -> Dict:
         """Developer Activity (AR)"""
-        if self.start_date and self.end_date:
-            # Use the filtered commits that respect the date range
-            recent_commits = self.commits
-        else:
-            # Fallback to days-based filtering
-            cutoff_date = django_timezone.now() - timedelta(days=days)
-            recent_commits = self.commits.filter(authored_date__gte=cutoff_date)
+        # Use the filtered commits when a date range is set, otherwise the last `days` days
+        recent_commits = self._recent_commit_frame(days)
         
         if self.entity_type == 'developer':
+            additions = recent_commits.total_additions()
+            deletions = recent_commits.total_deletions()
             return {
                 'developers': [{
                     'name': self.developer.primary_name,
-                    'commits': recent_commits.count(),
-                    'additions': sum(c.additions for c in recent_commits),
-                    'deletions': sum(c.deletions for c in recent_commits),
-                    'net_lines': sum(c.additions - c.deletions for c in recent_commits)
+                    'commits': len(recent_commits),
+                    'additions': additions,
+                    'deletions': deletions,
+                    'net_lines': additions - deletions
                 }],
                 'total_developers': 1
             }
         
-        # For both repositories and projects, use the same logic
-        # Create mapping from email to Developer
-        email_to_developer = {}
-        for alias in DeveloperAlias.objects():
-            if alias.developer:
-                email_to_developer[alias.email.lower()] = alias.developer
-        
-        # Aggregate by developer groups
-        developer_stats = {}
-        for commit in recent_commits:
-            email = commit.author_email.lower()
-            developer = email_to_developer.get(email)
-            if developer:
-                key = developer.primary_name
-            else:
-                key = commit.author_name
-            if key not in developer_stats:
-                developer_stats[key] = {'commits': 0, 'additions': 0, 'deletions': 0}
-            developer_stats[key]['commits'] += 1
-            developer_stats[key]['additions'] += commit.additions
-            developer_stats[key]['deletions'] += commit.deletions
+        # For both repositories and projects, aggregate by developer groups
+        developer_stats = self._totals_by_developer(recent_commits)
         
         # Format response
         developers = []
@@ -404,6 +384,7 @@ class UnifiedMetricsService:
         }
     
     # Quality Metrics (DAR)
+    @cached_metric()
     def get_commit_quality(self) -> Dict:
         """Commit Quality (DAR)"""
         generic_patterns = [
@@ -418,9 +399,9 @@ class UnifiedMetricsService:
         generic_count = 0
         total_commits = 0
         
-        for commit in self.commits:
+        for commit in self.query_memo.documents(self.commits, ('message',)):
             total_commits += 1
-            message = commit.message.lower().strip()
+            message = (commit.get('message') or '').lower().strip()
             
             is_generic = any(re.match(pattern, message) for pattern in generic_patterns)
             if is_generic:
@@ -443,9 +424,10 @@ class UnifiedMetricsService:
             'generic_ratio': round(generic_ratio, 1)
         }
     
+    @cached_metric()
     def get_commit_type_distribution(self) -> Dict:
         """Commit Type Distribution (DAR)"""
-        return get_commit_type_stats(self.commits)
+        return build_commit_type_stats(self.commit_frame.type_counts())
     
     # PR Cycle Time (AR) - Now uses unified method
     def get_pr_cycle_time(self) -> Dict:
@@ -481,40 +463,23 @@ class UnifiedMetricsService:
         }
     
     # Top Contributors (AR)
+    @cached_metric()
     def get_top_contributors(self, limit: int = 10) -> List[Dict]:
         """Top 10 Contributors by Net Lines (AR)"""
         if self.entity_type == 'developer':
             # For individual developer, return just them
-            total_additions = sum(c.additions for c in self.commits)
-            total_deletions = sum(c.deletions for c in self.commits)
+            total_additions = self.commit_frame.total_additions()
+            total_deletions = self.commit_frame.total_deletions()
             return [{
                 'name': self.developer.primary_name,
                 'additions': total_additions,
                 'deletions': total_deletions,
                 'net_lines': total_additions - total_deletions,
-                'commits': self.commits.count()
+                'commits': len(self.commit_frame)
             }]
         
         # For both repositories and projects, use the same logic
-        contributor_stats = {}
-        # Prepare mapping email -> Developer (if exists)
-        email_to_developer = {}
-        for alias in DeveloperAlias.objects():
-            if alias.developer:
-                email_to_developer[alias.email.lower()] = alias.developer
-        
-        for commit in self.commits:
-            email = commit.author_email.lower()
-            developer = email_to_developer.get(email)
-            if developer:
-                key = developer.primary_name
-            else:
-                key = commit.author_name
-            if key not in contributor_stats:
-                contributor_stats[key] = {'additions': 0, 'deletions': 0, 'commits': 0}
-            contributor_stats[key]['additions'] += commit.additions
-            contributor_stats[key]['deletions'] += commit.deletions
-            contributor_stats[key]['commits'] += 1
+        contributor_stats = self._totals_by_developer(self.commit_frame)
         
         # Format and sort by net lines
         contributors = []
@@ -532,20 +497,11 @@ class UnifiedMetricsService:
         return contributors[:limit]
     
     # Activity Heatmap (DAR)
+    @cached_metric(relative=True)
     def get_commit_activity_by_hour(self, days: int = 30) -> Dict:
         """Commit Activity by Hour (DAR)"""
-        if self.start_date and self.end_date:
-            recent_commits = self.commits
-        else:
-            cutoff_date = django_timezone.now() - timedelta(days=days)
-            recent_commits = self.commits.filter(authored_date__gte=cutoff_date)
-        
-        # Initialize hourly activity
-        hourly_activity = {str(hour): 0 for hour in range(24)}
-        
-        for commit in recent_commits:
-            hour = commit.authored_date.hour
-            hourly_activity[str(hour)] += 1
+        hourly_counts = self._recent_commit_frame(days).hourly_counts()
+        hourly_activity = {str(hour): int(hourly_counts[hour]) for hour in range(24)}
         
         return {
             'hourly_data': hourly_activity,
@@ -553,6 +509,7 @@ class UnifiedMetricsService:
             'period_days': days
         }
     
+    @cached_metric(relative=True)
     def get_bubble_chart_data(self, days: int = 30) -> Dict:
         """
         Get bubble chart data for commit activity over time and hours
@@ -564,20 +521,9 @@ class UnifiedMetricsService:
             Dictionary with bubble chart data
         """
         cutoff_date = django_timezone.now() - timedelta(days=days)
-        recent_commits = self.commits.filter(authored_date__gte=cutoff_date)
         
-        # Group commits by date and hour
-        bubble_data = defaultdict(lambda: {'commits': 0})
-        
-        for commit in recent_commits:
-            # Use the new timezone-aware method from the model
-            local_date = commit.get_authored_date_in_timezone()
-            
-            date = local_date.date()
-            hour = local_date.hour
-            
-            key = (date, hour)
-            bubble_data[key]['commits'] += 1
+        # Group commits by local date and hour (configured timezone)
+        bubble_data = self.commit_frame.since(cutoff_date).local_hour_buckets()
         
         # Convert to Chart.js format
         dataset = {
@@ -591,43 +537,42 @@ class UnifiedMetricsService:
         }
         
         max_commits = 0
-        for (date, hour), data in bubble_data.items():
+        for (date, hour), commits in bubble_data.items():
             days_ago = (django_timezone.now().date() - date).days
             dataset['data'].append({
                 'x': days_ago,
                 'y': hour,
-                'r': min(data['commits'] * 3, 20),
-                'commits': int(data['commits'])
+                'r': min(commits * 3, 20),
+                'commits': int(commits)
             })
-            max_commits = max(max_commits, data['commits'])
+            max_commits = max(max_commits, commits)
         
         return {
             'datasets': [dataset],
             'max_commits': max_commits
         }
     
+    @cached_metric()
     def get_commit_change_stats(self) -> Dict:
-        commits = list(self.commits)
-        print(f"[DEBUG] nb_commits pour commit_change_stats: {len(commits)}")
-        for c in commits[:5]:
-            print(f"[DEBUG] commit: sha={getattr(c, 'sha', None)}, total_changes={getattr(c, 'total_changes', None)}, files_changed={getattr(c, 'files_changed', None)}")
+        commits = self.query_memo.documents(self.commits, ('total_changes', 'files_changed.filename'))
         if not commits:
             return {'avg_total_changes': 0, 'avg_files_changed': 0, 'nb_commits': 0}
-        avg_total_changes = sum(getattr(c, 'total_changes', 0) or 0 for c in commits) / len(commits)
-        avg_files_changed = sum(len(getattr(c, 'files_changed', []) or []) for c in commits) / len(commits)
-        print(f'[DEBUG] avg_total_changes={avg_total_changes}, avg_files_changed={avg_files_changed}')
+        avg_total_changes = sum(c.get('total_changes') or 0 for c in commits) / len(commits)
+        avg_files_changed = sum(len(c.get('files_changed') or []) for c in commits) / len(commits)
         return {
             'avg_total_changes': round(avg_total_changes, 2),
             'avg_files_changed': round(avg_files_changed, 2),
             'nb_commits': len(commits)
         }
     
+    @cached_metric()
     def get_total_deployments(self) -> int:
         """Total Deployments (AR)"""
         if self.entity_type == 'developer':
             return 0  # Developers don't own deployments
-        return self.deployments.count()
+        return len(self.query_memo.documents(self.deployments, ('created_at',)))
     
+    @cached_metric(relative=True)
     def get_deployment_frequency(self, period_days: int = 90) -> Dict:
         """
         Calculate deployment frequency over a period
@@ -643,9 +588,10 @@ class UnifiedMetricsService:
         
         # Get deployments in the specified period
         cutoff_date = django_timezone.now() - timedelta(days=period_days)
-        recent_deployments = self.deployments.filter(created_at__gte=cutoff_date)
-        
-        total_deployments = recent_deployments.count()
+        total_deployments = sum(
+            1 for deployment in self.query_memo.documents(self.deployments, ('created_at',))
+            if deployment.get('created_at') and self._ensure_timezone_aware(deployment['created_at']) >= cutoff_date
+        )
         
         if total_deployments == 0:
             return {
@@ -664,16 +610,18 @@ class UnifiedMetricsService:
             'period_days': period_days
         }
     
+    @cached_metric()
     def get_last_deployment_date(self):
         """Get the date of the most recent deployment"""
         if self.entity_type == 'developer':
             return None  # Developers don't own deployments
         
         # Get the most recent deployment
-        latest_deployment = self.deployments.order_by('-created_at').first()
-        return latest_deployment.created_at if latest_deployment else None
+        dates = [d['created_at'] for d in self.query_memo.documents(self.deployments, ('created_at',)) if d.get('created_at')]
+        return max(dates) if dates else None
     
     # Comprehensive metrics getter
+    @cached_metric(relative=True)
     def get_all_metrics(self) -> Dict:
         """Get all metrics for the entity"""
         # Calculate days based on date filters
@@ -684,6 +632,9 @@ class UnifiedMetricsService:
         else:
             days = 30  # Default to 30 days
         
+        # Load the commit fields of every metric at once, the methods share them
+        self.query_memo.documents(self.commits, COMMIT_METRICS_PROJECTION)
+        
         metrics = {
             # Basic stats
             'total_commits': self.get_total_commits(),
@@ -64,7 +64,7 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-
+    'analytics.middleware.QueryStatsMiddleware',
 ]
 INTERNAL_IPS = [
     # ...
@@ -213,6 +213,14 @@ GITHUB_API_TIMEOUT = int(config('GITHUB_API_TIMEOUT', default=30))
 # Ollama Configuration
 OLLAMA_HOST = config('OLLAMA_HOST', default='http://localhost:11434')
 OLLAMA_MODEL = config('OLLAMA_MODEL', default='gemma3:4b')
+OLLAMA_BATCH_SIZE = config('OLLAMA_BATCH_SIZE', default=25, cast=int)  # Commit messages per classification prompt
+OLLAMA_LABEL_CACHE_SIZE = config('OLLAMA_LABEL_CACHE_SIZE', default=10000, cast=int)  # In-process cached labels
+OLLAMA_LATENCY_BUDGET = config('OLLAMA_LATENCY_BUDGET', default=30, cast=float)  # Seconds per call before the circuit opens
+OLLAMA_FAILURE_THRESHOLD = config('OLLAMA_FAILURE_THRESHOLD', default=3, cast=int)  # Consecutive failures opening the circuit
+OLLAMA_RETRY_AFTER = config('OLLAMA_RETRY_AFTER', default=60, cast=float)  # Seconds before an open circuit probes again
+
+# Local commit type model (train_commit_model command)
+COMMIT_MODEL_DIR = Path(config('COMMIT_MODEL_DIR', default=str(BASE_DIR / 'data' / 'commit_models')))
 
 SITE_ID = 1
 
@@ -253,6 +261,23 @@ ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=1, cast=int)
 PR_METRICS_CACHE_TIMEOUT = config('PR_METRICS_CACHE_TIMEOUT', default=1, cast=int)  # 30 minutes for PR metrics
 COMMIT_METRICS_CACHE_TIMEOUT = config('COMMIT_METRICS_CACHE_TIMEOUT', default=1, cast=int) # 2 hours for commit metrics
 
+# Shared metrics cache of UnifiedMetricsService ('mongo', 'file' or 'none'),
+# invalidated by repository data versions so entries can live long
+METRICS_CACHE_BACKEND = config('METRICS_CACHE_BACKEND', default='none' if IS_TEST else 'mongo')
+METRICS_CACHE_TIMEOUT = config('METRICS_CACHE_TIMEOUT', default=7 * 24 * 3600, cast=int)  # 7 days
+METRICS_CACHE_DIR = Path(config('METRICS_CACHE_DIR', default=str(BASE_DIR / 'data' / 'metrics_cache')))  # 'file' backend
+# Repository and project pages are served from a snapshot, refreshed in the background once older than this
+PAGE_SNAPSHOT_SOFT_TTL = config('PAGE_SNAPSHOT_SOFT_TTL', default=300, cast=int)  # 5 minutes
+# Indexing completions within this delay are warmed once (repository, its projects and top developers)
+CACHE_WARMING_DELAY = config('CACHE_WARMING_DELAY', default=60, cast=int)
+CACHE_WARMING_TOP_DEVELOPERS = config('CACHE_WARMING_TOP_DEVELOPERS', default=10, cast=int)
+# Browsers reuse repository API responses this long, then revalidate them with If-None-Match
+API_CACHE_MAX_AGE = config('API_CACHE_MAX_AGE', default=60, cast=int)
+# Threads computing the sections of a project page concurrently
+PROJECT_DETAIL_MAX_WORKERS = config('PROJECT_DETAIL_MAX_WORKERS', default=4, cast=int)
+# Minutes between two refreshes of the global dashboard snapshot
+DASHBOARD_SNAPSHOT_INTERVAL = config('DASHBOARD_SNAPSHOT_INTERVAL', default=10, cast=int)
+
 SOCIALACCOUNT_LOGIN_ON_GET = True
 
 # Custom adapter to capture GitHub tokens
@@ -0,0 +1,28 @@
+import logging
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+
+def stamp_developer_ids(apps, schema_editor):
+    """Backfill developer_id on existing commits and pull requests (MongoDB), read by the developer pages"""
+    try:
+        from analytics.identity_index import restamp_developer_ids
+        modified = restamp_developer_ids()
+    except Exception as e:
+        # No MongoDB at migration time: run `manage.py stamp_developer_ids` once it is reachable
+        logger.warning(f"Could not stamp developer ids: {e}")
+        return
+    logger.info(f"Stamped {modified['commits']} commits and {modified['pull_requests']} pull requests")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("developers", "0002_developer_github_organizations_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(stamp_developer_ids, migrations.RunPython.noop),
+    ]
@@ -15,8 +15,9 @@ import logging
 import uuid
 
 from analytics.models import Developer, DeveloperAlias
+from analytics.identity_index import refresh_developer_stamps
+from analytics.developer_profile_service import DeveloperProfileService
 
-from analytics.commit_classifier import get_commit_type_stats
 from .github_teams_service import GitHubTeamsService
 logger = logging.getLogger(__name__)
 
@@ -585,6 +586,7 @@ def merge_developers(request):
         # Perform the merge
         try:
             # For each other developer, create aliases and link them to the primary developer
+            merged_emails = []
             for other_dev in other_developers:
                 # Create alias for the other developer's primary identity
                 alias = DeveloperAlias(
@@ -596,16 +598,21 @@ def merge_developers(request):
                     commit_count=0  # Will be calculated from commits
                 )
                 alias.save()
+                merged_emails.append(alias.email)
                 
                 # Move all existing aliases of the other developer to the primary developer
                 existing_aliases = DeveloperAlias.objects(developer=other_dev)
                 for existing_alias in existing_aliases:
                     existing_alias.developer = primary_developer
                     existing_alias.save()
+                    merged_emails.append(existing_alias.email)
                 
                 # Delete the other developer
                 other_dev.delete()
             
+            # Commits and PRs of the merged aliases now belong to the primary developer
+            refresh_developer_stamps(merged_emails)
+            
             return JsonResponse({
                 'success': True,
                 'message': f'Successfully merged {len(other_developers)} developer(s) into {primary_developer.primary_name}'
@@ -623,263 +630,37 @@ def merge_developers(request):
         return _error_response('Unexpected error while merging developers', exc=e)
 
 
-def _calculate_detailed_quality_metrics(commits):
-    """Calculate detailed quality metrics for a developer's commits"""
-    if not commits:
-        return {
-            'total_commits': 0,
-            'real_code_commits': 0,
-            'real_code_ratio': 0,
-            'suspicious_commits': 0,
-            'suspicious_ratio': 0,
-            'doc_only_commits': 0,
-            'doc_only_ratio': 0,
-            'config_only_commits': 0,
-            'config_only_ratio': 0,
-            'micro_commits': 0,
-            'micro_commits_ratio': 0,
-            'no_ticket_commits': 0,
-            'no_ticket_ratio': 0,
-            'avg_code_quality': 0,
-            'avg_impact': 0,
-            'avg_complexity': 0
-        }
-    
-    total_commits = commits.count()
-    real_code_commits = 0
-    suspicious_commits = 0
-    doc_only_commits = 0
-    config_only_commits = 0
-    micro_commits = 0
-    no_ticket_commits = 0
-    quality_scores = []
-    impact_scores = []
-    complexity_scores = []
-    
-    for commit in commits:
-        # Check for real code (has code files)
-        has_code_files = False
-        has_doc_only = True
-        has_config_only = True
-        
-        for file_change in commit.files_changed:
-            filename = file_change.filename.lower()
-            
-            # Check for code files
-            if any(ext in filename for ext in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs', '.php', '.rb']):
-                has_code_files = True
-                has_doc_only = False
-                has_config_only = False
-            
-            # Check for test files
-            elif any(pattern in filename for pattern in ['test', 'spec', 'specs', '_test.', '.test.']):
-                has_code_files = True
-                has_doc_only = False
-                has_config_only = False
-            
-            # Check for documentation files
-            elif any(ext in filename for ext in ['.md', '.txt', '.rst', '.adoc', 'readme', 'docs/', 'documentation/']):
-                has_doc_only = has_doc_only and not has_code_files
-            
-            # Check for configuration files
-            elif any(ext in filename for ext in ['.json', '.yaml', '.yml', '.toml', '.ini', '.conf', '.config', 'package.json', 'requirements.txt', 'pom.xml', 'build.gradle']):
-                has_config_only = has_config_only and not has_code_files
-        
-        # Count different types of commits
-        if has_code_files:
-            real_code_commits += 1
-        
-        if has_doc_only:
-            doc_only_commits += 1
-        
-        if has_config_only:
-            config_only_commits += 1
-        
-        # Check for micro commits (≤2 changes)
-        if commit.total_changes <= 2:
-            micro_commits += 1
-        
-        # Check for no ticket reference
-        if not re.search(r'#[0-9]+', commit.message):
-            no_ticket_commits += 1
-        
-        # Detect suspicious patterns
-        is_suspicious = False
-        
-        # Micro commit (≤1 changes, not 0)
-        if commit.total_changes <= 1 and commit.total_changes > 0:
-            is_suspicious = True
-        
-        # No ticket reference (only if project uses ticket system)
-        # Commented out because most commits don't have ticket references
-        # if not re.search(r'#[0-9]+', commit.message):
-        #     is_suspicious = True
-        
-        # Only documentation (not suspicious if it's a real documentation commit)
-        if has_doc_only and commit.total_changes > 5:
-            is_suspicious = True
-        
-        # Only configuration (not suspicious if it's a real config change)
-        if has_config_only and commit.total_changes > 5:
-            is_suspicious = True
-        
-        # Formatting only (message contains format + small changes)
-        if re.search(r'format|style|indent|whitespace', commit.message.lower()) and commit.total_changes <= 5:
-            is_suspicious = True
-        
-        if is_suspicious:
-            suspicious_commits += 1
-        
-        # Calculate quality scores (simplified)
-        code_quality = 50  # Base score
-        if has_code_files:
-            code_quality += 40
-        if commit.total_changes > 10:
-            code_quality += 15
-        quality_scores.append(min(100, code_quality))
-        
-        # Calculate impact score
-        impact_score = 50  # Base score
-        if commit.total_changes > 20:
-            impact_score += 40
-        elif commit.total_changes > 10:
-            impact_score += 30
-        elif commit.total_changes > 5:
-            impact_score += 20
-        impact_scores.append(min(100, impact_score))
-        
-        # Calculate complexity score
-        complexity_score = 30  # Base score
-        if commit.commit_type == 'feature':
-            complexity_score += 40
-        elif commit.commit_type == 'fix':
-            complexity_score += 35
-        elif commit.commit_type == 'refactor':
-            complexity_score += 30
-        complexity_scores.append(min(100, complexity_score))
-    
-    # Calculate ratios
-    real_code_ratio = (real_code_commits / total_commits * 100) if total_commits > 0 else 0
-    suspicious_ratio = (suspicious_commits / total_commits * 100) if total_commits > 0 else 0
-    doc_only_ratio = (doc_only_commits / total_commits * 100) if total_commits > 0 else 0
-    config_only_ratio = (config_only_commits / total_commits * 100) if total_commits > 0 else 0
-    micro_commits_ratio = (micro_commits / total_commits * 100) if total_commits > 0 else 0
-    no_ticket_ratio = (no_ticket_commits / total_commits * 100) if total_commits > 0 else 0
-    
-    # Calculate averages
-    avg_code_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
-    avg_impact = sum(impact_scores) / len(impact_scores) if impact_scores else 0
-    avg_complexity = sum(complexity_scores) / len(complexity_scores) if complexity_scores else 0
-    
-    return {
-        'total_commits': total_commits,
-        'real_code_commits': real_code_commits,
-        'real_code_ratio': round(real_code_ratio, 1),
-        'suspicious_commits': suspicious_commits,
-        'suspicious_ratio': round(suspicious_ratio, 1),
-        'doc_only_commits': doc_only_commits,
-        'doc_only_ratio': round(doc_only_ratio, 1),
-        'config_only_commits': config_only_commits,
-        'config_only_ratio': round(config_only_ratio, 1),
-        'micro_commits': micro_commits,
-        'micro_commits_ratio': round(micro_commits_ratio, 1),
-        'no_ticket_commits': no_ticket_commits,
-        'no_ticket_ratio': round(no_ticket_ratio, 1),
-        'avg_code_quality': round(avg_code_quality, 1),
-        'avg_impact': round(avg_impact, 1),
-        'avg_complexity': round(avg_complexity, 1)
-    }
-
-
-def _calculate_commit_type_distribution(commits):
-    """Calculate commit type distribution for a developer, with ratios and status fields"""
-    return get_commit_type_stats(commits)
-
-
-def _calculate_quality_metrics_by_month(commits):
-    """Calculate quality metrics by month for the last 12 months"""
-    if not commits:
-        return {
-            'labels': [],
-            'datasets': []
+def _build_activity_chart_data(profile):
+    """Bubble chart datasets (days ago x local hour) of the last 365 days, one per repository"""
+    # Color palette (daisyUI green, blue, orange, purple, pink, etc.)
+    palette = [
+        {'bg': 'rgba(16, 185, 129, 0.6)', 'border': 'rgba(16, 185, 129, 1)'}, # green
+        {'bg': 'rgba(59, 130, 246, 0.6)', 'border': 'rgba(59, 130, 246, 1)'}, # blue
+        {'bg': 'rgba(245, 158, 11, 0.6)', 'border': 'rgba(245, 158, 11, 1)'}, # orange
+        {'bg': 'rgba(139, 92, 246, 0.6)', 'border': 'rgba(139, 92, 246, 1)'}, # purple
+        {'bg': 'rgba(236, 72, 153, 0.6)', 'border': 'rgba(236, 72, 153, 1)'}, # pink
+        {'bg': 'rgba(34, 197, 94, 0.6)', 'border': 'rgba(34, 197, 94, 1)'},   # emerald
+    ]
+    chart_data = []
+    for i, (repo, bubbles) in enumerate(profile.activity_bubbles().items()):
+        color = palette[i % len(palette)]
+        dataset = {
+            'label': repo,
+            'data': [],
+            'backgroundColor': color['bg'],
+            'borderColor': color['border'],
+            'borderWidth': 1
         }
-    
-    # Get commits from the last 12 months
-    now = datetime.now(timezone.utc)
-    months_data = {}
-    
-    for i in range(12):
-        month_start = now - timedelta(days=30 * (i + 1))
-        month_end = now - timedelta(days=30 * i)
-        month_key = month_start.strftime('%Y-%m')
-        
-        month_commits = commits.filter(
-            authored_date__gte=month_start,
-            authored_date__lt=month_end
-        )
-        
-        if month_commits.count() > 0:
-            # Calculate average scores for this month
-            quality_scores = []
-            impact_scores = []
-            complexity_scores = []
-            
-            for commit in month_commits:
-                # Simplified quality calculation
-                quality_score = 50  # Base
-                if commit.total_changes > 10:
-                    quality_score += 20
-                quality_scores.append(min(100, quality_score))
-                
-                impact_score = 40  # Base
-                if commit.total_changes > 20:
-                    impact_score += 30
-                elif commit.total_changes > 10:
-                    impact_score += 20
-                impact_scores.append(min(100, impact_score))
-                
-                complexity_score = 30  # Base
-                if commit.commit_type == 'feature':
-                    complexity_score += 30
-                elif commit.commit_type == 'fix':
-                    complexity_score += 25
-                complexity_scores.append(min(100, complexity_score))
-            
-            months_data[month_key] = {
-                'quality': sum(quality_scores) / len(quality_scores) if quality_scores else 0,
-                'impact': sum(impact_scores) / len(impact_scores) if impact_scores else 0,
-                'complexity': sum(complexity_scores) / len(complexity_scores) if complexity_scores else 0
-            }
-    
-    # Sort months chronologically
-    sorted_months = sorted(months_data.keys())
-    
-    return {
-        'labels': sorted_months,
-        'datasets': [
-            {
-                'label': 'Code Quality',
-                'data': [months_data[month]['quality'] for month in sorted_months],
-                'borderColor': '#10B981',
-                'backgroundColor': 'rgba(16, 185, 129, 0.1)',
-                'tension': 0.4
-            },
-            {
-                'label': 'Impact Score',
-                'data': [months_data[month]['impact'] for month in sorted_months],
-                'borderColor': '#3B82F6',
-                'backgroundColor': 'rgba(59, 130, 246, 0.1)',
-                'tension': 0.4
-            },
-            {
-                'label': 'Complexity Score',
-                'data': [months_data[month]['complexity'] for month in sorted_months],
-                'borderColor': '#F59E0B',
-                'backgroundColor': 'rgba(245, 158, 11, 0.1)',
-                'tension': 0.4
-            }
-        ]
-    }
+        for (days_ago, hour), data in bubbles.items():
+            dataset['data'].append({
+                'x': days_ago,
+                'y': hour,
+                'r': min(5 + data['commits'] * 2, 20),
+                'commit_count': data['commits'],
+                'changes': data['changes']
+            })
+        chart_data.append(dataset)
+    return chart_data
 
 
 @login_required
@@ -919,19 +700,11 @@ def developer_detail(request, developer_id):
             'aliases': aliases
         })()
         
-        # Get commits for this developer (all applications)
-        from analytics.models import Commit
-        alias_emails = [alias.email for alias in aliases]
-        all_commits = Commit.objects.filter(author_email__in=alias_emails)
-
-        # Calculate detailed quality metrics
-        detailed_quality_metrics = _calculate_detailed_quality_metrics(all_commits)
-        
-        # Calculate commit type distribution
-        commit_type_data = _calculate_commit_type_distribution(all_commits)
-        
-        # Calculate quality metrics by month
-        quality_metrics_by_month = _calculate_quality_metrics_by_month(all_commits)
+        # Materialized aggregates of the developer's commits (all applications)
+        profile = DeveloperProfileService.get_profile(str(developer.id))
+        detailed_quality_metrics = profile.detailed_quality_metrics()
+        commit_type_data = profile.commit_type_distribution()
+        quality_metrics_by_month = profile.quality_metrics_by_month()
         
         # Format polar chart data for Chart.js
         polar_chart_data = []
@@ -947,61 +720,14 @@ def developer_detail(request, developer_id):
         if not polar_chart_data:
             polar_chart_data = []
 
-        # --- Correction: Activity Heatmap chart_data ---
-        # Only keep commits from the last 365 days
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
-        cutoff = now - timedelta(days=365)
-        commits_365d = [c for c in all_commits if c.authored_date and c.authored_date.replace(tzinfo=None) >= cutoff]
-        # Group by repo, then by (days_ago, hour)
-        repo_bubbles = {}
-        for commit in commits_365d:
-            repo = commit.repository_full_name or 'unknown'
-            # Use the robust timezone-aware method
-            commit_dt = commit.get_authored_date_in_timezone()
-            days_ago = (now.date() - commit_dt.date()).days
-            hour = commit_dt.hour
-            key = (days_ago, hour)
-            if repo not in repo_bubbles:
-                repo_bubbles[repo] = {}
-            if key not in repo_bubbles[repo]:
-                repo_bubbles[repo][key] = {'commits': 0, 'changes': 0}
-            repo_bubbles[repo][key]['commits'] += 1
-            repo_bubbles[repo][key]['changes'] += (commit.additions or 0) + (commit.deletions or 0)
-        # Color palette (daisyUI green, blue, orange, purple, pink, etc.)
-        palette = [
-            {'bg': 'rgba(16, 185, 129, 0.6)', 'border': 'rgba(16, 185, 129, 1)'}, # green
-            {'bg': 'rgba(59, 130, 246, 0.6)', 'border': 'rgba(59, 130, 246, 1)'}, # blue
-            {'bg': 'rgba(245, 158, 11, 0.6)', 'border': 'rgba(245, 158, 11, 1)'}, # orange
-            {'bg': 'rgba(139, 92, 246, 0.6)', 'border': 'rgba(139, 92, 246, 1)'}, # purple
-            {'bg': 'rgba(236, 72, 153, 0.6)', 'border': 'rgba(236, 72, 153, 1)'}, # pink
-            {'bg': 'rgba(34, 197, 94, 0.6)', 'border': 'rgba(34, 197, 94, 1)'},   # emerald
-        ]
-        chart_data = []
-        for i, (repo, bubbles) in enumerate(repo_bubbles.items()):
-            color = palette[i % len(palette)]
-            dataset = {
-                'label': repo,
-                'data': [],
-                'backgroundColor': color['bg'],
-                'borderColor': color['border'],
-                'borderWidth': 1
-            }
-            for (days_ago, hour), data in bubbles.items():
-                dataset['data'].append({
-                    'x': days_ago,
-                    'y': hour,
-                    'r': min(5 + data['commits'] * 2, 20),
-                    'commit_count': data['commits'],
-                    'changes': data['changes']
-                })
-            chart_data.append(dataset)
-        # --- Fin correction ---
+        # Activity heatmap of the last 365 days
+        chart_data = _build_activity_chart_data(profile)
 
         context = {
             'developer': developer_for_template,
             'developer_id': str(developer.id),
             'aliases': aliases,
-            'commit_frequency': analytics.get_developer_commit_frequency(all_commits),
+            'commit_frequency': profile.commit_frequency(),
             'commit_quality': developer_stats.get('commit_quality', {}),
             'quality_metrics': detailed_quality_metrics,
             'first_commit': None,  # Will be set if available
@@ -1020,12 +746,12 @@ def developer_detail(request, developer_id):
         # Set first and last commit if available
         if developer_stats.get('first_commit_date'):
             from analytics.models import Commit
-            first_commit = Commit.objects.filter(author_email__in=[alias.email for alias in aliases]).order_by('authored_date').first()
+            first_commit = Commit.objects.filter(developer_id=str(developer.id)).order_by('authored_date').first()
             if first_commit:
                 context['first_commit'] = first_commit
         if developer_stats.get('last_commit_date'):
             from analytics.models import Commit
-            last_commit = Commit.objects.filter(author_email__in=[alias.email for alias in aliases]).order_by('-authored_date').first()
+            last_commit = Commit.objects.filter(developer_id=str(developer.id)).order_by('-authored_date').first()
             if last_commit:
                 context['last_commit'] = last_commit
     else:
@@ -1106,6 +832,7 @@ def remove_developer_alias(request, developer_id, alias_id):
         # Disassociate the alias from the developer (don't delete it)
         alias.developer = None
         alias.save()
+        refresh_developer_stamps([alias_email])
         
         return JsonResponse({
             'success': True,
@@ -1178,6 +905,7 @@ def create_developer_from_aliases(request):
         
         # Create aliases for all selected identities
         aliases_created = 0
+        created_emails = []
         skipped_aliases = []
         
         for alias_data in aliases_data:
@@ -1232,6 +960,10 @@ def create_developer_from_aliases(request):
             )
             alias.save()
             aliases_created += 1
+            created_emails.append(normalized_email)
+        
+        if created_emails:
+            refresh_developer_stamps(created_emails)
         
         # Prepare response message
         message = f'Successfully {action} developer "{developer_name}" with {aliases_created} new aliases'
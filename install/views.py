@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.contrib import messages
@@ -100,6 +101,7 @@ def setup_scheduled_tasks():
     periodic_tasks = [
         ('analytics.services.process_pending_rate_limit_restarts', 5),  # Every 5 minutes
         ('analytics.tasks.fetch_all_pull_requests_task', 180),         # Every 3 hours (180 minutes)
+        ('analytics.dashboard_snapshot.refresh_dashboard_snapshot', settings.DASHBOARD_SNAPSHOT_INTERVAL),  # Dashboard figures
     ]
     
     success_count = 0
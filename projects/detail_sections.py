@@ -0,0 +1,708 @@
+"""
+Sections of the project detail page
+
+Each section computes an independent part of the page context from the
+ProjectScope (date range and repositories). The sections are run
+concurrently by compute_project_detail_context, see analytics.page_sections.
+"""
+import json
+import statistics
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List
+
+from django.utils import timezone
+
+from analytics.models import Commit, Deployment, PullRequest, Release
+from analytics.page_sections import Section
+
+# Doughnut colors for commit types
+DOUGHNUT_COLORS = {
+    'fix': '#4caf50',
+    'feature': '#2196f3',
+    'docs': '#ffeb3b',
+    'refactor': '#ff9800',
+    'test': '#9c27b0',
+    'style': '#00bcd4',
+    'chore': '#607d8b',
+    'other': '#bdbdbd',
+}
+
+# Color palette for repositories in the bubble chart
+BUBBLE_PALETTE = [
+    {'bg': 'rgba(239, 68, 68, 0.6)', 'border': 'rgba(239, 68, 68, 1)'},   # red
+    {'bg': 'rgba(59, 130, 246, 0.6)', 'border': 'rgba(59, 130, 246, 1)'}, # blue
+    {'bg': 'rgba(245, 158, 11, 0.6)', 'border': 'rgba(245, 158, 11, 1)'}, # orange
+    {'bg': 'rgba(139, 92, 246, 0.6)', 'border': 'rgba(139, 92, 246, 1)'}, # purple
+    {'bg': 'rgba(236, 72, 153, 0.6)', 'border': 'rgba(236, 72, 153, 1)'}, # pink
+    {'bg': 'rgba(34, 197, 94, 0.6)', 'border': 'rgba(34, 197, 94, 1)'},   # emerald
+]
+
+# Color palette for repositories in the codebase size chart (same as developers view)
+CODEBASE_PALETTE = [
+    {'bg': 'rgba(16, 185, 129, 0.6)', 'border': 'rgba(16, 185, 129, 1)'},  # green
+    {'bg': 'rgba(59, 130, 246, 0.6)', 'border': 'rgba(59, 130, 246, 1)'},  # blue
+    {'bg': 'rgba(245, 158, 11, 0.6)', 'border': 'rgba(245, 158, 11, 1)'},  # orange
+    {'bg': 'rgba(139, 92, 246, 0.6)', 'border': 'rgba(139, 92, 246, 1)'},  # purple
+    {'bg': 'rgba(236, 72, 153, 0.6)', 'border': 'rgba(236, 72, 153, 1)'},  # pink
+    {'bg': 'rgba(34, 197, 94, 0.6)', 'border': 'rgba(34, 197, 94, 1)'},    # emerald
+]
+
+
+def ensure_timezone_aware(dt):
+    """Ensure a datetime is timezone-aware (UTC)"""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=dt_timezone.utc)
+    return dt
+
+
+class ProjectScope:
+    """Date range and repositories shared by the sections of a project page"""
+
+    def __init__(self, project, start_str, end_str):
+        self.project = project
+        self.start_str = start_str
+        self.end_str = end_str
+
+        # Parse dates if provided
+        if start_str and end_str:
+            try:
+                self.start_dt = datetime.strptime(start_str, '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+                # Add one day to end_date to include the full day
+                self.end_dt = datetime.strptime(end_str, '%Y-%m-%d').replace(tzinfo=dt_timezone.utc) + timedelta(days=1)
+            except ValueError:
+                # Default to last 30 days if invalid dates
+                self.end_dt = timezone.now()
+                self.start_dt = self.end_dt - timedelta(days=30)
+        else:
+            # Default to last 30 days
+            self.end_dt = timezone.now()
+            self.start_dt = self.end_dt - timedelta(days=30)
+
+        # A start date more than 5 years ago is the "All Time" quick select
+        self.is_all_time = bool(start_str and end_str) and timezone.now().year - self.start_dt.year > 5
+        # Custom range picked by the user (not the default 30 days nor All Time)
+        self.is_custom_range = bool(start_str and end_str) and not self.is_all_time
+
+        # Evaluated once, the sections only read it
+        self.repositories = list(project.repositories.all())
+        self.repo_full_names = [repo.full_name for repo in self.repositories]
+
+        self._lock = threading.Lock()
+        self._recent_commits = None
+
+    @property
+    def recent_commits_query(self):
+        """Commits of the project in the date range"""
+        return Commit.objects.filter(
+            repository_full_name__in=self.repo_full_names,
+            authored_date__gte=self.start_dt,
+            authored_date__lt=self.end_dt,
+            authored_date__ne=None
+        )
+
+    def recent_commits(self) -> List:
+        """Commits of the project in the date range, loaded once for all the sections"""
+        with self._lock:
+            if self._recent_commits is None:
+                self._recent_commits = list(self.recent_commits_query)
+            return self._recent_commits
+
+    def in_period(self, field: str) -> Dict:
+        """Filter of a date field on the date range, or on any date for All Time"""
+        if self.is_all_time:
+            return {f'{field}__ne': None}
+        return {f'{field}__gte': self.start_dt, f'{field}__lt': self.end_dt, f'{field}__ne': None}
+
+    @property
+    def days_diff(self) -> int:
+        return (self.end_dt - self.start_dt).days
+
+
+def commit_totals(scope: ProjectScope) -> Dict:
+    """Total commits, average commits per day and commit change stats"""
+    recent_commits = scope.recent_commits()
+    if scope.is_all_time:
+        # "All Time" - show all commits for the project
+        total_commits = Commit.objects.filter(**scope.in_period('authored_date'),
+                                              repository_full_name__in=scope.repo_full_names).count()
+    else:
+        total_commits = len(recent_commits)
+
+    days_diff = scope.days_diff
+    total_changes = sum(commit.additions + commit.deletions for commit in recent_commits if commit.additions and commit.deletions)
+    total_files = sum(len(commit.files_changed) for commit in recent_commits if commit.files_changed)
+    return {
+        'total_commits': total_commits,
+        'commit_frequency': {
+            'avg_commits_per_day': round(total_commits / days_diff, 1) if days_diff > 0 else 0
+        },
+        'commit_change_stats': {
+            'avg_total_changes': round(total_changes / total_commits, 0) if total_commits > 0 else 0,
+            'avg_files_changed': round(total_files / total_commits, 1) if total_commits > 0 else 0
+        },
+    }
+
+
+def release_deployment_totals(scope: ProjectScope) -> Dict:
+    """Releases and deployments of the period, and their frequencies over the date range"""
+    repositories = {'repository_full_name__in': scope.repo_full_names}
+    recent_releases = Release.objects.filter(
+        **repositories, published_at__gte=scope.start_dt, published_at__lt=scope.end_dt, published_at__ne=None
+    ).count()
+    recent_deployments = Deployment.objects.filter(
+        **repositories, created_at__gte=scope.start_dt, created_at__lt=scope.end_dt, created_at__ne=None
+    ).count()
+    if scope.is_all_time:
+        total_releases = Release.objects.filter(**repositories, **scope.in_period('published_at')).count()
+        total_deployments = Deployment.objects.filter(**repositories, **scope.in_period('created_at')).count()
+    else:
+        total_releases = recent_releases
+        total_deployments = recent_deployments
+
+    months_diff = scope.days_diff / 30
+    weeks_diff = scope.days_diff / 7
+    return {
+        'total_releases': total_releases,
+        'total_deployments': total_deployments,
+        'release_frequency': {
+            'releases_per_month': round(recent_releases / months_diff, 1) if months_diff > 0 else 0
+        },
+        'deployment_frequency': {
+            'deployments_per_week': round(recent_deployments / weeks_diff, 1) if weeks_diff > 0 else 0
+        },
+    }
+
+
+def pr_cycle_time(scope: ProjectScope) -> Dict:
+    """PR cycle time of the PRs opened in the date range"""
+    prs = PullRequest.objects.filter(
+        repository_full_name__in=scope.repo_full_names,
+        created_at__ne=None,
+        closed_at__ne=None,
+        created_at__gte=scope.start_dt,
+        created_at__lt=scope.end_dt
+    ).only('created_at', 'closed_at').as_pymongo()
+    pr_cycle_times = sorted(
+        (pr['closed_at'] - pr['created_at']).total_seconds() / 3600 for pr in prs
+    )
+
+    if not pr_cycle_times:
+        return {'pr_cycle_time_median': 0, 'pr_cycle_time_min': 0, 'pr_cycle_time_max': 0, 'pr_cycle_time_count': 0}
+    return {
+        'pr_cycle_time_median': round(pr_cycle_times[len(pr_cycle_times) // 2], 1),
+        'pr_cycle_time_min': round(min(pr_cycle_times), 1),
+        'pr_cycle_time_max': round(max(pr_cycle_times), 1),
+        'pr_cycle_time_count': len(pr_cycle_times),
+    }
+
+
+def developer_count(scope: ProjectScope) -> Dict:
+    """Total developers using grouped developers"""
+    from analytics.developer_grouping_service import DeveloperGroupingService
+
+    if scope.is_custom_range:
+        project_commits = Commit.objects.filter(
+            repository_full_name__in=scope.repo_full_names,
+            authored_date__gte=scope.start_dt,
+            authored_date__lt=scope.end_dt,
+            author_email__ne=None
+        )
+    elif scope.is_all_time:
+        project_commits = Commit.objects.filter(repository_full_name__in=scope.repo_full_names, author_email__ne=None)
+    else:
+        project_commits = scope.recent_commits_query
+    return {'total_developers': DeveloperGroupingService().get_all_developers_for_commits(project_commits)}
+
+
+def repository_metrics(scope: ProjectScope, repo) -> Dict:
+    """All metrics of one repository of the project over the date range"""
+    from analytics.unified_metrics_service import UnifiedMetricsService
+
+    metrics_service = UnifiedMetricsService('repository', repo.id, start_date=scope.start_dt, end_date=scope.end_dt)
+    return {'metrics': metrics_service.get_all_metrics()}
+
+
+def aggregate_repository_metrics(repository_results: List[Dict]) -> Dict:
+    """Aggregate the metrics of the repositories of the project, in repository order"""
+    all_metrics_aggregated = {}
+    for result in repository_results:
+        for key, value in result['metrics'].items():
+            if key == 'commit_frequency':
+                # The project commit frequency is computed from all its commits
+                continue
+
+            if key not in all_metrics_aggregated:
+                all_metrics_aggregated[key] = value
+            elif isinstance(value, dict):
+                # Merge dictionaries
+                if isinstance(all_metrics_aggregated[key], dict):
+                    for sub_key, sub_value in value.items():
+                        if sub_key in all_metrics_aggregated[key]:
+                            if isinstance(sub_value, (int, float)) and isinstance(all_metrics_aggregated[key][sub_key], (int, float)):
+                                all_metrics_aggregated[key][sub_key] += sub_value
+                            else:
+                                # For non-numeric values, keep the latest
+                                all_metrics_aggregated[key][sub_key] = sub_value
+                        else:
+                            all_metrics_aggregated[key][sub_key] = sub_value
+            elif isinstance(value, (int, float)):
+                # Sum numeric values
+                all_metrics_aggregated[key] += value
+            elif isinstance(value, list):
+                # Extend lists
+                all_metrics_aggregated[key].extend(value)
+
+    release_frequency_advanced = all_metrics_aggregated.get('release_frequency', {})
+    commit_quality = all_metrics_aggregated.get('commit_quality', {})
+    pr_health_metrics = all_metrics_aggregated.get('pr_health_metrics', {})
+    pr_cycle_time = all_metrics_aggregated.get('pr_cycle_time', {})
+
+    # Round advanced metrics for better readability
+    if release_frequency_advanced:
+        release_frequency_advanced['releases_per_month'] = round(release_frequency_advanced.get('releases_per_month', 0), 1)
+        release_frequency_advanced['releases_per_week'] = round(release_frequency_advanced.get('releases_per_week', 0), 1)
+
+    if commit_quality:
+        # Recalculate percentages correctly based on aggregated totals
+        commit_quality_total = commit_quality.get('total_commits', 0)
+        if commit_quality_total > 0:
+            explicit_commits = commit_quality.get('explicit_commits', 0)
+            generic_commits = commit_quality.get('generic_commits', 0)
+
+            commit_quality['explicit_ratio'] = round((explicit_commits / commit_quality_total * 100), 1)
+            commit_quality['generic_ratio'] = round((generic_commits / commit_quality_total * 100), 1)
+        else:
+            commit_quality['explicit_ratio'] = 0
+            commit_quality['generic_ratio'] = 0
+
+    if pr_health_metrics:
+        # Recalculate percentages correctly based on aggregated totals
+        total_prs = pr_health_metrics.get('total_prs', 0)
+        if total_prs > 0:
+            pr_health_metrics['merged_prs_percentage'] = round((pr_health_metrics.get('merged_prs', 0) / total_prs * 100), 1)
+            pr_health_metrics['self_merged_rate'] = round((pr_health_metrics.get('self_merged_prs', 0) / total_prs * 100), 1)
+            pr_health_metrics['prs_without_review_rate'] = round((pr_health_metrics.get('prs_without_review', 0) / total_prs * 100), 1)
+            pr_health_metrics['old_open_prs_rate'] = round((pr_health_metrics.get('old_open_prs', 0) / total_prs * 100), 1)
+            pr_health_metrics['open_prs_percentage'] = round((pr_health_metrics.get('open_prs', 0) / total_prs * 100), 1)
+        else:
+            pr_health_metrics['merged_prs_percentage'] = 0
+            pr_health_metrics['self_merged_rate'] = 0
+            pr_health_metrics['prs_without_review_rate'] = 0
+            pr_health_metrics['old_open_prs_rate'] = 0
+            pr_health_metrics['open_prs_percentage'] = 0
+
+        # Round other metrics
+        pr_health_metrics['avg_merge_time_hours'] = round(pr_health_metrics.get('avg_merge_time_hours', 0), 1)
+        pr_health_metrics['median_merge_time_hours'] = round(pr_health_metrics.get('median_merge_time_hours', 0), 1)
+
+    return {
+        'release_frequency_advanced': release_frequency_advanced,
+        'commit_quality': commit_quality,
+        'pr_health_metrics': pr_health_metrics,
+        'activity_heatmap': all_metrics_aggregated.get('commit_activity_by_hour', {}),
+        'lines_added': all_metrics_aggregated.get('lines_added', 0),
+        'pr_cycle_time_avg': round(pr_cycle_time.get('avg_cycle_time_hours', 0), 1),
+    }
+
+
+def commit_frequency(scope: ProjectScope) -> Dict:
+    """Commit frequency scores of the whole project"""
+    # Sort commits by date
+    all_project_commits = sorted(scope.recent_commits(), key=lambda x: x.authored_date if x.authored_date else timezone.now())
+    if not all_project_commits:
+        # No commits found, provide empty metrics
+        return {'commit_frequency_advanced': {
+            'avg_commits_per_day': 0,
+            'recent_activity_score': 0,
+            'consistency_score': 0,
+            'overall_frequency_score': 0,
+            'commits_last_30_days': 0,
+            'commits_last_90_days': 0,
+            'days_since_last_commit': None,
+            'active_days': 0,
+            'total_days': 0,
+            'avg_gap_between_commits': 0,
+            'gap_consistency': 0
+        }}
+
+    now = timezone.now()
+    first_commit = all_project_commits[0]
+    last_commit = all_project_commits[-1]
+
+    # Calculate total time span
+    total_days = (last_commit.authored_date - first_commit.authored_date).days + 1
+
+    # Calculate average commits per day
+    avg_commits_per_day = len(all_project_commits) / total_days if total_days > 0 else 0
+
+    # Calculate recent activity (last 30 and 90 days)
+    cutoff_30 = now - timedelta(days=30)
+    cutoff_90 = now - timedelta(days=90)
+
+    commits_last_30_days = sum(1 for commit in all_project_commits if commit.authored_date and ensure_timezone_aware(commit.authored_date) >= cutoff_30)
+    commits_last_90_days = sum(1 for commit in all_project_commits if commit.authored_date and ensure_timezone_aware(commit.authored_date) >= cutoff_90)
+
+    # Calculate days since last commit
+    days_since_last_commit = (now - ensure_timezone_aware(last_commit.authored_date)).days if last_commit.authored_date else 0
+
+    # Calculate activity consistency
+    # Group commits by day to find active days
+    active_days = set()
+    for commit in all_project_commits:
+        if commit.authored_date:
+            active_days.add(commit.authored_date.date())
+
+    active_days_count = len(active_days)
+    consistency_ratio = active_days_count / total_days if total_days > 0 else 0
+
+    # Calculate gaps between commits (for consistency)
+    gaps = []
+    for i in range(1, len(all_project_commits)):
+        if all_project_commits[i].authored_date and all_project_commits[i-1].authored_date:
+            gap = (all_project_commits[i].authored_date - all_project_commits[i-1].authored_date).days
+            gaps.append(gap)
+
+    avg_gap = statistics.mean(gaps) if gaps else 0
+    gap_std = statistics.stdev(gaps) if len(gaps) > 1 else 0
+
+    # Recent activity score (0-100)
+    # Based on commits in last 30 days vs 90 days
+    if commits_last_90_days > 0:
+        recent_activity_ratio = commits_last_30_days / commits_last_90_days
+        recent_activity_score = min(recent_activity_ratio * 100, 100)
+    else:
+        recent_activity_score = 0
+
+    # Consistency score (0-100)
+    consistency_score = min(consistency_ratio * 100, 100)
+
+    # Overall frequency score (0-100)
+    # Weighted combination of different factors
+    weights = {
+        'avg_commits_per_day': 0.3,
+        'recent_activity': 0.4,
+        'consistency': 0.3
+    }
+
+    # Normalize avg_commits_per_day (0-5 commits/day = 0-100 score)
+    normalized_avg = min(avg_commits_per_day * 20, 100)
+
+    overall_frequency_score = (
+        normalized_avg * weights['avg_commits_per_day'] +
+        recent_activity_score * weights['recent_activity'] +
+        consistency_score * weights['consistency']
+    )
+
+    return {'commit_frequency_advanced': {
+        'avg_commits_per_day': round(avg_commits_per_day, 2),
+        'recent_activity_score': round(recent_activity_score, 1),
+        'consistency_score': round(consistency_score, 1),
+        'overall_frequency_score': round(overall_frequency_score, 1),
+        'commits_last_30_days': commits_last_30_days,
+        'commits_last_90_days': commits_last_90_days,
+        'days_since_last_commit': days_since_last_commit,
+        'active_days': active_days_count,
+        'total_days': total_days,
+        'avg_gap_between_commits': round(avg_gap, 1),
+        'gap_consistency': round(gap_std, 1)
+    }}
+
+
+def commit_types(scope: ProjectScope) -> Dict:
+    """Commit type distribution and ratios of the commits in the date range"""
+    from analytics.commit_classifier import get_commit_type_stats
+
+    commit_types = get_commit_type_stats(scope.recent_commits())
+
+    # Recalculate ratios and statuses from the aggregated counts
+    counts = commit_types.get('counts', {})
+    commit_types_total = sum(counts.values())
+
+    if commit_types_total > 0:
+        feature_count = counts.get('feature', 0)
+        fix_count = counts.get('fix', 0)
+        test_count = counts.get('test', 0)
+        chore_count = counts.get('chore', 0)
+        docs_count = counts.get('docs', 0)
+
+        # Feature-to-Fix Ratio: feature/fix > 1 is good
+        if fix_count > 0:
+            feature_fix_ratio = feature_count / fix_count
+        else:
+            feature_fix_ratio = feature_count if feature_count > 0 else 0
+
+        # Test-to-Feature Ratio: test/feature >= 0.3 is good
+        if feature_count > 0:
+            test_feature_ratio = test_count / feature_count
+        else:
+            test_feature_ratio = 0
+
+        # Chore+Docs Ratio: (chore + docs) / total < 0.3 is good
+        chore_docs_ratio = (chore_count + docs_count) / commit_types_total
+
+        # Update the ratios
+        commit_types['feature_fix_ratio'] = round(feature_fix_ratio, 2)
+        commit_types['test_feature_ratio'] = round(test_feature_ratio, 2)
+        commit_types['chore_docs_ratio'] = round(chore_docs_ratio, 2)
+
+        # Recalculate statuses based on correct ratios
+        commit_types['feature_fix_status'] = 'good' if feature_fix_ratio > 1 else 'poor'
+        commit_types['feature_fix_message'] = (
+            'The current feature-to-fix ratio indicates a healthy focus on building new capabilities, with fewer bug fixes. This suggests the codebase is relatively stable and development is moving forward.'
+            if feature_fix_ratio > 1 else
+            'A low feature-to-fix ratio may indicate a high maintenance burden or recurring issues. It can suggest technical debt or instability slowing down the delivery of new value.'
+        )
+
+        # Test Coverage Ratio: test/feature >= 0.3 is good
+        commit_types['test_feature_status'] = 'good' if test_feature_ratio >= 0.3 else 'poor'
+        commit_types['test_feature_message'] = (
+            'The ratio of test to feature commits reflects a strong commitment to test coverage. This improves code reliability, eases refactoring, and supports long-term maintainability.'
+            if test_feature_ratio >= 0.3 else
+            'A low test-to-feature ratio can be a sign of insufficient test coverage. This increases the risk of regressions and may reduce confidence in the stability of new features.'
+        )
+
+        # Focus Ratio: (chore + docs) / total < 0.3 is good
+        commit_types['chore_docs_status'] = 'good' if chore_docs_ratio < 0.3 else 'poor'
+        commit_types['chore_docs_message'] = (
+            'The project shows a clear focus on product-driven development, with a balanced investment in documentation and infrastructure work.'
+            if chore_docs_ratio < 0.3 else
+            'A high percentage of chore and documentation commits may indicate overhead or fragmented focus. This can reduce direct impact on feature delivery and product value.'
+        )
+    else:
+        # No commits, set default values
+        commit_types['feature_fix_ratio'] = 0
+        commit_types['test_feature_ratio'] = 0
+        commit_types['chore_docs_ratio'] = 0
+        commit_types['feature_fix_status'] = 'poor'
+        commit_types['test_feature_status'] = 'poor'
+        commit_types['chore_docs_status'] = 'poor'
+        commit_types['feature_fix_message'] = 'No commits available for analysis.'
+        commit_types['test_feature_message'] = 'No commits available for analysis.'
+        commit_types['chore_docs_message'] = 'No commits available for analysis.'
+
+    # Prepare chart data for doughnut chart
+    legend_data = [
+        {'label': label, 'count': count, 'color': DOUGHNUT_COLORS.get(label, '#bdbdbd')}
+        for label, count in counts.items()
+    ]
+    return {
+        'commit_types': commit_types,
+        'commit_type_labels': json.dumps(list(counts.keys())),
+        'commit_type_values': json.dumps(list(counts.values())),
+        'commit_type_legend': legend_data,
+        'doughnut_colors': DOUGHNUT_COLORS,
+    }
+
+
+def contributors(scope: ProjectScope) -> Dict:
+    """Top contributors and developer activity, by developer group"""
+    from analytics.models import Developer, DeveloperAlias
+
+    # Create mapping from email to developer group
+    email_to_developer = {}
+    for developer in Developer.objects.all():
+        for alias in DeveloperAlias.objects.filter(developer=developer):
+            email_to_developer[alias.email.lower()] = {
+                'developer_id': str(developer.id),
+                'primary_name': developer.primary_name,
+                'primary_email': developer.primary_email,
+                'confidence_score': developer.confidence_score
+            }
+
+    # Aggregate by developer groups
+    contributor_stats = {}
+    for commit in scope.recent_commits():
+        if not commit.author_email:
+            continue
+        email = commit.author_email.lower()
+
+        developer_info = email_to_developer.get(email)
+        if developer_info:
+            # Use developer group
+            key = developer_info['developer_id']
+            if key not in contributor_stats:
+                contributor_stats[key] = {
+                    'name': developer_info['primary_name'],
+                    'email': developer_info['primary_email'],
+                    'developer_id': key,
+                    'confidence_score': developer_info['confidence_score'],
+                    'net_lines': 0,
+                    'commits': 0,
+                    'additions': 0,
+                    'deletions': 0
+                }
+        else:
+            # Fallback to individual email (ungrouped developer)
+            key = email
+            if key not in contributor_stats:
+                contributor_stats[key] = {
+                    'name': commit.author_name,
+                    'email': commit.author_email,
+                    'developer_id': None,
+                    'confidence_score': 100,  # Individual developer
+                    'net_lines': 0,
+                    'commits': 0,
+                    'additions': 0,
+                    'deletions': 0
+                }
+
+        contributor_stats[key]['net_lines'] += (commit.additions or 0) - (commit.deletions or 0)
+        contributor_stats[key]['commits'] += 1
+        contributor_stats[key]['additions'] += (commit.additions or 0)
+        contributor_stats[key]['deletions'] += (commit.deletions or 0)
+
+    # Sort by net_lines and take top 10
+    top_contributors = sorted(contributor_stats.values(), key=lambda x: x['net_lines'], reverse=True)[:10]
+
+    # Developer activity for the project, sorted by commits for the activity display
+    developers = [
+        {
+            'name': stats['name'],
+            'commits': stats['commits'],
+            'additions': stats['additions'],
+            'deletions': stats['deletions'],
+            'net_lines': stats['net_lines']
+        }
+        for stats in contributor_stats.values()
+    ]
+    developers.sort(key=lambda x: x['commits'], reverse=True)
+    return {
+        'top_contributors': top_contributors,
+        'developer_activity': {'developers': developers, 'total_developers': len(contributor_stats)},
+    }
+
+
+def activity_bubbles(scope: ProjectScope) -> Dict:
+    """Bubble chart of the commits of the last 30 days by repository, day and hour"""
+    # Group commits by repository, date and hour
+    repo_bubbles = defaultdict(lambda: defaultdict(lambda: {'commits': 0, 'changes': 0}))
+
+    for commit in scope.recent_commits():
+        repo_name = commit.repository_full_name.split('/')[-1] if '/' in commit.repository_full_name else commit.repository_full_name
+
+        # Get local date and hour
+        if commit.authored_date:
+            local_date = commit.get_authored_date_in_timezone()
+            if local_date:
+                key = (local_date.date(), local_date.hour)
+                repo_bubbles[repo_name][key]['commits'] += 1
+                repo_bubbles[repo_name][key]['changes'] += (commit.additions or 0) + (commit.deletions or 0)
+
+    # Create datasets for Chart.js
+    chart_datasets = []
+    today = timezone.now().date()
+    for i, (repo_name, bubbles) in enumerate(repo_bubbles.items()):
+        color = BUBBLE_PALETTE[i % len(BUBBLE_PALETTE)]
+        dataset = {
+            'label': repo_name,
+            'data': [],
+            'backgroundColor': color['bg'],
+            'borderColor': color['border'],
+            'borderWidth': 1
+        }
+
+        for (date, hour), data in bubbles.items():
+            days_ago = (today - date).days
+            if 0 <= days_ago <= 30:  # Only show last 30 days
+                dataset['data'].append({
+                    'x': days_ago,
+                    'y': hour,
+                    'r': min(5 + data['commits'] * 2, 20),
+                    'commit_count': data['commits'],
+                    'changes': data['changes']
+                })
+
+        if dataset['data']:  # Only add dataset if it has data
+            chart_datasets.append(dataset)
+
+    return {'activity_heatmap_data': json.dumps(chart_datasets)}
+
+
+def codebase_size(scope: ProjectScope) -> Dict:
+    """Net lines of each repository of the project over the period"""
+    # Net lines (additions - deletions) by repository for the filtered period
+    net_lines_by_repo = defaultdict(int)
+    if scope.is_all_time:
+        commits = Commit.objects.filter(
+            repository_full_name__in=scope.repo_full_names, authored_date__ne=None
+        ).only('repository_full_name', 'additions', 'deletions').as_pymongo()
+        for commit in commits:
+            net_lines_by_repo[commit.get('repository_full_name')] += (commit.get('additions') or 0) - (commit.get('deletions') or 0)
+    else:
+        for commit in scope.recent_commits():
+            net_lines_by_repo[commit.repository_full_name] += (commit.additions or 0) - (commit.deletions or 0)
+
+    codebase_size_data = {
+        'labels': [],
+        'values': [],
+        'colors': [],
+        'legend_data': []
+    }
+    for i, repo in enumerate(scope.repositories):
+        net_lines = net_lines_by_repo.get(repo.full_name, 0)
+
+        # Only include repositories with data
+        if net_lines != 0:  # Changed from > 0 to != 0 to include negative values
+            codebase_size_data['labels'].append(repo.name)
+            codebase_size_data['values'].append(abs(net_lines))  # Use absolute value for display
+            codebase_size_data['colors'].append(CODEBASE_PALETTE[i % len(CODEBASE_PALETTE)])
+            codebase_size_data['legend_data'].append({
+                'label': repo.name,
+                'value': net_lines,  # Keep original value (can be negative)
+                'color': CODEBASE_PALETTE[i % len(CODEBASE_PALETTE)]['bg']
+            })
+
+    # Sort data by values (ascending - smallest first, so largest appears at bottom)
+    if codebase_size_data['labels']:
+        sorted_data = list(zip(codebase_size_data['labels'], codebase_size_data['values'], codebase_size_data['colors'], codebase_size_data['legend_data']))
+        sorted_data.sort(key=lambda x: x[1], reverse=False)
+
+        codebase_size_data['labels'] = [item[0] for item in sorted_data]
+        codebase_size_data['values'] = [item[1] for item in sorted_data]
+        codebase_size_data['colors'] = [item[2] for item in sorted_data]
+        codebase_size_data['legend_data'] = [item[3] for item in sorted_data]
+
+    return {'codebase_size_data': codebase_size_data}
+
+
+def project_detail_sections(scope: ProjectScope) -> List[Section]:
+    """Sections of the project detail page, repository metrics last"""
+    sections = [
+        Section('commit_totals', lambda: commit_totals(scope)),
+        Section('release_deployment_totals', lambda: release_deployment_totals(scope)),
+        Section('pr_cycle_time', lambda: pr_cycle_time(scope)),
+        Section('developer_count', lambda: developer_count(scope)),
+        Section('commit_frequency', lambda: commit_frequency(scope), {'commit_frequency_advanced': {}}),
+        Section('commit_types', lambda: commit_types(scope), {
+            'commit_types': {'counts': {}},
+            'commit_type_labels': json.dumps([]),
+            'commit_type_values': json.dumps([]),
+            'commit_type_legend': [],
+            'doughnut_colors': {},
+        }),
+        Section('contributors', lambda: contributors(scope), {
+            'top_contributors': [],
+            'developer_activity': {'developers': []},
+        }),
+        Section('activity_bubbles', lambda: activity_bubbles(scope), {'activity_heatmap_data': json.dumps([0] * 24)}),
+        Section('codebase_size', lambda: codebase_size(scope)),
+    ]
+    for repo in scope.repositories:
+        # Bind repo now, the lambda runs later on the pool
+        sections.append(Section(
+            f'repository:{repo.full_name}', lambda repo=repo: repository_metrics(scope, repo), {'metrics': {}}
+        ))
+    return sections
+
+
+def developer_activity_title(scope: ProjectScope) -> str:
+    """Title of the developer activity chart for the date filters"""
+    if scope.is_custom_range:
+        return f"Developer Activity ({scope.start_dt.strftime('%b %d, %Y')} - {scope.end_dt.strftime('%b %d, %Y')})"
+    if scope.is_all_time:
+        return "Developer Activity (All Time)"
+    return "Developer Activity (Last 30 Days)"
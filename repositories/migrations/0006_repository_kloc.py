@@ -0,0 +1,47 @@
+import logging
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_kloc(apps, schema_editor):
+    """Copy the latest KLOC history entry of each repository (MongoDB) to its new columns"""
+    Repository = apps.get_model("repositories", "Repository")
+    try:
+        from analytics.models import RepositoryKLOCHistory
+        latest = RepositoryKLOCHistory.latest_by_repository()
+    except Exception as e:
+        # No MongoDB at migration time: `manage.py sync_repository_kloc` fills them later
+        logger.warning(f"Could not backfill repository KLOC: {e}")
+        return
+
+    repositories = list(Repository.objects.filter(id__in=list(latest)))
+    for repository in repositories:
+        kloc, calculated_at = latest[repository.id]
+        if calculated_at is not None and calculated_at.tzinfo is None:
+            calculated_at = calculated_at.replace(tzinfo=dt_timezone.utc)
+        repository.kloc, repository.kloc_calculated_at = kloc, calculated_at
+    Repository.objects.bulk_update(repositories, ["kloc", "kloc_calculated_at"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("repositories", "0005_remove_kloc_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="repository",
+            name="kloc",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="repository",
+            name="kloc_calculated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_kloc, migrations.RunPython.noop),
+    ]
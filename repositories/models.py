@@ -31,9 +31,9 @@ class Repository(models.Model):
     last_indexed = models.DateTimeField(null=True, blank=True)
     commit_count = models.IntegerField(default=0)
     
-    # KLOC (Kilo Lines of Code) tracking - now using MongoDB via properties
-    # kloc = models.FloatField(default=0.0)  # Current KLOC value - REMOVED
-    # kloc_calculated_at = models.DateTimeField(null=True, blank=True)  # When KLOC was last calculated - REMOVED
+    # KLOC (Kilo Lines of Code) - latest entry of the MongoDB history, kept in sync by RepositoryKLOCHistory.save
+    kloc = models.FloatField(default=0.0)  # Current KLOC value
+    kloc_calculated_at = models.DateTimeField(null=True, blank=True)  # When KLOC was last calculated
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -103,29 +103,34 @@ class Repository(models.Model):
             logger.warning(f"Error checking KLOC history for {self.full_name}: {e}")
             return True, "kloc_error"
 
-    @property
-    def kloc(self):
-        """Get the latest KLOC value from MongoDB history"""
-        try:
-            from analytics.models import RepositoryKLOCHistory
-            latest = RepositoryKLOCHistory.objects.filter(
-                repository_id=self.id
-            ).order_by('-calculated_at').first()
-            return latest.kloc if latest else 0.0
-        except Exception:
-            return 0.0
+    @classmethod
+    def record_kloc(cls, repository_id, kloc, calculated_at):
+        """
+        Store a KLOC calculation on a repository, unless a later one is already stored
 
-    @property
-    def kloc_calculated_at(self):
-        """Get the latest KLOC calculation date from MongoDB history"""
-        try:
-            from analytics.models import RepositoryKLOCHistory
-            latest = RepositoryKLOCHistory.objects.filter(
-                repository_id=self.id
-            ).order_by('-calculated_at').first()
-            return latest.calculated_at if latest else None
-        except Exception:
-            return None
+        Returns:
+            Number of repositories updated (0 or 1)
+        """
+        from django.db.models import Q
+        from datetime import timezone as dt_timezone
+
+        if calculated_at is None:
+            return 0
+        if calculated_at.tzinfo is None:
+            calculated_at = calculated_at.replace(tzinfo=dt_timezone.utc)
+        # update() leaves updated_at alone: a KLOC calculation is not a repository change
+        updated = cls.objects.filter(id=repository_id).filter(
+            Q(kloc_calculated_at__isnull=True) | Q(kloc_calculated_at__lte=calculated_at)
+        ).update(kloc=kloc, kloc_calculated_at=calculated_at)
+        if updated:
+            # Pages and ETags showing the KLOC are keyed on the repository data version
+            full_name = cls.objects.filter(id=repository_id).values_list('full_name', flat=True).first()
+            try:
+                from analytics.metrics_cache import bump_data_version
+                bump_data_version(full_name)
+            except Exception as e:
+                logger.warning(f"Could not bump data version for {full_name}: {e}")
+        return updated
 
     def delete(self, *args, **kwargs):
         """
@@ -6,6 +6,7 @@ app_name = 'repositories'
 urlpatterns = [
     path('', views.repository_list, name='list'),
     path('<int:repo_id>/', views.repository_detail, name='detail'),
+    path('<int:repo_id>/panels/<slug:panel>/', views.repository_panel, name='panel'),
     path('search/', views.search_repositories, name='search'),
     path('index/', views.index_repository, name='index'),
     path('index-batch/', views.index_repositories, name='index_batch'),
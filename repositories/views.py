@@ -1,23 +1,36 @@
+import hashlib
 import json
 from datetime import datetime, timedelta
 import logging
+import time
 import uuid
 from functools import wraps
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db.models import Q, Sum
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views.decorators.http import require_http_methods
 
 from analytics.codeql_indexing_service import get_codeql_indexing_service_for_user
 from analytics.codeql_service import get_codeql_service_for_user
+from analytics.dora_service import (
+    DoraMetricsService,
+    classify_dora_performance as _classify_dora_performance,
+    empty_dora_metrics,
+)
 from analytics.github_token_service import GitHubTokenService
 from analytics.license_analysis_service import LicenseAnalysisService
 from analytics.llm_service import LLMService
+from analytics.metrics_cache import versions_digest
+from analytics.page_snapshots import normalize_date_range, serve_snapshot
 from analytics.sanitization import assert_safe_repository_full_name
 from analytics.sonarcloud_service import SonarCloudService
 from analytics.unified_metrics_service import UnifiedMetricsService
@@ -36,6 +49,47 @@ def staff_required(view_func):
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
+def _repository_etag(request, repo_id):
+    """ETag of a repository API response: its data version, the request parameters and the day"""
+    full_name = Repository.objects.filter(id=repo_id).values_list('full_name', flat=True).first()
+    if full_name is None:
+        return None
+    # Windows ending today (last 30 days by default) move daily even without new data
+    parts = [versions_digest([full_name]), request.path, urlencode(sorted(request.GET.lists()), doseq=True),
+             timezone.now().date().isoformat()]
+    return hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+def repository_etag(view_func):
+    """
+    Conditional GET for repository API views
+
+    Answers 304 without calling the view when If-None-Match matches, and tags
+    successful responses with their ETag and a Cache-Control hint.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, repo_id, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, repo_id, *args, **kwargs)
+        try:
+            etag = _repository_etag(request, repo_id)
+        except Exception:
+            logger.warning("Could not compute ETag of repository %s", repo_id, exc_info=True)
+            etag = None
+        if etag is None:
+            return view_func(request, repo_id, *args, **kwargs)
+
+        etag = quote_etag(etag)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = view_func(request, repo_id, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, max_age=settings.API_CACHE_MAX_AGE)
+        return response
+    return _wrapped_view
+
 def _error_response(user_message: str, exc: Exception = None, status: int = 500):
     error_id = str(uuid.uuid4())
     if exc is not None:
@@ -65,252 +119,13 @@ def _is_sonarcloud_configured():
         return False
 
 
-def _classify_dora_performance(metric_type, value):
-    """
-    Classify DORA metric performance based on Google's State of DevOps Report benchmarks.
-    
-    Args:
-        metric_type (str): 'deployment_frequency', 'lt1', or 'lt2'
-        value (float): The metric value
-    
-    Returns:
-        dict: {'grade': 'Elite|High|Medium|Low', 'color': 'text-green-600|text-blue-600|text-yellow-600|text-red-600'}
-    """
-    if value is None or value <= 0:
-        return {'grade': 'N/A', 'color': 'text-gray-500'}
-    
-    if metric_type == 'deployment_frequency':
-        # Deployments per day
-        if value >= 1.0:  # Several times per day
-            return {'grade': 'Elite', 'color': 'text-green-600'}
-        elif value >= 0.14:  # Once per day to once per week (1/7)
-            return {'grade': 'High', 'color': 'text-blue-600'}
-        elif value >= 0.03:  # Once per week to once per month (1/30)
-            return {'grade': 'Medium', 'color': 'text-yellow-600'}
-        else:  # Less than once per month
-            return {'grade': 'Low', 'color': 'text-red-600'}
-    
-    elif metric_type == 'lt1':
-        # Lead Time LT1 in days (first commit to production)
-        if value < 0.042:  # Less than 1 hour (1/24)
-            return {'grade': 'Elite', 'color': 'text-green-600'}
-        elif value < 1.0:  # Less than 1 day
-            return {'grade': 'High', 'color': 'text-blue-600'}
-        elif value <= 7.0:  # 1 day to 1 week
-            return {'grade': 'Medium', 'color': 'text-yellow-600'}
-        else:  # More than 1 week
-            return {'grade': 'Low', 'color': 'text-red-600'}
-    
-    elif metric_type == 'lt2':
-        # Lead Time LT2 in days (merge to production)
-        if value < 0.042:  # Less than 1 hour (1/24)
-            return {'grade': 'Elite', 'color': 'text-green-600'}
-        elif value < 0.5:  # Less than 12 hours (1/2 day)
-            return {'grade': 'High', 'color': 'text-blue-600'}
-        elif value <= 2.0:  # 12 hours to 2 days
-            return {'grade': 'Medium', 'color': 'text-yellow-600'}
-        else:  # More than 2 days
-            return {'grade': 'Low', 'color': 'text-red-600'}
-    
-    return {'grade': 'N/A', 'color': 'text-gray-500'}
-
-
 def _get_dora_metrics(repository):
-    """Calculate DORA metrics for a repository"""
+    """Get DORA metrics for a repository (served from its persisted snapshot)"""
     try:
-        from analytics.models import Deployment, PullRequest, Commit
-        from datetime import datetime, timedelta
-        import statistics
-        
-        # Get date range (last 6 months)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=180)
-        
-        # Get production deployments with success
-        deployments_query = Deployment.objects.filter(repository_full_name=repository.full_name)
-        if start_date:
-            deployments_query = deployments_query.filter(created_at__gte=start_date)
-        if end_date:
-            deployments_query = deployments_query.filter(created_at__lte=end_date)
-        
-        deployments = list(deployments_query)
-        
-        # Filter production deployments with success
-        def is_production_deployment(deployment):
-            if not deployment.environment:
-                return False
-            env_lower = deployment.environment.lower()
-            prod_envs = ['production', 'prod', 'live', 'main', 'master', 'github-pages']
-            return any(prod_env in env_lower for prod_env in prod_envs)
-        
-        def get_deployment_success_time(deployment):
-            if not deployment.statuses:
-                return None
-            for status in deployment.statuses:
-                if status.get('state', '').lower() == 'success':
-                    timestamp_str = status.get('created_at') or status.get('updated_at')
-                    if timestamp_str:
-                        try:
-                            return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        except (ValueError, TypeError):
-                            continue
-            return None
-        
-        prod_deployments = []
-        for deployment in deployments:
-            if is_production_deployment(deployment):
-                success_time = get_deployment_success_time(deployment)
-                if success_time:
-                    prod_deployments.append({
-                        'deployment': deployment,
-                        'success_time': success_time
-                    })
-        
-        prod_deployments.sort(key=lambda x: x['success_time'])
-        
-        # Get merged PRs
-        prs_query = PullRequest.objects.filter(
-            repository_full_name=repository.full_name,
-            state='closed'
-        )
-        if start_date:
-            prs_query = prs_query.filter(merged_at__gte=start_date)
-        if end_date:
-            prs_query = prs_query.filter(merged_at__lte=end_date)
-        
-        merged_prs = [pr for pr in prs_query if pr.merged_at is not None]
-        
-        # Calculate deployment frequency
-        deployments_per_day = len(prod_deployments) / 180 if prod_deployments else 0
-        deployment_frequency_performance = _classify_dora_performance('deployment_frequency', deployments_per_day)
-        
-        # Calculate metrics
-        result = {
-            'deployment_frequency': {
-                'total_deployments': len(prod_deployments),
-                'period_days': 180,
-                'deployments_per_day': deployments_per_day,
-                'performance': deployment_frequency_performance
-            },
-            'lead_time': {
-                'lt1_median_hours': None,
-                'lt1_mean_hours': None,
-                'lt1_median_days': None,
-                'lt1_mean_days': None,
-                'lt1_performance': {'grade': 'N/A', 'color': 'text-gray-500'},
-                'lt2_median_hours': None,
-                'lt2_mean_hours': None,
-                'lt2_median_days': None,
-                'lt2_mean_days': None,
-                'lt2_performance': {'grade': 'N/A', 'color': 'text-gray-500'},
-                'total_prs_analyzed': 0
-            }
-        }
-        
-        # Calculate Lead Time if we have deployments
-        if len(prod_deployments) >= 2:
-            lead_times_lt1 = []  # first_commit -> deployment
-            lead_times_lt2 = []  # merged_at -> deployment
-            
-            for i, prod_deploy in enumerate(prod_deployments):
-                deploy_time = prod_deploy['success_time']
-                
-                # Define deployment window
-                if i == 0:
-                    window_start = datetime(2020, 1, 1, tzinfo=deploy_time.tzinfo)
-                else:
-                    window_start = prod_deployments[i-1]['success_time']
-                
-                # Ensure timezone consistency
-                if window_start.tzinfo is None:
-                    window_start = window_start.replace(tzinfo=deploy_time.tzinfo)
-                if deploy_time.tzinfo is None:
-                    deploy_time = deploy_time.replace(tzinfo=window_start.tzinfo)
-                
-                window_end = deploy_time
-                
-                # Find PRs merged in this window
-                prs_in_window = []
-                for pr in merged_prs:
-                    merged_at = pr.merged_at
-                    if merged_at.tzinfo is None:
-                        merged_at = merged_at.replace(tzinfo=deploy_time.tzinfo)
-                    
-                    if window_start < merged_at <= window_end:
-                        prs_in_window.append(pr)
-                
-                for pr in prs_in_window:
-                    # Calculate LT1: first_commit -> deployment
-                    if pr.commit_shas:
-                        # Get all commits for this PR
-                        commits = Commit.objects.filter(
-                            repository_full_name=repository.full_name,
-                            sha__in=pr.commit_shas
-                        )
-                        if commits:
-                            # Find the earliest commit (authored_date)
-                            first_commit = min(commits, key=lambda c: c.authored_date)
-                            first_commit_time = first_commit.authored_date
-                            
-                            # Ensure timezone consistency
-                            if first_commit_time.tzinfo is None:
-                                first_commit_time = first_commit_time.replace(tzinfo=deploy_time.tzinfo)
-                            
-                            lt1_hours = (deploy_time - first_commit_time).total_seconds() / 3600
-                            lead_times_lt1.append(lt1_hours)
-                    
-                    # Calculate LT2: merged_at -> deployment
-                    merged_at = pr.merged_at
-                    if merged_at.tzinfo is None:
-                        merged_at = merged_at.replace(tzinfo=deploy_time.tzinfo)
-                    
-                    lt2_hours = (deploy_time - merged_at).total_seconds() / 3600
-                    lead_times_lt2.append(lt2_hours)
-            
-            if lead_times_lt1:
-                lt1_median_days = statistics.median(lead_times_lt1) / 24
-                lt1_mean_days = statistics.mean(lead_times_lt1) / 24
-                result['lead_time']['lt1_median_hours'] = statistics.median(lead_times_lt1)
-                result['lead_time']['lt1_mean_hours'] = statistics.mean(lead_times_lt1)
-                result['lead_time']['lt1_median_days'] = lt1_median_days
-                result['lead_time']['lt1_mean_days'] = lt1_mean_days
-                result['lead_time']['lt1_performance'] = _classify_dora_performance('lt1', lt1_median_days)
-            
-            if lead_times_lt2:
-                lt2_median_days = statistics.median(lead_times_lt2) / 24
-                lt2_mean_days = statistics.mean(lead_times_lt2) / 24
-                result['lead_time']['lt2_median_hours'] = statistics.median(lead_times_lt2)
-                result['lead_time']['lt2_mean_hours'] = statistics.mean(lead_times_lt2)
-                result['lead_time']['lt2_median_days'] = lt2_median_days
-                result['lead_time']['lt2_mean_days'] = lt2_mean_days
-                result['lead_time']['lt2_performance'] = _classify_dora_performance('lt2', lt2_median_days)
-                result['lead_time']['total_prs_analyzed'] = len(lead_times_lt2)
-        
-        return result
-        
+        return DoraMetricsService.get_metrics(repository.full_name, repository_id=repository.id)
     except Exception as e:
         logger.warning(f"Error calculating DORA metrics for {repository.full_name}: {e}")
-        return {
-            'deployment_frequency': {
-                'total_deployments': 0,
-                'period_days': 180,
-                'deployments_per_day': 0,
-                'performance': {'grade': 'N/A', 'color': 'text-gray-500'}
-            },
-            'lead_time': {
-                'lt1_median_hours': None,
-                'lt1_mean_hours': None,
-                'lt1_median_days': None,
-                'lt1_mean_days': None,
-                'lt1_performance': {'grade': 'N/A', 'color': 'text-gray-500'},
-                'lt2_median_hours': None,
-                'lt2_mean_hours': None,
-                'lt2_median_days': None,
-                'lt2_mean_days': None,
-                'lt2_performance': {'grade': 'N/A', 'color': 'text-gray-500'},
-                'total_prs_analyzed': 0
-            }
-        }
+        return empty_dora_metrics()
 
 
 def _get_codeql_metrics(repository, user_id: int):
@@ -369,57 +184,30 @@ def repository_list(request):
     # Filter repositories (all repositories visible to all users)
     repositories = Repository.objects.all()
     
-    # Handle KLOC sorting separately since it's now a property, not a database field
-    if sort_by == 'kloc':
-        # Apply search filter first if needed
-        if search_query:
-            repositories = repositories.filter(
-                Q(name__icontains=search_query) |
-                Q(full_name__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
-        
-        # Get all repositories and sort them in Python using the property
-        repos_list = list(repositories)
-        reverse_sort = (order == 'desc')
-        repos_list.sort(key=lambda x: x.kloc, reverse=reverse_sort)
-        
-        # Use the sorted list for pagination
-        paginator = Paginator(repos_list, 50)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        
-        # Stats
-        total_repos = len(repos_list)
-        indexed_repos = sum(1 for repo in repos_list if repo.is_indexed)
-        total_commits = sum(repo.commit_count for repo in repos_list)
-    else:
-        # Build order_by for database fields
-        if order == 'desc':
-            sort_by = f'-{sort_by}'
-        
-        # Sort by database field
-        repositories = repositories.order_by(sort_by)
-        
-        # Apply search filter
-        if search_query:
-            repositories = repositories.filter(
-                Q(name__icontains=search_query) |
-                Q(full_name__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
-        
-        # Pagination
-        paginator = Paginator(repositories, 50)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        
-        # Stats
-        total_repos = repositories.count()
-        indexed_repos = repositories.filter(is_indexed=True).count()
-        total_commits = repositories.aggregate(total=Sum('commit_count'))['total'] or 0
+    # Build order_by for database fields
+    if order == 'desc':
+        sort_by = f'-{sort_by}'
     
-
+    # Sort by database field, by id among equal values so pages don't overlap
+    repositories = repositories.order_by(sort_by, 'id')
+    
+    # Apply search filter
+    if search_query:
+        repositories = repositories.filter(
+            Q(name__icontains=search_query) |
+            Q(full_name__icontains=search_query) |
+            Q(description__icontains=search_query)
+        )
+    
+    # Pagination
+    paginator = Paginator(repositories, 50)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    
+    # Stats
+    total_repos = repositories.count()
+    indexed_repos = repositories.filter(is_indexed=True).count()
+    total_commits = repositories.aggregate(total=Sum('commit_count'))['total'] or 0
     
     # If AJAX request, return JSON
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -461,24 +249,173 @@ def repository_list(request):
     return render(request, 'repositories/list.html', context)
 
 
-@login_required
-def repository_detail(request, repo_id):
-    start_str = request.GET.get('start')
-    end_str = request.GET.get('end')
+def _parse_date_range(start_str, end_str):
+    """Date range of the detail page: the requested days, or the last 30 days"""
     if start_str and end_str:
         try:
-            start_date = datetime.strptime(start_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_str, "%Y-%m-%d")
+            return datetime.strptime(start_str, "%Y-%m-%d"), datetime.strptime(end_str, "%Y-%m-%d")
         except Exception:
-            start_date = timezone.now() - timedelta(days=29)
-            end_date = timezone.now()
-    else:
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=29)
+            pass
+    end_date = timezone.now()
+    return end_date - timedelta(days=29), end_date
+
+
+def compute_repository_detail_context(repo_id, start_str, end_str):
+    """Metrics of the repository detail page, without the request-time data"""
+    start_date, end_date = _parse_date_range(start_str, end_str)
+    repository = Repository.objects.get(id=repo_id)
+    assert_safe_repository_full_name(repository.full_name)
     # Passe la plage à UnifiedMetricsService
     metrics_service = UnifiedMetricsService('repository', repo_id, start_date=start_date, end_date=end_date)
     all_metrics = metrics_service.get_all_metrics()
     
+    # Extract specific metrics for template
+    overall_stats = {
+        'total_commits': all_metrics['total_commits'],
+        'total_authors': all_metrics['total_developers'],
+        'total_additions': all_metrics['lines_added'],
+        'total_deletions': all_metrics['lines_deleted'],
+        'net_lines': all_metrics['net_lines']
+    }
+    
+    developer_activity = all_metrics['developer_activity_30d']
+    commit_frequency = all_metrics['commit_frequency']
+    release_frequency = all_metrics['release_frequency']
+    total_releases = all_metrics['total_releases']
+    deployment_frequency = all_metrics['deployment_frequency']
+    total_deployments = all_metrics['total_deployments']
+    last_deployment_date = all_metrics.get('last_deployment_date')
+    pr_cycle_time = all_metrics['pr_cycle_time']
+    commit_quality = all_metrics['commit_quality']
+    commit_types = all_metrics['commit_type_distribution']
+    pr_health_metrics = all_metrics['pr_health_metrics']
+    top_contributors = all_metrics['top_contributors']
+    activity_heatmap = all_metrics['commit_activity_by_hour']
+    
+    # Calculate PR cycle time statistics for template
+    pr_cycle_time_median = pr_cycle_time.get('median_cycle_time_hours', 0)
+    pr_cycle_time_avg = pr_cycle_time.get('avg_cycle_time_hours', 0)
+    pr_cycle_time_min = pr_cycle_time.get('min_cycle_time_hours', 0)
+    pr_cycle_time_max = pr_cycle_time.get('max_cycle_time_hours', 0)
+    pr_cycle_time_count = pr_cycle_time.get('total_prs', 0)
+    
+    # Prepare chart data for doughnut chart (like applications)
+    commit_types_counts = commit_types.get('counts', {}) if isinstance(commit_types, dict) else {}
+    commit_type_labels = json.dumps(list(commit_types_counts.keys()))
+    commit_type_values = json.dumps(list(commit_types_counts.values()))
+    
+    # Doughnut colors for commit types
+    doughnut_colors = {
+        'fix': '#4caf50',
+        'feature': '#2196f3',
+        'docs': '#ffeb3b',
+        'refactor': '#ff9800',
+        'test': '#9c27b0',
+        'style': '#00bcd4',
+        'chore': '#607d8b',
+        'other': '#bdbdbd',
+    }
+    
+    # Legend data for commit types
+    legend_data = []
+    for label, count in commit_types_counts.items():
+        color = doughnut_colors.get(label, '#bdbdbd')
+        legend_data.append({'label': label, 'count': count, 'color': color})
+    
+    # Hourly activity data
+    hourly_data = activity_heatmap.get('hourly_data', {})
+    activity_heatmap_data = json.dumps([int(hourly_data.get(str(hour), 0)) for hour in range(24)])
+    
+    # Bubble chart data
+    bubble_chart = metrics_service.get_bubble_chart_data(days=90)
+    bubble_chart_data = json.dumps(bubble_chart.get('datasets', []))
+    
+    # Ajout stats changements commit (calcul et conversion explicite)
+    commit_change_stats = all_metrics['commit_change_stats']
+    avg_total_changes = round(float(commit_change_stats.get('avg_total_changes', 0)), 2)
+    avg_files_changed = round(float(commit_change_stats.get('avg_files_changed', 0)), 2)
+    nb_commits = int(commit_change_stats.get('nb_commits', 0))
+    
+    # Get SBOM data (no longer using SBOMVulnerability; vulnerabilities come from CodeQL)
+    from analytics.models import SBOM
+    # Get all SBOMs for this repository (full_name already validated above)
+    assert_safe_repository_full_name(repository.full_name)
+    all_sboms = SBOM.objects(repository_full_name=repository.full_name).order_by('-generated_at')
+    
+    # Choose the most recent SBOM if available
+    sbom = all_sboms[0] if all_sboms else None
+    vulnerability_stats = {
+        'total_vulnerabilities': 0,
+        'severity_counts': {},
+        'has_sbom': False
+    }
+    
+    if sbom:
+        # Apply date filtering to SBOM generation date
+        sbom_in_range = True
+        if start_date and end_date:
+            try:
+                # Convert date objects to timezone-aware datetime
+                start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+                end_dt = timezone.make_aware(datetime.combine(end_date, datetime.min.time()))
+                # Add one day to end_date to include the full day
+                end_dt = end_dt + timedelta(days=1)
+                
+                # Check if SBOM was generated within the date range
+                if sbom.generated_at:
+                    sbom_date = sbom.generated_at
+                    # Ensure SBOM date is timezone-aware
+                    if sbom_date.tzinfo is None:
+                        sbom_date = timezone.make_aware(sbom_date)
+                    if sbom_date < start_dt or sbom_date >= end_dt:
+                        sbom_in_range = False
+            except ValueError:
+                # Invalid date format, continue without filtering
+                pass
+        
+        if sbom_in_range:
+            # We only expose CodeQL vulnerabilities now; keep SBOM presence as a flag
+            vulnerability_stats['has_sbom'] = True
+    
+    # DORA, SonarCloud, CodeQL and KLOC are loaded by the page from their panel endpoints
+    return {
+        'start_date': start_date.strftime("%Y-%m-%d"),
+        'end_date': end_date.strftime("%Y-%m-%d"),
+        'overall_stats': overall_stats,
+        'developer_activity': developer_activity,
+        'commit_frequency': commit_frequency,
+        'release_frequency': release_frequency,
+        'total_releases': total_releases,
+        'deployment_frequency': deployment_frequency,
+        'total_deployments': total_deployments,
+        'last_deployment_date': last_deployment_date,
+        'pr_cycle_time_median': pr_cycle_time_median,
+        'pr_cycle_time_avg': pr_cycle_time_avg,
+        'pr_cycle_time_min': pr_cycle_time_min,
+        'pr_cycle_time_max': pr_cycle_time_max,
+        'pr_cycle_time_count': pr_cycle_time_count,
+        'commit_quality': commit_quality,
+        'commit_types': commit_types,
+        'pr_health_metrics': pr_health_metrics,
+        'top_contributors': top_contributors,
+        'activity_heatmap': activity_heatmap,
+        'commit_type_labels': commit_type_labels,
+        'commit_type_values': commit_type_values,
+        'commit_type_legend': legend_data,
+        'doughnut_colors': doughnut_colors,
+        'activity_heatmap_data': activity_heatmap_data,
+        'bubble_chart_data': bubble_chart_data,
+        'commit_change_stats': {
+            'avg_total_changes': avg_total_changes,
+            'avg_files_changed': avg_files_changed,
+            'nb_commits': nb_commits,
+        },
+        'vulnerability_stats': vulnerability_stats,
+    }
+
+
+@login_required
+def repository_detail(request, repo_id):
     """Working repository detail view with proper charts"""
     try:
         repository = Repository.objects.get(id=repo_id)
@@ -522,175 +459,23 @@ def repository_detail(request, repo_id):
         }
         return render(request, 'repositories/detail.html', context)
     
+    start_str, end_str = normalize_date_range(request.GET.get('start'), request.GET.get('end'))
     try:
-        # Get metrics using unified service
-        # metrics_service = UnifiedMetricsService('repository', repo_id)
-        # all_metrics = metrics_service.get_all_metrics()
-        
-        # Extract specific metrics for template
-        overall_stats = {
-            'total_commits': all_metrics['total_commits'],
-            'total_authors': all_metrics['total_developers'],
-            'total_additions': all_metrics['lines_added'],
-            'total_deletions': all_metrics['lines_deleted'],
-            'net_lines': all_metrics['net_lines']
-        }
-        
-        developer_activity = all_metrics['developer_activity_30d']
-        commit_frequency = all_metrics['commit_frequency']
-        release_frequency = all_metrics['release_frequency']
-        total_releases = all_metrics['total_releases']
-        deployment_frequency = all_metrics['deployment_frequency']
-        total_deployments = all_metrics['total_deployments']
-        last_deployment_date = all_metrics.get('last_deployment_date')
-        pr_cycle_time = all_metrics['pr_cycle_time']
-        commit_quality = all_metrics['commit_quality']
-        commit_types = all_metrics['commit_type_distribution']
-        pr_health_metrics = all_metrics['pr_health_metrics']
-        top_contributors = all_metrics['top_contributors']
-        activity_heatmap = all_metrics['commit_activity_by_hour']
-        
-        # Calculate PR cycle time statistics for template
-        pr_cycle_time_median = pr_cycle_time.get('median_cycle_time_hours', 0)
-        pr_cycle_time_avg = pr_cycle_time.get('avg_cycle_time_hours', 0)
-        pr_cycle_time_min = pr_cycle_time.get('min_cycle_time_hours', 0)
-        pr_cycle_time_max = pr_cycle_time.get('max_cycle_time_hours', 0)
-        pr_cycle_time_count = pr_cycle_time.get('total_prs', 0)
-        
-        # Prepare chart data for doughnut chart (like applications)
-        commit_types_counts = commit_types.get('counts', {}) if isinstance(commit_types, dict) else {}
-        commit_type_labels = json.dumps(list(commit_types_counts.keys()))
-        commit_type_values = json.dumps(list(commit_types_counts.values()))
-        
-        # Doughnut colors for commit types
-        doughnut_colors = {
-            'fix': '#4caf50',
-            'feature': '#2196f3',
-            'docs': '#ffeb3b',
-            'refactor': '#ff9800',
-            'test': '#9c27b0',
-            'style': '#00bcd4',
-            'chore': '#607d8b',
-            'other': '#bdbdbd',
-        }
-        
-        # Legend data for commit types
-        legend_data = []
-        for label, count in commit_types_counts.items():
-            color = doughnut_colors.get(label, '#bdbdbd')
-            legend_data.append({'label': label, 'count': count, 'color': color})
-        
-        # Hourly activity data
-        hourly_data = activity_heatmap.get('hourly_data', {})
-        activity_heatmap_data = json.dumps([int(hourly_data.get(str(hour), 0)) for hour in range(24)])
-        
-        # Bubble chart data
-        bubble_chart = metrics_service.get_bubble_chart_data(days=90)
-        bubble_chart_data = json.dumps(bubble_chart.get('datasets', []))
-        
-        # Ajout stats changements commit (calcul et conversion explicite)
-        commit_change_stats = all_metrics['commit_change_stats']
-        avg_total_changes = round(float(commit_change_stats.get('avg_total_changes', 0)), 2)
-        avg_files_changed = round(float(commit_change_stats.get('avg_files_changed', 0)), 2)
-        nb_commits = int(commit_change_stats.get('nb_commits', 0))
-        
-        # Get SBOM data (no longer using SBOMVulnerability; vulnerabilities come from CodeQL)
-        from analytics.models import SBOM
-        # Get all SBOMs for this repository (full_name already validated above)
-        assert_safe_repository_full_name(repository.full_name)
-        all_sboms = SBOM.objects(repository_full_name=repository.full_name).order_by('-generated_at')
-        
-        # Choose the most recent SBOM if available
-        sbom = all_sboms[0] if all_sboms else None
-        vulnerability_stats = {
-            'total_vulnerabilities': 0,
-            'severity_counts': {},
-            'has_sbom': False
-        }
-        
-        if sbom:
-            # Apply date filtering to SBOM generation date
-            sbom_in_range = True
-            if start_date and end_date:
-                try:
-                    # Convert date objects to timezone-aware datetime
-                    start_dt = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
-                    end_dt = timezone.make_aware(datetime.combine(end_date, datetime.min.time()))
-                    # Add one day to end_date to include the full day
-                    end_dt = end_dt + timedelta(days=1)
-                    
-                    # Check if SBOM was generated within the date range
-                    if sbom.generated_at:
-                        sbom_date = sbom.generated_at
-                        # Ensure SBOM date is timezone-aware
-                        if sbom_date.tzinfo is None:
-                            sbom_date = timezone.make_aware(sbom_date)
-                        if sbom_date < start_dt or sbom_date >= end_dt:
-                            sbom_in_range = False
-                except ValueError:
-                    # Invalid date format, continue without filtering
-                    pass
-            
-            if sbom_in_range:
-                # We only expose CodeQL vulnerabilities now; keep SBOM presence as a flag
-                vulnerability_stats['has_sbom'] = True
-        
-        # Get SonarCloud metrics
-        from repositories.views import _get_sonarcloud_metrics
-        sonarcloud_metrics = _get_sonarcloud_metrics(repository.id)
-        print(f"DEBUG: sonarcloud_metrics = {sonarcloud_metrics}")
-        print(f"DEBUG: sonarcloud_metrics type = {type(sonarcloud_metrics)}")
-        if sonarcloud_metrics:
-            print(f"DEBUG: sonarcloud_metrics.quality_gate = {sonarcloud_metrics.quality_gate}")
-        
-        # Get CodeQL metrics
-        codeql_metrics = _get_codeql_metrics(repository, request.user.id)
-        
-        # Get DORA metrics
-        dora_metrics = _get_dora_metrics(repository)
-        
-        # Build context
-        context = {
+        # Served from the page snapshot, refreshed in the background when stale
+        context, snapshot = serve_snapshot(
+            'repository_detail', repository.id, (start_str, end_str), [repository.full_name],
+            'repositories.views.compute_repository_detail_context',
+            (repository.id, start_str, end_str)
+        )
+        context.update({
             'repository': repository,
-            'start_date': start_date.strftime("%Y-%m-%d"),
-            'end_date': end_date.strftime("%Y-%m-%d"),
-            'overall_stats': overall_stats,
-            'developer_activity': developer_activity,
-            'commit_frequency': commit_frequency,
-            'release_frequency': release_frequency,
-            'total_releases': total_releases,
-            'deployment_frequency': deployment_frequency,
-            'total_deployments': total_deployments,
-            'last_deployment_date': last_deployment_date,
-            'pr_cycle_time_median': pr_cycle_time_median,
-            'pr_cycle_time_avg': pr_cycle_time_avg,
-            'pr_cycle_time_min': pr_cycle_time_min,
-            'pr_cycle_time_max': pr_cycle_time_max,
-            'pr_cycle_time_count': pr_cycle_time_count,
-            'commit_quality': commit_quality,
-            'commit_types': commit_types,
-            'pr_health_metrics': pr_health_metrics,
-            'top_contributors': top_contributors,
-            'activity_heatmap': activity_heatmap,
-            'commit_type_labels': commit_type_labels,
-            'commit_type_values': commit_type_values,
-            'commit_type_legend': legend_data,
-            'doughnut_colors': doughnut_colors,
-            'activity_heatmap_data': activity_heatmap_data,
-            'bubble_chart_data': bubble_chart_data,
-            'commit_change_stats': {
-                'avg_total_changes': avg_total_changes,
-                'avg_files_changed': avg_files_changed,
-                'nb_commits': nb_commits,
-            },
-            'vulnerability_stats': vulnerability_stats,
-            'sonarcloud_metrics': sonarcloud_metrics,
-            'codeql_metrics': codeql_metrics,
-            'dora_metrics': dora_metrics,
             'indexing_schedule': indexing_schedule,
-        }
+            'snapshot': snapshot,
+        })
         
-    except Exception as e:
+    except Exception:
+        logger.exception("Failed to compute metrics of repository %s", repo_id)
+        start_date, end_date = _parse_date_range(start_str, end_str)
         # If metrics calculation fails, provide empty data
         context = {
             'repository': repository,
@@ -719,7 +504,6 @@ def repository_detail(request, repo_id):
             'commit_type_legend': [],
             'doughnut_colors': {},
             'activity_heatmap_data': json.dumps([0] * 24),
-            'sonarcloud_metrics': None,
             'indexing_schedule': indexing_schedule,
             'error_message': 'Failed to compute repository metrics',
             'error_id': str(uuid.uuid4())
@@ -728,6 +512,54 @@ def repository_detail(request, repo_id):
     return render(request, 'repositories/detail.html', context)
 
 
+def _dora_panel(request, repository):
+    return {'dora_metrics': _get_dora_metrics(repository)}
+
+
+def _codeql_panel(request, repository):
+    # Security Health Score comes with the CodeQL metrics
+    return {'codeql_metrics': _get_codeql_metrics(repository, request.user.id)}
+
+
+def _sonarcloud_panel(request, repository):
+    return {'sonarcloud_metrics': _get_sonarcloud_metrics(repository.id)}
+
+
+def _kloc_panel(request, repository):
+    return {'kloc': repository.kloc}
+
+
+# Panels of the detail page fetched after the page itself: name -> context of templates/repositories/_<name>_panel.html
+DETAIL_PANELS = {
+    'dora': _dora_panel,
+    'codeql': _codeql_panel,
+    'sonarcloud': _sonarcloud_panel,
+    'kloc': _kloc_panel,
+}
+
+
+@login_required
+@require_http_methods(["GET"])
+@repository_etag
+def repository_panel(request, repo_id, panel):
+    """HTML fragment of one panel of the repository detail page, timed in a Server-Timing header"""
+    load_panel = DETAIL_PANELS.get(panel)
+    if load_panel is None:
+        raise Http404("Unknown panel")
+    repository = get_object_or_404(Repository, id=repo_id)
+    assert_safe_repository_full_name(repository.full_name)
+
+    started = time.perf_counter()
+    context = load_panel(request, repository)
+    duration_ms = (time.perf_counter() - started) * 1000
+    logger.debug("Panel %s of repository %s computed in %.1f ms", panel, repo_id, duration_ms)
+
+    context['repository'] = repository
+    response = render(request, f'repositories/_{panel}_panel.html', context)
+    response['Server-Timing'] = f'{panel};dur={duration_ms:.1f}'
+    return response
+
+
 @login_required
 @require_http_methods(["GET"])
 def repository_sonarcloud_temporal(request, repo_id):
@@ -939,6 +771,7 @@ def delete_repository(request, repo_id):
 
 @login_required
 @require_http_methods(["GET"])
+@repository_etag
 def api_repository_pr_health_metrics(request, repo_id):
     """API endpoint to get PR health metrics for a repository asynchronously"""
     try:
@@ -961,6 +794,7 @@ def api_repository_pr_health_metrics(request, repo_id):
 
 @login_required
 @require_http_methods(["GET"])
+@repository_etag
 def api_repository_developer_activity(request, repo_id):
     """API endpoint for repository developer activity data"""
     try:
@@ -982,6 +816,7 @@ def api_repository_developer_activity(request, repo_id):
 
 @login_required
 @require_http_methods(["GET"])
+@repository_etag
 def api_repository_commit_quality(request, repo_id):
     """API endpoint for repository commit quality metrics"""
     try:
@@ -1000,6 +835,7 @@ def api_repository_commit_quality(request, repo_id):
 
 @login_required
 @require_http_methods(["GET"])
+@repository_etag
 def api_repository_commit_types(request, repo_id):
     """API endpoint for repository commit type distribution"""
     try:
@@ -1270,6 +1106,7 @@ def repository_vulnerabilities_analysis(request, repo_id):
 
 
 @login_required
+@repository_etag
 def repository_commits_list(request, repo_id):
     """AJAX view for commits list with pagination and date filtering"""
     if request.method != 'GET':
@@ -1414,6 +1251,7 @@ def repository_commits_list(request, repo_id):
 
 
 @login_required
+@repository_etag
 def repository_releases_list(request, repo_id):
     """AJAX view for releases list with pagination and date filtering"""
     if request.method != 'GET':
@@ -1542,6 +1380,7 @@ def repository_releases_list(request, repo_id):
 
 
 @login_required
+@repository_etag
 def repository_deployments_list(request, repo_id):
     """AJAX view for deployments list with pagination and date filtering"""
     if request.method != 'GET':
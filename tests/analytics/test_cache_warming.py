@@ -0,0 +1,101 @@
+"""
+Tests for the post-indexing cache warming
+"""
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+
+from analytics.cache_warming import (
+    default_date_ranges, request_warming, warm_after_indexing, warm_entity_task,
+)
+
+
+class MemoryStore:
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, key, value, timeout, **labels):
+        if key in self.entries:
+            return False
+        self.entries[key] = value
+        return True
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+
+@override_settings(CACHE_WARMING_DELAY=60, CACHE_WARMING_TOP_DEVELOPERS=2)
+class TestCacheWarming(TestCase):
+    """Test cases for deduplicated warming"""
+
+    def setUp(self):
+        self.store = MemoryStore()
+        patchers = [
+            patch('analytics.cache_warming.get_store', return_value=self.store),
+            patch('django_q.tasks.schedule'),
+        ]
+        self.schedule = patchers[1].start()
+        patchers[0].start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def make_repository(self, project_ids=(7,)):
+        repository = Mock(id=1, full_name='org/repo', owner_id=3)
+        repository.projects.values_list.return_value = list(project_ids)
+        return repository
+
+    def scheduled(self):
+        return [call.args[1:] for call in self.schedule.call_args_list]
+
+    def test_burst_of_indexing_completions_warms_once(self):
+        """Commits, pull requests and releases of a sync finishing together schedule one warm per entity"""
+        repository = self.make_repository(project_ids=(7, 8))
+        for _ in range(3):
+            warm_after_indexing(repository)
+
+        self.assertEqual(self.scheduled(), [('repository', 1), ('project', 7), ('project', 8)])
+        self.assertEqual(self.schedule.call_args.args[0], 'analytics.cache_warming.warm_entity_task')
+
+    def test_warm_started_accepts_new_requests(self):
+        request_warming('project', 7)
+        with patch('analytics.cache_warming._warm_project'):
+            self.assertEqual(warm_entity_task('project', 7)['status'], 'success')
+
+        self.assertTrue(request_warming('project', 7))
+        self.assertEqual(len(self.scheduled()), 2)
+
+    def test_schedule_failure_releases_the_marker(self):
+        self.schedule.side_effect = ConnectionError('database down')
+        self.assertFalse(request_warming('repository', 1))
+        self.assertEqual(self.store.entries, {})
+
+    def test_disabled_cache_does_not_warm(self):
+        with patch('analytics.cache_warming.get_store', return_value=None):
+            warm_after_indexing(self.make_repository())
+        self.schedule.assert_not_called()
+
+    def test_repository_warm_computes_default_ranges_and_requests_top_developers(self):
+        repository = self.make_repository()
+        with patch('repositories.models.Repository.objects') as repositories, \
+             patch('analytics.cache_warming.compute_snapshot') as compute_snapshot, \
+             patch('analytics.unified_metrics_service.UnifiedMetricsService') as service, \
+             patch('analytics.cache_warming.top_developer_ids', return_value=['dev1', 'dev2']) as top:
+            repositories.get.return_value = repository
+            result = warm_entity_task('repository', 1)
+
+        self.assertEqual(result['status'], 'success')
+        warmed = [call.args[2] for call in compute_snapshot.call_args_list]
+        self.assertEqual(warmed, default_date_ranges())
+        self.assertEqual(compute_snapshot.call_args.args[5], (1, '1970-01-01', warmed[-1][1]))
+        service.assert_called_once_with('repository', 1)
+        top.assert_called_once_with('org/repo', 2)
+        self.assertEqual(self.scheduled(), [('developer', 'dev1'), ('developer', 'dev2')])
+
+    def test_developer_warm_only_rebuilds_the_profile(self):
+        with patch('analytics.developer_profile_service.DeveloperProfileService.get_profile') as get_profile, \
+             patch('analytics.unified_metrics_service.UnifiedMetricsService') as service:
+            result = warm_entity_task('developer', 'dev1')
+
+        self.assertEqual(result['status'], 'success')
+        get_profile.assert_called_once_with('dev1')
+        service.assert_not_called()
@@ -0,0 +1,63 @@
+"""
+Tests for the circuit breaker
+"""
+from django.test import TestCase
+
+from analytics.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(TestCase):
+    """Test cases for CircuitBreaker"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, latency_budget=5.0, retry_after=60.0,
+                                      clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        """A success in between resets the failure count"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success(0.5)
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_opens_over_latency_budget(self):
+        """A slow answer or a slow failure opens the circuit at once"""
+        self.breaker.record_success(7.0)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.breaker.reset()
+        self.breaker.record_failure(elapsed=5.5)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_single_probe_when_half_open(self):
+        """After retry_after one probe is let through, its result decides the state"""
+        self.breaker.record_success(10.0)
+        self.clock.now = 59.0
+        self.assertFalse(self.breaker.allow_request())
+
+        self.clock.now = 60.0
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.clock.now = 120.0
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success(1.0)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
@@ -0,0 +1,184 @@
+"""
+Tests for the classify_existing_commits management command
+"""
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from analytics.commit_rules import classify_message
+
+COMMAND_MODULE = 'analytics.management.commands.classify_existing_commits'
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.closed = False
+
+    def sort(self, key, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeCommitCollection:
+    """Commits collection: queries on commit_type and _id $gt, bulk UpdateOne"""
+
+    def __init__(self, docs):
+        self.docs = {doc['_id']: doc for doc in docs}
+        self.bulk_writes = 0
+
+    def _matching(self, query):
+        return [
+            dict(doc) for doc in self.docs.values()
+            if doc['commit_type'] == query['commit_type'] and doc['_id'] > query.get('_id', {}).get('$gt', -1)
+        ]
+
+    def count_documents(self, query):
+        return len(self._matching(query))
+
+    def find(self, query, projection=None, **kwargs):
+        return FakeCursor(self._matching(query))
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+        modified = 0
+        for operation in operations:
+            doc = self.docs[operation._filter['_id']]
+            if doc['commit_type'] == operation._filter['commit_type']:
+                doc.update(operation._doc['$set'])
+                modified += 1
+        return Mock(modified_count=modified)
+
+
+class FakeCheckpointCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query):
+        return self.docs.get(query['_id'])
+
+    def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query['_id'], {'_id': query['_id']}).update(update['$set'])
+
+    def delete_one(self, query):
+        self.docs.pop(query['_id'], None)
+
+
+def make_commits(count):
+    subjects = ['fix: crash on login', 'add dashboard widget', 'update README', 'random words']
+    return [
+        {
+            '_id': index,
+            'message': f"{subjects[index % len(subjects)]} #{index}",
+            'files_changed': [{'filename': 'app.py'}],
+            'developer_id': f"dev{index % 3}",
+            'commit_type': 'other',
+        }
+        for index in range(count)
+    ]
+
+
+class TestClassifyExistingCommits(TestCase):
+    """Test cases for the streaming reclassification pipeline"""
+
+    def setUp(self):
+        self.commits = FakeCommitCollection(make_commits(25))
+        self.checkpoints = FakeCheckpointCollection()
+        patchers = [
+            patch('analytics.models.Commit._get_collection', return_value=self.commits),
+            patch('analytics.models.CommandCheckpoint._get_collection', return_value=self.checkpoints),
+            patch(f'{COMMAND_MODULE}.DeveloperProfileService.mark_stale'),
+        ]
+        self.mark_stale = patchers[2].start()
+        for patcher in patchers[:2]:
+            patcher.start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('classify_existing_commits', '--batch-size=4', '--workers=3', *args, stdout=out)
+        return out.getvalue()
+
+    def test_bulk_updates_in_batches(self):
+        """Every batch is written with one bulk update, in the message order"""
+        with patch(f'{COMMAND_MODULE}.label_messages',
+                   side_effect=lambda messages, **kwargs: [classify_message(m) for m in messages]):
+            output = self.run_command()
+
+        self.assertEqual(self.commits.bulk_writes, 7)
+        for doc in self.commits.docs.values():
+            self.assertEqual(doc['commit_type'], classify_message(doc['message']))
+        self.assertIn('Processed 25/25 commits', output)
+        self.assertIn('msgs/s', output)
+        self.assertEqual(self.checkpoints.docs, {})
+
+    def test_resumes_after_interruption(self):
+        """Ollama going down stops the run, the next run resumes after the last written batch"""
+        calls = []
+
+        def flaky_labels(messages, **kwargs):
+            calls.append(messages)
+            if len(calls) > 2:
+                return [None] * len(messages)
+            return [classify_message(message) for message in messages]
+
+        with patch(f'{COMMAND_MODULE}.label_messages', side_effect=flaky_labels), \
+             patch(f'{COMMAND_MODULE}.ThreadPoolExecutor.submit',
+                   side_effect=lambda function, *args: Mock(result=Mock(return_value=function(*args)))):
+            output = self.run_command()
+
+        self.assertIn('Ollama is unavailable, stopped after 8 commits', output)
+        checkpoint = self.checkpoints.docs['classify_existing_commits:ollama']
+        self.assertEqual((checkpoint['last_id'], checkpoint['processed']), (7, 8))
+
+        with patch(f'{COMMAND_MODULE}.label_messages',
+                   side_effect=lambda messages, **kwargs: [classify_message(m) for m in messages]) as labels:
+            output = self.run_command()
+
+        self.assertIn('Resuming after 8 commits', output)
+        self.assertIn('Total commits processed: 25', output)
+        resumed = [message for call in labels.call_args_list for message in call.args[0]]
+        self.assertEqual(len(resumed), 17)
+        self.assertEqual(self.checkpoints.docs, {})
+
+    def test_documentation_only_commits_skip_the_classifier(self):
+        """Commits touching only documentation are classified by their files"""
+        for doc in self.commits.docs.values():
+            doc['files_changed'] = [{'filename': 'docs/index.md'}]
+
+        with patch(f'{COMMAND_MODULE}.label_messages') as labels:
+            output = self.run_command('--dry-run')
+
+        self.assertIn('docs: 25 (100.0%)', output)
+        self.assertEqual(self.commits.bulk_writes, 0)
+        labels.assert_not_called()
+
+    def test_dry_run_leaves_profiles_alone(self):
+        """A dry run writes neither commit types nor developer profiles"""
+        with patch(f'{COMMAND_MODULE}.label_messages',
+                   side_effect=lambda messages, **kwargs: [classify_message(m) for m in messages]):
+            self.run_command('--dry-run')
+
+        self.assertEqual(self.commits.bulk_writes, 0)
+        self.mark_stale.assert_not_called()
+
+        with patch(f'{COMMAND_MODULE}.label_messages',
+                   side_effect=lambda messages, **kwargs: [classify_message(m) for m in messages]):
+            self.run_command()
+        self.mark_stale.assert_called_once_with({'dev0', 'dev1', 'dev2'})
@@ -3,10 +3,15 @@ Tests for the CodeQL service
 """
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from django.test import TestCase
 
-from analytics.codeql_service import CodeQLService
+from analytics.codeql_service import (
+    CodeQLService,
+    SEVERITIES,
+    open_vulnerability_counts,
+    rebuild_open_vulnerability_snapshots,
+)
 from analytics.models import CodeQLVulnerability
 from tests.conftest import BaseTestCase
 
@@ -673,3 +678,113 @@ class TestCodeQLService(BaseTestCase):
         rule_info = {'tags': ['other-tag']}
         cwe_id = self.service._extract_cwe_id(rule_info)
         assert cwe_id is None
+
+
+class TestOpenVulnerabilitiesTimeline(BaseTestCase):
+    """Test cases for the open vulnerabilities timeline"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = CodeQLService('ghp_test_token_12345')
+        self.repo_full_name = 'test-org/test-repo'
+        self.vulns = [
+            Mock(severity='high', created_at=datetime(2024, 1, 2, 15, 0), fixed_at=datetime(2024, 1, 5, 1, 0),
+                 dismissed_at=None),
+            Mock(severity='critical', created_at=datetime(2023, 12, 1), fixed_at=None, dismissed_at=None),
+            Mock(severity='low', created_at=datetime(2024, 1, 3, tzinfo=timezone.utc),
+                 fixed_at=datetime(2024, 1, 9), dismissed_at=datetime(2024, 1, 4)),
+            Mock(severity='medium', created_at=datetime(2024, 1, 20), fixed_at=None, dismissed_at=None),
+        ]
+
+    def _naive_counts(self, start_day, end_day):
+        """Reference implementation: +1 for every day each vulnerability is open"""
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        series = {severity: [0] * len(days) for severity in SEVERITIES}
+        for v in self.vulns:
+            closed = min([d for d in (v.fixed_at, v.dismissed_at) if d], default=None)
+            for i, day in enumerate(days):
+                if v.created_at.date() <= day and (closed is None or day < closed.date()):
+                    series[v.severity][i] += 1
+        return series
+
+    def test_difference_array_matches_daily_loop(self):
+        """Prefix sums give the same counts as incrementing every open day"""
+        start_day, end_day = date(2024, 1, 1), date(2024, 1, 10)
+        counts = open_vulnerability_counts(self.vulns, start_day, end_day)
+        expected = self._naive_counts(start_day, end_day)
+        for row, severity in enumerate(SEVERITIES):
+            assert counts[row].tolist() == expected[severity]
+        # High is open on Jan 2-4, closed on Jan 5
+        assert counts[SEVERITIES.index('high')].tolist()[:6] == [0, 1, 1, 1, 0, 0]
+
+    def test_timeline_computes_when_snapshots_missing(self):
+        """Without complete snapshots the timeline is computed from vulnerabilities"""
+        with patch('analytics.models.CodeQLDailySnapshot') as mock_snapshot, \
+                patch('analytics.codeql_service.CodeQLVulnerability') as mock_vuln:
+            self._stored_snapshots(mock_snapshot, [], latest=None)
+            mock_vuln.objects.return_value.only.return_value = self.vulns
+            timeline = self.service.get_open_vulnerabilities_timeline(
+                self.repo_full_name, datetime(2024, 1, 1), datetime(2024, 1, 3)
+            )
+        assert timeline['labels'] == ['2024-01-01', '2024-01-02', '2024-01-03']
+        assert timeline['series']['high'] == [0, 1, 1]
+        assert timeline['series']['critical'] == [1, 1, 1]
+
+    def test_timeline_reads_complete_snapshots(self):
+        """Snapshots covering every day are used without querying vulnerabilities"""
+        snapshots = [
+            Mock(critical=1, high=i, medium=0, low=0) for i in range(3)
+        ]
+        with patch('analytics.models.CodeQLDailySnapshot') as mock_snapshot, \
+                patch('analytics.codeql_service.CodeQLVulnerability') as mock_vuln:
+            mock_snapshot.objects.return_value.order_by.return_value = snapshots
+            timeline = self.service.get_open_vulnerabilities_timeline(
+                self.repo_full_name, datetime(2024, 1, 1), datetime(2024, 1, 3)
+            )
+        assert timeline['series']['high'] == [0, 1, 2]
+        mock_vuln.objects.assert_not_called()
+
+    def _stored_snapshots(self, mock_snapshot, in_range, latest):
+        """Range query (ordered by day) and latest snapshot (ordered by -day) of the repository"""
+        latest_query = Mock()
+        latest_query.first.return_value = latest
+        mock_snapshot.objects.return_value.order_by.side_effect = (
+            lambda key: in_range if key == 'day' else latest_query
+        )
+
+    def test_timeline_carries_latest_snapshot_forward(self):
+        """Days after the last indexing day repeat the latest snapshot"""
+        latest = Mock(day=datetime(2024, 1, 2), critical=1, high=4, medium=0, low=0)
+        in_range = [Mock(day=datetime(2024, 1, 1), critical=1, high=3, medium=0, low=0), latest]
+        with patch('analytics.models.CodeQLDailySnapshot') as mock_snapshot, \
+                patch('analytics.codeql_service.CodeQLVulnerability') as mock_vuln:
+            self._stored_snapshots(mock_snapshot, in_range, latest)
+            timeline = self.service.get_open_vulnerabilities_timeline(
+                self.repo_full_name, datetime(2024, 1, 1), datetime(2024, 1, 4)
+            )
+        assert timeline['series']['high'] == [3, 4, 4, 4]
+        mock_vuln.objects.assert_not_called()
+
+    def test_timeline_computes_when_snapshots_have_gaps(self):
+        """Missing days before the latest snapshot are not carried forward"""
+        latest = Mock(day=datetime(2024, 1, 2), critical=1, high=4, medium=0, low=0)
+        with patch('analytics.models.CodeQLDailySnapshot') as mock_snapshot, \
+                patch('analytics.codeql_service.CodeQLVulnerability') as mock_vuln:
+            self._stored_snapshots(mock_snapshot, [latest], latest)
+            mock_vuln.objects.return_value.only.return_value = self.vulns
+            timeline = self.service.get_open_vulnerabilities_timeline(
+                self.repo_full_name, datetime(2024, 1, 1), datetime(2024, 1, 4)
+            )
+        assert timeline['series']['high'] == [0, 1, 1, 1]
+
+    def test_rebuild_snapshots_writes_history(self):
+        """Rebuilding replaces the repository snapshots with one row per day"""
+        with patch('analytics.models.CodeQLDailySnapshot') as mock_snapshot, \
+                patch('analytics.codeql_service.CodeQLVulnerability') as mock_vuln:
+            mock_vuln.objects.return_value.only.return_value = self.vulns
+            written = rebuild_open_vulnerability_snapshots(self.repo_full_name, days=30)
+
+        assert written == 30
+        mock_snapshot.objects.return_value.delete.assert_called_once()
+        inserted = mock_snapshot.objects.insert.call_args.args[0]
+        assert len(inserted) == 30
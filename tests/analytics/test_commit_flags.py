@@ -0,0 +1,81 @@
+"""
+Tests for per-commit derived flags
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from analytics.commit_flags import (
+    FLAG_CONFIG_ONLY,
+    FLAG_DOC_ONLY,
+    FLAG_GENERIC_MESSAGE,
+    FLAG_HAS_CODE,
+    FLAG_HAS_TESTS,
+    FLAG_HAS_TICKET_REF,
+    FLAG_MICRO,
+    FLAG_SUSPICIOUS,
+    compute_commit_flags,
+    decode_flags,
+    files_only_type,
+    flag_count_pipeline,
+)
+from analytics.models import Commit, FileChange
+
+
+class TestComputeCommitFlags(TestCase):
+    """Test cases for compute_commit_flags"""
+
+    def test_code_and_tests(self):
+        """Code and test files, with a ticket reference"""
+        flags, languages = compute_commit_flags(
+            ['src/api/views.py', 'tests/test_views.py', 'web/App.tsx', 'README.md'], 40, 'Add export #12'
+        )
+        self.assertEqual(flags, FLAG_HAS_CODE | FLAG_HAS_TESTS | FLAG_HAS_TICKET_REF)
+        self.assertEqual(languages, ['python', 'typescript'])
+
+    def test_doc_and_config_only(self):
+        """Documentation or configuration only commits with real changes are suspicious"""
+        flags, languages = compute_commit_flags(['docs/guide.md'], 20, 'Write the guide')
+        # As in the quality metrics, doc_only and config_only only exclude code files
+        self.assertEqual(flags, FLAG_DOC_ONLY | FLAG_CONFIG_ONLY | FLAG_SUSPICIOUS)
+        self.assertEqual(languages, [])
+
+        flags, _ = compute_commit_flags(['config/settings.yaml'], 3, 'update settings')
+        self.assertEqual(flags, FLAG_DOC_ONLY | FLAG_CONFIG_ONLY | FLAG_GENERIC_MESSAGE)
+
+    def test_micro_commits(self):
+        """Commits with at most two changes are micro, one change is suspicious"""
+        flags, _ = compute_commit_flags(['app.go'], 1, 'wip')
+        self.assertEqual(flags, FLAG_HAS_CODE | FLAG_MICRO | FLAG_SUSPICIOUS | FLAG_GENERIC_MESSAGE)
+        self.assertTrue(decode_flags(flags)['micro'])
+        self.assertFalse(decode_flags(flags)['has_tests'])
+
+    def test_files_only_type(self):
+        """File-based classification shortcut"""
+        self.assertEqual(files_only_type(['README.md', 'docs/intro.rst']), 'docs')
+        self.assertEqual(files_only_type(['Dockerfile', '.github/ci.yml']), 'chore')
+        self.assertIsNone(files_only_type(['README.md', 'main.py']))
+        self.assertIsNone(files_only_type([]))
+
+    def test_flag_count_pipeline(self):
+        """One $group counts every flag"""
+        pipeline = flag_count_pipeline({'developer_id': 'dev1'})
+        self.assertEqual(pipeline[0], {'$match': {'developer_id': 'dev1'}})
+        self.assertIn('has_ticket_ref', pipeline[-1]['$group'])
+
+
+class TestCommitSaveFlags(TestCase):
+    """Test cases for flags computed when a commit is saved"""
+
+    def test_save_computes_flags(self):
+        """Flags and languages are set from the files, size and message"""
+        commit = Commit(
+            author_email='dev@example.com',
+            message='Fix login #7',
+            total_changes=12,
+            files_changed=[FileChange(filename='auth/login.rb'), FileChange(filename='spec/login_spec.rb')]
+        )
+        with patch('mongoengine.Document.save', return_value=None):
+            commit.save()
+        self.assertEqual(commit.flags, FLAG_HAS_CODE | FLAG_HAS_TESTS | FLAG_HAS_TICKET_REF)
+        self.assertEqual(commit.languages, ['ruby'])
@@ -0,0 +1,139 @@
+"""
+Tests for the columnar commit frame
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+from django.test import TestCase, override_settings
+
+from analytics.commit_frame import CommitFrame, COMMIT_TYPES
+from analytics.commit_classifier import build_commit_type_stats, get_commit_type_stats
+
+
+def _doc(authored_date, additions=0, deletions=0, commit_type='other',
+         email='dev@example.com', name='Dev', repo='org/repo'):
+    return {
+        'authored_date': authored_date,
+        'additions': additions,
+        'deletions': deletions,
+        'commit_type': commit_type,
+        'author_email': email,
+        'author_name': name,
+        'repository_full_name': repo,
+    }
+
+
+class TestCommitFrame(TestCase):
+    """Test cases for CommitFrame"""
+
+    def setUp(self):
+        self.now = datetime(2024, 6, 30, 12, 0, tzinfo=timezone.utc)
+        # Stored dates come back from Mongo as naive UTC datetimes
+        self.docs = [
+            _doc(datetime(2024, 6, 29, 9, 15), 10, 2, 'feature', 'alice@example.com', 'Alice'),
+            _doc(datetime(2024, 6, 29, 9, 45), 5, 5, 'fix', 'ALICE@example.com', 'Alice'),
+            _doc(datetime(2024, 6, 10, 23, 5), 100, 0, 'docs', 'bob@example.com', 'Bob', 'org/other'),
+            _doc(datetime(2024, 3, 1, 0, 30), 1, 1, 'test', 'bob@example.com', 'Bob'),
+            _doc(None, 50, 50),
+        ]
+        self.frame = CommitFrame.from_documents(self.docs)
+
+    def test_from_documents_skips_missing_dates(self):
+        """Documents without authored_date are ignored"""
+        self.assertEqual(len(self.frame), 4)
+        self.assertEqual(self.frame.total_additions(), 116)
+        self.assertEqual(self.frame.total_deletions(), 8)
+
+    def test_from_queryset_uses_projection(self):
+        """The queryset is projected and read as raw dictionaries"""
+        queryset = Mock()
+        queryset.only.return_value.as_pymongo.return_value = self.docs[:2]
+
+        frame = CommitFrame.from_queryset(queryset)
+
+        queryset.only.assert_called_once_with(*CommitFrame.PROJECTION)
+        self.assertEqual(len(frame), 2)
+
+    def test_empty_frame(self):
+        """An empty frame returns neutral values"""
+        frame = CommitFrame.empty()
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.total_additions(), 0)
+        self.assertEqual(frame.per_author_totals(), [])
+        self.assertEqual(frame.daily_counts(), {})
+        self.assertIsNone(frame.commit_frequency()['days_since_last_commit'])
+
+    def test_type_counts_match_commit_type_stats(self):
+        """Vectorized type counts give the same stats as iterating documents"""
+        commits = [Mock(commit_type=doc['commit_type']) for doc in self.docs if doc['authored_date']]
+        self.assertEqual(build_commit_type_stats(self.frame.type_counts()), get_commit_type_stats(commits))
+        self.assertEqual(set(self.frame.type_counts()), set(COMMIT_TYPES))
+
+    def test_since_filters_on_cutoff(self):
+        """since() keeps commits authored at or after the cutoff"""
+        recent = self.frame.since(self.now - timedelta(days=30))
+        self.assertEqual(len(recent), 3)
+
+    def test_per_author_totals_keeps_email_case(self):
+        """Authors are interned by exact (email, name) pairs"""
+        totals = {(t['email'], t['name']): t for t in self.frame.per_author_totals()}
+        self.assertEqual(totals[('alice@example.com', 'Alice')]['additions'], 10)
+        self.assertEqual(totals[('ALICE@example.com', 'Alice')]['commits'], 1)
+        self.assertEqual(totals[('bob@example.com', 'Bob')]['commits'], 2)
+
+    def test_per_repository_totals(self):
+        """Totals are grouped by repository"""
+        totals = {t['name']: t for t in self.frame.per_repository_totals()}
+        self.assertEqual(totals['org/repo']['commits'], 3)
+        self.assertEqual(totals['org/other']['additions'], 100)
+
+    def test_hourly_and_daily_counts(self):
+        """Hourly histogram and daily counts use UTC"""
+        hourly = self.frame.hourly_counts()
+        self.assertEqual(int(hourly[9]), 2)
+        self.assertEqual(int(hourly[23]), 1)
+        self.assertEqual(int(hourly.sum()), 4)
+        self.assertEqual(self.frame.daily_counts()['2024-06-29'], 2)
+
+    @override_settings(TIME_ZONE='Europe/Paris')
+    def test_local_hour_buckets_use_configured_timezone(self):
+        """Bubble buckets are expressed in local time"""
+        buckets = self.frame.local_hour_buckets()
+        # 2024-06-10 23:05 UTC is 2024-06-11 01:05 in Paris (UTC+2)
+        self.assertEqual(buckets[(datetime(2024, 6, 11).date(), 1)], 1)
+        self.assertEqual(buckets[(datetime(2024, 6, 29).date(), 11)], 2)
+
+        by_repo = self.frame.local_hour_buckets(by_repository=True)
+        self.assertEqual(by_repo[('org/other', datetime(2024, 6, 11).date(), 1)], 1)
+
+    def test_commit_frequency_matches_document_implementation(self):
+        """Frequency terms follow the per-document conventions"""
+        frequency = self.frame.commit_frequency(now=self.now)
+        first = datetime(2024, 3, 1, 0, 30)
+        last = datetime(2024, 6, 29, 9, 45)
+        total_days = (last - first).days + 1
+
+        self.assertEqual(frequency['total_days'], total_days)
+        self.assertEqual(frequency['active_days'], 3)
+        self.assertEqual(frequency['commits_last_30_days'], 3)
+        self.assertEqual(frequency['commits_last_90_days'], 3)
+        self.assertEqual(frequency['days_since_last_commit'], 1)
+        self.assertEqual(frequency['avg_commits_per_day'], round(4 / total_days, 2))
+        self.assertEqual(frequency['recent_activity_score'], 100)
+
+    def test_gap_statistics(self):
+        """Gaps are whole days between consecutive commits"""
+        frame = CommitFrame.from_documents([
+            _doc(datetime(2024, 1, 1)),
+            _doc(datetime(2024, 1, 3)),
+            _doc(datetime(2024, 1, 7)),
+        ])
+        mean, std = frame.gap_statistics()
+        self.assertEqual(mean, 3.0)
+        self.assertAlmostEqual(std, 1.414, places=3)
+
+    def test_change_size_percentiles(self):
+        """Percentiles are computed on additions + deletions"""
+        percentiles = self.frame.change_size_percentiles((50, 100))
+        self.assertEqual(percentiles['p100'], 100.0)
+        self.assertEqual(percentiles['p50'], 11.0)
@@ -0,0 +1,70 @@
+"""
+Golden tests for the compiled commit classifier
+"""
+from django.test import TestCase
+
+from analytics.commit_classifier import classify_commit
+from analytics.commit_rules import classify_many, classify_message
+from analytics.management.commands.benchmark_commit_classifier import synthetic_messages
+
+GOLDEN = [
+    ('', 'other'),
+    (None, 'other'),
+    ('   ', 'chore'),  # blank after strip, short
+    ('Fix crash on empty list', 'fix'),
+    ('fix(api): handle timeouts', 'fix'),
+    ('feat: export to CSV', 'feature'),
+    ('Featured articles page', 'feature'),  # prefix match, no word boundary
+    ('Added login page', 'feature'),
+    ('Docs: explain setup', 'docs'),
+    ('README tweaks for the installer', 'docs'),
+    ('Refactor the sync service', 'refactor'),
+    ('Portuguese translation of the home page', 'refactor'),
+    ('tests for the parser module', 'test'),
+    ('Style: run black on analytics', 'style'),
+    ('chore(deps): bump lodash', 'chore'),
+    ('Merge branch main into develop', 'chore'),
+    ('Bump version to 1.2.3', 'chore'),
+    ('Cibles: ajout du mode sombre', 'chore'),  # 'ci' prefix
+    ('WIP', 'chore'),
+    ('perf: speed up the dashboard queries', 'other'),
+    ('Speed up the dashboard: remove N+1 queries', 'refactor'),
+    ('Handle bug in the login form', 'fix'),
+    ('Handle errors when the list is empty', 'other'),
+    ('Handle bug, fix later', 'fix'),  # 'bug,' is not a word, 'fix' is
+    ('Initial commit', 'chore'),  # short message
+    ('Initial commit of the API', 'other'),
+    ('v1.2.3', 'chore'),
+    ('Première version', 'other'),
+    ('Première vers.', 'chore'),
+    ('Résolution du problème de connexion', 'other'),
+    ('Dashboard\n\nadd caching to the stats endpoint', 'feature'),
+    ('Release 2024.10 of the analytics pipeline', 'other'),
+    ('Some release notes about the dashboard: disable polling', 'fix'),
+]
+
+
+class TestClassifyMessage(TestCase):
+    """Test cases for the compiled classifier"""
+
+    def test_golden_set(self):
+        """Expected categories, identical to the reference classifier"""
+        for message, expected in GOLDEN:
+            with self.subTest(message=message):
+                self.assertEqual(classify_message(message), expected)
+                self.assertEqual(classify_commit(message), expected)
+
+    def test_matches_reference_on_synthetic_messages(self):
+        """Same output as classify_commit on generated commit histories"""
+        messages = synthetic_messages(20000, seed=3)
+        self.assertEqual(
+            [classify_message(message) for message in messages],
+            [classify_commit(message) for message in messages]
+        )
+
+    def test_classify_many_keeps_order_across_processes(self):
+        """The process pool returns categories in input order"""
+        messages = synthetic_messages(3000, seed=11)
+        expected = [classify_commit(message) for message in messages]
+        self.assertEqual(classify_many(messages), expected)
+        self.assertEqual(classify_many(messages, workers=2, parallel_threshold=1, chunk_size=500), expected)
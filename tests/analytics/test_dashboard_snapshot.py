@@ -0,0 +1,106 @@
+"""
+Tests for the global dashboard snapshot
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from bson import ObjectId
+from django.test import TestCase, override_settings
+
+from analytics.dashboard_snapshot import (
+    DASHBOARD_SNAPSHOT_KEY,
+    refresh_dashboard_snapshot,
+    serve_dashboard,
+    top_developers,
+)
+from tests.analytics.test_page_snapshots import MemoryStore
+
+
+@override_settings(DASHBOARD_SNAPSHOT_INTERVAL=10)
+class TestDashboardSnapshot(TestCase):
+    """Test cases for serving and refreshing the dashboard snapshot"""
+
+    def setUp(self):
+        self.store = MemoryStore()
+        self.store.get = Mock(side_effect=self.store.get)
+        patchers = [
+            patch('analytics.page_snapshots.get_store', return_value=self.store),
+            patch('analytics.page_snapshots.versions_digest', return_value='v1'),
+            patch('analytics.dashboard_snapshot.compute_dashboard_context', side_effect=lambda: {'total_commits': 42}),
+        ]
+        self.compute = patchers[2].start()
+        patchers[0].start()
+        patchers[1].start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_render_reads_the_snapshot(self):
+        serve_dashboard()
+        self.store.get.reset_mock()
+
+        context, snapshot = serve_dashboard()
+
+        self.assertEqual(context, {'total_commits': 42})
+        self.assertFalse(snapshot['stale'])
+        self.assertEqual(self.compute.call_count, 1)
+        self.store.get.assert_called_once_with(DASHBOARD_SNAPSHOT_KEY)
+
+    @patch('django_q.tasks.async_task')
+    def test_missed_refreshes_enqueue_one_refresh(self, async_task):
+        self.store.entries[DASHBOARD_SNAPSHOT_KEY] = {
+            'context': {'total_commits': 1}, 'computed_at': datetime.now(timezone.utc) - timedelta(minutes=30),
+            'versions': 'v1',
+        }
+
+        for _ in range(3):
+            context, snapshot = serve_dashboard()
+
+        self.assertEqual(context, {'total_commits': 1})
+        self.assertTrue(snapshot['refreshing'])
+        self.assertEqual(async_task.call_count, 1)
+        self.assertEqual(async_task.call_args.args[0], 'analytics.page_snapshots.refresh_snapshot')
+        self.assertEqual(async_task.call_args.args[-1], DASHBOARD_SNAPSHOT_KEY)
+        self.compute.assert_not_called()
+
+        refresh_dashboard_snapshot()
+        self.assertEqual(self.store.entries[DASHBOARD_SNAPSHOT_KEY]['context'], {'total_commits': 42})
+        self.assertNotIn(DASHBOARD_SNAPSHOT_KEY + ':refresh', self.store.entries)
+
+    def test_snapshot_younger_than_two_intervals_is_fresh(self):
+        """The dashboard uses its schedule interval, not PAGE_SNAPSHOT_SOFT_TTL"""
+        self.store.entries[DASHBOARD_SNAPSHOT_KEY] = {
+            'context': {'total_commits': 1}, 'computed_at': datetime.now(timezone.utc) - timedelta(minutes=15),
+            'versions': 'v1',
+        }
+
+        with override_settings(PAGE_SNAPSHOT_SOFT_TTL=60), patch('django_q.tasks.async_task') as async_task:
+            context, snapshot = serve_dashboard()
+
+        self.assertEqual(context, {'total_commits': 1})
+        self.assertFalse(snapshot['stale'])
+        async_task.assert_not_called()
+
+
+class TestTopDevelopers(TestCase):
+    """Test cases for the top developers aggregation"""
+
+    @patch('analytics.models.Developer.objects')
+    @patch('analytics.models.Commit._get_collection')
+    def test_groups_fold_by_developer_name(self, commit_collection, developer_objects):
+        ann, bob = ObjectId(), ObjectId()
+        commit_collection.return_value.aggregate.return_value = [
+            {'_id': {'developer_id': str(ann), 'author_name': None}, 'commits': 4, 'author_name': 'ann'},
+            {'_id': {'developer_id': None, 'author_name': 'Ann Smith '}, 'commits': 2, 'author_name': 'Ann Smith '},
+            {'_id': {'developer_id': str(bob), 'author_name': None}, 'commits': 5, 'author_name': 'bob'},
+            {'_id': {'developer_id': None, 'author_name': 'carl'}, 'commits': 1, 'author_name': 'carl'},
+        ]
+        developer_objects.return_value.only.return_value.as_pymongo.return_value = [
+            {'_id': ann, 'primary_name': 'Ann Smith'},
+            {'_id': bob, 'primary_name': 'Bob'},
+        ]
+
+        result = top_developers(datetime.now(timezone.utc), limit=2)
+
+        self.assertEqual(result, [('Ann Smith', 6), ('Bob', 5)])
+        pipeline = commit_collection.return_value.aggregate.call_args.args[0]
+        self.assertIn('$group', pipeline[1])
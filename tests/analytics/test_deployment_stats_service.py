@@ -0,0 +1,143 @@
+"""
+Tests for weekly deployment aggregates (change failure rate, time to restore)
+"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from analytics.deployment_stats_service import (
+    DeploymentStatsService,
+    build_weekly_stats,
+    deployment_outcome,
+    week_start,
+)
+from analytics.dora_service import stability_metrics
+
+
+def _deployment(created_at, *states, environment='production'):
+    """Build a deployment whose statuses happen one minute apart, in the given order"""
+    statuses = [
+        {'state': state, 'created_at': (created_at + timedelta(minutes=i + 1)).isoformat() + 'Z'}
+        for i, state in enumerate(states)
+    ]
+    # GitHub returns statuses newest first
+    return Mock(created_at=created_at, environment=environment, statuses=list(reversed(statuses)))
+
+
+def _query(items):
+    query = Mock()
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.__iter__ = lambda self: iter(items)
+    return query
+
+
+class TestBuildWeeklyStats(TestCase):
+    """Test cases for the weekly aggregation"""
+
+    def setUp(self):
+        self.monday = datetime(2024, 6, 3, 9, 0)
+
+    def test_week_start_is_monday_midnight(self):
+        """Weeks start on Monday 00:00 UTC"""
+        self.assertEqual(week_start(datetime(2024, 6, 6, 17, 30)), datetime(2024, 6, 3))
+        self.assertEqual(week_start(self.monday), datetime(2024, 6, 3))
+
+    def test_deployment_outcome_uses_latest_final_status(self):
+        """The latest final status decides the outcome, pending statuses are ignored"""
+        self.assertEqual(deployment_outcome(_deployment(self.monday, 'pending', 'failure', 'success')), 'success')
+        self.assertEqual(deployment_outcome(_deployment(self.monday, 'in_progress', 'error')), 'failure')
+        self.assertIsNone(deployment_outcome(_deployment(self.monday, 'pending')))
+
+    def test_failure_restored_by_next_success(self):
+        """An incident is restored by the next success of the environment"""
+        deployments = [
+            _deployment(self.monday, 'success'),
+            _deployment(self.monday + timedelta(days=1), 'failure'),
+            _deployment(self.monday + timedelta(days=1, hours=1), 'error'),
+            _deployment(self.monday + timedelta(days=8), 'success'),
+            _deployment(self.monday + timedelta(days=9), 'pending'),
+        ]
+
+        weeks = build_weekly_stats(deployments)
+
+        first = weeks[datetime(2024, 6, 3)]
+        self.assertEqual(first['deployments'], 3)
+        self.assertEqual(first['failed_deployments'], 2)
+        self.assertEqual(first['incidents'], 1)
+        self.assertEqual(first['restored_incidents'], 1)
+        # Opened at day 1 + 1 minute, restored at day 8 + 1 minute
+        self.assertEqual(first['restore_seconds_total'], timedelta(days=7).total_seconds())
+
+        second = weeks[datetime(2024, 6, 10)]
+        self.assertEqual(second['deployments'], 1)
+        self.assertEqual(second['failed_deployments'], 0)
+        self.assertEqual(second['incidents'], 0)
+
+    def test_open_incident_is_not_restored(self):
+        """A failure without a later success stays open"""
+        weeks = build_weekly_stats([_deployment(self.monday, 'failure')])
+        week = weeks[datetime(2024, 6, 3)]
+        self.assertEqual(week['incidents'], 1)
+        self.assertEqual(week['restored_incidents'], 0)
+
+
+class TestDeploymentStatsService(TestCase):
+    """Test cases for DeploymentStatsService"""
+
+    @patch('analytics.models.DeploymentWeeklyStats')
+    @patch('analytics.models.Deployment')
+    def test_rebuild_starts_at_last_successful_deployment(self, mock_deployment, mock_stats):
+        """Only weeks since the last healthy deployment before the change are rebuilt"""
+        previous = [
+            _deployment(datetime(2024, 5, 30), 'failure'),
+            _deployment(datetime(2024, 5, 22), 'success'),
+        ]
+        current = [_deployment(datetime(2024, 6, 4), 'success')]
+        mock_deployment.objects.filter.side_effect = [_query(previous), _query(current)]
+        existing = _query([])
+        mock_stats.objects.filter.return_value = existing
+
+        rows = DeploymentStatsService.rebuild('org/repo', 'production', changed_since=datetime(2024, 6, 4))
+
+        self.assertEqual(rows, 1)
+        start = datetime(2024, 5, 20)
+        _, kwargs = mock_deployment.objects.filter.call_args_list[0]
+        self.assertEqual(kwargs['created_at__lt'], datetime(2024, 6, 3))
+        existing.filter.assert_called_once_with(week_start__gte=start)
+        existing.delete.assert_called_once()
+        mock_stats.objects.insert.assert_called_once()
+
+    @patch('analytics.models.DeploymentWeeklyStats')
+    def test_summarize_sums_production_rows(self, mock_stats):
+        """Rows are summed across repositories, non production environments are skipped"""
+        rows = [
+            Mock(environment='production', deployments=8, failed_deployments=2, incidents=2,
+                 restored_incidents=2, restore_seconds_total=7200.0),
+            Mock(environment='prod-eu', deployments=2, failed_deployments=0, incidents=0,
+                 restored_incidents=0, restore_seconds_total=0.0),
+            Mock(environment='staging', deployments=50, failed_deployments=25, incidents=10,
+                 restored_incidents=10, restore_seconds_total=1.0),
+        ]
+        mock_stats.objects.filter.return_value = _query(rows)
+
+        summary = DeploymentStatsService.summarize(['org/a', 'org/b'])
+
+        self.assertEqual(summary['deployments'], 10)
+        self.assertEqual(summary['failed_deployments'], 2)
+        self.assertEqual(summary['change_failure_rate'], 20.0)
+        self.assertEqual(summary['mean_time_to_restore_hours'], 1.0)
+
+        metrics = stability_metrics(summary)
+        self.assertEqual(metrics['change_failure_rate']['performance']['grade'], 'High')
+        self.assertEqual(metrics['time_to_restore']['performance']['grade'], 'High')
+
+    @patch('analytics.models.DeploymentWeeklyStats')
+    def test_summarize_without_deployments(self, mock_stats):
+        """No deployments gives no rate rather than 0%"""
+        mock_stats.objects.filter.return_value = _query([])
+        summary = DeploymentStatsService.summarize(['org/a'])
+        self.assertIsNone(summary['change_failure_rate'])
+        self.assertIsNone(summary['mean_time_to_restore_hours'])
+        self.assertEqual(stability_metrics(summary)['change_failure_rate']['performance']['grade'], 'N/A')
@@ -0,0 +1,85 @@
+"""
+Tests for the plan/apply mode of developer auto-grouping
+"""
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from bson import ObjectId
+from django.test import TestCase
+
+from analytics.developer_grouping_service import DeveloperGroupingService
+from analytics.models import Developer, DeveloperAlias
+
+
+class TestAutoGroupDevelopers(TestCase):
+    """Test cases for DeveloperGroupingService.auto_group_developers"""
+
+    def setUp(self):
+        self.bob_id = ObjectId()
+        seen = datetime(2024, 1, 1)
+        self.ids = [ObjectId() for _ in range(6)]
+        self.aliases = [
+            {'_id': self.ids[0], 'name': 'Jane Doe', 'email': '123+janedoe@users.noreply.github.com'},
+            {'_id': self.ids[1], 'name': 'Jane D', 'email': 'janedoe@users.noreply.github.com'},
+            {'_id': self.ids[2], 'name': 'Bob', 'email': 'bob@example.com', 'developer': self.bob_id},
+            {'_id': self.ids[3], 'name': 'Bobby', 'email': 'bob@example.com'},
+            {'_id': self.ids[4], 'name': 'Robert', 'email': 'BOB@example.com'},
+            {'_id': self.ids[5], 'name': 'Solo', 'email': 'solo@example.org'},
+        ]
+        for alias in self.aliases:
+            alias.update(first_seen=seen, last_seen=seen, commit_count=1)
+
+        alias_patch = patch.object(DeveloperAlias, 'objects')
+        developer_patch = patch.object(Developer, 'objects')
+        self.mock_aliases = alias_patch.start()
+        self.mock_developers = developer_patch.start()
+        self.addCleanup(alias_patch.stop)
+        self.addCleanup(developer_patch.stop)
+        self.mock_aliases.only.return_value.as_pymongo.return_value = self.aliases
+        self.mock_developers.return_value.only.return_value.as_pymongo.return_value = [
+            {'_id': self.bob_id, 'primary_name': 'Bob', 'primary_email': 'bob@example.com'}
+        ]
+
+        self.developer_collection = Mock()
+        self.developer_collection.bulk_write.return_value = Mock(inserted_count=2, modified_count=0)
+        self.alias_collection = Mock()
+        self.alias_collection.bulk_write.return_value = Mock(inserted_count=0, modified_count=4)
+        for model, collection in ((Developer, self.developer_collection), (DeveloperAlias, self.alias_collection)):
+            collection_patch = patch.object(model, '_get_collection', return_value=collection)
+            collection_patch.start()
+            self.addCleanup(collection_patch.stop)
+
+    def test_dry_run_plans_without_writing(self):
+        """The plan covers every ungrouped alias and nothing is written"""
+        result = DeveloperGroupingService().auto_group_developers(dry_run=True)
+
+        self.assertTrue(result['success'])
+        self.assertTrue(result['dry_run'])
+        actions = {(d['type'], d['action'], d['added_count']) for d in result['developers']}
+        self.assertEqual(actions, {('github_id', 'created_new', 2), ('email', 'added_to_existing', 2)})
+        self.assertEqual(result['ungrouped_individuals'], 1)
+        self.assertEqual(len(result['plan']), 3)
+        self.assertIn('add to Bob <bob@example.com>', result['plan'][0])
+        self.developer_collection.bulk_write.assert_not_called()
+        self.alias_collection.bulk_write.assert_not_called()
+
+    @patch('analytics.developer_grouping_service.refresh_developer_stamps')
+    @patch('analytics.developer_grouping_service.invalidate_identity_index')
+    def test_apply_uses_one_bulk_write_per_collection(self, mock_invalidate, mock_restamp):
+        """New developers and alias links are written in bulk"""
+        result = DeveloperGroupingService().auto_group_developers()
+
+        self.assertEqual(result['written'], {'developers_inserted': 2, 'aliases_updated': 4})
+        self.developer_collection.bulk_write.assert_called_once()
+        inserts = self.developer_collection.bulk_write.call_args.args[0]
+        self.assertEqual(sorted(op._doc['primary_name'] for op in inserts), ['Jane Doe', 'Solo'])
+
+        self.alias_collection.bulk_write.assert_called_once()
+        updates = self.alias_collection.bulk_write.call_args.args[0]
+        existing = next(op for op in updates if op._doc['$set']['developer'] == self.bob_id)
+        self.assertEqual(existing._filter, {'_id': {'$in': [self.ids[3], self.ids[4]]}, 'developer': None})
+        mock_invalidate.assert_called_once()
+        self.assertEqual(sorted(mock_restamp.call_args.args[0]), [
+            '123+janedoe@users.noreply.github.com', 'BOB@example.com', 'bob@example.com',
+            'janedoe@users.noreply.github.com', 'solo@example.org',
+        ])
@@ -0,0 +1,246 @@
+"""
+Tests for materialized developer profiles
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+
+from analytics.analytics_service import AnalyticsService
+from analytics.commit_frame import CommitFrame
+from analytics.developer_profile_service import (
+    DeveloperProfileService,
+    ProfileState,
+    changed_developer_ids,
+    profile_fingerprint,
+    score_commit,
+)
+from analytics.models import DeveloperProfile
+
+
+def _commit(days_ago, repo='org/api', commit_type='feature', additions=10, deletions=2,
+            message='Add export endpoint #12', files=('api/export.py',), hour=12):
+    now = datetime.now(dt_timezone.utc)
+    authored = now.replace(hour=hour, minute=0, second=0, microsecond=0) - timedelta(days=days_ago)
+    return {
+        'authored_date': authored,
+        'repository_full_name': repo,
+        'additions': additions,
+        'deletions': deletions,
+        'total_changes': additions + deletions,
+        'commit_type': commit_type,
+        'message': message,
+        'files_changed': [{'filename': filename} for filename in files],
+        'developer_id': 'dev1',
+        'synced_at': authored,
+    }
+
+
+def _state(commits):
+    state = ProfileState()
+    for commit in commits:
+        state.add(commit)
+    return state
+
+
+class TestScoreCommit(TestCase):
+    """Test cases for the per-commit quality counters"""
+
+    def test_code_commit(self):
+        """Code files with a ticket reference"""
+        scores = score_commit(['src/app.py', 'README.md'], 12, 'Add cache #42', 'feature')
+        self.assertEqual(scores['real_code_commits'], 1)
+        self.assertEqual(scores['doc_only_commits'], 0)
+        self.assertEqual(scores['no_ticket_commits'], 0)
+        self.assertEqual(scores['suspicious_commits'], 0)
+        self.assertEqual((scores['code_quality_sum'], scores['impact_sum'], scores['complexity_sum']), (100, 80, 70))
+
+    def test_suspicious_commits(self):
+        """Micro, documentation-only and formatting-only commits are suspicious"""
+        self.assertEqual(score_commit(['app.py'], 1, 'x', 'other')['suspicious_commits'], 1)
+        self.assertEqual(score_commit(['docs/guide.md'], 20, 'Write guide', 'docs')['suspicious_commits'], 1)
+        self.assertEqual(score_commit(['app.py'], 4, 'Fix indent', 'style')['suspicious_commits'], 1)
+        self.assertEqual(score_commit(['app.py'], 0, 'Empty', 'other')['micro_commits'], 1)
+
+
+class TestProfileState(TestCase):
+    """Test cases for ProfileState"""
+
+    def setUp(self):
+        self.commits = [
+            _commit(2),
+            _commit(5, repo='org/web', commit_type='fix', message='fix', files=('web/app.js',)),
+            _commit(5, repo='org/web', commit_type='docs', message='Update docs', files=('README.md',), hour=15),
+            _commit(40, commit_type='refactor', additions=50, deletions=30),
+            _commit(120, commit_type='chore', files=('package.json',)),
+            _commit(500, repo='org/legacy'),
+        ]
+
+    def test_incremental_updates_match_rebuild(self):
+        """Adding commits to a stored profile gives the same document as a rebuild"""
+        rebuilt = _state(self.commits)
+        rebuilt.prune()
+
+        stored = _state(self.commits[:3])
+        stored.prune()
+        incremental = ProfileState.from_document(stored.to_fields())
+        for commit in self.commits[3:]:
+            incremental.add(commit)
+        incremental.prune()
+
+        self.assertEqual(incremental.to_fields(), rebuilt.to_fields())
+
+    def test_aggregates(self):
+        """Totals, repositories and message quality"""
+        state = _state(self.commits)
+        self.assertEqual(state.total_commits, 6)
+        self.assertEqual(state.top_repositories(1), [
+            {'name': 'org/api', 'commits': 3, 'additions': 70, 'deletions': 34}
+        ])
+        self.assertEqual(state.commit_quality()['generic_commits'], 2)  # 'fix', 'Update docs'
+        self.assertEqual(state.commit_type_distribution()['counts']['feature'], 2)
+        self.assertEqual(state.detailed_quality_metrics()['doc_only_commits'], 1)
+        self.assertEqual(state.first_commit_date(), self.commits[-1]['authored_date'])
+
+    def test_windows_ignore_pruned_history(self):
+        """Monthly windows only cover the last 12 x 30 days"""
+        state = _state(self.commits)
+        state.prune()
+        activity = state.activity_over_time()
+        self.assertEqual(len(activity), 12)
+        self.assertEqual(activity[0]['commits'], 3)
+        self.assertEqual(sum(month['commits'] for month in activity), 5)
+        self.assertEqual(len(state.quality_metrics_by_month()['labels']), 3)
+
+    def test_commit_frequency_matches_commit_frame(self):
+        """Frequency report matches the per-commit computation (commits at the same time of day)"""
+        commits = [commit for commit in self.commits if commit['authored_date'].hour == 12]
+        expected = AnalyticsService._format_frequency(CommitFrame.from_documents(commits))
+        self.assertEqual(_state(commits).commit_frequency(), expected)
+
+    @override_settings(TIME_ZONE='Europe/Paris')
+    def test_activity_bubbles_use_local_hours(self):
+        """Bubbles are keyed by (days ago, local hour), busiest repository first"""
+        bubbles = _state(self.commits).activity_bubbles()
+        self.assertEqual(list(bubbles), ['org/api', 'org/web'])
+        hours = {hour for _, hour in bubbles['org/web']}
+        self.assertIn(hours, ({13, 16}, {14, 17}))  # 12:00 and 15:00 UTC
+        self.assertEqual(sum(b['commits'] for b in bubbles['org/api'].values()), 3)
+
+
+class TestDeveloperProfileService(TestCase):
+    """Test cases for DeveloperProfileService"""
+
+    def setUp(self):
+        self.collection = Mock()
+        collection_patch = patch.object(DeveloperProfile, '_get_collection', return_value=self.collection)
+        collection_patch.start()
+        self.addCleanup(collection_patch.stop)
+
+    def _stored(self, commits, version=3):
+        doc = _state(commits).to_fields()
+        doc.update(_id='p1', developer_id='dev1', version=version, stale=False,
+                   built_at=datetime.now(dt_timezone.utc) - timedelta(days=30))
+        return doc
+
+    def test_record_ingested_updates_profile(self):
+        """New commits are added with an optimistic, versioned update"""
+        self.collection.find_one.return_value = self._stored([_commit(60)])
+        self.collection.update_one.return_value = Mock(modified_count=1)
+
+        DeveloperProfileService.record_ingested([_commit(1), _commit(0)])
+
+        query, update = self.collection.update_one.call_args.args
+        self.assertEqual(query, {'_id': 'p1', 'version': 3})
+        self.assertEqual(update['$set']['total_commits'], 3)
+        self.assertEqual(update['$inc'], {'version': 1})
+        self.collection.update_many.assert_not_called()
+
+    def test_record_ingested_marks_conflicts_stale(self):
+        """Profiles that keep changing underneath, or whose commits changed, are rebuilt on read"""
+        self.collection.find_one.return_value = self._stored([_commit(60)])
+        self.collection.update_one.return_value = Mock(modified_count=0)
+
+        DeveloperProfileService.record_ingested([_commit(1)], stale_developer_ids=['dev2', None])
+
+        query, update = self.collection.update_many.call_args.args
+        self.assertEqual(sorted(query['developer_id']['$in']), ['dev1', 'dev2'])
+        self.assertEqual(update, {'$set': {'stale': True}, '$inc': {'version': 1}})
+
+    def test_commits_counted_by_last_rebuild_are_skipped(self):
+        """Commits stored before the last rebuild are not added twice"""
+        doc = self._stored([_commit(1)])
+        doc['built_at'] = datetime.now(dt_timezone.utc)
+        self.collection.find_one.return_value = doc
+        self.collection.update_one.return_value = Mock(modified_count=1)
+
+        DeveloperProfileService.record_ingested([_commit(1)])
+
+        self.assertEqual(self.collection.update_one.call_args.args[1]['$set']['total_commits'], 1)
+
+    @patch('analytics.models.Commit.objects')
+    def test_get_profile_rebuilds_stale_profiles(self, mock_commits):
+        """Stale profiles are recomputed from the commits"""
+        self.collection.find_one.return_value = {'_id': 'p1', 'developer_id': 'dev1', 'stale': True, 'version': 4}
+        flagged = Mock()
+        flagged.only.return_value.as_pymongo.return_value = [dict(_commit(3), flags=1)]
+        unflagged = Mock()
+        unflagged.only.return_value.as_pymongo.return_value = [_commit(4)]
+        mock_commits.side_effect = [flagged, unflagged]
+
+        profile = DeveloperProfileService.get_profile('dev1')
+
+        self.assertEqual(profile.total_commits, 2)
+        self.assertEqual(profile.detailed_quality_metrics()['real_code_commits'], 2)
+        # Only commits without flags load their filenames
+        self.assertNotIn('files_changed.filename', flagged.only.call_args.args)
+        self.assertIn('files_changed.filename', unflagged.only.call_args.args)
+        # Stored only if no update happened during the rebuild
+        query, update = self.collection.update_one.call_args.args
+        self.assertEqual(query, {'_id': 'p1', 'version': 4})
+        self.assertFalse(update['$set']['stale'])
+        self.assertEqual(update['$inc'], {'version': 1})
+
+    @patch('analytics.models.Commit.objects')
+    def test_commit_saved_during_rebuild_is_counted_once(self, mock_commits):
+        """A commit saved while a rebuild scans is left to record_ingested, whether the scan saw it or not"""
+        saved_during_scan = dict(_commit(0), synced_at=datetime.now(dt_timezone.utc) + timedelta(seconds=5))
+        for scanned in ([_commit(3), saved_during_scan], [_commit(3)]):
+            self.collection.reset_mock()
+            self.collection.find_one.return_value = None
+            flagged = Mock()
+            flagged.only.return_value.as_pymongo.return_value = [dict(commit, flags=1) for commit in scanned]
+            unflagged = Mock()
+            unflagged.only.return_value.as_pymongo.return_value = []
+            mock_commits.side_effect = [flagged, unflagged]
+
+            DeveloperProfileService.get_profile('dev1')
+            stored = self.collection.update_one.call_args.args[1]['$set']
+            self.assertEqual(stored['total_commits'], 1)
+
+            # Ingestion of the batch finishes after the rebuild was stored
+            self.collection.find_one.return_value = dict(stored, _id='p1', developer_id='dev1', version=1)
+            self.collection.update_one.return_value = Mock(modified_count=1)
+            DeveloperProfileService.record_ingested([saved_during_scan])
+            self.assertEqual(self.collection.update_one.call_args.args[1]['$set']['total_commits'], 2)
+
+    def test_ingest_during_rebuild_discards_it(self):
+        """Commits ingested while a profile is stale mark it stale again, so a rebuild in progress is not stored"""
+        self.collection.find_one.return_value = dict(self._stored([_commit(60)]), stale=True)
+
+        DeveloperProfileService.record_ingested([_commit(0)])
+
+        self.collection.update_one.assert_not_called()
+        query, update = self.collection.update_many.call_args.args
+        self.assertEqual(query, {'developer_id': {'$in': ['dev1']}})
+        self.assertEqual(update['$inc'], {'version': 1})
+
+    def test_unchanged_commit_update_keeps_profiles(self):
+        """Re-syncing a commit only invalidates profiles when an aggregated field changed"""
+        commit = _commit(3)
+        before = profile_fingerprint(commit)
+        commit['synced_at'] = datetime.now(dt_timezone.utc)
+        self.assertEqual(changed_developer_ids(before, commit), set())
+
+        commit.update(developer_id='dev2', additions=12)
+        self.assertEqual(changed_developer_ids(before, commit), {'dev1', 'dev2'})
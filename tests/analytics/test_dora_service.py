@@ -0,0 +1,125 @@
+"""
+Tests for the DORA metrics engine
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from analytics.dora_service import DoraMetricsService, deployment_success_time, empty_dora_metrics
+
+
+def _query(items):
+    query = Mock()
+    query.filter.return_value = query
+    query.__iter__ = lambda self: iter(items)
+    return query
+
+
+def _deployment(success_time, environment='production', state='success'):
+    return Mock(environment=environment, statuses=[
+        {'state': 'pending', 'created_at': (success_time - timedelta(minutes=5)).isoformat()},
+        {'state': state, 'created_at': success_time.strftime('%Y-%m-%dT%H:%M:%SZ')},
+    ])
+
+
+class TestDoraMetricsService(TestCase):
+    """Test cases for DoraMetricsService"""
+
+    def setUp(self):
+        self.now = datetime(2024, 6, 30, 12, 0)
+        self.deploy_times = [self.now - timedelta(days=20), self.now - timedelta(days=10), self.now - timedelta(days=2)]
+        self.deployments = [_deployment(t) for t in self.deploy_times]
+        self.deployments.append(_deployment(self.now - timedelta(days=1), environment='staging'))
+        self.deployments.append(_deployment(self.now - timedelta(days=3), state='failure'))
+
+        # PR merged one day before the second deployment, with commits 2 and 3 days before it
+        self.pr1 = Mock(merged_at=self.now - timedelta(days=11), commit_shas=['a', 'b'])
+        # PR merged one day before the third deployment, commit unknown
+        self.pr2 = Mock(merged_at=self.now - timedelta(days=3), commit_shas=['zzz'])
+        # PR merged after the last deployment: not deployed yet
+        self.pr3 = Mock(merged_at=self.now - timedelta(hours=1), commit_shas=['c'])
+        self.commits = [
+            Mock(sha='a', authored_date=self.now - timedelta(days=12)),
+            Mock(sha='b', authored_date=self.now - timedelta(days=13)),
+            Mock(sha='c', authored_date=self.now - timedelta(days=1)),
+        ]
+
+    def _compute(self, mock_commit, mock_pr, mock_deployment):
+        mock_deployment.objects.filter.return_value = _query(self.deployments)
+        mock_pr.objects.filter.return_value = _query([self.pr1, self.pr2, self.pr3])
+        mock_commit.objects.filter.return_value = self.commits
+        return DoraMetricsService.compute('org/repo', now=self.now)
+
+    @patch('analytics.models.Deployment')
+    @patch('analytics.models.PullRequest')
+    @patch('analytics.models.Commit')
+    def test_compute_assigns_prs_to_next_deployment(self, mock_commit, mock_pr, mock_deployment):
+        """PRs are attributed to the first production deployment after their merge"""
+        metrics = self._compute(mock_commit, mock_pr, mock_deployment)
+
+        self.assertEqual(metrics['deployment_frequency']['total_deployments'], 3)
+        self.assertAlmostEqual(metrics['deployment_frequency']['deployments_per_day'], 3 / 180)
+
+        lead_time = metrics['lead_time']
+        self.assertEqual(lead_time['total_prs_analyzed'], 2)
+        # LT2: 24h for both PRs
+        self.assertEqual(lead_time['lt2_median_hours'], 24)
+        # LT1: only pr1 has known commits, first one 3 days before deployment
+        self.assertEqual(lead_time['lt1_median_hours'], 72)
+        self.assertEqual(lead_time['lt1_median_days'], 3)
+
+    @patch('analytics.models.Deployment')
+    @patch('analytics.models.PullRequest')
+    @patch('analytics.models.Commit')
+    def test_compute_resolves_commits_in_one_query(self, mock_commit, mock_pr, mock_deployment):
+        """First commits of all PRs are fetched with a single bulk query"""
+        self._compute(mock_commit, mock_pr, mock_deployment)
+
+        mock_commit.objects.filter.assert_called_once()
+        shas = mock_commit.objects.filter.call_args.kwargs['sha__in']
+        self.assertEqual(set(shas), {'a', 'b', 'zzz'})
+
+    @patch('analytics.models.Deployment')
+    @patch('analytics.models.PullRequest')
+    @patch('analytics.models.Commit')
+    def test_compute_needs_two_deployments_for_lead_time(self, mock_commit, mock_pr, mock_deployment):
+        """Lead time is not computed with a single production deployment"""
+        self.deployments = self.deployments[:1]
+        metrics = self._compute(mock_commit, mock_pr, mock_deployment)
+
+        self.assertEqual(metrics['deployment_frequency']['total_deployments'], 1)
+        self.assertIsNone(metrics['lead_time']['lt2_median_hours'])
+        mock_pr.objects.filter.assert_not_called()
+
+    def test_deployment_success_time_parses_utc(self):
+        """Success time is the first parseable success status, as aware UTC"""
+        deployment = _deployment(datetime(2024, 1, 1, 10, 0))
+        self.assertEqual(deployment_success_time(deployment), datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc))
+        self.assertIsNone(deployment_success_time(Mock(statuses=[])))
+
+    @patch('analytics.models.DoraMetricsSnapshot')
+    @patch.object(DoraMetricsService, 'compute')
+    def test_get_metrics_reads_fresh_snapshot(self, mock_compute, mock_snapshot):
+        """A recent snapshot is served without recomputing"""
+        snapshot = Mock(metrics=empty_dora_metrics(), computed_at=datetime.now(timezone.utc))
+        mock_snapshot.objects.filter.return_value.first.return_value = snapshot
+
+        metrics = DoraMetricsService.get_metrics('org/repo', repository_id=1)
+
+        self.assertIs(metrics, snapshot.metrics)
+        mock_compute.assert_not_called()
+
+    @patch('analytics.models.DoraMetricsSnapshot')
+    @patch.object(DoraMetricsService, 'compute')
+    def test_get_metrics_recomputes_stale_snapshot(self, mock_compute, mock_snapshot):
+        """A stale snapshot is recomputed and persisted"""
+        snapshot = Mock(metrics={'old': True}, computed_at=datetime.now(timezone.utc) - timedelta(days=2))
+        mock_snapshot.objects.filter.return_value.first.return_value = snapshot
+        mock_compute.return_value = {'new': True}
+
+        metrics = DoraMetricsService.get_metrics('org/repo', repository_id=1)
+
+        self.assertEqual(metrics, {'new': True})
+        mock_snapshot.objects.return_value.update_one.assert_called_once()
+        self.assertEqual(mock_snapshot.objects.return_value.update_one.call_args.kwargs['set__metrics'], {'new': True})
@@ -0,0 +1,76 @@
+"""
+Tests for the blocking + union-find developer identity grouping engine
+"""
+from django.test import TestCase
+
+from analytics.identity_grouping import (
+    UnionFind,
+    group_identities,
+    group_identities_pairwise,
+    should_group_identities,
+)
+from analytics.management.commands.benchmark_identity_grouping import synthetic_identities
+
+
+def _identities(*emails):
+    return [{'name': email.split('@')[0], 'email': email} for email in emails]
+
+
+class TestShouldGroupIdentities(TestCase):
+    """Test cases for the matching rules"""
+
+    def test_reasons(self):
+        """Each rule reports its reason"""
+        cases = [
+            ('John@Example.com', 'john@example.com', 'exact_email_match'),
+            ('jdoe@example.com', 'jdoe@other.org', 'email_local_match'),
+            ('nohemie.lehuby@toto.com', 'lehuby.nohemie@kisio.com', 'name_reversal_pattern'),
+            ('nlehuby@hove.com', 'n.lehuby@hove.com', 'initial_pattern'),
+        ]
+        for email1, email2, reason in cases:
+            self.assertEqual(
+                should_group_identities({'email': email1}, {'email': email2}), (True, reason)
+            )
+
+    def test_short_locals_do_not_match(self):
+        """Pattern rules need local parts longer than three characters"""
+        self.assertEqual(should_group_identities({'email': 'a.b@x.com'}, {'email': 'b.a@y.com'}), (False, None))
+        self.assertEqual(should_group_identities({'email': 'bob@x.com'}, {'email': 'bobby@y.com'}), (False, None))
+
+
+class TestGroupIdentities(TestCase):
+    """Test cases for group_identities"""
+
+    def test_groups_are_transitive(self):
+        """Aliases linked through a chain of matches end up in one group"""
+        identities = _identities(
+            'nohemie.lehuby@toto.com',
+            'lehuby.nohemie@kisio.com',
+            'lehuby@hove.com',
+            '123456+nlehuby@users.noreply.github.com',
+            'someone.else@toto.com',
+        )
+        result = group_identities(identities)
+        self.assertEqual(result.groups, [[0, 1, 2, 3], [4]])
+        self.assertEqual({reason for _, _, reason in result.matches},
+                         {'name_reversal_pattern', 'initial_pattern'})
+
+    def test_identities_without_email_local_part(self):
+        """Logins without @ only group on exact match"""
+        result = group_identities(_identities('octocat', 'OctoCat', 'octocat2'))
+        self.assertEqual(result.groups, [[0, 1], [2]])
+
+    def test_matches_pairwise_reference_on_synthetic_aliases(self):
+        """Blocking finds exactly the groups of the exhaustive comparison"""
+        identities = synthetic_identities(600, seed=7)
+        result = group_identities(identities)
+        reference = group_identities_pairwise(identities)
+        self.assertEqual(result.groups, reference.groups)
+        self.assertLess(result.comparisons, reference.comparisons)
+
+    def test_union_find(self):
+        """Union reports whether sets were merged"""
+        union_find = UnionFind(4)
+        self.assertTrue(union_find.union(0, 2))
+        self.assertFalse(union_find.union(2, 0))
+        self.assertEqual(union_find.groups(), [[0, 2], [1], [3]])
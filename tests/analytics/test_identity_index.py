@@ -0,0 +1,165 @@
+"""
+Tests for the in-memory identity index
+"""
+from unittest.mock import Mock, patch
+
+from bson import ObjectId
+from django.test import TestCase
+
+from analytics import identity_index
+from analytics.developer_grouping_service import DeveloperGroupingService
+from analytics.identity_index import (
+    DeveloperIdentity,
+    IdentityIndex,
+    get_identity_index,
+    invalidate_identity_index,
+    restamp_developer_ids,
+)
+
+
+class TestIdentityIndex(TestCase):
+    """Test cases for IdentityIndex"""
+
+    def setUp(self):
+        self.alice_id = ObjectId()
+        self.bob_id = ObjectId()
+        self.developers = [
+            {'_id': self.alice_id, 'primary_name': 'Alice'},
+            {'_id': self.bob_id, 'primary_name': 'Bob'},
+        ]
+        self.aliases = [
+            {'email': 'alice@example.com', 'developer': self.alice_id},
+            {'email': 'Alice.Work@corp.com', 'developer': self.alice_id},
+            {'email': 'bob@example.com', 'developer': self.bob_id},
+            {'email': 'ghost@example.com', 'developer': ObjectId()},  # dangling reference
+        ]
+
+    def _patch_models(self):
+        developer_patch = patch('analytics.models.Developer.objects')
+        alias_patch = patch('analytics.models.DeveloperAlias.objects')
+        mock_developers = developer_patch.start()
+        mock_aliases = alias_patch.start()
+        self.addCleanup(developer_patch.stop)
+        self.addCleanup(alias_patch.stop)
+        mock_developers.only.return_value.as_pymongo.return_value = self.developers
+        mock_aliases.return_value.only.return_value.as_pymongo.return_value = self.aliases
+        return mock_developers, mock_aliases
+
+    def test_build_and_resolve(self):
+        """Emails resolve case-insensitively to their developer"""
+        self._patch_models()
+        index = IdentityIndex.build()
+
+        self.assertEqual(index.resolve('ALICE@example.com'), DeveloperIdentity(str(self.alice_id), 'Alice'))
+        self.assertIsNone(index.resolve('ghost@example.com'))
+        self.assertIsNone(index.resolve(None))
+        self.assertEqual(index.emails_for(str(self.alice_id)), ['alice.work@corp.com', 'alice@example.com'])
+
+    def test_count_developers(self):
+        """Grouped emails count once per developer, ungrouped emails once each"""
+        self._patch_models()
+        index = IdentityIndex.build()
+
+        count = index.count_developers([
+            'alice@example.com', 'alice.work@corp.com', 'bob@example.com',
+            'carol@example.com', 'CAROL@example.com', 'dave@example.com', '',
+        ])
+        self.assertEqual(count, 4)
+
+    def test_index_is_cached_until_invalidated(self):
+        """The index is built once and rebuilt after invalidation"""
+        mock_developers, _ = self._patch_models()
+
+        first = get_identity_index()
+        self.assertIs(get_identity_index(), first)
+        self.assertEqual(mock_developers.only.call_count, 1)
+
+        invalidate_identity_index()
+        second = get_identity_index()
+        self.assertIsNot(second, first)
+        self.assertEqual(mock_developers.only.call_count, 2)
+
+    def test_version_bumped_by_another_process_rebuilds_index(self):
+        """The index version is shared in MongoDB, so a regroup in another process is seen before the next stamp"""
+        from analytics.models import RepositoryDataVersion
+
+        mock_developers, _ = self._patch_models()
+        versions = Mock()
+        versions.find_one.return_value = {'_id': 'identity_index', 'version': 1}
+        with patch.object(RepositoryDataVersion, '_get_collection', return_value=versions):
+            first = get_identity_index()
+            self.assertIs(get_identity_index(), first)
+
+            # Bumped by the web process: this process's _index is untouched
+            versions.find_one.return_value = {'_id': 'identity_index', 'version': 2}
+            self.assertIsNot(get_identity_index(), first)
+
+        self.assertEqual(mock_developers.only.call_count, 2)
+
+    def test_developer_count_uses_distinct_emails(self):
+        """Developer counting is one distinct() plus index lookups"""
+        self._patch_models()
+        commits = Mock()
+        commits.distinct.return_value = ['alice@example.com', 'Alice.Work@corp.com', 'new@example.com', None]
+
+        count = DeveloperGroupingService().get_all_developers_for_commits(commits)
+
+        commits.distinct.assert_called_once_with('author_email')
+        self.assertEqual(count, 2)
+
+    def test_alias_save_invalidates_index(self):
+        """Saving an alias bumps the index version"""
+        from analytics.models import DeveloperAlias
+
+        self._patch_models()
+        get_identity_index()
+        with patch('mongoengine.Document.save', return_value=None):
+            DeveloperAlias(name='Alice', email='alice@example.com').save()
+        self.assertIsNone(identity_index._index)
+
+    def test_commit_save_stamps_developer_id(self):
+        """Commits get the developer of their author email when saved"""
+        from analytics.models import Commit
+
+        self._patch_models()
+        commit = Commit(author_email='Alice.Work@corp.com')
+        with patch('mongoengine.Document.save', return_value=None):
+            commit.save()
+        self.assertEqual(commit.developer_id, str(self.alice_id))
+
+        commit.author_email = 'nobody@example.com'
+        with patch('mongoengine.Document.save', return_value=None):
+            commit.save()
+        self.assertIsNone(commit.developer_id)
+
+    def test_restamp_groups_updates_by_developer(self):
+        """Re-stamping sends one update per developer, keeping the stored email case"""
+        from analytics.models import Commit, PullRequest
+
+        self._patch_models()
+        commit_collection = Mock()
+        commit_collection.bulk_write.return_value = Mock(modified_count=3)
+        commit_collection.distinct.return_value = [str(self.bob_id)]
+        pr_collection = Mock()
+        pr_collection.bulk_write.return_value = Mock(modified_count=1)
+        with patch.object(Commit, 'objects') as mock_commits, \
+                patch.object(PullRequest, 'objects') as mock_prs, \
+                patch.object(Commit, '_get_collection', return_value=commit_collection), \
+                patch.object(PullRequest, '_get_collection', return_value=pr_collection), \
+                patch('analytics.developer_profile_service.DeveloperProfileService.mark_stale') as mock_mark_stale, \
+                patch('analytics.metrics_cache.bump_data_version') as mock_bump:
+            mock_commits.distinct.return_value = ['alice@example.com', 'Alice.Work@corp.com', 'bob@example.com']
+            mock_prs.distinct.return_value = ['alice@example.com', 'someone']
+            modified = restamp_developer_ids(['ALICE.WORK@corp.com', 'alice@example.com', 'someone'])
+
+        self.assertEqual(modified, {'commits': 3, 'pull_requests': 1})
+        operations = commit_collection.bulk_write.call_args.args[0]
+        self.assertEqual(len(operations), 1)
+        self.assertEqual(operations[0]._filter['author_email'], {'$in': ['alice@example.com', 'Alice.Work@corp.com']})
+        self.assertEqual(operations[0]._doc, {'$set': {'developer_id': str(self.alice_id)}})
+        pr_filters = {op._filter['author']['$in'][0]: op._doc['$set']['developer_id']
+                      for op in pr_collection.bulk_write.call_args.args[0]}
+        self.assertEqual(pr_filters, {'alice@example.com': str(self.alice_id), 'someone': None})
+        # Profiles of the previous and new developers of the moved commits
+        mock_mark_stale.assert_called_once_with({str(self.alice_id), str(self.bob_id)})
+        mock_bump.assert_called_once_with()
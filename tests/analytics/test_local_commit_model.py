@@ -0,0 +1,126 @@
+"""
+Tests for the local commit type model
+"""
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from analytics.commit_rules import classify_message
+from analytics.local_commit_model import HASH_FEATURES, LocalCommitModel, featurize
+from analytics.management.commands.benchmark_commit_classifier import synthetic_messages
+
+
+def labelled_messages(count, seed):
+    """Synthetic messages labelled by the rule-based classifier"""
+    messages = synthetic_messages(count, seed=seed)
+    return messages, [classify_message(message) for message in messages]
+
+
+class TestFeaturize(TestCase):
+    """Test cases for hashed n-gram features"""
+
+    def test_features_per_message(self):
+        """Tokens, bigrams, first token, length and bias; empty messages only have length and bias"""
+        rows, features = featurize(['fix(api): timeout', None, 'Fix\n\nbody is ignored'])
+        counts = np.bincount(rows, minlength=3)
+        # fix ( api ) : timeout -> 6 tokens, 5 bigrams, first token, length, bias
+        self.assertEqual(counts.tolist(), [14, 2, 4])
+        self.assertEqual(features[rows == 1][-1], HASH_FEATURES)
+        self.assertTrue((features <= HASH_FEATURES).all())
+
+    def test_stable_hashes(self):
+        """Same message, same features, case-insensitive"""
+        _, first = featurize(['Bump lodash to 4.17.21'])
+        _, second = featurize(['bump LODASH to 4.17.21'])
+        self.assertEqual(sorted(first.tolist()), sorted(second.tolist()))
+
+
+class TestLocalCommitModel(TestCase):
+    """Test cases for training, prediction and model files"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.messages, cls.labels = labelled_messages(12000, seed=7)
+        cls.held_out_messages, cls.held_out_labels = labelled_messages(3000, seed=8)
+
+    def test_naive_bayes_learns_the_rules(self):
+        """Held-out accuracy on rule-labelled messages"""
+        model = LocalCommitModel.train(self.messages, self.labels)
+        report = model.evaluate(self.held_out_messages, self.held_out_labels)
+        # The rules pick the first known word of the whole message, not a bag of words
+        self.assertGreater(report['accuracy'], 0.75)
+        self.assertEqual(sum(stats['commits'] for stats in report['per_category'].values()), 3000)
+
+    def test_logistic_regression(self):
+        """Logistic regression is more accurate than naive Bayes on the same features"""
+        nb = LocalCommitModel.train(self.messages, self.labels)
+        lr = LocalCommitModel.train(self.messages, self.labels, algorithm='lr', epochs=40)
+        lr_accuracy = lr.evaluate(self.held_out_messages, self.held_out_labels)['accuracy']
+        self.assertGreater(lr_accuracy, 0.85)
+        self.assertGreater(lr_accuracy, nb.evaluate(self.held_out_messages, self.held_out_labels)['accuracy'])
+
+    def test_predict_keeps_order_and_duplicates(self):
+        """Predictions follow the input, duplicates included"""
+        model = LocalCommitModel.train(self.messages, self.labels)
+        messages = ['fix: crash on login', 'docs: explain setup', 'fix: crash on login', '']
+        self.assertEqual(model.predict(messages)[:3], ['fix', 'docs', 'fix'])
+        self.assertEqual(len(model.predict(messages)), 4)
+        self.assertEqual(model.predict([]), [])
+
+    def test_versioned_files(self):
+        """Each save writes the next version, load reads the latest"""
+        model = LocalCommitModel.train(self.messages[:2000], self.labels[:2000])
+        with tempfile.TemporaryDirectory() as directory, override_settings(COMMIT_MODEL_DIR=Path(directory)):
+            self.assertEqual(model.save().name, 'commit_model_v1.npz')
+            self.assertEqual(model.save().name, 'commit_model_v2.npz')
+            loaded = LocalCommitModel.load()
+            self.assertEqual(loaded.version, 2)
+            self.assertEqual(loaded.predict(self.held_out_messages[:500]), model.predict(self.held_out_messages[:500]))
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(COMMIT_MODEL_DIR=Path(directory)):
+            with self.assertRaises(FileNotFoundError):
+                LocalCommitModel.load()
+
+
+class TestTrainCommitModelCommand(TestCase):
+    """Test cases for the train_commit_model command"""
+
+    def test_train_and_report_accuracy(self):
+        """Trains on classified commits and saves a model with its held-out accuracy"""
+        messages, labels = labelled_messages(5000, seed=3)
+        docs = [{'message': message, 'commit_type': label} for message, label in zip(messages, labels)]
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory, \
+             patch('analytics.models.Commit._get_collection') as collection:
+            collection.return_value.find.return_value = docs
+            call_command('train_commit_model', '--output-dir', directory, stdout=out)
+            model = LocalCommitModel.load(Path(directory) / 'commit_model_v1.npz')
+
+        self.assertIn('Held-out accuracy', out.getvalue())
+        self.assertEqual(model.metadata['holdout_commits'], 500)
+        self.assertEqual(model.metadata['training_commits'], 4500)
+        self.assertGreater(model.metadata['holdout_accuracy'], 0.7)
+
+    def test_classify_existing_commits_with_local_backend(self):
+        """classify_existing_commits --backend=local uses the latest model"""
+        messages, labels = labelled_messages(3000, seed=5)
+        commits = [{'_id': 1, 'message': 'fix: crash on login', 'files_changed': [], 'developer_id': 'dev1'}]
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory, override_settings(COMMIT_MODEL_DIR=Path(directory)), \
+             patch('analytics.models.Commit._get_collection') as get_collection:
+            LocalCommitModel.train(messages, labels).save()
+            collection = get_collection.return_value
+            collection.count_documents.return_value = len(commits)
+            cursor = collection.find.return_value.sort.return_value.batch_size.return_value
+            cursor.__iter__.return_value = iter(commits)
+            call_command('classify_existing_commits', '--backend=local', '--dry-run', stdout=out)
+
+        self.assertIn('Using local commit model v1 (nb)', out.getvalue())
+        self.assertIn('fix: 1 (100.0%)', out.getvalue())
+        collection.bulk_write.assert_not_called()
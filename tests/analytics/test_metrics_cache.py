@@ -0,0 +1,168 @@
+"""
+Tests for the shared metrics cache
+"""
+import tempfile
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from analytics.metrics_cache import (
+    _MISSING, GLOBAL_SCOPE, EntityMetricsCache, FileMetricsStore, MongoMetricsStore, bump_data_version,
+    cached_metric, format_date_range, get_data_versions,
+)
+
+
+class MemoryStore:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key, _MISSING)
+
+    def set(self, key, value, timeout, **labels):
+        self.entries[key] = value
+
+
+class Metrics:
+    """Stand-in for UnifiedMetricsService"""
+
+    def __init__(self, metrics_cache):
+        self.metrics_cache = metrics_cache
+        self.computed = 0
+
+    @cached_metric()
+    def get_total_commits(self):
+        self.computed += 1
+        return 42
+
+    @cached_metric(relative=True)
+    def get_developer_activity(self, days=30):
+        self.computed += 1
+        return {'days': days}
+
+
+class TestEntityMetricsCache(TestCase):
+    """Test cases for cache keys and lookups"""
+
+    def setUp(self):
+        self.store = MemoryStore()
+        self.versions = {'org/repo': 0, GLOBAL_SCOPE: 0}
+        patcher = patch('analytics.metrics_cache.get_data_versions', side_effect=lambda names: dict(self.versions))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_cache(self, entity_id=1, date_range='all'):
+        return EntityMetricsCache('repository', entity_id, date_range, ['org/repo'], store=self.store)
+
+    def test_computed_once_across_services(self):
+        """A second service (another process) reads the value stored by the first"""
+        first = Metrics(self.make_cache())
+        second = Metrics(self.make_cache())
+
+        self.assertEqual(first.get_total_commits(), 42)
+        self.assertEqual(second.get_total_commits(), 42)
+
+        self.assertEqual((first.computed, second.computed), (1, 0))
+        self.assertEqual((second.metrics_cache.hits, second.metrics_cache.misses), (1, 0))
+
+    def test_keys_include_entity_range_metric_and_arguments(self):
+        cache = self.make_cache()
+        keys = {
+            cache.key('get_total_commits'),
+            self.make_cache(entity_id=2).key('get_total_commits'),
+            self.make_cache(date_range='2024-01-01..2024-01-31').key('get_total_commits'),
+            cache.key('get_total_releases'),
+        }
+        self.assertEqual(len(keys), 4)
+
+        metrics = Metrics(cache)
+        metrics.get_developer_activity(days=30)
+        metrics.get_developer_activity(days=90)
+        metrics.get_developer_activity(days=30)
+        self.assertEqual(metrics.computed, 2)
+
+    def test_data_version_bump_invalidates(self):
+        """Indexing a repository moves its entities to new keys"""
+        Metrics(self.make_cache()).get_total_commits()
+
+        self.versions['org/repo'] += 1
+        metrics = Metrics(self.make_cache())
+        metrics.get_total_commits()
+
+        self.assertEqual(metrics.computed, 1)
+
+    def test_relative_metrics_expire_daily(self):
+        cache = self.make_cache()
+        with patch('analytics.metrics_cache.date') as today:
+            today.today.return_value = datetime(2024, 5, 1).date()
+            monday = cache.key('get_developer_activity', relative=True)
+            today.today.return_value = datetime(2024, 5, 2).date()
+            tuesday = cache.key('get_developer_activity', relative=True)
+            self.assertNotEqual(monday, tuesday)
+            self.assertEqual(cache.key('get_total_commits'), cache.key('get_total_commits'))
+
+    def test_store_errors_fall_back_to_computing(self):
+        cache = self.make_cache()
+        with patch.object(self.store, 'get', side_effect=ConnectionError('down')):
+            self.assertEqual(Metrics(cache).get_total_commits(), 42)
+
+    def test_disabled_backend(self):
+        with override_settings(METRICS_CACHE_BACKEND='none'):
+            cache = EntityMetricsCache('repository', 1, 'all', ['org/repo'])
+        metrics = Metrics(cache)
+        metrics.get_total_commits()
+        metrics.get_total_commits()
+        self.assertEqual(metrics.computed, 2)
+
+
+class TestStores(TestCase):
+    """Test cases for the shared backends"""
+
+    def test_file_store_is_shared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            FileMetricsStore(directory).set('metrics:abc', {'value': [1, 2]}, 60)
+            self.assertEqual(FileMetricsStore(directory).get('metrics:abc'), {'value': [1, 2]})
+
+    def test_mongo_store(self):
+        with patch('analytics.models.MetricsCacheEntry._get_collection') as get_collection:
+            collection = get_collection.return_value
+            store = MongoMetricsStore()
+            store.set('metrics:abc', {'date': datetime(2024, 1, 1, tzinfo=timezone.utc)}, 60,
+                      entity_type='project', metric='get_all_metrics')
+
+            (query, update), kwargs = collection.update_one.call_args
+            self.assertEqual(query, {'_id': 'metrics:abc'})
+            self.assertEqual(update['$set']['entity_type'], 'project')
+            self.assertTrue(kwargs['upsert'])
+
+            collection.find_one.return_value = {'value': update['$set']['value']}
+            self.assertEqual(store.get('metrics:abc'), {'date': datetime(2024, 1, 1, tzinfo=timezone.utc)})
+            collection.find_one.return_value = None
+            self.assertIs(store.get('metrics:abc'), _MISSING)
+
+
+class TestDataVersions(TestCase):
+    """Test cases for repository data versions"""
+
+    def test_bump_increments(self):
+        with patch('analytics.models.RepositoryDataVersion._get_collection') as get_collection:
+            get_collection.return_value.find_one_and_update.return_value = {'_id': 'org/repo', 'version': 3}
+            self.assertEqual(bump_data_version('org/repo'), 3)
+            (query, update), kwargs = get_collection.return_value.find_one_and_update.call_args
+        self.assertEqual(query, {'_id': 'org/repo'})
+        self.assertEqual(update['$inc'], {'version': 1})
+        self.assertTrue(kwargs['upsert'])
+
+    def test_versions_default_to_zero_and_include_global(self):
+        with patch('analytics.models.RepositoryDataVersion._get_collection') as get_collection:
+            get_collection.return_value.find.return_value = [{'_id': 'org/a', 'version': 2}]
+            versions = get_data_versions(['org/a', 'org/b'])
+        self.assertEqual(versions, {GLOBAL_SCOPE: 0, 'org/a': 2, 'org/b': 0})
+
+    def test_format_date_range(self):
+        self.assertEqual(format_date_range(), 'all')
+        self.assertEqual(
+            format_date_range(datetime(2024, 1, 1), datetime(2024, 1, 31)),
+            '2024-01-01T00:00:00..2024-01-31T00:00:00'
+        )
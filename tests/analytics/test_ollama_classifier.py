@@ -0,0 +1,226 @@
+"""
+Tests for the cached and batched Ollama commit classification, against a local Ollama stand-in
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+
+from analytics.commit_classifier import classify_commit_ollama, classify_commits_with_ollama_fallback_batch
+from analytics.circuit_breaker import OPEN
+from analytics.ollama_classifier import (
+    LabelCache,
+    breaker,
+    classify_messages,
+    label_cache,
+    message_key,
+    reclassify_deferred_commits,
+)
+
+CANNED_LABELS = {
+    'Initial commit of the API': 'feature',
+    'Release 2024.10 of the analytics pipeline': 'chore',
+    'Handle errors when the list is empty': 'fix',
+    'perf: speed up the dashboard queries': 'refactor',
+}
+
+
+class OllamaStandIn(ThreadingHTTPServer):
+    """Serves canned /api/generate answers and records the prompts"""
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), OllamaHandler)
+        self.prompts = []
+        self.skipped = set()  # Messages left out of batch answers
+        self.delay = 0
+        self.failing = False
+
+    @property
+    def host(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class OllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.prompts.append(body)
+        time.sleep(self.server.delay)
+        if self.server.failing:
+            self.send_error(500)
+            return
+        prompt = body['prompt']
+        if body.get('format'):
+            labels = []
+            for number, quoted in re.findall(r'^(\d+)\. (".*")$', prompt, re.MULTILINE):
+                message = json.loads(quoted)
+                if message not in self.server.skipped:
+                    labels.append({'id': int(number), 'category': CANNED_LABELS.get(message, 'other')})
+            answer = json.dumps({'labels': labels})
+        else:
+            message = re.search(r'\n"(.*)"\n', prompt, re.DOTALL).group(1)
+            answer = CANNED_LABELS.get(message, 'other')
+
+        payload = json.dumps({'model': body['model'], 'response': answer, 'done': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestOllamaClassifier(TestCase):
+    """Test cases for classify_messages"""
+
+    def setUp(self):
+        self.server = OllamaStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.settings_override = override_settings(OLLAMA_HOST=self.server.host, OLLAMA_MODEL='stand-in')
+        self.settings_override.enable()
+        label_cache.clear()
+        breaker.reset()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.server.shutdown()
+        self.server.server_close()
+        label_cache.clear()
+        breaker.reset()
+
+    def test_batched_prompt_with_duplicates(self):
+        """Distinct messages are classified in one structured prompt and stored"""
+        messages = list(CANNED_LABELS) + ['Initial commit of the API']
+        with patch('analytics.models.CommitLabel._get_collection') as collection:
+            collection.return_value.find.return_value = []
+            self.assertEqual(classify_messages(messages), list(CANNED_LABELS.values()) + ['feature'])
+
+        self.assertEqual(len(self.server.prompts), 1)
+        self.assertEqual(self.server.prompts[0]['format']['required'], ['labels'])
+        operations = collection.return_value.bulk_write.call_args[0][0]
+        self.assertEqual(len(operations), 4)
+        self.assertEqual(operations[0]._filter, {'message_hash': message_key('Initial commit of the API', 'stand-in')})
+        self.assertEqual(operations[0]._doc['$set'], {'label': 'feature', 'model': 'stand-in'})
+
+        # Second sync: served from the in-process cache
+        self.assertEqual(classify_commit_ollama('  Handle errors when the list is empty\n'), 'fix')
+        self.assertEqual(len(self.server.prompts), 1)
+
+    def test_labels_stored_in_mongo(self):
+        """Labels cached by another process are not sent to Ollama"""
+        stored = [{'message_hash': message_key('Handle errors when the list is empty', 'stand-in'), 'label': 'test'}]
+        with patch('analytics.models.CommitLabel._get_collection') as collection:
+            collection.return_value.find.return_value = stored
+            self.assertEqual(
+                classify_messages(['Handle errors when the list is empty', 'Initial commit of the API']),
+                ['test', 'feature']
+            )
+        # Only the uncached message, with the one-message prompt
+        self.assertEqual(len(self.server.prompts), 1)
+        self.assertNotIn('format', self.server.prompts[0])
+
+    def test_missing_batch_answers_are_retried_alone(self):
+        """Messages left out of a batch answer fall back to the one-message prompt"""
+        self.server.skipped.add('Release 2024.10 of the analytics pipeline')
+        messages = list(CANNED_LABELS)
+        self.assertEqual(classify_messages(messages, batch_size=2), list(CANNED_LABELS.values()))
+        # Two batches, then one retry
+        self.assertEqual(len(self.server.prompts), 3)
+        self.assertEqual(sum(1 for prompt in self.server.prompts if prompt.get('format')), 2)
+
+    def test_fallback_batch_only_sends_other_messages(self):
+        """Messages the rules can classify never reach Ollama"""
+        results = classify_commits_with_ollama_fallback_batch(['fix: crash on login', 'Initial commit of the API'])
+        self.assertEqual(results, ['fix', 'feature'])
+        self.assertNotIn('crash on login', self.server.prompts[0]['prompt'])
+
+    def test_ollama_down(self):
+        """Rule-based categories when Ollama fails, nothing is cached, the commits are deferred"""
+        self.server.shutdown()
+        self.server.server_close()
+        with patch('analytics.models.CommitLabel._get_collection') as collection, \
+             patch('analytics.models.ClassificationBacklog._get_collection') as backlog:
+            collection.return_value.find.return_value = []
+            self.assertEqual(classify_messages(['Initial commit of the API', 'wip']), ['other', 'chore'])
+        collection.return_value.bulk_write.assert_not_called()
+        update = backlog.return_value.update_one.call_args[0]
+        self.assertEqual(update[0], {'_id': 'ollama'})
+        self.assertEqual(update[1]['$inc'], {'deferred_commits': 2})
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        """Once open, the rules answer without waiting on Ollama"""
+        self.server.failing = True
+        for message in CANNED_LABELS:
+            self.assertEqual(classify_commit_ollama(message), 'other')
+        self.assertEqual(breaker.state, OPEN)
+        # Three failures opened the circuit, the fourth message was not sent
+        self.assertEqual(len(self.server.prompts), 3)
+
+    def test_slow_ollama_opens_the_circuit(self):
+        """A call over the latency budget opens the circuit at once"""
+        self.server.delay = 0.3
+        with patch.object(breaker, 'latency_budget', 0.1):
+            self.assertEqual(classify_commit_ollama('Initial commit of the API'), 'other')
+            self.assertEqual(breaker.state, OPEN)
+            classify_messages(list(CANNED_LABELS))
+        self.assertEqual(len(self.server.prompts), 1)
+
+    def test_reclassify_deferred_commits(self):
+        """The backlog is cleared once the deferred commits are classified by Ollama"""
+        first_deferred_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        docs = [
+            {'_id': 1, 'message': 'Initial commit of the API', 'developer_id': 'dev1'},
+            {'_id': 2, 'message': 'Still nothing obvious here', 'developer_id': 'dev2'},
+        ]
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter(docs)
+        with patch('analytics.models.ClassificationBacklog._get_collection') as backlog, \
+             patch('analytics.models.Commit._get_collection') as commits, \
+             patch('analytics.developer_profile_service.DeveloperProfileService.mark_stale') as mark_stale:
+            backlog.return_value.find_one.return_value = {
+                '_id': 'ollama', 'deferred_commits': 2, 'first_deferred_at': first_deferred_at
+            }
+            commits.return_value.find.return_value.batch_size.return_value = cursor
+            commits.return_value.bulk_write.return_value.modified_count = 1
+            result = reclassify_deferred_commits()
+
+        self.assertEqual(result, {'status': 'completed', 'reclassified': 1})
+        self.assertEqual(
+            commits.return_value.find.call_args[0][0],
+            {'commit_type': 'other', 'synced_at': {'$gte': first_deferred_at}}
+        )
+        operations = commits.return_value.bulk_write.call_args[0][0]
+        self.assertEqual([(op._filter, op._doc) for op in operations], [({'_id': 1}, {'$set': {'commit_type': 'feature'}})])
+        mark_stale.assert_called_once_with({'dev1'})
+        reset = backlog.return_value.update_one.call_args[0]
+        self.assertEqual(reset[0], {'_id': 'ollama', 'deferred_commits': 2})
+        self.assertEqual(reset[1]['$set']['deferred_commits'], 0)
+
+    def test_reclassify_waits_for_the_circuit(self):
+        """Nothing is sent while the circuit is open"""
+        breaker._trip('test')
+        with patch('analytics.models.ClassificationBacklog._get_collection') as backlog:
+            backlog.return_value.find_one.return_value = {'_id': 'ollama', 'deferred_commits': 5}
+            self.assertEqual(
+                reclassify_deferred_commits(),
+                {'status': 'circuit_open', 'reclassified': 0, 'deferred': 5}
+            )
+        self.assertEqual(self.server.prompts, [])
+
+
+class TestLabelCache(TestCase):
+    """Test cases for the in-process LRU"""
+
+    def test_least_recently_used_are_evicted(self):
+        """Reading a label keeps it, the oldest unread label is dropped"""
+        cache = LabelCache(max_size=2)
+        cache.set_many({'a': 'fix', 'b': 'docs'}, 'model')
+        self.assertEqual(cache.get_many(['a']), {'a': 'fix'})
+        cache.set_many({'c': 'test'}, 'model')
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 'fix', 'c': 'test'})
@@ -0,0 +1,61 @@
+"""
+Tests for the concurrent computation of page sections
+"""
+import time
+
+from django.test import TestCase
+
+from analytics.page_sections import Section, compute_sections
+from analytics.query_memo import current_request_stats, end_request_stats, start_request_stats
+
+
+def slow(name, seconds):
+    def compute():
+        time.sleep(seconds)
+        return {name: seconds}
+    return compute
+
+
+def failing():
+    raise ValueError("boom")
+
+
+class TestComputeSections(TestCase):
+    """Test cases for compute_sections"""
+
+    def test_sections_run_concurrently(self):
+        sections = [Section(f's{i}', slow(f's{i}', 0.2)) for i in range(4)]
+
+        started = time.perf_counter()
+        results, timings = compute_sections(sections, max_workers=4)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results['s3'], {'s3': 0.2})
+        # Bounded by the slowest section, not the sum of them
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual([timing['name'] for timing in timings], ['s0', 's1', 's2', 's3'])
+        self.assertTrue(all(timing['duration_ms'] >= 200 for timing in timings))
+
+    def test_failed_section_uses_its_fallback(self):
+        results, timings = compute_sections([
+            Section('ok', slow('ok', 0)),
+            Section('broken', failing, {'broken': []}),
+        ], max_workers=2)
+
+        self.assertEqual(results['broken'], {'broken': []})
+        self.assertEqual([timing['status'] for timing in timings], ['ok', 'failed'])
+
+    def test_error_without_fallback_propagates(self):
+        with self.assertRaises(ValueError):
+            compute_sections([Section('ok', slow('ok', 0)), Section('broken', failing)], max_workers=2)
+
+    def test_sections_see_the_request_stats(self):
+        stats = start_request_stats()
+        try:
+            results, _ = compute_sections(
+                [Section('stats', lambda: {'stats': current_request_stats()})], max_workers=2
+            )
+        finally:
+            end_request_stats()
+
+        self.assertIs(results['stats']['stats'], stats)
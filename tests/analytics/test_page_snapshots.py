@@ -0,0 +1,154 @@
+"""
+Tests for the stale-while-revalidate page snapshots
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from analytics.metrics_cache import _MISSING
+from analytics.page_snapshots import normalize_date_range, refresh_snapshot, serve_snapshot, snapshot_key
+
+COMPUTE = 'tests.analytics.test_page_snapshots.compute_page'
+
+computed = []
+# Label of the next computed context
+current = {'label': None}
+
+
+def compute_page(entity_id, start, end):
+    computed.append(entity_id)
+    return {'label': current['label']}
+
+
+class MemoryStore:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key, _MISSING)
+
+    def set(self, key, value, timeout, **labels):
+        self.entries[key] = value
+
+    def add(self, key, value, timeout, **labels):
+        if key in self.entries:
+            return False
+        self.entries[key] = value
+        return True
+
+    def delete(self, key):
+        self.entries.pop(key, None)
+
+
+@override_settings(PAGE_SNAPSHOT_SOFT_TTL=300)
+class TestPageSnapshots(TestCase):
+    """Test cases for serving and refreshing snapshots"""
+
+    def setUp(self):
+        computed.clear()
+        self.store = MemoryStore()
+        self.versions = 'v1'
+        patchers = [
+            patch('analytics.page_snapshots.get_store', return_value=self.store),
+            patch('analytics.page_snapshots.versions_digest', side_effect=lambda names: self.versions),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def serve(self, label='fresh', params=('2024-01-01', '2024-01-31')):
+        current['label'] = label
+        return serve_snapshot('repository_detail', 1, params, ['org/repo'], COMPUTE, (1, *params))
+
+    def age_snapshot(self, seconds):
+        params = ('2024-01-01', '2024-01-31')
+        key = snapshot_key('repository_detail', 1, params, COMPUTE, (1, *params))
+        self.store.entries[key]['computed_at'] -= timedelta(seconds=seconds)
+
+    def test_first_request_computes_and_stores(self):
+        context, snapshot = self.serve()
+
+        self.assertEqual(context, {'label': 'fresh'})
+        self.assertEqual(computed, [1])
+        self.assertFalse(snapshot['stale'])
+        self.assertEqual(len(self.store.entries), 1)
+
+    def test_fresh_snapshot_is_served_without_refresh(self):
+        self.serve()
+        with patch('django_q.tasks.async_task') as async_task:
+            context, snapshot = self.serve(label='ignored')
+
+        self.assertEqual(context, {'label': 'fresh'})
+        self.assertEqual(computed, [1])
+        self.assertFalse(snapshot['refreshing'])
+        async_task.assert_not_called()
+
+    def test_stale_snapshot_is_served_and_refreshed_once(self):
+        """A burst of requests on an old snapshot enqueues a single refresh"""
+        self.serve()
+        self.age_snapshot(600)
+
+        with patch('django_q.tasks.async_task') as async_task:
+            for _ in range(3):
+                context, snapshot = self.serve(label='new')
+
+        self.assertEqual(context, {'label': 'fresh'})
+        self.assertTrue(snapshot['stale'])
+        self.assertTrue(snapshot['refreshing'])
+        self.assertGreaterEqual(snapshot['age_seconds'], 600)
+        self.assertEqual(async_task.call_count, 1)
+        self.assertEqual(async_task.call_args.args[0], 'analytics.page_snapshots.refresh_snapshot')
+
+        # The worker recomputes, stores and releases the lock
+        refresh_snapshot(*async_task.call_args.args[1:])
+        context, snapshot = self.serve()
+        self.assertEqual(context, {'label': 'new'})
+        self.assertFalse(snapshot['stale'])
+        self.assertEqual(len(self.store.entries), 1)
+
+    def test_data_version_bump_marks_stale(self):
+        self.serve()
+        self.versions = 'v2'
+
+        with patch('django_q.tasks.async_task') as async_task:
+            context, snapshot = self.serve()
+
+        self.assertTrue(snapshot['stale'])
+        async_task.assert_called_once()
+
+    def test_enqueue_failure_releases_the_lock(self):
+        self.serve()
+        self.age_snapshot(600)
+
+        with patch('django_q.tasks.async_task', side_effect=ConnectionError('broker down')):
+            context, snapshot = self.serve()
+
+        self.assertEqual(context, {'label': 'fresh'})
+        self.assertFalse(snapshot['refreshing'])
+        self.assertEqual(len(self.store.entries), 1)
+
+    def test_disabled_store_computes_every_request(self):
+        with patch('analytics.page_snapshots.get_store', return_value=None):
+            self.serve()
+            self.serve()
+        self.assertEqual(computed, [1, 1])
+        self.assertEqual(self.store.entries, {})
+
+    def test_inputs_of_the_compute_are_part_of_the_key(self):
+        self.serve()
+        context, _ = self.serve(label='other range', params=('2024-02-01', '2024-02-29'))
+
+        self.assertEqual(context, {'label': 'other range'})
+        self.assertEqual(len(self.store.entries), 2)
+
+
+class TestNormalizeDateRange(TestCase):
+    """Test cases for the normalization of date parameters"""
+
+    def test_valid_days_are_kept(self):
+        self.assertEqual(normalize_date_range('2024-01-01', '2024-01-31'), ('2024-01-01', '2024-01-31'))
+
+    def test_invalid_or_partial_ranges_are_dropped(self):
+        for start, end in (('2024-01-01', None), ('yesterday', '2024-01-31'), ('2024-01-01', '2024-13-01')):
+            self.assertEqual(normalize_date_range(start, end), (None, None))
@@ -0,0 +1,140 @@
+"""
+Tests for the query memoization of metric services
+"""
+from datetime import datetime
+from unittest.mock import Mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from analytics.metrics_cache import EntityMetricsCache
+from analytics.middleware import QueryStatsMiddleware
+from analytics.query_memo import QueryMemo, current_request_stats, end_request_stats, start_request_stats
+from analytics.unified_metrics_service import UnifiedMetricsService
+
+
+class FakeQuerySet:
+    """Queryset over a list of raw documents, counting the round trips"""
+
+    def __init__(self, docs, query=None):
+        self.docs = docs
+        self._document = Mock(**{'_get_collection_name.return_value': 'commits'})
+        self._query = query or {'repository_full_name': 'org/repo'}
+        self._ordering = None
+        self._skip = None
+        self._limit = None
+        self.round_trips = 0
+        self.fields = ()
+
+    def only(self, *fields):
+        self.fields = fields
+        return self
+
+    def as_pymongo(self):
+        self.round_trips += 1
+        return [{field: doc[field] for field in self.fields if field in doc} for doc in self.docs]
+
+    def count(self):
+        self.round_trips += 1
+        return len(self.docs)
+
+    def distinct(self, field):
+        self.round_trips += 1
+        return sorted({doc[field] for doc in self.docs})
+
+
+class TestQueryMemo(TestCase):
+    """Test cases for QueryMemo"""
+
+    def setUp(self):
+        self.queryset = FakeQuerySet([
+            {'author_email': 'a@example.com', 'message': 'fix crash', 'total_changes': 3},
+            {'author_email': 'b@example.com', 'message': 'add page', 'total_changes': 5},
+            {'author_email': 'a@example.com', 'message': 'docs', 'total_changes': 1},
+        ])
+        self.memo = QueryMemo()
+
+    def test_projection_is_materialized_once(self):
+        self.memo.documents(self.queryset, ('author_email', 'message', 'total_changes'))
+        self.memo.documents(self.queryset, ('message',))
+        self.assertEqual(self.memo.count(self.queryset), 3)
+        self.assertEqual(sorted(self.memo.distinct(self.queryset, 'author_email')), ['a@example.com', 'b@example.com'])
+
+        self.assertEqual(self.queryset.round_trips, 1)
+        self.assertEqual((self.memo.round_trips, self.memo.saved), (1, 3))
+
+    def test_missing_fields_and_other_queries_run(self):
+        self.memo.documents(self.queryset, ('message',))
+        self.memo.documents(self.queryset, ('message', 'total_changes'))
+        other = FakeQuerySet(self.queryset.docs, query={'repository_full_name': 'org/other'})
+        self.memo.count(other)
+        self.memo.count(other)
+
+        self.assertEqual(self.queryset.round_trips, 2)
+        self.assertEqual(other.round_trips, 1)
+
+    def test_request_stats_add_up_services(self):
+        stats = start_request_stats()
+        try:
+            for _ in range(2):
+                memo = QueryMemo()
+                memo.count(self.queryset)
+                memo.count(self.queryset)
+        finally:
+            end_request_stats()
+
+        self.assertEqual((stats.round_trips, stats.saved), (2, 2))
+        self.assertIsNone(current_request_stats())
+
+
+class TestMemoizedMetrics(TestCase):
+    """Test cases for metrics computed from memoized documents"""
+
+    def make_service(self, prs):
+        service = UnifiedMetricsService.__new__(UnifiedMetricsService)
+        service.entity_type = 'repository'
+        service.prs = FakeQuerySet(prs, query={'pull_requests': 1})
+        service.query_memo = QueryMemo()
+        service.metrics_cache = EntityMetricsCache('repository', 1, 'all', [])
+        service.metrics_cache.store = None
+        return service
+
+    def test_pr_metrics_use_one_round_trip(self):
+        service = self.make_service([
+            {'state': 'closed', 'created_at': datetime(2024, 1, 1), 'closed_at': datetime(2024, 1, 11),
+             'merged_at': datetime(2024, 1, 11), 'merged_by': 'ann', 'author': 'ann', 'comments_count': 4},
+            {'state': 'closed', 'created_at': datetime(2024, 1, 1), 'closed_at': datetime(2024, 1, 2),
+             'merged_at': datetime(2024, 1, 2), 'merged_by': 'bob', 'author': 'ann', 'comments_count': 1},
+            {'state': 'open', 'created_at': datetime(2024, 1, 5)},
+        ])
+
+        health = service.get_pr_health_metrics()
+        cycle_time = service.get_pr_cycle_time()
+
+        self.assertEqual(health['total_prs'], 3)
+        self.assertEqual((health['open_prs'], health['merged_prs'], health['closed_prs']), (1, 2, 2))
+        self.assertEqual((health['self_merged_prs'], health['prs_without_review'], health['old_open_prs']), (1, 2, 1))
+        self.assertEqual((cycle_time['min_cycle_time_hours'], cycle_time['max_cycle_time_hours']), (24.0, 240.0))
+        self.assertEqual(service.prs.round_trips, 1)
+
+
+class TestQueryStatsMiddleware(TestCase):
+    """Test cases for the per-request debug counters"""
+
+    def view(self, request):
+        memo = QueryMemo()
+        queryset = FakeQuerySet([{'message': 'x'}])
+        memo.count(queryset)
+        memo.count(queryset)
+        return HttpResponse('ok')
+
+    @override_settings(DEBUG=True)
+    def test_counts_in_debug_headers(self):
+        response = QueryStatsMiddleware(self.view)(RequestFactory().get('/repositories/1/'))
+        self.assertEqual(response['X-Mongo-Round-Trips'], '1')
+        self.assertEqual(response['X-Mongo-Round-Trips-Saved'], '1')
+
+    @override_settings(DEBUG=False)
+    def test_no_headers_in_production(self):
+        response = QueryStatsMiddleware(self.view)(RequestFactory().get('/repositories/1/'))
+        self.assertFalse(response.has_header('X-Mongo-Round-Trips'))
@@ -0,0 +1,80 @@
+"""
+Tests for the Security Health Score service
+"""
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from analytics.security_health_score_service import SecurityHealthScoreService
+
+
+class TestSecurityHealthScoreBatch(TestCase):
+    """Test cases for batch SHS computation"""
+
+    def setUp(self):
+        self.service = SecurityHealthScoreService()
+        self.repositories = [
+            Mock(full_name='org/vulnerable', id=1, kloc=5.0),
+            Mock(full_name='org/clean', id=2, kloc=3.0),
+            Mock(full_name='org/unknown', id=3, kloc=1.0),
+            Mock(full_name='org/no-size', id=4, kloc=0.0),
+        ]
+        self.severity_rows = [
+            {'_id': {'repository': 'org/vulnerable', 'severity': 'high'}, 'open': 2},
+            {'_id': {'repository': 'org/vulnerable', 'severity': 'low'}, 'open': 3},
+            {'_id': {'repository': 'org/vulnerable', 'severity': 'critical'}, 'open': 0},
+            {'_id': {'repository': 'org/clean', 'severity': 'medium'}, 'open': 0},
+            {'_id': {'repository': 'org/no-size', 'severity': 'critical'}, 'open': 1},
+        ]
+
+    def _run(self, mock_codeql, mock_kloc, mock_history, force=True, previous=None):
+        mock_codeql.objects.aggregate.return_value = iter(self.severity_rows)
+        mock_kloc.objects.aggregate.return_value = iter([{'_id': 'org/vulnerable', 'kloc': 10.0}])
+        mock_history.objects.aggregate.return_value = iter(previous or [])
+        return self.service.calculate_shs_batch(self.repositories, force=force)
+
+    @patch('analytics.security_health_score_service.SecurityHealthHistory')
+    @patch('analytics.security_health_score_service.RepositoryKLOCHistory')
+    @patch('analytics.security_health_score_service.CodeQLVulnerability')
+    def test_batch_uses_aggregations_and_one_insert(self, mock_codeql, mock_kloc, mock_history):
+        """Counts, KLOC and previous scores are read once, history is bulk inserted"""
+        results = self._run(mock_codeql, mock_kloc, mock_history,
+                            previous=[{'_id': 'org/vulnerable', 'shs_score': 90.0}])
+
+        mock_codeql.objects.aggregate.assert_called_once()
+        mock_kloc.objects.aggregate.assert_called_once()
+        mock_history.objects.aggregate.assert_called_once()
+        mock_history.objects.insert.assert_called_once()
+        self.assertEqual(len(mock_history.objects.insert.call_args.args[0]), 1)
+
+        vulnerable = results['org/vulnerable']
+        # Latest KLOC history wins over the repository field
+        expected = self.service._score_from_weight(2 * 0.7 + 3 * 0.1, 10.0)
+        self.assertEqual(vulnerable['shs_score'], round(expected, 1))
+        self.assertEqual(vulnerable['delta_shs'], round(expected - 90.0, 1))
+        self.assertEqual(vulnerable['total_vulnerabilities'], 5)
+        self.assertEqual(vulnerable['kloc'], 10.0)
+
+    @patch('analytics.security_health_score_service.SecurityHealthHistory')
+    @patch('analytics.security_health_score_service.RepositoryKLOCHistory')
+    @patch('analytics.security_health_score_service.CodeQLVulnerability')
+    def test_batch_statuses_match_single_repository_rules(self, mock_codeql, mock_kloc, mock_history):
+        """Clean, never analyzed and unsized repositories get the same statuses as calculate_shs"""
+        results = self._run(mock_codeql, mock_kloc, mock_history)
+
+        self.assertEqual(results['org/clean']['status'], 'perfect')
+        self.assertEqual(results['org/clean']['shs_score'], 100.0)
+        self.assertEqual(results['org/unknown']['status'], 'not_available')
+        self.assertEqual(results['org/unknown']['message'], 'CodeQL analysis not available')
+        self.assertEqual(results['org/no-size']['message'], 'Repository size not available')
+
+    @patch('analytics.security_health_score_service.SecurityHealthHistory')
+    @patch('analytics.security_health_score_service.RepositoryKLOCHistory')
+    @patch('analytics.security_health_score_service.CodeQLVulnerability')
+    def test_batch_skips_existing_scores_without_force(self, mock_codeql, mock_kloc, mock_history):
+        """Repositories with a score are skipped unless forced"""
+        results = self._run(mock_codeql, mock_kloc, mock_history, force=False,
+                            previous=[{'_id': 'org/vulnerable', 'shs_score': 90.0}])
+
+        self.assertNotIn('org/vulnerable', results)
+        mock_history.objects.insert.assert_not_called()
@@ -104,6 +104,7 @@ def mock_mongodb_objects():
     mock_qs.all.return_value = []
     mock_qs.filter.return_value = mock_qs
     mock_qs.get.return_value = None
+    mock_qs.distinct.return_value = []
     # Make the mock iterable
     mock_qs.__iter__ = lambda self: iter([])
     mock_qs.__len__ = lambda self: 0
@@ -122,7 +123,12 @@ def mock_mongodb_objects():
          patch('analytics.models.SyncLog.objects') as mock_sync_log_objects, \
          patch('analytics.models.RepositoryKLOCHistory.objects') as mock_kloc_history_objects, \
          patch('analytics.models.SecurityHealthHistory.objects') as mock_sh_history_objects, \
-         patch('analytics.models.Deployment.objects') as mock_deployment_objects:
+         patch('analytics.models.Deployment.objects') as mock_deployment_objects, \
+         patch('analytics.models.DoraMetricsSnapshot.objects') as mock_dora_snapshot_objects, \
+         patch('analytics.models.DeploymentWeeklyStats.objects') as mock_deployment_weekly_objects, \
+         patch('analytics.models.CodeQLDailySnapshot.objects') as mock_codeql_snapshot_objects, \
+         patch('analytics.models.DeveloperProfile._get_collection') as mock_profile_collection, \
+         patch('analytics.identity_index._index', None):
 
         # Apply the same mock queryset to all objects
         for mock_objects in [
@@ -140,6 +146,9 @@ def mock_mongodb_objects():
             mock_kloc_history_objects,
             mock_sh_history_objects,
             mock_deployment_objects,
+            mock_dora_snapshot_objects,
+            mock_deployment_weekly_objects,
+            mock_codeql_snapshot_objects,
         ]:
             mock_objects.filter.return_value = mock_qs
             mock_objects.first.return_value = None
@@ -152,9 +161,46 @@ def mock_mongodb_objects():
             # Also configure the filter return value to have the same model
             mock_objects.filter.return_value.model = mock_objects.model
 
+        # Developer profiles are read and written on the raw collection
+        mock_profile_collection.return_value.find_one.return_value = None
+
         yield
 
 
+@pytest.fixture(autouse=True)
+def mock_commit_label_collection():
+    """Mock the LLM commit label cache (no cached labels), classification backlog and command checkpoint collections"""
+    with patch('analytics.models.CommitLabel._get_collection') as mock_label_collection, \
+         patch('analytics.models.ClassificationBacklog._get_collection'), \
+         patch('analytics.models.CommandCheckpoint._get_collection') as mock_checkpoint_collection:
+        mock_label_collection.return_value.find.return_value = []
+        mock_checkpoint_collection.return_value.find_one.return_value = None
+        yield mock_label_collection
+
+
+@pytest.fixture(autouse=True)
+def mock_metrics_cache_collections():
+    """Mock the repository data versions (never bumped) and metrics cache collections"""
+    with patch('analytics.models.RepositoryDataVersion._get_collection') as mock_version_collection, \
+         patch('analytics.models.MetricsCacheEntry._get_collection'):
+        mock_version_collection.return_value.find.return_value = []
+        mock_version_collection.return_value.find_one_and_update.return_value = {'version': 1}
+        yield mock_version_collection
+
+
+@pytest.fixture
+def mock_dashboard_collections():
+    """Mock the collections aggregated by the dashboard snapshot (empty)"""
+    with patch('analytics.models.Commit._get_collection') as mock_commit_collection, \
+         patch('analytics.models.PullRequest._get_collection') as mock_pr_collection, \
+         patch('analytics.models.Release._get_collection') as mock_release_collection, \
+         patch('analytics.models.Deployment._get_collection') as mock_deployment_collection:
+        for collection in (mock_commit_collection, mock_pr_collection, mock_release_collection, mock_deployment_collection):
+            collection.return_value.estimated_document_count.return_value = 0
+            collection.return_value.aggregate.return_value = []
+        yield mock_commit_collection
+
+
 @pytest.fixture
 def mock_github_api():
     """Mock GitHub API responses"""
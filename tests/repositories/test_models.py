@@ -2,6 +2,7 @@ import pytest
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import datetime, timedelta
+from unittest.mock import patch
 from django.test import TestCase
 
 from repositories.models import Repository
@@ -55,7 +56,7 @@ class TestRepositoryModel(TestCase):
         self.assertEqual(self.repository.github_id, 123456789)
         self.assertTrue(self.repository.is_indexed)
         self.assertEqual(self.repository.commit_count, 500)
-        # kloc is now a property that retrieves from MongoDB, default to 0.0 if no history
+        # kloc mirrors the latest KLOC history entry, 0.0 until one is saved
         self.assertEqual(self.repository.kloc, 0.0)
         self.assertEqual(self.repository.owner, self.user)
     
@@ -216,3 +217,26 @@ class TestRepositoryModel(TestCase):
         self.assertIsNone(repo.kloc_calculated_at)
         self.assertIsNotNone(repo.created_at)
         self.assertIsNotNone(repo.updated_at)
+
+    @patch('analytics.metrics_cache.bump_data_version')
+    @patch('mongoengine.Document.save')
+    def test_kloc_history_save_updates_repository(self, mock_document_save, mock_bump):
+        """Test that saving a KLOC history entry stores it on the repository, unless an older one"""
+        from analytics.models import RepositoryKLOCHistory
+
+        calculated_at = timezone.now()
+        RepositoryKLOCHistory(
+            repository_full_name=self.repository.full_name, repository_id=self.repository.id,
+            kloc=42.5, total_lines=42500, calculated_at=calculated_at
+        ).save()
+        RepositoryKLOCHistory(
+            repository_full_name=self.repository.full_name, repository_id=self.repository.id,
+            kloc=10.0, total_lines=10000, calculated_at=calculated_at - timedelta(days=1)
+        ).save()
+
+        self.repository.refresh_from_db()
+        self.assertEqual(self.repository.kloc, 42.5)
+        self.assertEqual(self.repository.kloc_calculated_at, calculated_at)
+        self.assertEqual(mock_document_save.call_count, 2)
+        # Only the stored (latest) calculation invalidates the repository's pages
+        mock_bump.assert_called_once_with(self.repository.full_name)
@@ -385,3 +385,122 @@ class DORAMetricsTestCase(TestCase):
         # Test edge cases
         self.assertEqual(_classify_dora_performance('deployment_frequency', 0)['grade'], 'N/A')
         self.assertEqual(_classify_dora_performance('deployment_frequency', None)['grade'], 'N/A')
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test cases for ETag/304 on repository API endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='testpass123')
+        self.repository = Repository.objects.create(
+            name='etag-repo', full_name='test-org/etag-repo', github_id=54321, owner=self.user
+        )
+        self.client.force_login(self.user)
+        self.url = f'/repositories/api/{self.repository.id}/developer-activity/'
+        self.version = 'v1'
+        patchers = [
+            patch('repositories.views.versions_digest', side_effect=lambda names: self.version),
+            patch('repositories.views.UnifiedMetricsService'),
+        ]
+        patchers[0].start()
+        self.service = patchers[1].start()
+        self.service.return_value.get_developer_activity.return_value = {'developers': []}
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_unchanged_data_answers_304_without_computing(self):
+        response = self.client.get(self.url, {'days': 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(self.url, {'days': 30}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.service.call_count, 1)
+
+    def test_etag_changes_with_data_version_and_params(self):
+        etag = self.client.get(self.url, {'days': 30})['ETag']
+        self.assertNotEqual(self.client.get(self.url, {'days': 90})['ETag'], etag)
+
+        self.version = 'v2'
+        response = self.client.get(self.url, {'days': 30}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_errors_are_not_tagged(self):
+        self.service.return_value.get_developer_activity.side_effect = RuntimeError('mongo down')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_unknown_repository_is_not_tagged(self):
+        response = self.client.get('/repositories/api/999999/developer-activity/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class RepositoryPanelTestCase(TestCase):
+    """Test cases for the lazily loaded panels of the repository detail page"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='panels', email='panels@example.com', password='testpass123')
+        self.repository = Repository.objects.create(
+            name='panel-repo', full_name='test-org/panel-repo', github_id=65432, owner=self.user
+        )
+        self.client.force_login(self.user)
+        patcher = patch('repositories.views.versions_digest', return_value='v1')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def url(self, panel):
+        return f'/repositories/{self.repository.id}/panels/{panel}/'
+
+    @patch('repositories.views._get_sonarcloud_metrics')
+    def test_panel_renders_its_fragment(self, mock_sonarcloud):
+        mock_sonarcloud.return_value = Mock(maintainability_rating='A', reliability_rating='B', security_rating='C')
+
+        response = self.client.get(self.url('sonarcloud'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Maintainability')
+        self.assertNotContains(response, '<html')
+        self.assertTrue(response['Server-Timing'].startswith('sonarcloud;dur='))
+        self.assertTrue(response.has_header('ETag'))
+        mock_sonarcloud.assert_called_once_with(self.repository.id)
+
+    @patch('repositories.views._get_codeql_metrics')
+    @patch('repositories.views._get_dora_metrics')
+    def test_panel_only_computes_its_own_data(self, mock_dora, mock_codeql):
+        Repository.objects.filter(id=self.repository.id).update(kloc=12.34)
+        response = self.client.get(self.url('kloc'))
+
+        self.assertContains(response, '12.3')
+        mock_dora.assert_not_called()
+        mock_codeql.assert_not_called()
+
+    def test_unknown_panel_is_404(self):
+        self.assertEqual(self.client.get(self.url('unknown')).status_code, 404)
+
+
+class RepositoryListTestCase(TestCase):
+    """Test cases for sorting and paginating the repository list"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='lister', email='lister@example.com', password='testpass123')
+        for index, kloc in enumerate([3.0, 51.5, 0.0, 12.0]):
+            Repository.objects.create(
+                name=f'repo-{index}', full_name=f'test-org/repo-{index}', github_id=70000 + index,
+                owner=self.user, kloc=kloc
+            )
+        self.client.force_login(self.user)
+
+    @patch('analytics.models.RepositoryKLOCHistory.objects')
+    def test_kloc_sort_is_done_in_the_database(self, history_objects):
+        response = self.client.get(
+            '/repositories/', {'sort': 'kloc', 'order': 'desc'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        data = response.json()
+        self.assertEqual([repo['kloc'] for repo in data['repositories']], [51.5, 12.0, 3.0, 0.0])
+        self.assertEqual(data['total_count'], 4)
+        history_objects.filter.assert_not_called()
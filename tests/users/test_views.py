@@ -9,6 +9,7 @@ from users.models import UserProfile
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures('mock_dashboard_collections')
 class TestLoginView(TestCase):
     """Test login view"""
     
@@ -81,6 +82,7 @@ class TestLoginView(TestCase):
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures('mock_dashboard_collections')
 class TestRegisterView(TestCase):
     """Test register view"""
     
@@ -328,6 +330,7 @@ class TestProfileView(TestCase):
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures('mock_dashboard_collections')
 class TestDashboardView(TestCase):
     """Test dashboard view"""
     
@@ -9,15 +9,13 @@ from .forms import CustomUserCreationForm, CustomAuthenticationForm, UserProfile
 from .models import UserProfile
 from .services import GitHubUserService
 # from models import GitHubUser  # Supprimé car inutilisé et cause une erreur linter
-from analytics.models import Commit, PullRequest, DeveloperAlias, Developer, Release, Deployment  # mongoengine
+from analytics.models import DeveloperAlias, Developer  # mongoengine
 
-from django.utils import timezone
-from collections import defaultdict
 from allauth.socialaccount.models import SocialAccount, SocialToken
 from analytics.analytics_service import AnalyticsService
 from analytics.models import Developer as MongoDeveloper, DeveloperAlias as MongoDeveloperAlias
+from analytics.dashboard_snapshot import serve_dashboard
 import requests
-from repositories.models import Repository
 
 
 def login_view(request):
@@ -159,13 +157,12 @@ def profile_view(request):
             'github_id': developer.github_id,
             'aliases': aliases
         })()
-        from analytics.models import Commit
-        alias_emails = [alias.email for alias in aliases]
-        all_commits = Commit.objects.filter(author_email__in=alias_emails)
-        from developers.views import _calculate_detailed_quality_metrics, _calculate_commit_type_distribution, _calculate_quality_metrics_by_month
-        detailed_quality_metrics = _calculate_detailed_quality_metrics(all_commits)
-        commit_type_data = _calculate_commit_type_distribution(all_commits)
-        quality_metrics_by_month = _calculate_quality_metrics_by_month(all_commits)
+        from analytics.developer_profile_service import DeveloperProfileService
+        from developers.views import _build_activity_chart_data
+        profile = DeveloperProfileService.get_profile(str(developer.id))
+        detailed_quality_metrics = profile.detailed_quality_metrics()
+        commit_type_data = profile.commit_type_distribution()
+        quality_metrics_by_month = profile.quality_metrics_by_month()
         polar_chart_data = []
         for repo in developer_stats.get('top_repositories', []):
             net_lines = repo.get('additions', 0) - repo.get('deletions', 0)
@@ -178,50 +175,7 @@ def profile_view(request):
             })
         if not polar_chart_data:
             polar_chart_data = []
-        from datetime import datetime, timedelta, timezone as dt_timezone
-        now = datetime.now(dt_timezone.utc).replace(tzinfo=None)
-        cutoff = now - timedelta(days=365)
-        commits_365d = [c for c in all_commits if c.authored_date and c.authored_date.replace(tzinfo=None) >= cutoff]
-        repo_bubbles = {}
-        for commit in commits_365d:
-            repo = commit.repository_full_name or 'unknown'
-            commit_dt = commit.get_authored_date_in_timezone()
-            days_ago = (now.date() - commit_dt.date()).days
-            hour = commit_dt.hour
-            key = (days_ago, hour)
-            if repo not in repo_bubbles:
-                repo_bubbles[repo] = {}
-            if key not in repo_bubbles[repo]:
-                repo_bubbles[repo][key] = {'commits': 0, 'changes': 0}
-            repo_bubbles[repo][key]['commits'] += 1
-            repo_bubbles[repo][key]['changes'] += (commit.additions or 0) + (commit.deletions or 0)
-        palette = [
-            {'bg': 'rgba(16, 185, 129, 0.6)', 'border': 'rgba(16, 185, 129, 1)'},
-            {'bg': 'rgba(59, 130, 246, 0.6)', 'border': 'rgba(59, 130, 246, 1)'},
-            {'bg': 'rgba(245, 158, 11, 0.6)', 'border': 'rgba(245, 158, 11, 1)'},
-            {'bg': 'rgba(139, 92, 246, 0.6)', 'border': 'rgba(139, 92, 246, 1)'},
-            {'bg': 'rgba(236, 72, 153, 0.6)', 'border': 'rgba(236, 72, 153, 1)'},
-            {'bg': 'rgba(34, 197, 94, 0.6)', 'border': 'rgba(34, 197, 94, 1)'},
-        ]
-        chart_data = []
-        for i, (repo, bubbles) in enumerate(repo_bubbles.items()):
-            color = palette[i % len(palette)]
-            dataset = {
-                'label': repo,
-                'data': [],
-                'backgroundColor': color['bg'],
-                'borderColor': color['border'],
-                'borderWidth': 1
-            }
-            for (days_ago, hour), data in bubbles.items():
-                dataset['data'].append({
-                    'x': days_ago,
-                    'y': hour,
-                    'r': min(5 + data['commits'] * 2, 20),
-                    'commit_count': data['commits'],
-                    'changes': data['changes']
-                })
-            chart_data.append(dataset)
+        chart_data = _build_activity_chart_data(profile)
         def _get_commit_type_color(commit_type):
             colors = {
                 'fix': '#4caf50',
@@ -242,11 +196,11 @@ def profile_view(request):
         last_commit = None
         if developer_stats.get('first_commit_date'):
             from analytics.models import Commit
-            first_commit = Commit.objects.filter(author_email__in=alias_emails).order_by('authored_date').first()
+            first_commit = Commit.objects.filter(developer_id=str(developer.id)).order_by('authored_date').first()
         if developer_stats.get('last_commit_date'):
             from analytics.models import Commit
-            last_commit = Commit.objects.filter(author_email__in=alias_emails).order_by('-authored_date').first()
-        commit_frequency = analytics.get_developer_commit_frequency(all_commits)
+            last_commit = Commit.objects.filter(developer_id=str(developer.id)).order_by('-authored_date').first()
+        commit_frequency = profile.commit_frequency()
         context = {
             'form': form,
             'github_user': github_user,
@@ -299,55 +253,7 @@ def home_view(request):
 
 @login_required
 def dashboard_view(request):
-    """Dashboard view"""
-    total_repositories = Repository.objects.count()  # Django ORM, comme sur /repositories/
-    total_commits = Commit.objects().count()  # mongoengine
-    total_pull_requests = PullRequest.objects().count()  # mongoengine
-    total_releases = Release.objects().count()  # mongoengine
-    total_deployments = Deployment.objects().count()  # mongoengine
-
-    # Commits du mois (30 derniers jours)
-    cutoff_date = timezone.now() - timezone.timedelta(days=30)
-    recent_commits = Commit.objects.filter(authored_date__gte=cutoff_date)
-
-    # Top développeurs (par Developer global, nom principal)
-    dev_stats = defaultdict(int)
-    alias_to_developer = {}
-    # Préparer un mapping email -> Developer
-    for alias in DeveloperAlias.objects.filter(developer__ne=None):
-        alias_to_developer[alias.email.lower()] = alias.developer
-    for commit in recent_commits:
-        dev = alias_to_developer.get(commit.author_email.lower())
-        if dev:
-            key = dev.primary_name.strip()
-        else:
-            key = commit.author_name.strip()
-        dev_stats[key] += 1
-    top_developers = [{'name': name, 'commits': count} for name, count in sorted(dev_stats.items(), key=lambda x: -x[1])[:5]]
-
-    # Top repositories (par nom)
-    repo_stats = defaultdict(int)
-    for commit in recent_commits:
-        key = commit.repository_full_name.strip()
-        repo_stats[key] += 1
-    top_repositories = [{'repo': repo, 'commits': count} for repo, count in sorted(repo_stats.items(), key=lambda x: -x[1])[:5]]
-
-    # Top repositories by deployments (ce mois)
-    deployment_repo_stats = defaultdict(int)
-    recent_deployments = Deployment.objects.filter(created_at__gte=cutoff_date)
-    for dep in recent_deployments:
-        key = dep.repository_full_name.strip()
-        deployment_repo_stats[key] += 1
-    top_deployment_repositories = [{'repo': repo, 'deployments': count} for repo, count in sorted(deployment_repo_stats.items(), key=lambda x: -x[1])[:5]]
-
-    context = {
-        'total_repositories': total_repositories,
-        'total_commits': total_commits,
-        'total_pull_requests': total_pull_requests,
-        'total_releases': total_releases,
-        'total_deployments': total_deployments,
-        'top_developers': top_developers,
-        'top_repositories': top_repositories,
-        'top_deployment_repositories': top_deployment_repositories,
-    }
+    """Dashboard view, served from the global dashboard snapshot"""
+    context, snapshot = serve_dashboard()
+    context['snapshot'] = snapshot
     return render(request, 'users/dashboard.html', context)